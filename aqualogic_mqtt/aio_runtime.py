@@ -0,0 +1,363 @@
+"""Optional single-event-loop runtime for the bridge.
+
+The default runtime runs paho's network thread, a Flask server thread, the
+AquaLogic reader thread and the reconcile loop side by side. This runtime keeps
+MQTT socket I/O (paho's external-loop socket callbacks), the panel byte
+stream, the web API (aiohttp) and reconciliation on one asyncio loop.
+
+pyAqualogic's frame parser is a blocking byte-at-a-time loop, so it still runs
+in one dedicated thread fed from the event loop; its change callbacks are
+coalesced and handed back to the loop. The LCD menu drivers keep their worker
+threads because their keypress/verify sequences are shared with the threaded
+runtime.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import re
+import threading
+from typing import Callable, Optional
+
+from aiohttp import web
+
+from .client import Client, split_host_port
+from .webapp import API_ROUTES, basic_auth_token, default_static_dir
+
+logger = logging.getLogger("aqualogic_mqtt.aio_runtime")
+
+
+class PanelByteFeed:
+    """File-like byte source for ``AquaLogic.connect_io``.
+
+    The event loop appends received bytes with ``feed``; the parser thread
+    blocks in ``read``. ``write`` hands key frames back to the loop.
+    """
+
+    def __init__(self, writer: Callable[[bytes], None]):
+        self._writer = writer
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def feed(self, data: bytes) -> None:
+        if not data:
+            return
+        with self._cond:
+            self._buffer.extend(data)
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def read(self, size: int = 1) -> bytes:
+        with self._cond:
+            while not self._buffer and not self._closed:
+                self._cond.wait()
+            if not self._buffer:
+                return b""  # pyAqualogic treats an empty read as EOF
+            chunk = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return chunk
+
+    def write(self, data) -> None:
+        self._writer(bytes(data))
+
+
+def _aiohttp_rule(rule: str) -> str:
+    return re.sub(r"<(?:\w+:)?(\w+)>", r"{\1}", rule)
+
+
+def create_aiohttp_app(
+    static_dir: Optional[str] = None,
+    basic_user: Optional[str] = None,
+    basic_pass: Optional[str] = None,
+) -> web.Application:
+    """aiohttp equivalent of ``webapp.create_app`` serving the same API routes."""
+    token = basic_auth_token(basic_user, basic_pass)
+
+    @web.middleware
+    async def require_auth(request, handler):
+        if token is not None and request.headers.get("Authorization") != token:
+            return web.Response(
+                status=401,
+                text="Unauthorized",
+                headers={"WWW-Authenticate": 'Basic realm="AquaLogic"'},
+            )
+        return await handler(request)
+
+    app = web.Application(middlewares=[require_auth])
+
+    def view_for(api_handler):
+        async def view(request: web.Request) -> web.Response:
+            body = {}
+            if request.can_read_body:
+                try:
+                    body = await request.json()
+                except ValueError:
+                    body = {}
+            if not isinstance(body, dict):
+                body = {}
+            if request.method == "GET":
+                body = {**dict(request.query), **body}
+            # Handlers take locks and may wait on the panel; keep them off the loop.
+            payload, status = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(api_handler, body, **request.match_info)
+            )
+            return web.json_response(payload, status=status)
+        return view
+
+    for method, rule, api_handler in API_ROUTES:
+        app.router.add_route(method, _aiohttp_rule(rule), view_for(api_handler))
+
+    root = os.path.realpath(static_dir or default_static_dir())
+
+    async def static_file(request: web.Request) -> web.StreamResponse:
+        relative = request.match_info.get("path") or "index.html"
+        path = os.path.realpath(os.path.join(root, relative))
+        if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+            raise web.HTTPNotFound()
+        return web.FileResponse(path)
+
+    app.router.add_get("/", static_file)
+    app.router.add_get("/{path:.+}", static_file)
+    return app
+
+
+class AsyncRuntime:
+    """Drive an existing ``Client`` from a single asyncio event loop."""
+
+    def __init__(
+        self,
+        client: Client,
+        *,
+        misc_interval_seconds: float = 1.0,
+    ):
+        self._client = client
+        self._paho = client._paho_client
+        self._panel = client._panel
+        self._misc_interval_seconds = float(misc_interval_seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._panel_pending = False
+        self._source: Optional[str] = None
+        self._web_runner: Optional[web.AppRunner] = None
+        self._closers: list[Callable[[], None]] = []
+
+    # ---- thread hand-off ----
+    def _on_loop(self, callback: Callable, *args) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    # ---- MQTT over the event loop ----
+    def _attach_mqtt(self) -> None:
+        self._paho.on_socket_open = self._on_socket_open
+        self._paho.on_socket_close = self._on_socket_close
+        self._paho.on_socket_register_write = self._on_socket_register_write
+        self._paho.on_socket_unregister_write = self._on_socket_unregister_write
+        # The client's supervisors decide when to reconnect; make their
+        # attempts run on this loop instead of paho's thread API. The ticks
+        # that ask for them run in an executor thread, so hop to the loop.
+        self._client._mqtt_link.set_connect(lambda: self._on_loop(self._start_mqtt_reconnect))
+        self._client._panel_link.set_connect(lambda: self._on_loop(self._start_panel_reconnect))
+
+    def _on_socket_open(self, client, userdata, sock) -> None:
+        def register():
+            self._loop.add_reader(sock, client.loop_read)
+        self._on_loop(register)
+
+    def _on_socket_close(self, client, userdata, sock) -> None:
+        self._on_loop(self._loop.remove_reader, sock)
+
+    def _on_socket_register_write(self, client, userdata, sock) -> None:
+        self._on_loop(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock) -> None:
+        self._on_loop(self._loop.remove_writer, sock)
+
+    def _start_mqtt_reconnect(self) -> None:
+        self._spawn(self._loop.run_in_executor(None, self._paho.reconnect), "MQTT reconnect")
+
+    def _spawn(self, awaitable, what: str) -> None:
+        # Failures are only logged: the supervisor retries when it sees no
+        # sign of life within its confirmation window.
+        def done(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.warning("%s failed: %s", what, future.exception())
+        asyncio.ensure_future(awaitable).add_done_callback(done)
+
+    async def _mqtt_misc(self) -> None:
+        while True:
+            self._paho.loop_misc()
+            await asyncio.sleep(self._misc_interval_seconds)
+
+    async def _connect_mqtt(self, dest: str) -> None:
+        host, port = split_host_port(dest)
+        await self._loop.run_in_executor(None, self._paho.connect, host, port, 60)
+        logger.debug("Connected to %s:%s", host, port)
+
+    # ---- panel source ----
+    def _panel_changed_from_reader(self, panel) -> None:
+        # Frames can arrive far faster than consumers need them; keep at most
+        # one hand-off queued since it reads the latest panel state anyway.
+        if self._panel_pending:
+            return
+        self._panel_pending = True
+        self._loop.call_soon_threadsafe(self._dispatch_panel_changed)
+
+    def _dispatch_panel_changed(self) -> None:
+        self._panel_pending = False
+        try:
+            self._client._panel_changed(self._panel)
+        except Exception:
+            logger.exception("panel update handling failed")
+
+    async def _open_tcp(self, host: str, port: int) -> PanelByteFeed:
+        reader, writer = await asyncio.open_connection(host, port)
+        feed = PanelByteFeed(lambda data: self._on_loop(writer.write, data))
+
+        async def pump():
+            try:
+                while True:
+                    data = await reader.read(256)
+                    if not data:
+                        break
+                    feed.feed(data)
+            finally:
+                feed.close()
+
+        self._loop.create_task(pump())
+        self._closers.append(writer.close)
+        self._closers.append(feed.close)
+        return feed
+
+    def _open_serial(self, path: str) -> PanelByteFeed:
+        import serial
+        port = serial.Serial(port=path, baudrate=19200, stopbits=serial.STOPBITS_TWO, timeout=0)
+
+        def write(data: bytes) -> None:
+            port.write(data)
+            port.flush()
+
+        feed = PanelByteFeed(lambda data: self._on_loop(write, data))
+
+        def readable() -> None:
+            try:
+                feed.feed(port.read(port.in_waiting or 1))
+            except serial.SerialException:
+                logger.exception("serial read failed")
+                self._loop.remove_reader(port.fileno())
+                feed.close()
+
+        def close() -> None:
+            self._loop.remove_reader(port.fileno())
+            port.close()
+            feed.close()
+
+        self._loop.add_reader(port.fileno(), readable)
+        self._closers.append(close)
+        return feed
+
+    def _close_panel(self) -> None:
+        closers, self._closers = self._closers, []
+        for close in closers:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def _start_panel_reconnect(self) -> None:
+        self._close_panel()
+        self._spawn(self._connect_panel(self._source), "Panel reconnect")
+
+    async def _connect_panel(self, source: str) -> None:
+        self._source = source
+        if ':' in source:
+            host, port = source.split(':')
+            feed = await self._open_tcp(host, int(port))
+        else:
+            feed = self._open_serial(source)
+        self._panel.connect_io(feed)
+        reader = threading.Thread(
+            target=self._client._run_panel_reader,
+            args=[self._panel_changed_from_reader],
+            name="aqualogic-parser",
+            daemon=True,
+        )
+        self._client._panel_thread = reader
+        reader.start()
+
+    # ---- web ----
+    async def _start_web(self, host: str, port: int, **app_kwargs) -> None:
+        runner = web.AppRunner(create_aiohttp_app(**app_kwargs))
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        self._web_runner = runner
+        print(f"Web UI listening on http://{host}:{port}")
+
+    # ---- main loop ----
+    async def _tick_loop(self) -> None:
+        while True:
+            # A tick can wait on panel locks; keep the loop free to deliver
+            # the frames that menu drivers are polling for meanwhile.
+            delay = await self._loop.run_in_executor(None, self._client.service_tick)
+            reasons = await self._client._scheduler.wait_async(delay)
+            logger.debug("Reconcile wake-up: %s", ", ".join(sorted(reasons)))
+
+    async def run(
+        self,
+        *,
+        source: str,
+        mqtt_dest: str,
+        http_host: str = "0.0.0.0",
+        http_port: int = 0,
+        static_dir: Optional[str] = None,
+        basic_user: Optional[str] = None,
+        basic_pass: Optional[str] = None,
+    ) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._attach_mqtt()
+        try:
+            if http_port and http_port > 0:
+                await self._start_web(
+                    http_host,
+                    http_port,
+                    static_dir=static_dir,
+                    basic_user=basic_user,
+                    basic_pass=basic_pass,
+                )
+            print("Connecting MQTT...")
+            try:
+                await self._connect_mqtt(mqtt_dest)
+            except Exception as exc:
+                self._client._mqtt_link.start_failed(exc)
+            print("Connecting Controller...")
+            try:
+                await self._connect_panel(source)
+            except Exception as exc:
+                self._client._panel_link.start_failed(exc)
+            print("Starting loop...")
+            await asyncio.gather(self._mqtt_misc(), self._tick_loop())
+        finally:
+            self._client._scheduler.notify("shutdown")
+            self._client.flush_state()
+            self._close_panel()
+            if self._web_runner is not None:
+                await self._web_runner.cleanup()
+            self._paho.disconnect()
+
+    def run_forever(self, **kwargs) -> None:
+        asyncio.run(self.run(**kwargs))
@@ -6,6 +6,7 @@ America/New_York so the intended wall-clock behavior survives DST changes.
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import asdict, dataclass, field
 from datetime import date, datetime, time, timedelta, timezone
 import json
@@ -14,12 +15,18 @@ from threading import Lock
 from typing import Callable, Mapping, Optional, Sequence
 from zoneinfo import ZoneInfo
 
+from .interlocks import InterlockFile
+from .lcd_arbiter import LcdArbiter, LcdBusyError
 from .vsp import PRESET_SPEEDS
 
 
 LOCAL_TIMEZONE = ZoneInfo("America/New_York")
 UTC = timezone.utc
 DAILY_MANUAL_RELEASE_TIME = time(3, 0)
+# A holding speed lease is renewed once fewer than this many seconds remain.
+LEASE_RENEWAL_SECONDS = 45.0
+# Menu drivers whose LCD lease pauses automation, and the phase shown meanwhile.
+_LCD_HOLDER_PHASES = {"heater_targets": "heater_target", "clock_sync": "clock_sync"}
 
 
 def utc_now() -> datetime:
@@ -58,6 +65,54 @@ class PumpWindow:
         return current >= start or current < end
 
 
+def _second_of_day(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class DailyTimeline:
+    """One local day of schedule compiled to sorted transition points.
+
+    ``starts[i]`` is the second of the local day at which ``slots[i]`` (pump
+    preset, cleanout active) takes effect. Windows that wrap past midnight
+    simply contribute a transition at each end, so lookup is a single
+    ``bisect`` regardless of the number of windows.
+    """
+
+    __slots__ = ("starts", "slots")
+
+    def __init__(
+        self,
+        pump_schedule: Sequence[PumpWindow],
+        cleanout_start: time,
+        cleanout_end: time,
+        fallback_preset: str,
+    ):
+        points = {0, _second_of_day(cleanout_start), _second_of_day(cleanout_end)}
+        for window in pump_schedule:
+            points.update((_second_of_day(window.start), _second_of_day(window.end)))
+        cleanout = (_second_of_day(cleanout_start), _second_of_day(cleanout_end))
+        starts: list[int] = []
+        slots: list[tuple[str, bool]] = []
+        for point in sorted(points):
+            local_time = time(point // 3600, point % 3600 // 60, point % 60)
+            preset = next(
+                (window.preset for window in pump_schedule if window.contains(local_time)),
+                fallback_preset,
+            )
+            slot = (preset, cleanout[0] <= point < cleanout[1])
+            if not slots or slots[-1] != slot:
+                starts.append(point)
+                slots.append(slot)
+        self.starts = tuple(starts)
+        self.slots = tuple(slots)
+
+    def slot_at(self, second: int) -> tuple[str, bool]:
+        return self.slots[bisect_right(self.starts, second) - 1]
+
+    def starts_after(self, second: int) -> tuple[int, ...]:
+        return self.starts[bisect_right(self.starts, second):]
+
+
 DEFAULT_PUMP_SCHEDULE = (
     PumpWindow(time(0, 0), time(8, 0), "speed4"),
     PumpWindow(time(8, 0), time(10, 0), "speed1"),
@@ -121,18 +176,80 @@ class ScheduleResolver:
         self.cleanout_start = cleanout_start
         self.cleanout_end = cleanout_end
         self.fallback_preset = fallback_preset
+        self._timeline = DailyTimeline(
+            self.pump_schedule, cleanout_start, cleanout_end, fallback_preset
+        )
 
-    def scheduled_preset(self, local_time: time) -> str:
-        for window in self.pump_schedule:
-            if window.contains(local_time):
-                return window.preset
-        return self.fallback_preset
+    def timeline_for(self, local_date: date) -> DailyTimeline:
+        del local_date  # the built-in schedule is the same every day
+        return self._timeline
 
-    def _cleanout_active(self, local_time: time) -> bool:
-        current = (local_time.hour, local_time.minute, local_time.second)
-        start = (self.cleanout_start.hour, self.cleanout_start.minute, self.cleanout_start.second)
-        end = (self.cleanout_end.hour, self.cleanout_end.minute, self.cleanout_end.second)
-        return start <= current < end
+    def describe(self) -> dict:
+        return {"source": "built-in", "timezone": str(self.timezone)}
+
+    def scheduled_preset(self, local_time: time, local_date: Optional[date] = None) -> str:
+        day = local_date or datetime.now(self.timezone).date()
+        return self.timeline_for(day).slot_at(_second_of_day(local_time))[0]
+
+    def slot(self, now_utc: datetime) -> tuple[str, bool]:
+        """Return (scheduled preset, cleanout active) at a UTC instant."""
+        local = parse_utc(now_utc).astimezone(self.timezone)
+        return self.timeline_for(local.date()).slot_at(
+            local.hour * 3600 + local.minute * 60 + local.second
+        )
+
+    def _offset_change(self, start: datetime, end: datetime) -> Optional[datetime]:
+        """Return the first UTC second in [start, end) using ``end``'s UTC offset."""
+        target = end.astimezone(self.timezone).utcoffset()
+        if start.astimezone(self.timezone).utcoffset() == target:
+            return None
+        low, high = 0, int((end - start).total_seconds())
+        while low < high:
+            middle = (low + high) // 2
+            if (start + timedelta(seconds=middle)).astimezone(self.timezone).utcoffset() == target:
+                high = middle
+            else:
+                low = middle + 1
+        return start + timedelta(seconds=low)
+
+    def _day_candidates(self, day: date, after_second: int) -> list[datetime]:
+        day_start = datetime.combine(day, time(0), tzinfo=self.timezone).astimezone(UTC)
+        next_start = datetime.combine(
+            day + timedelta(days=1), time(0), tzinfo=self.timezone
+        ).astimezone(UTC)
+        candidates = {next_start}
+        for second in self.timeline_for(day).starts_after(after_second):
+            wall = time(second // 3600, second % 3600 // 60, second % 60)
+            # Both folds: a repeated fall-back wall time occurs twice and a
+            # skipped spring-forward one resolves to either side of the jump.
+            for fold in (0, 1):
+                candidates.add(
+                    datetime.combine(day, wall, tzinfo=self.timezone).replace(fold=fold).astimezone(UTC)
+                )
+        jump = self._offset_change(day_start, next_start)
+        if jump is not None:
+            candidates.add(jump)
+        return sorted(candidates)
+
+    def next_change(self, now_utc: datetime, *, horizon_days: int = 3) -> Optional[datetime]:
+        """Return the first instant after now at which ``slot`` changes.
+
+        Walks compiled transition points (and any DST offset change) one
+        local day at a time, so an ordinary call touches only the remainder
+        of today's timeline.
+        """
+        now = parse_utc(now_utc)
+        current = self.slot(now)
+        local = now.astimezone(self.timezone)
+        after_second = local.hour * 3600 + local.minute * 60 + local.second
+        day = local.date()
+        for offset in range(horizon_days):
+            if offset:
+                after_second = -1
+            for candidate in self._day_candidates(day + timedelta(days=offset), after_second):
+                if candidate > now and self.slot(candidate) != current:
+                    return candidate
+        return None
 
     @staticmethod
     def _switches(source: object) -> dict[str, Optional[bool]]:
@@ -151,8 +268,7 @@ class ScheduleResolver:
         pool_heat_enabled: bool = False,
     ) -> DesiredState:
         now = parse_utc(now_utc)
-        local = now.astimezone(self.timezone)
-        scheduled = self.scheduled_preset(local.timetz().replace(tzinfo=None))
+        scheduled, cleanout = self.slot(now)
 
         if openclaw_spa_session is not None:
             session_phase = str(openclaw_spa_session.get("phase") or "spa")
@@ -186,7 +302,6 @@ class ScheduleResolver:
                 switches={"auto_heat": True, "heater_relay": True},
             )
 
-        cleanout = self._cleanout_active(local.timetz().replace(tzinfo=None))
         base_mode = "spillover" if cleanout else "pool"
         base_source = "cleanout" if cleanout else "schedule"
         if manual_override is not None and manual_override.active_at(now):
@@ -237,11 +352,14 @@ class AutomationEngine:
         manual_duration_seconds: float = 12 * 60 * 60,
         clock_sync: Optional[object] = None,
         heater_targets: Optional[object] = None,
+        on_change: Optional[Callable[[], None]] = None,
+        arbiter: Optional[LcdArbiter] = None,
     ):
         self._equipment = equipment
         self._vsp = vsp
         self._enabled = bool(enabled)
         self._enable_file = str(enable_file) if enable_file else None
+        self._enable_flag = InterlockFile(self._enable_file)
         self._state_file = str(state_file) if state_file else None
         self._resolver = resolver or ScheduleResolver()
         self._now = now
@@ -249,6 +367,8 @@ class AutomationEngine:
         self._manual_duration_seconds = float(manual_duration_seconds)
         self._clock_sync = clock_sync
         self._heater_targets = heater_targets
+        self._on_change = on_change
+        self._arbiter = arbiter or LcdArbiter()
         self._lock = Lock()
         self._tick_lock = Lock()
         self._manual_override: Optional[ManualOverride] = None
@@ -270,7 +390,7 @@ class AutomationEngine:
         return local_now.date() - timedelta(days=1)
 
     def is_enabled(self) -> bool:
-        return self._enabled or bool(self._enable_file and os.path.isfile(self._enable_file))
+        return self._enabled or self._enable_flag.present()
 
     def hardware_busy(self) -> bool:
         return bool(
@@ -278,6 +398,34 @@ class AutomationEngine:
             or (self._heater_targets is not None and self._heater_targets.is_busy())
         )
 
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    def _waiting_for_lcd(self) -> bool:
+        """True (and phase ``waiting_for_lcd``) while a menu driver holds the LCD."""
+        if self._arbiter.holder() is None:
+            return False
+        with self._lock:
+            self._phase = "waiting_for_lcd"
+            self._last_error = None
+        return True
+
+    def _set_switch(self, name: str, target: bool) -> bool:
+        # Relay keys wait for the LCD; never let that wait stall the tick.
+        if self._waiting_for_lcd():
+            return False
+        try:
+            self._equipment.set_switch(name, target, lcd_timeout_seconds=0)
+        except LcdBusyError:
+            with self._lock:
+                self._phase = "waiting_for_lcd"
+                self._last_error = None
+            return False
+        with self._lock:
+            self._phase = f"setting_{name}"
+        return True
+
     def _scan_targets_after_startup_speed_confirmation(self) -> bool:
         """Read targets once when startup adopts an already-matching speed."""
         if self._heater_targets is None or self._startup_target_scan_attempted:
@@ -450,6 +598,7 @@ class AutomationEngine:
                 session["spa_started_utc"] = format_utc(now)
             self._openclaw_spa_session = session
             self._save_locked()
+        self._changed()
         return self.status()
 
     def stop_openclaw_spa(self, session_id: Optional[str] = None) -> dict:
@@ -463,6 +612,7 @@ class AutomationEngine:
             ):
                 self._openclaw_spa_session = None
             self._save_locked()
+        self._changed()
         return self.status()
 
     def set_manual(self, **updates: object) -> dict:
@@ -494,6 +644,7 @@ class AutomationEngine:
                     **fields,
                 )
             self._save_locked()
+        self._changed()
         return self.status()
 
     def set_pool_heat(self, enabled: bool) -> dict:
@@ -502,6 +653,7 @@ class AutomationEngine:
         with self._lock:
             self._pool_heat_enabled = enabled
             self._save_locked()
+        self._changed()
         return self.status()
 
     def clear_manual(self, field: Optional[str] = None) -> dict:
@@ -524,6 +676,7 @@ class AutomationEngine:
                     ManualOverride(expires_utc=current.expires_utc, **fields) if fields else None
                 )
             self._save_locked()
+        self._changed()
         return self.status()
 
     def _inputs(self) -> tuple[Optional[ManualOverride], Optional[dict], bool]:
@@ -547,7 +700,52 @@ class AutomationEngine:
             self._save_locked()
             return released
 
-    def status(self) -> dict:
+    def _next_manual_release(self, now: datetime) -> datetime:
+        local_now = now.astimezone(self._resolver.timezone)
+        release_day = local_now.date()
+        if local_now.timetz().replace(tzinfo=None) >= DAILY_MANUAL_RELEASE_TIME:
+            release_day += timedelta(days=1)
+        return datetime.combine(
+            release_day, DAILY_MANUAL_RELEASE_TIME, tzinfo=self._resolver.timezone
+        ).astimezone(UTC)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Earliest future time at which ``tick`` may act without any input changing.
+
+        Covers schedule/cleanout boundaries, manual override expiry, the daily
+        manual release, scheduled OpenClaw prep/preheat starts, the clock-sync
+        due time and speed lease renewal. Observed panel changes are reported
+        separately through the reconcile scheduler.
+        """
+        now = parse_utc(self._now())
+        manual, openclaw_spa, _ = self._inputs()
+        candidates = [self._resolver.next_change(now), self._next_manual_release(now)]
+        if manual is not None:
+            candidates.append(manual.expires_utc)
+        if openclaw_spa and openclaw_spa.get("phase") == "scheduled":
+            candidates.append(parse_utc(openclaw_spa["prep_start_utc"]))
+            candidates.append(parse_utc(openclaw_spa["preheat_start_utc"]))
+        if self._clock_sync is not None:
+            candidates.append(self._clock_sync.next_due(now))
+        vsp = self._vsp.status()
+        remaining = vsp.get("lease_remaining_sec")
+        if vsp.get("phase") == "holding" and remaining is not None:
+            renew_in = remaining - LEASE_RENEWAL_SECONDS
+            candidates.append(now + timedelta(seconds=renew_in if renew_in > 0 else remaining))
+        future = [candidate for candidate in candidates if candidate is not None and candidate > now]
+        return min(future) if future else None
+
+    def status(
+        self,
+        *,
+        clock_sync_status: Optional[dict] = None,
+        heater_target_status: Optional[dict] = None,
+    ) -> dict:
+        """Return the resolved automation state.
+
+        Callers composing a larger response may pass driver statuses they
+        already hold so they are embedded rather than queried again.
+        """
         now = parse_utc(self._now())
         manual, openclaw_spa, pool_heat_enabled = self._inputs()
         desired = self._resolver.resolve(
@@ -568,6 +766,7 @@ class AutomationEngine:
             "state_file": self._state_file,
             "timezone": str(self._resolver.timezone),
             "priority": ["calendar", "manual", "cleanout", "schedule"],
+            "schedule": self._resolver.describe(),
             "phase": phase,
             "last_error": last_error,
             "last_tick_utc": format_utc(last_tick) if last_tick is not None else None,
@@ -581,9 +780,13 @@ class AutomationEngine:
             "last_manual_release_local_date": last_manual_release_local_date.isoformat(),
         }
         if self._clock_sync is not None:
-            result["clock_sync"] = self._clock_sync.status()
+            result["clock_sync"] = (
+                clock_sync_status if clock_sync_status is not None else self._clock_sync.status()
+            )
         if self._heater_targets is not None:
-            result["heater_targets"] = self._heater_targets.status()
+            result["heater_targets"] = (
+                heater_target_status if heater_target_status is not None else self._heater_targets.status()
+            )
         return result
 
     def tick(self) -> bool:
@@ -591,6 +794,8 @@ class AutomationEngine:
             return False
         try:
             now = parse_utc(self._now())
+            # Re-check the interlock on disk once per pass; status reads use the cached value.
+            self._enable_flag.present(refresh=True)
             self._release_manual_for_daily_checkpoint(now)
             manual, openclaw_spa, pool_heat_enabled = self._inputs()
             desired = self._resolver.resolve(
@@ -622,14 +827,10 @@ class AutomationEngine:
                     self._last_error = None
                 return False
 
-            if self._heater_targets is not None and self._heater_targets.is_busy():
+            lcd_holder = self._arbiter.holder()
+            if lcd_holder in _LCD_HOLDER_PHASES:
                 with self._lock:
-                    self._phase = "heater_target"
-                return False
-
-            if self._clock_sync is not None and self._clock_sync.is_busy():
-                with self._lock:
-                    self._phase = "clock_sync"
+                    self._phase = _LCD_HOLDER_PHASES[lcd_holder]
                 return False
 
             # Maintenance is lower priority than calendar/manual/cleanout. A
@@ -730,7 +931,7 @@ class AutomationEngine:
                         # are moving; renewal changes no hardware speed.
                         remaining = vsp.get("lease_remaining_sec") or 0
                         held_target = vsp.get("target_name")
-                        if remaining < 45 and held_target is not None:
+                        if remaining < LEASE_RENEWAL_SECONDS and held_target is not None:
                             self._vsp.request_preset(
                                 held_target,
                                 source=desired.source,
@@ -763,6 +964,8 @@ class AutomationEngine:
                         self._phase = "waiting_for_mode"
                     return False
                 if current_mode != desired.mode:
+                    if self._waiting_for_lcd():
+                        return False
                     self._equipment.request_mode(desired.mode)
                     with self._lock:
                         self._phase = "setting_mode"
@@ -789,16 +992,10 @@ class AutomationEngine:
                     # authoritative Heater1 page has been observed.
                     continue
                 if equipment.get(name) != target:
-                    self._equipment.set_switch(name, target)
-                    with self._lock:
-                        self._phase = f"setting_{name}"
-                    return True
+                    return self._set_switch(name, target)
 
             if equipment.get("filter_on") != desired.filter_on:
-                self._equipment.set_switch("filter", desired.filter_on)
-                with self._lock:
-                    self._phase = "setting_filter"
-                return True
+                return self._set_switch("filter", desired.filter_on)
 
             if desired.suppress_filter_speed or desired.pump_preset is None:
                 with self._lock:
@@ -814,7 +1011,7 @@ class AutomationEngine:
                     self._phase = "changing_speed"
                 return True
             if vsp.get("busy") and current_target == target:
-                if vsp.get("phase") == "holding" and (vsp.get("lease_remaining_sec") or 0) < 45:
+                if vsp.get("phase") == "holding" and (vsp.get("lease_remaining_sec") or 0) < LEASE_RENEWAL_SECONDS:
                     self._vsp.request_preset(
                         target,
                         source=desired.source,
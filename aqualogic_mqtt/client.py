@@ -1,13 +1,12 @@
+import json
 import threading
 import logging
 import sys
 import ssl
-from time import sleep
 import os
 import argparse
-
-import paho.mqtt.client as mqtt
-from paho.mqtt.reasoncodes import ReasonCode
+import re
+import signal
 
 from aqualogic.core import AquaLogic
 from aqualogic.states import States
@@ -21,9 +20,18 @@ from . import controls  # Web/UI controls: key queue + display state
 from .webapp import create_app  # Embedded Flask app for Web UI
 from .vsp import PanelPumpState, VspDriver
 from .equipment import EquipmentController
-from .automation import AutomationEngine
+from .automation import AutomationEngine, utc_now
+from .schedule_config import FileScheduleResolver, ScheduleConfigError, ScheduleFileWatcher
 from .clock_sync import ClockSyncDriver
 from .heater_targets import HeaterTargetDriver
+from .key_timing import KeyTimingProfile
+from .spa_heating import SpaHeatingModel
+from .pump_power import PumpPowerLog
+from .log_config import configure_logging, level_for_verbosity, parse_level_overrides
+from .scheduler import ReconcileScheduler
+from .optimistic import OptimisticStates
+from .supervisor import LinkSupervisor
+from .mqtt_connection import acquire_connection, release_connection, split_host_port
 
 logger = logging.getLogger("aqualogic_mqtt.client")
 
@@ -33,27 +41,55 @@ def _patched_write_to_serial(self, data):
     self._serial.flush()
 AquaLogic._write_to_serial = _patched_write_to_serial
 
+# Panel states that automation and the drivers reconcile against. A change in
+# any of them (or in the requested pump speed) wakes the reconcile loop.
+_RECONCILE_STATES = (
+    States.POOL, States.SPA, States.SPILLOVER, States.FILTER, States.SERVICE,
+    States.HEATER_1, States.HEATER_AUTO_MODE, States.AUX_1, States.AUX_2, States.LIGHTS,
+)
+
+# State keys whose commands move the pool/spa valves rather than a relay.
+_MODE_STATE_KEYS = ("pool", "spa", "spill")
+
 class Client:
     _panel = None
     _paho_client = None
     _panel_thread = None
     _formatter = None
     _pman = None
-    _disconnect_retries = 3
-    _disconnect_retry_wait_max = 30
-    _disconnect_retry_wait = 1
-    _disconnect_retry_num = 0
 
     def __init__(self, formatter:Messages, panel_manager:PanelManager, client_id=None, transport='tcp', protocol_num=5,
                  vsp_enabled=False, vsp_enable_file=None, vsp_rollback_file=None, vsp_default_lease_seconds=60.0,
                  automation_enabled=False, automation_enable_file=None, automation_state_file=None,
-                 clock_sync_state_file=None):
+                 clock_sync_state_file=None, schedule_file=None, panel_controls=None, mqtt_connection=None,
+                 key_timing_file=None, spa_heating_file=None, pump_power_file=None, schedule_watcher=None):
         self._formatter = formatter
         self._pman = panel_manager
         self._panel = AquaLogic(web_port=0)
+        # Per instance, so each panel's frames reach its own manager.
+        self._panel._web = panel_manager
+        self._controls = panel_controls if panel_controls is not None else controls
+        if schedule_watcher is None and schedule_file:
+            schedule_watcher = ScheduleFileWatcher(schedule_file)
+        self._scheduler = ReconcileScheduler()
+        self._reconcile_inputs = None
+        # Several panels may share one broker session; without an explicit
+        # one, bridges with the same broker settings share a pooled session.
+        self._owns_connection = mqtt_connection is None
+        self._mqtt = mqtt_connection or acquire_connection(client_id=client_id, transport=transport, protocol_num=protocol_num)
+        self._paho_client = self._mqtt.paho
+        self._router = self._mqtt.router
+        self._outbound = self._mqtt.outbound
+        self._mqtt_link = self._mqtt.link
         # Register low-level key sender so the web/UI can queue button presses
-        controls.set_key_sender(self._panel.send_key)
-        controls.register_with_panel(self._panel)  # live LCD feed if available
+        self._controls.set_key_sender(self._panel.send_key)
+        self._controls.register_with_panel(self._panel)  # live LCD feed if available
+        # Learned keypress latency, shared by this panel's menu drivers.
+        self._key_timing = KeyTimingProfile(state_file=key_timing_file)
+        self._controls.set_key_timing(self._key_timing)
+        self._controls.set_spa_heating_model(SpaHeatingModel(state_file=spa_heating_file))
+        # Watts per preset for the schedule optimizer (python -m aqualogic_mqtt.pump_optimizer).
+        self._pump_power = PumpPowerLog(state_file=pump_power_file)
         self._vsp_driver = VspDriver(
             self._panel,
             enabled=vsp_enabled,
@@ -61,28 +97,48 @@ class Client:
             rollback_file=vsp_rollback_file,
             default_lease_seconds=vsp_default_lease_seconds,
             key_sender=self._panel.send_key,
-            display_reader=controls.get_display,
-            menu_cache_reader=controls.get_default_menu,
+            display_reader=self._controls.get_display,
+            menu_cache_reader=self._controls.get_default_menu,
+            on_phase_change=lambda phase: self._scheduler.notify("vsp_phase"),
+            menu_graph=self._controls.get_menu_graph(),
+            arbiter=self._controls.get_lcd_arbiter(),
+            harvester=self._controls.get_settings_harvest(),
+            key_timing=self._key_timing,
         )
-        controls.set_vsp_driver(self._vsp_driver)
+        self._controls.set_vsp_driver(self._vsp_driver)
         self._equipment = EquipmentController(
             self._panel,
-            menu_cache_reader=controls.get_default_menu,
+            menu_cache_reader=self._controls.get_default_menu,
+            arbiter=self._controls.get_lcd_arbiter(),
         )
-        controls.set_equipment_controller(self._equipment)
+        self._controls.set_equipment_controller(self._equipment)
+        self._optimistic = OptimisticStates(
+            confirmation_seconds=self._equipment.switch_confirmation_seconds,
+        )
+        self._last_observed_state = None
+        self._published_state = {}
         self._clock_sync = ClockSyncDriver(
             key_sender=self._panel.send_key,
-            display_reader=controls.get_display,
-            menu_cache_reader=controls.get_default_menu,
+            display_reader=self._controls.get_display,
+            menu_cache_reader=self._controls.get_default_menu,
             state_file=clock_sync_state_file,
+            menu_graph=self._controls.get_menu_graph(),
+            arbiter=self._controls.get_lcd_arbiter(),
+            harvester=self._controls.get_settings_harvest(),
+            key_timing=self._key_timing,
         )
+        self._controls.set_clock_sync_driver(self._clock_sync)
         self._heater_targets = HeaterTargetDriver(
             self._panel,
             key_sender=self._panel.send_key,
-            display_reader=controls.get_display,
+            display_reader=self._controls.get_display,
             service_mode_reader=lambda: bool(self._equipment.status().get("service_mode")),
+            menu_graph=self._controls.get_menu_graph(),
+            arbiter=self._controls.get_lcd_arbiter(),
+            harvester=self._controls.get_settings_harvest(),
+            key_timing=self._key_timing,
         )
-        controls.set_heater_target_driver(self._heater_targets)
+        self._controls.set_heater_target_driver(self._heater_targets)
         self._automation = AutomationEngine(
             self._equipment,
             self._vsp_driver,
@@ -91,44 +147,55 @@ class Client:
             state_file=automation_state_file,
             clock_sync=self._clock_sync,
             heater_targets=self._heater_targets,
+            resolver=FileScheduleResolver(schedule_watcher) if schedule_watcher is not None else None,
+            on_change=lambda: self._scheduler.notify("automation_inputs"),
+            arbiter=self._controls.get_lcd_arbiter(),
         )
-        controls.set_automation_engine(self._automation)
+        self._controls.set_automation_engine(self._automation)
 
-        protocol = mqtt.MQTTv311 if protocol_num == 3 else mqtt.MQTTv5
-        self._paho_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2,
-                                        client_id=client_id, transport=transport,
-                                        protocol=protocol)
-        self._paho_client.on_message = self._on_message
-        self._paho_client.on_connect = self._on_connect
-        self._paho_client.on_disconnect = self._on_disconnect
-        self._paho_client.on_connect_fail = self._on_connect_fail
+        # Both links are retried forever in-process, so menu caches, heater
+        # targets and automation state survive broker and panel outages.
+        self._panel_link = LinkSupervisor("Panel", self._reconnect_panel)
+        self._panel_source = None
+        self._controls.set_connection_status_reader(self.connection_status)
+        self._mqtt.attach(self)
 
     # Respond to panel events
     def _panel_changed(self, panel):
         # Drain any queued keypresses as soon as a panel update arrives.
         # This closely follows the recommendation to send keys right after keepalive frames.
         try:
-            controls.drain_keypresses()
+            self._controls.drain_keypresses()
         except Exception as _e:
-            logger.debug(f"controls.drain_keypresses() skipped: {_e}")
+            logger.debug("controls.drain_keypresses() skipped: %s", _e)
 
-        logger.debug(f"_panel_changed called... Publishing to {self._formatter.get_state_topic()}...")
+        # This runs for every panel frame; only format debug output when it
+        # will actually be emitted.
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("_panel_changed called... Publishing to %s...", self._formatter.get_state_topic())
 
         self._observe_vsp_state(panel)
+        self._notify_if_inputs_changed(panel)
 
         # Helpful debug to see what LCD attributes exist on this panel object
-        try:
-            logger.debug(
-                f"display candidates: display={getattr(panel,'display',None)} "
-                f"lcd_lines={getattr(panel,'lcd_lines',None)} "
-                f"get_lcd_lines={'yes' if hasattr(panel,'get_lcd_lines') else 'no'}"
-            )
-        except Exception:
-            pass
+        if debug:
+            try:
+                logger.debug(
+                    "display candidates: display=%r lcd_lines=%r get_lcd_lines=%s",
+                    getattr(panel, 'display', None),
+                    getattr(panel, 'lcd_lines', None),
+                    'yes' if hasattr(panel, 'get_lcd_lines') else 'no',
+                )
+            except Exception:
+                pass
 
         self._pman.observe_system_message(panel.check_system_msg)
-        msg = self._formatter.get_state_message(panel, self._pman)
-        logger.debug(msg)
+        observed = self._formatter.get_state_dict(panel, self._pman)
+        self._last_observed_state = observed
+        state, acks = self._optimistic.apply(observed)
+        if debug:
+            logger.debug("%s", state)
 
         # Optional: if display/LED info is available, expose it to the web UI
         try:
@@ -182,7 +249,7 @@ class Client:
                                 cand = [str(s).replace('\x00', '').rstrip() for s in val][:4]
                                 if any(cand):
                                     lines = cand
-                                    logger.debug(f"Picked LCD from panel.{name} -> {lines!r}")
+                                    logger.debug("Picked LCD from panel.%s -> %r", name, lines)
                                     break
                         except Exception:
                             pass
@@ -197,99 +264,178 @@ class Client:
                         blink = []
 
                 # Push only when we have native LCD lines so we don't overwrite real display with blanks
-                controls.update_display(lines[:4] + [""] * max(0, 4 - len(lines)), blink, leds)
-                lit_leds = {name: val for name, val in leds.items() if val}
-                logger.debug(f"UI lines={lines!r} blink={blink!r} leds={lit_leds!r}")
+                self._controls.update_display(lines[:4] + [""] * max(0, 4 - len(lines)), blink, leds)
+                if debug:
+                    lit_leds = {name: val for name, val in leds.items() if val}
+                    logger.debug("UI lines=%r blink=%r leds=%r", lines, blink, lit_leds)
             else:
-                controls.update_display(None, None, leds)
-                lit_leds = {name: val for name, val in leds.items() if val}
-                logger.debug(f"UI LEDs={lit_leds!r}; no native LCD lines, leaving prior display text intact")
+                self._controls.update_display(None, None, leds)
+                if debug:
+                    lit_leds = {name: val for name, val in leds.items() if val}
+                    logger.debug("UI LEDs=%r; no native LCD lines, leaving prior display text intact", lit_leds)
 
         except Exception as _e:
-            logger.debug(f"controls.update_display skipped: {_e}")
-
-        self._paho_client.publish(self._formatter.get_state_topic(), msg)
+            logger.debug("controls.update_display skipped: %s", _e)
+
+        self._publish_state(state)
+        self._publish_acks(acks)
+
+    def _publish_state(self, state):
+        for topic, payload, qos, retain in self._formatter.get_state_publications(state):
+            if retain:
+                # Retained topics (per-entity, compact) are change-only;
+                # brokers hand the last value to late subscribers.
+                if self._published_state.get(topic) == payload:
+                    continue
+                self._published_state[topic] = payload
+            self._outbound.submit(topic, payload, qos, retain)
+
+    def _publish_acks(self, acks):
+        for key, ack in acks:
+            self._outbound.submit(self._formatter.get_ack_topic(key), json.dumps(ack))
+
+    def _echo_command(self, key, target):
+        """Publish ``target`` for ``key`` now instead of waiting for the panel."""
+        timeout = (
+            self._equipment.mode_confirmation_seconds if key in _MODE_STATE_KEYS
+            else self._equipment.switch_confirmation_seconds
+        )
+        self._publish_acks(self._optimistic.command(key, target, confirmation_seconds=timeout))
+        observed = self._last_observed_state
+        if observed is None:
+            return
+        state, acks = self._optimistic.apply(observed)
+        self._publish_state(state)
+        self._publish_acks(acks)
 
     def _observe_vsp_state(self, panel):
         try:
-            self._vsp_driver.observe(PanelPumpState(
+            state = PanelPumpState(
                 requested_speed_pct=getattr(panel, 'pump_speed', None),
                 pump_power_w=getattr(panel, 'pump_power', None),
                 filter_on=bool(panel.get_state(States.FILTER)),
                 service_mode=bool(panel.get_state(States.SERVICE)),
-            ))
+            )
+            self._vsp_driver.observe(state)
+            self._pump_power.observe(state.requested_speed_pct, state.pump_power_w, state.filter_on)
         except Exception as exc:
-            logger.debug(f"VSP state observation failed: {exc}")
-
-    # Respond to MQTT events
-    def _on_message(self, client, userdata, msg):
-        logger.debug(f"_on_message called for topic {msg.topic} with payload {msg.payload}")
+            logger.debug("VSP state observation failed: %s", exc)
 
-        payload = msg.payload.decode().strip()
-        if controls.handle_automation_mqtt(msg.topic, payload):
-            logger.info("MQTT command captured as host automation manual override: %s", msg.topic)
+    def _notify_if_inputs_changed(self, panel):
+        # Frames arrive several times a second but rarely change anything the
+        # reconcile loop acts on; only wake it when they do.
+        try:
+            inputs = (getattr(panel, 'pump_speed', None),) + tuple(
+                bool(panel.get_state(state)) for state in _RECONCILE_STATES
+            )
+        except Exception as exc:
+            logger.debug("reconcile input snapshot failed: %s", exc)
             return
+        if inputs != self._reconcile_inputs:
+            self._reconcile_inputs = inputs
+            self._scheduler.notify("panel")
 
-        # ALW Handle button press for POOL_SPA toggle
-        if msg.topic.endswith("button_pool_spa_toggle/set") and msg.payload.decode().strip().lower() in ["press", "on", "1", "true"]:
-            from aqualogic.keys import Keys
-            logger.info("POOL_SPA button pressed via MQTT")
-            self._panel.send_key(Keys.POOL_SPA)
-            return
-        #
-        # ALW Handle button press for PLUS
-        if msg.topic.endswith("button_plus_set") and msg.payload.decode().strip().lower() in ["press", "on", "1", "true"]:
-            from aqualogic.keys import Keys
-            logger.info("PLUS button pressed via MQTT")
-            self._panel.send_key(Keys.PLUS)
-            return
-        #
-        new_messages = self._formatter.handle_message_on_topic(msg.topic, payload, self._panel)
-        for t, m in new_messages:
-            self._paho_client.publish(t, m)
-
-    def _on_connect(self, client, userdata, flags, reason_code, properties):
-        logger.debug("_on_connect called")
-        if isinstance(reason_code, ReasonCode):
-            if reason_code.is_failure:
-                logger.critical(f"Got failure when connecting MQTT: {reason_code.getName()}! Exiting!")
-                raise RuntimeError(reason_code)
-        self._disconnect_retry_num = 0
-        self._disconnect_retry_wait = 1
-
-        sub_topics = self._formatter.get_subscription_topics()
-        for topic in sub_topics:
+    # Respond to MQTT events
+    def _install_command_routes(self):
+        for topic, state in self._formatter.get_control_command_topics().items():
+            self._router.add_route(topic, self._control_command_handler(topic, state))
+        for topic, key in self._formatter.get_button_command_topics().items():
+            # Each PRESS is its own key event, so button topics are never coalesced.
+            self._router.add_route(topic, self._button_command_handler(topic, key), min_interval_seconds=0)
+
+    def _control_command_handler(self, topic, state):
+        key = self._formatter.get_control_key_for_topic(topic)
+
+        def handle(payload):
+            echoed = payload in ("ON", "OFF")
+            if echoed:
+                self._echo_command(key, payload)
+            try:
+                if self._controls.handle_automation_mqtt(topic, payload, self._formatter.get_identifier()):
+                    logger.info("MQTT command captured as host automation manual override: %s", topic)
+                    return
+                self._panel.set_state(state, payload == "ON")
+            except Exception:
+                if echoed:
+                    self._publish_acks(self._optimistic.fail(key))
+                raise
+        return handle
+
+    def _button_command_handler(self, topic, key):
+        def handle(payload):
+            if payload.lower() in ["press", "on", "1", "true"]:
+                # Same rule as Web UI keys: never press into a driver's menu trip.
+                holder = self._controls.get_lcd_arbiter().holder()
+                if holder is not None:
+                    logger.info("%s button via MQTT blocked while %s owns the LCD menu", key.name, holder)
+                    return
+                logger.info("%s button pressed via MQTT", key.name)
+                self._panel.send_key(key)
+        return handle
+
+    def publish_discovery(self):
+        topic = self._formatter.get_discovery_topic()
+        message = self._formatter.get_discovery_message()
+        logger.debug("Publishing to %s...", topic)
+        logger.debug("%s", message)
+        self._paho_client.publish(topic, message)
+
+    def on_mqtt_connected(self):
+        """Called by the shared connection on every (re)connect."""
+        self._install_command_routes()
+        # A new session may be on a broker that lost retained state.
+        self._published_state = {}
+        for topic in self._formatter.get_subscription_topics():
             self._paho_client.subscribe(topic)
-        logger.debug(f"Publishing to {self._formatter.get_discovery_topic()}...")
-        logger.debug(self._formatter.get_discovery_message())
-        self._paho_client.publish(self._formatter.get_discovery_topic(), self._formatter.get_discovery_message())
-        ...
+        self.publish_discovery()
+
+    def _close_panel_source(self):
+        for name in ('_socket', '_serial'):
+            handle = getattr(self._panel, name, None)
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception as exc:
+                    logger.debug("closing panel %s failed: %s", name, exc)
 
-    def _on_connect_fail(self, userdata, reason_code):
-        #TODO: Have not been able to reach here, needs testing!
-        logger.debug("_on_connect_fail called")
-
-    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
-        if isinstance(reason_code, ReasonCode):
-            if reason_code.is_failure:
-                logger.error(f"MQTT Disconnected: {reason_code.getName()}!")
-                if self._disconnect_retry_num < self._disconnect_retries:
-                    self._disconnect_retry_num += 1
-                    self._disconnect_retry_wait = min(self._disconnect_retry_wait*2, self._disconnect_retry_wait_max)
-                    logger.info(f"Retrying ({self._disconnect_retry_num}) after {self._disconnect_retry_wait}s...")
-                    sleep(self._disconnect_retry_wait)
-                    self._paho_client.reconnect()
-                else:
-                    logger.critical("MQTT connection failed!")
-                    self._paho_client.disconnect()
-                    raise RuntimeError(reason_code)
+    def _reconnect_panel(self):
+        self._close_panel_source()
+        self.panel_connect(self._panel_source)
+        self._start_panel_reader()
+
+    def _run_panel_reader(self, callback=None):
+        try:
+            self._panel.process(callback or self._panel_changed)
+        except Exception as exc:
+            logger.error("Panel reader stopped: %s", exc)
+        else:
+            logger.error("Panel reader stopped: connection closed or timed out")
+        self._scheduler.notify("panel_reader")
+
+    def _start_panel_reader(self):
+        self._panel_thread = threading.Thread(target=self._run_panel_reader, name="aqualogic-reader")
+        self._panel_thread.daemon = True # https://stackoverflow.com/a/50788759/489116 ?
+        self._panel_thread.start()
+
+    def _watch_panel(self):
+        reader_alive = self._panel_thread is None or self._panel_thread.is_alive()
+        if self._pman.is_updating() and reader_alive:
+            self._panel_link.mark_up()
+        elif self._panel_link.is_up():
+            if reader_alive:
+                reason = f"no updates for {self._pman.get_last_update_age():.0f}s"
             else:
-                logger.debug(f"MQTT Disconnected: {reason_code.getName()}")
-        elif isinstance(reason_code, int):
-            if reason_code > 0:
-                logger.error(f"MQTT Disconnected: {reason_code}")
+                reason = "reader stopped"
+            self._panel_link.mark_down(reason)
+
+    def connection_status(self):
+        return {
+            "mqtt": self._mqtt.status(),
+            "panel": {**self._panel_link.status(), "last_update_age_sec": round(self._pman.get_last_update_age(), 1)},
+        }
 
     def panel_connect(self, source):
+        self._panel_source = source
         if ':' in source:
             s_host, s_port = source.split(':')
             self._panel.connect(s_host, int(s_port))
@@ -298,44 +444,125 @@ class Client:
         ...
 
     def mqtt_username_pw_set(self, username:(str), password:(str)):
-        return self._paho_client.username_pw_set(username=username, password=password)
+        return self._mqtt.username_pw_set(username, password)
 
     def mqtt_tls_set(self, certfile=None, keyfile=None, cert_reqs=ssl.CERT_REQUIRED):
-        return self._paho_client.tls_set(certfile=certfile, keyfile=keyfile, cert_reqs=cert_reqs)
+        return self._mqtt.tls_set(certfile=certfile, keyfile=keyfile, cert_reqs=cert_reqs)
     
     def mqtt_connect(self, dest:(str), port:(int)=1883, keepalive=60):
-        host = dest
-        if dest is not None:
-            if ':' in dest:
-                host, port = dest.split(':')
-                port = int(port)
-            else:
-                host = dest
-        r = self._paho_client.connect(host, port, keepalive)
-        logger.debug(f"Connected to {host}:{port} with result {r}")
+        return self._mqtt.connect(dest, port, keepalive)
+
+    def _drivers_busy(self):
+        return bool(
+            self._vsp_driver.is_menu_busy()
+            or self._equipment.status().get("busy")
+            or self._clock_sync.is_busy()
+            or self._heater_targets.is_busy()
+        )
+
+    def service_tick(self):
+        """One reconciliation pass; returns seconds until the next one is due.
+
+        Runs the drivers, automation and the panel watchdog, then computes the
+        next wake-up from automation deadlines, the watchdog timeout and
+        whether a menu driver is mid-operation.
+        """
+        self._observe_vsp_state(self._panel)
+        mqtt_delays = self._mqtt.service_tick()
+        logger.debug("Update age: %s", self._pman.get_last_update_age())
+        self._watch_panel()
+        self._panel_link.tick()
+        acted = False
+        if self._panel_link.is_up():
+            # Menu drivers and automation act through key presses; hold them
+            # while the panel link is down rather than queue stale keys.
+            self._vsp_driver.tick()
+            acted = self._automation.tick()
+        deadline = self._automation.next_deadline()
+        automation_delay = (deadline - utc_now()).total_seconds() if deadline is not None else None
+        return self._scheduler.next_delay(
+            (
+                automation_delay,
+                self._pman.get_timeout_remaining() if self._panel_link.is_up() else None,
+                *mqtt_delays,
+                self._panel_link.next_due(),
+            ),
+            busy=acted or self._drivers_busy(),
+        )
+
+    def wait_for_reconcile(self, delay):
+        """Block until ``delay`` elapses or a reconcile input changes."""
+        reasons = self._scheduler.wait(delay)
+        logger.debug("Reconcile wake-up: %s", ", ".join(sorted(reasons)))
+        return reasons
+
+    def flush_state(self):
+        """Save learned state that is otherwise only written periodically."""
+        self._pump_power.flush()
+        self._key_timing.flush()
+
+    def close(self):
+        """Stop serving this panel over MQTT, releasing a pooled connection."""
+        self.flush_state()
+        self._mqtt.detach(self)
+        if self._owns_connection:
+            release_connection(self._mqtt)
+
+    def run(self):
+        """Read the panel and reconcile until the process exits."""
+        self._start_panel_reader()
+        while True:
+            self.wait_for_reconcile(self.service_tick())
 
     def loop_forever(self):
         try:
             self._paho_client.loop_start()
-            self._panel_thread = threading.Thread(target=self._panel.process, args=[self._panel_changed])
-            self._panel_thread.daemon = True # https://stackoverflow.com/a/50788759/489116 ?
-            self._panel_thread.start()
             #self._paho_client.loop_forever()
-            while True:
-                self._observe_vsp_state(self._panel)
-                self._vsp_driver.tick()
-                self._automation.tick()
-                logger.debug(f"Update age: {self._pman.get_last_update_age()}")
-                if not self._pman.is_updating():
-                    logger.critical("Panel not updated in "+str(self._pman.get_last_update_age())+"s, exiting!")
-                    raise RuntimeError("Panel stopped updating!")
-                sleep(1)
+            self.run()
         finally:
             self._paho_client.loop_stop()
             pass
         
         
 
+def parse_panel_sources(values):
+    """Parse repeated ``ID=SOURCE`` options into ordered (id, source) pairs."""
+    panels = []
+    for value in values:
+        panel_id, sep, source = str(value).partition('=')
+        if not sep or not source:
+            raise ValueError(f"--panel expects ID=SOURCE, got {value!r}")
+        if not re.fullmatch(r"[A-Za-z0-9_]+", panel_id):
+            raise ValueError(f"panel ID {panel_id!r} may only contain letters, digits and underscores")
+        if panel_id in [existing for existing, _ in panels]:
+            raise ValueError(f"panel ID {panel_id!r} is given more than once")
+        panels.append((panel_id, source))
+    return panels
+
+def panel_file(path, panel_id, multi_panel):
+    """Give each panel its own interlock/state file when several share a host."""
+    if not path or not multi_panel:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{panel_id}{ext}"
+
+def run_clients(clients):
+    """Serve every panel over the clients' shared MQTT connection until exit."""
+    connection = clients[0]._mqtt
+    try:
+        connection.paho.loop_start()
+        for client in clients[1:]:
+            threading.Thread(
+                target=client.run,
+                name=f"reconcile-{client._formatter.get_identifier()}",
+                daemon=True,
+            ).start()
+        clients[0].run()
+    finally:
+        connection.paho.loop_stop()
+        for client in clients:
+            client.flush_state()
+
 if __name__ == "__main__":
     autodisc_prefix = None
     source = None
@@ -358,6 +585,13 @@ if __name__ == "__main__":
         help="add a binary sensor that is ON when a given \"Check System\" message appears on the display, with the specified message STRING which will use the MQTT state KEY and optionally device class DEV_CLASS (default is \"problem\")--may be specified multiple times")
     g_group.add_argument('-v', '--verbose', action="count", default=0,
         help="seconds after which a Check System message previously seen is dropped from reporting")
+    g_group.add_argument('--runtime', choices=["threads", "asyncio"], default=os.getenv('AQUALOGIC_RUNTIME', 'threads'),
+        help="threads (default) runs MQTT, web and panel I/O on separate threads; asyncio runs them on one event loop with an aiohttp web server")
+    g_group.add_argument('--log-json', action='store_true', default=os.getenv('AQUALOGIC_LOG_JSON', '0') == '1',
+        help="emit one structured JSON object per log line (default: plain text)")
+    g_group.add_argument('--log-level', action='append', metavar="LOGGER=LEVEL",
+        default=[os.environ['AQUALOGIC_LOG_LEVELS']] if os.getenv('AQUALOGIC_LOG_LEVELS') else [],
+        help="override the level of one subsystem logger, e.g. vsp=DEBUG or aqualogic_mqtt.equipment=INFO--may be specified multiple times")
 
     source_group = parser.add_argument_group("source options")
     source_group_mex = source_group.add_mutually_exclusive_group(required=True)
@@ -365,8 +599,10 @@ if __name__ == "__main__":
         help="serial device source (path)")
     source_group_mex.add_argument('-t', '--tcp', type=str, metavar="tcpserialhost:port",
         help="network serial adapter source in the format host:port")
+    source_group_mex.add_argument('--panel', action='append', metavar="ID=SOURCE",
+        help="serve several panels from one process: panel ID (used for MQTT topics and /api/panels/ID) and its serial path or host:port--may be specified multiple times")
     source_group.add_argument('-T', '--source-timeout', nargs=1, type=int, default=30, metavar="SECONDS",
-        help="seconds after which the source connection is deemed to be lost if no updates have been seen--the program will exit if the timeout is reached")
+        help="seconds after which the source connection is deemed to be lost if no updates have been seen--the source is then reconnected with backoff")
     
     mqtt_group = parser.add_argument_group('MQTT destination options')
     mqtt_group.add_argument('-m', '--mqtt-dest', required=True, type=str, metavar="mqtthost:port",
@@ -385,6 +621,15 @@ if __name__ == "__main__":
     ha_group = parser.add_argument_group("Home Assistant options")
     ha_group.add_argument('-p', '--discover-prefix', default="homeassistant", type=str, 
         help="MQTT prefix path (default is \"homeassistant\")")
+    ha_group.add_argument('--state-topics', choices=list(Messages.STATE_TOPIC_MODES),
+        default=os.getenv('AQUALOGIC_STATE_TOPICS', 'combined'),
+        help="combined (default) publishes all state as one JSON topic every frame; entity publishes each entity to its own retained topic on change")
+    ha_group.add_argument('--compact-state', action='store_true', default=os.getenv('AQUALOGIC_COMPACT_STATE', '0') == '1',
+        help="also publish the state as retained CBOR (booleans and numbers, same keys) on <root>/state/cbor, on change")
+    ha_group.add_argument('--telemetry-qos', type=int, choices=[0, 1, 2], default=int(os.getenv('AQUALOGIC_TELEMETRY_QOS', '0')),
+        help="QoS for sensor and system message state in entity mode (default: 0)")
+    ha_group.add_argument('--control-qos', type=int, choices=[0, 1, 2], default=int(os.getenv('AQUALOGIC_CONTROL_QOS', '1')),
+        help="QoS for switch/light state and the combined state topic (default: 1)")
 
     web_group = parser.add_argument_group("Web UI options")
     web_group.add_argument('--http-host', default=os.getenv('AQUALOGIC_HTTP_HOST', '0.0.0.0'), type=str, help='Web UI bind host (default: 0.0.0.0)')
@@ -406,51 +651,98 @@ if __name__ == "__main__":
         help='local interlock file whose presence enables automation (default: .automation-control-enabled)')
     web_group.add_argument('--automation-state-file', default=os.getenv('AQUALOGIC_AUTOMATION_STATE_FILE', '.automation-state.json'), type=str,
         help='persistent calendar/manual automation state (default: .automation-state.json)')
+    web_group.add_argument('--schedule-file', default=os.getenv('AQUALOGIC_SCHEDULE_FILE'), type=str,
+        help='JSON (or YAML with PyYAML) pump schedule with weekday/seasonal windows; reloaded when it changes (default: built-in schedule)')
     web_group.add_argument('--clock-sync-state-file', default=os.getenv('AQUALOGIC_CLOCK_SYNC_STATE_FILE', '.clock-sync-state.json'), type=str,
         help='persistent weekly PL-PLUS clock-sync state (default: .clock-sync-state.json)')
+    web_group.add_argument('--key-timing-file', default=os.getenv('AQUALOGIC_KEY_TIMING_FILE', '.key-timing.json'), type=str,
+        help='learned LCD keypress timing profile (default: .key-timing.json)')
+    web_group.add_argument('--spa-heating-file', default=os.getenv('AQUALOGIC_SPA_HEATING_FILE', '.spa-heating.json'), type=str,
+        help='logged Spa heating segments for /api/openclaw/spa/estimate (default: .spa-heating.json)')
+    web_group.add_argument('--pump-power-file', default=os.getenv('AQUALOGIC_PUMP_POWER_FILE', '.pump-power.json'), type=str,
+        help='logged pump watts per preset for the schedule optimizer (default: .pump-power.json)')
 
     args = parser.parse_args()
 
     print("aqualogic_mqtt Started")
-
-    if args.verbose >= 3:
-        logging.basicConfig(level=logging.DEBUG)
-    elif args.verbose == 2:
-        logging.basicConfig(level=logging.INFO)
-    elif args.verbose == 1:
-        logging.basicConfig(level=logging.WARNING)
-    else:
-        logging.basicConfig(level=logging.ERROR)
+    # Let a container stop unwind normally so learned state is flushed.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        log_levels = parse_level_overrides(args.log_level)
+    except ValueError as _log_e:
+        parser.error(str(_log_e))
+    configure_logging(level_for_verbosity(args.verbose), json_format=args.log_json, subsystem_levels=log_levels)
     
-    source = args.serial if args.serial is not None else args.tcp
+    if args.panel:
+        try:
+            panels = parse_panel_sources(args.panel)
+        except ValueError as _panel_e:
+            parser.error(str(_panel_e))
+    else:
+        panels = [("aqualogic", args.serial if args.serial is not None else args.tcp)]
+    multi_panel = len(panels) > 1
+    if multi_panel and args.runtime == "asyncio":
+        parser.error("several --panel sources require --runtime threads")
     dest = args.mqtt_dest
 
-    pman = PanelManager(args.source_timeout, args.system_message_expiration)
-    # Monkey-patch PanelManager into _web so we can avoid running the web server without an error
-    AquaLogic._web = pman
-    
-    formatter = Messages(identifier="aqualogic", discover_prefix=args.discover_prefix,
-                         enable=args.enable if args.enable is not None else [], 
-                         system_message_sensors=args.system_message_sensor if args.system_message_sensor is not None else [])
-    
-    mqtt_client = Client(formatter=formatter, panel_manager=pman,
-                         client_id=args.mqtt_clientid, transport=args.mqtt_transport, 
-                         protocol_num=args.mqtt_version,
-                         vsp_enabled=args.vsp_control,
-                         vsp_enable_file=args.vsp_enable_file,
-                         vsp_rollback_file=args.vsp_rollback_file,
-                         vsp_default_lease_seconds=args.vsp_default_lease_seconds,
-                         automation_enabled=args.automation,
-                         automation_enable_file=args.automation_enable_file,
-                         automation_state_file=args.automation_state_file,
-                         clock_sync_state_file=args.clock_sync_state_file,
-                         )
+    # One broker session and one web server serve every panel.
+    # Every panel follows the same schedule file; load it once, up front.
+    schedule_watcher = None
+    if args.schedule_file:
+        try:
+            schedule_watcher = ScheduleFileWatcher(args.schedule_file)
+        except (OSError, ScheduleConfigError) as _schedule_e:
+            parser.error(f"invalid --schedule-file: {_schedule_e}")
+
+    connection = acquire_connection(client_id=args.mqtt_clientid, transport=args.mqtt_transport,
+                                    protocol_num=args.mqtt_version)
+    clients = []
+    for panel_id, source in panels:
+        panel_controls = controls.register_panel(panel_id)
+        pman = PanelManager(args.source_timeout, args.system_message_expiration, panel_controls=panel_controls)
+        formatter = Messages(identifier=panel_id, discover_prefix=args.discover_prefix,
+                             enable=args.enable if args.enable is not None else [], 
+                             system_message_sensors=args.system_message_sensor if args.system_message_sensor is not None else [],
+                             state_topics=args.state_topics, telemetry_qos=args.telemetry_qos, control_qos=args.control_qos,
+                             compact_state=args.compact_state)
+        mqtt_client = Client(formatter=formatter, panel_manager=pman,
+                             vsp_enabled=args.vsp_control,
+                             vsp_enable_file=panel_file(args.vsp_enable_file, panel_id, multi_panel),
+                             vsp_rollback_file=panel_file(args.vsp_rollback_file, panel_id, multi_panel),
+                             vsp_default_lease_seconds=args.vsp_default_lease_seconds,
+                             automation_enabled=args.automation,
+                             automation_enable_file=panel_file(args.automation_enable_file, panel_id, multi_panel),
+                             automation_state_file=panel_file(args.automation_state_file, panel_id, multi_panel),
+                             clock_sync_state_file=panel_file(args.clock_sync_state_file, panel_id, multi_panel),
+                             schedule_watcher=schedule_watcher,
+                             panel_controls=panel_controls,
+                             mqtt_connection=connection,
+                             key_timing_file=panel_file(args.key_timing_file, panel_id, multi_panel),
+                             spa_heating_file=panel_file(args.spa_heating_file, panel_id, multi_panel),
+                             pump_power_file=panel_file(args.pump_power_file, panel_id, multi_panel),
+                             )
+        clients.append((mqtt_client, source))
+    mqtt_client, source = clients[0]
     if args.mqtt_username is not None:
         mqtt_password = args.mqtt_password if args.mqtt_password is not None else mqtt_password
-        mqtt_client.mqtt_username_pw_set(args.mqtt_username, mqtt_password)
+        connection.username_pw_set(args.mqtt_username, mqtt_password)
     #TODO Broker client cert
     if args.mqtt_insecure:
-        mqtt_client.mqtt_tls_set(cert_reqs=ssl.CERT_NONE)
+        connection.tls_set(cert_reqs=ssl.CERT_NONE)
+
+    if args.runtime == "asyncio":
+        from .aio_runtime import AsyncRuntime
+        AsyncRuntime(mqtt_client).run_forever(
+            source=source,
+            mqtt_dest=dest,
+            http_host=args.http_host,
+            http_port=args.http_port,
+            static_dir=args.http_static_dir,
+            basic_user=args.http_basic_user,
+            basic_pass=args.http_basic_pass,
+        )
+        sys.exit(0)
 
     # Start embedded Web UI server (same process -> shared controls state)
     if args.http_port and args.http_port > 0:
@@ -464,8 +756,9 @@ if __name__ == "__main__":
             print(f"Failed to start Web UI: {_web_e}")
 
     print("Connecting MQTT...")
-    mqtt_client.mqtt_connect(dest=dest)
-    print("Connecting Controller...")
-    mqtt_client.panel_connect(source)
+    connection.link.start(lambda: connection.connect(dest=dest))
+    for panel_client, panel_source in clients:
+        print(f"Connecting Controller {panel_client._formatter.get_identifier()}...")
+        panel_client._panel_link.start(lambda: panel_client.panel_connect(panel_source))
     print("Starting loop...")
-    mqtt_client.loop_forever()
+    run_clients([panel_client for panel_client, _ in clients])
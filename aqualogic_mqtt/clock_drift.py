@@ -0,0 +1,167 @@
+"""PL-PLUS clock offset and skew estimated from the Default Menu clock line.
+
+The controller shows its clock only to the minute, so a single reading says
+little more than "within a minute". The moment the shown minute changes is
+sharper: the controller's clock reads exactly ``HH:MM:00`` somewhere between
+the last frame showing the old minute and the first frame showing the new
+one. Each such bracketed rollover is an offset sample (controller minus host
+time) with an uncertainty of half the bracket.
+
+Samples are thinned to the sharpest one per ``sample_interval_seconds`` and
+fitted with a weighted straight line (offset and skew in seconds per day)
+once they span ``min_fit_span_seconds``. A sample far off the fitted line
+means the clock was set (at the panel, by a sync or by a DST change) and
+starts a new fit. Everything here is passive; nothing enters the menu.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from .automation import format_utc
+
+
+class ClockDriftEstimator:
+    """Offset/skew fit over observed controller minute rollovers."""
+
+    def __init__(
+        self,
+        *,
+        max_bracket_seconds: float = 20.0,
+        sample_interval_seconds: float = 600.0,
+        window: timedelta = timedelta(days=14),
+        min_samples: int = 3,
+        min_fit_span_seconds: float = 6 * 3600.0,
+        jump_seconds: float = 30.0,
+        max_estimate_age: timedelta = timedelta(hours=1),
+    ):
+        self._max_bracket_seconds = float(max_bracket_seconds)
+        self._sample_interval_seconds = float(sample_interval_seconds)
+        self._window_seconds = window.total_seconds()
+        self._min_samples = int(min_samples)
+        self._min_fit_span_seconds = float(min_fit_span_seconds)
+        self._jump_seconds = float(jump_seconds)
+        self._max_estimate_age_seconds = max_estimate_age.total_seconds()
+        # (host epoch seconds, offset seconds, half-width seconds), oldest first.
+        self._samples: list[tuple[float, float, float]] = []
+        self._last_minute: Optional[datetime] = None
+        self._last_seen: Optional[float] = None
+        self._fit: Optional[tuple[float, float, Optional[float]]] = None
+        self._rollovers = 0
+        self._resets = 0
+
+    def observe(self, controller: datetime, observed: datetime) -> bool:
+        """Feed one reading of the controller minute; True if a sample was kept."""
+        seen = observed.timestamp()
+        previous, previous_seen = self._last_minute, self._last_seen
+        self._last_minute, self._last_seen = controller, seen
+        if previous is None or controller == previous:
+            return False
+        if controller - previous != timedelta(minutes=1):
+            return False
+        width = seen - previous_seen
+        if width < 0 or width > self._max_bracket_seconds:
+            return False
+        self._rollovers += 1
+        midpoint = previous_seen + width / 2
+        return self.add_sample(midpoint, controller.timestamp() - midpoint, width / 2)
+
+    def add_sample(self, at: float, offset: float, half_width: float) -> bool:
+        if self._fit is not None and len(self._samples) >= self._min_samples:
+            if abs(offset - self._predict(at)) > self._jump_seconds + half_width:
+                self.reset()
+        kept = False
+        if self._samples and int(self._samples[-1][0] // self._sample_interval_seconds) == int(
+            at // self._sample_interval_seconds
+        ):
+            if half_width < self._samples[-1][2]:
+                self._samples[-1] = (at, offset, half_width)
+                kept = True
+        else:
+            self._samples.append((at, offset, half_width))
+            kept = True
+        if kept:
+            self._samples = [s for s in self._samples if at - s[0] <= self._window_seconds]
+            self._refit()
+        return kept
+
+    def reset(self) -> None:
+        """Forget the fit; the clock was just set."""
+        if self._samples:
+            self._resets += 1
+        self._samples = []
+        self._fit = None
+
+    def load(self, samples: Iterable[Iterable[float]]) -> None:
+        self._samples = [tuple(float(v) for v in sample)[:3] for sample in samples]
+        self._samples.sort()
+        self._refit()
+
+    def samples(self) -> list[list[float]]:
+        return [[round(at, 3), round(offset, 3), round(half, 3)] for at, offset, half in self._samples]
+
+    def _refit(self) -> None:
+        if not self._samples:
+            self._fit = None
+            return
+        reference = self._samples[-1][0]
+        weights = [1.0 / max(half, 0.25) ** 2 for _, _, half in self._samples]
+        xs = [(at - reference) / 86400 for at, _, _ in self._samples]
+        ys = [offset for _, offset, _ in self._samples]
+        total = sum(weights)
+        x_mean = sum(w * x for w, x in zip(weights, xs)) / total
+        y_mean = sum(w * y for w, y in zip(weights, ys)) / total
+        span = self._samples[-1][0] - self._samples[0][0]
+        if len(self._samples) < self._min_samples or span < self._min_fit_span_seconds:
+            self._fit = (reference, y_mean, None)
+            return
+        spread = sum(w * (x - x_mean) ** 2 for w, x in zip(weights, xs))
+        skew = sum(w * (x - x_mean) * (y - y_mean) for w, x, y in zip(weights, xs, ys)) / spread
+        self._fit = (reference, y_mean - skew * x_mean, skew)
+
+    def _predict(self, at: float) -> float:
+        reference, offset, skew = self._fit
+        return offset + (skew or 0.0) * (at - reference) / 86400
+
+    def skew_seconds_per_day(self) -> Optional[float]:
+        return self._fit[2] if self._fit is not None else None
+
+    def offset_seconds(self, at: datetime) -> Optional[float]:
+        """Controller minus host time at ``at``; None without a usable estimate.
+
+        A fitted skew extrapolates across the whole window. Without one the
+        mean offset only stands for ``max_estimate_age`` after the last sample.
+        """
+        if self._fit is None:
+            return None
+        when = at.timestamp()
+        if self._fit[2] is None and when - self._samples[-1][0] > self._max_estimate_age_seconds:
+            return None
+        return self._predict(when)
+
+    def crossing(self, limit_seconds: float, now: datetime) -> Optional[datetime]:
+        """When the fitted offset reaches +/-``limit_seconds``; None if it never will."""
+        offset = self.offset_seconds(now)
+        if offset is None:
+            return None
+        if abs(offset) >= limit_seconds:
+            return now
+        skew = self._fit[2]
+        if not skew:
+            return None
+        target = limit_seconds if skew > 0 else -limit_seconds
+        return now + timedelta(days=(target - offset) / skew)
+
+    def as_dict(self, now: datetime) -> dict:
+        offset = self.offset_seconds(now)
+        skew = self.skew_seconds_per_day()
+        last = self._samples[-1] if self._samples else None
+        return {
+            "samples": len(self._samples),
+            "rollovers": self._rollovers,
+            "resets": self._resets,
+            "offset_sec": round(offset, 1) if offset is not None else None,
+            "skew_sec_per_day": round(skew, 2) if skew is not None else None,
+            "last_sample_utc": format_utc(datetime.fromtimestamp(last[0], timezone.utc)) if last else None,
+        }
@@ -1,4 +1,11 @@
-"""Weekly PL-PLUS clock comparison and guarded Settings-menu synchronization."""
+"""Weekly PL-PLUS clock comparison and guarded Settings-menu synchronization.
+
+Between syncs the driver watches the Default Menu clock line and fits the
+controller's offset and skew (``clock_drift``). With a fitted skew a sync is
+scheduled before the drift reaches the threshold instead of waiting for the
+weekly check, and a fresh offset estimate replaces the minute-resolution
+comparison. A sync commits its edit just after a minute rollover.
+"""
 
 from __future__ import annotations
 
@@ -13,6 +20,12 @@ from typing import Callable, Optional
 from aqualogic.keys import Keys
 
 from .automation import LOCAL_TIMEZONE, format_utc, parse_utc, utc_now
+from .clock_drift import ClockDriftEstimator
+from .key_burst import DEFAULT_BURST_INTERVAL_SECONDS, send_burst, wait_settled
+from .key_timing import FixedKeyTiming, KeyTimingProfile
+from .lcd_arbiter import MAINTENANCE, LcdArbiter, LcdLease
+from .menu_graph import MenuGraph
+from .settings_harvest import SettingsHarvester
 
 
 WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
@@ -21,6 +34,7 @@ CLOCK_RE = re.compile(
     r"(\d{1,2})(?:\s*:\s*|\s+)(\d{2})([AP])\b",
     re.I,
 )
+DEFAULT_CLOCK_RE = re.compile(r"^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b", re.I)
 TIME_RE = re.compile(r"\b(\d{1,2})\s*:\s*(\d{2})([AP])\b", re.I)
 
 
@@ -28,6 +42,13 @@ class ClockSyncError(RuntimeError):
     pass
 
 
+def _clock_page_value(line: str) -> str:
+    match = CLOCK_RE.search(" ".join(str(line or "").replace("\x00", " ").split()))
+    if not match:
+        raise ValueError(f"clock is currently blank on PL-PLUS clock page: {line!r}")
+    return match.group(0)
+
+
 def parse_controller_clock(line: object, reference: datetime) -> datetime:
     match = CLOCK_RE.search(" ".join(str(line or "").replace("\x00", " ").split()))
     if not match:
@@ -94,6 +115,17 @@ class ClockSyncDriver:
         key_settle_seconds: float = 0.75,
         field_settle_seconds: float = 1.25,
         key_timeout_seconds: float = 6.0,
+        menu_graph: Optional[MenuGraph] = None,
+        burst_keys: bool = True,
+        burst_interval_seconds: float = DEFAULT_BURST_INTERVAL_SECONDS,
+        arbiter: Optional[LcdArbiter] = None,
+        harvester: Optional[SettingsHarvester] = None,
+        harvest_max_age_seconds: float = 45.0,
+        key_timing: Optional[KeyTimingProfile] = None,
+        drift: Optional[ClockDriftEstimator] = None,
+        drift_margin_seconds: float = 15.0,
+        commit_slack_seconds: float = 2.0,
+        commit_delay_seconds: float = 0.25,
     ):
         self._key_sender = key_sender
         self._display_reader = display_reader
@@ -109,6 +141,19 @@ class ClockSyncDriver:
         self._key_settle_seconds = float(key_settle_seconds)
         self._field_settle_seconds = float(field_settle_seconds)
         self._key_timeout_seconds = float(key_timeout_seconds)
+        self._menu_graph = menu_graph or MenuGraph()
+        self._burst_keys = bool(burst_keys)
+        self._burst_interval_seconds = float(burst_interval_seconds)
+        self._arbiter = arbiter or LcdArbiter()
+        self._harvest = harvester or SettingsHarvester(clock=monotonic)
+        self._harvest.register(("clock",), _clock_page_value)
+        self._harvest_max_age_seconds = float(harvest_max_age_seconds)
+        self._key_timing = key_timing or FixedKeyTiming()
+        self._drift = drift or ClockDriftEstimator()
+        # Correct while the offset is still this far inside the threshold.
+        self._drift_limit_seconds = max(1.0, self._threshold_minutes * 60 - float(drift_margin_seconds))
+        self._commit_slack_seconds = float(commit_slack_seconds)
+        self._commit_delay_seconds = float(commit_delay_seconds)
         self._lock = Lock()
         self._worker: Optional[Thread] = None
         self._phase = "idle"
@@ -116,6 +161,7 @@ class ClockSyncDriver:
         self._last_attempt_utc: Optional[datetime] = None
         self._last_sync_utc: Optional[datetime] = None
         self._last_difference_minutes: Optional[int] = None
+        self._last_offset_seconds: Optional[float] = None
         self._last_error: Optional[str] = None
         self._load()
 
@@ -129,6 +175,7 @@ class ClockSyncDriver:
                 value = payload.get(name)
                 setattr(self, f"_{name}", parse_utc(value) if value else None)
             self._last_difference_minutes = payload.get("last_difference_minutes")
+            self._drift.load(payload.get("drift_samples") or [])
         except Exception as exc:
             self._last_error = f"clock state load failed: {exc}"
 
@@ -141,6 +188,7 @@ class ClockSyncDriver:
             "last_attempt_utc": format_utc(self._last_attempt_utc) if self._last_attempt_utc else None,
             "last_sync_utc": format_utc(self._last_sync_utc) if self._last_sync_utc else None,
             "last_difference_minutes": self._last_difference_minutes,
+            "drift_samples": self._drift.samples(),
         }
         parent = os.path.dirname(os.path.abspath(self._state_file))
         os.makedirs(parent, exist_ok=True)
@@ -156,23 +204,76 @@ class ClockSyncDriver:
         with self._lock:
             return self._worker is not None and self._worker.is_alive()
 
+    def observe_display(self, lines: object) -> None:
+        """Time controller minute rollovers on the Default Menu clock line."""
+        values = lines if isinstance(lines, (list, tuple)) else [lines]
+        for line in values:
+            text = " ".join(str(line or "").replace("\x00", " ").split())
+            if not DEFAULT_CLOCK_RE.match(text):
+                continue
+            now = parse_utc(self._now())
+            try:
+                controller = parse_controller_clock(text, now)
+            except ValueError:
+                return
+            with self._lock:
+                if self._worker is not None and self._worker.is_alive():
+                    return
+                if self._drift.observe(controller, now):
+                    try:
+                        self._save_locked()
+                    except Exception as exc:
+                        self._last_error = f"clock state save failed: {exc}"
+            return
+
+    def _drift_due_locked(self, current: datetime) -> Optional[datetime]:
+        crossing = self._drift.crossing(self._drift_limit_seconds, current)
+        if crossing is None:
+            return None
+        if self._last_attempt_utc is not None:
+            crossing = max(crossing, self._last_attempt_utc + self._retry_interval)
+        return crossing
+
     def due(self, now: Optional[datetime] = None) -> bool:
         current = parse_utc(now or self._now())
         with self._lock:
             if self._worker is not None and self._worker.is_alive():
                 return False
+            drift_due = self._drift_due_locked(current)
+            if drift_due is not None and drift_due <= current:
+                return True
             if self._last_check_utc is not None:
                 return current - self._last_check_utc >= self._interval
             if self._last_attempt_utc is not None:
                 return current - self._last_attempt_utc >= self._retry_interval
             return True
 
+    def next_due(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Return when ``due`` next becomes true; None while a sync is running."""
+        current = parse_utc(now or self._now())
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return None
+            if self._last_check_utc is not None:
+                scheduled = self._last_check_utc + self._interval
+            elif self._last_attempt_utc is not None:
+                scheduled = self._last_attempt_utc + self._retry_interval
+            else:
+                scheduled = current
+            drift_due = self._drift_due_locked(current)
+            return min(scheduled, drift_due) if drift_due is not None else scheduled
+
     def _cached_line(self) -> str:
         cache = self._menu_cache_reader() or {}
         value = (cache.get("values") or {}).get("controllerClock") or {}
+        line = value.get("value") or value.get("raw")
+        if value.get("fresh") is False or not line:
+            # Someone passing Set Day and Time saw the clock more recently.
+            harvested = self._harvest.get("clock", self._harvest_max_age_seconds)
+            if harvested is not None:
+                return str(harvested["value"])
         if value.get("fresh") is False:
             raise ClockSyncError("cached PL-PLUS clock is stale")
-        line = value.get("value") or value.get("raw")
         if not line:
             raise ClockSyncError("PL-PLUS clock has not been observed")
         return str(line)
@@ -196,7 +297,15 @@ class ClockSyncDriver:
         with self._lock:
             self._last_attempt_utc = now
             self._last_difference_minutes = difference
-            if abs(difference) < self._threshold_minutes:
+            offset = self._drift.offset_seconds(now)
+            self._last_offset_seconds = round(offset, 1) if offset is not None else None
+            if offset is not None and abs(difference) <= self._threshold_minutes:
+                # The shown minute is only within a minute; the fitted offset
+                # decides unless the display is off by more than the threshold.
+                in_sync = abs(offset) < self._drift_limit_seconds
+            else:
+                in_sync = abs(difference) < self._threshold_minutes
+            if in_sync:
                 self._last_check_utc = now
                 self._phase = "checked"
                 self._last_error = None
@@ -233,8 +342,8 @@ class ClockSyncDriver:
             return "top"
         return text
 
-    def _wait_for(self, predicate: Callable[[str], bool]) -> str:
-        deadline = self._monotonic() + self._key_timeout_seconds
+    def _wait_for(self, predicate: Callable[[str], bool], timeout: Optional[float] = None) -> str:
+        deadline = self._monotonic() + (self._key_timeout_seconds if timeout is None else timeout)
         last = self._line()
         while self._monotonic() < deadline:
             last = self._line()
@@ -245,31 +354,33 @@ class ClockSyncDriver:
                 # Selected clock fields disappear during their blink-off
                 # phase. Keep sampling until the value is visible again.
                 pass
-            self._sleep(self._poll_interval_seconds)
+            self._sleep(self._key_timing.poll_seconds(self._poll_interval_seconds))
         raise ClockSyncError(f"timed out waiting for PL-PLUS display (last={last!r})")
 
     def _press(self, key: object, predicate: Callable[[str], bool], *, safe_clock: bool = False) -> str:
-        if safe_clock and self._page(self._line()) != "clock":
+        page = self._page(self._line())
+        if safe_clock and page != "clock":
             raise ClockSyncError(f"refusing clock edit on unexpected page {self._line()!r}")
+        timeout = self._key_timing.timeout_seconds(key, page, self._key_timeout_seconds)
+        started = self._monotonic()
         self._key_sender(key)
-        result = self._wait_for(predicate)
-        self._sleep(self._key_settle_seconds)
+        try:
+            result = self._wait_for(predicate, timeout)
+        except ClockSyncError:
+            self._key_timing.miss(key, page)
+            raise
+        self._key_timing.observe(key, page, self._monotonic() - started)
+        self._sleep(self._key_timing.settle_seconds(key, page, self._key_settle_seconds))
         return result
 
     def _navigate_clock(self) -> None:
-        for _ in range(7):
-            if self._page(self._line()) == "settings":
-                break
-            previous = self._page(self._line())
-            self._press(Keys.MENU, lambda line, old=previous: self._page(line) != old)
-        else:
-            raise ClockSyncError("could not reach Settings Menu")
-        for _ in range(9):
-            if self._page(self._line()) == "clock":
-                return
-            previous = self._line()
-            self._press(Keys.RIGHT, lambda line, old=previous: line != old)
-        raise ClockSyncError("could not reach Set Day and Time")
+        if not self._menu_graph.navigate(
+            "clock",
+            self._line,
+            lambda key, predicate, _page: self._press(key, predicate),
+            on_page=self._arbiter.visit,
+        ):
+            raise ClockSyncError("could not reach Set Day and Time")
 
     @staticmethod
     def _cyclic_step(current: int, target: int, size: int) -> tuple[object, int]:
@@ -279,12 +390,47 @@ class ClockSyncDriver:
 
     def _adjust(self, current: int, target: int, size: int, reader: Callable[[str], int]) -> None:
         key, count = self._cyclic_step(current, target, size)
+        if self._burst_keys and count > 1:
+            current = self._burst(key, count, reader)
+            key, count = self._cyclic_step(current, target, size)
         value = current
         for _ in range(count):
             expected = (value + (1 if key == Keys.PLUS else -1)) % size
             self._press(key, lambda line, want=expected: reader(line) == want, safe_clock=True)
             value = expected
 
+    def _burst(self, key: object, count: int, reader: Callable[[str], int]) -> int:
+        """Send ``count`` presses at once; return the value the field settles on."""
+        def guard() -> None:
+            if self._page(self._line()) != "clock":
+                raise ClockSyncError(f"refusing clock edit on unexpected page {self._line()!r}")
+
+        def read() -> Optional[int]:
+            guard()
+            line = self._line()
+            return int(reader(line)) if self._reader_available(reader, line) else None
+
+        send_burst(
+            self._key_sender,
+            key,
+            count,
+            sleep=self._sleep,
+            interval_seconds=self._burst_interval_seconds,
+            before_press=guard,
+        )
+        value = wait_settled(
+            read,
+            clock=self._monotonic,
+            sleep=self._sleep,
+            poll_seconds=self._poll_interval_seconds,
+            settle_seconds=self._key_settle_seconds,
+            timeout_seconds=self._key_timeout_seconds,
+        )
+        if value is None:
+            raise ClockSyncError("clock field did not settle after burst entry")
+        self._sleep(self._key_settle_seconds)
+        return value
+
     @staticmethod
     def _parts(line: str, reference: datetime) -> tuple[int, int, int]:
         parsed = parse_controller_clock(line, reference)
@@ -316,37 +462,65 @@ class ClockSyncDriver:
     def _local_now(self) -> datetime:
         return parse_utc(self._now()).astimezone(LOCAL_TIMEZONE)
 
+    def _commit_target(self, local_now: datetime) -> datetime:
+        """The minute to enter: this one if it has only just begun, else the next."""
+        floor = local_now.replace(second=0, microsecond=0)
+        if (local_now - floor).total_seconds() <= self._commit_slack_seconds:
+            return floor
+        return floor + timedelta(minutes=1)
+
+    def _wait_for_commit(self, target: datetime) -> None:
+        """Commit the entered time just after ``target`` rolls over locally."""
+        remaining = (target - self._local_now()).total_seconds()
+        if remaining <= -60:
+            raise ClockSyncError(f"clock edit overran its commit minute {target:%H:%M}")
+        if remaining > 0:
+            self._sleep(remaining + self._commit_delay_seconds)
+
     def _return_default(self) -> None:
-        for _ in range(8):
-            if self._page(self._line()) == "default":
-                return
-            previous = self._page(self._line())
-            self._key_sender(Keys.MENU)
-            try:
-                self._wait_for(lambda line, old=previous: self._page(line) != old)
-            except ClockSyncError:
-                pass
+        self._menu_graph.navigate("default_menu", self._line, self._cleanup_press, on_page=self._arbiter.visit)
+
+    def _cleanup_press(self, key: object, predicate: Callable[[str], bool], _page: str) -> str:
+        self._key_sender(key)
+        try:
+            return self._wait_for(predicate)
+        except ClockSyncError:
+            return self._line()
 
     def _run(self) -> None:
+        try:
+            lease = self._arbiter.acquire("clock_sync", MAINTENANCE, page="clock")
+        except Exception as exc:
+            with self._lock:
+                self._phase = "failed"
+                self._last_error = str(exc)
+            return
+        with lease:
+            self._run_sync(lease)
+
+    def _run_sync(self, lease: LcdLease) -> None:
         try:
             with self._lock:
                 self._phase = "syncing"
             self._navigate_clock()
+            if lease.preempt_requested():
+                # Maintenance yields before editing; the retry interval reschedules it.
+                with self._lock:
+                    self._phase = "preempted"
+                lease.end_trip(self._return_default)
+                return
+            target = self._commit_target(self._local_now())
             current_day = int(self._read_visible(display_weekday))
-            self._adjust(current_day, self._local_now().weekday(), 7, display_weekday)
+            self._adjust(current_day, target.weekday(), 7, display_weekday)
             self._move_clock_field()
             hour_reader = lambda line: display_hour_minute(line)[0]
             current_hour = int(self._read_visible(hour_reader))
-            self._adjust(current_hour, self._local_now().hour, 24, hour_reader)
+            self._adjust(current_hour, target.hour, 24, hour_reader)
             self._move_clock_field()
             minute_reader = lambda line: display_hour_minute(line)[1]
             current_minute = int(self._read_visible(minute_reader))
-            local_now = self._local_now()
-            if local_now.second >= 45:
-                self._sleep(61 - local_now.second)
-                current_minute = int(self._read_visible(minute_reader))
-                local_now = self._local_now()
-            self._adjust(current_minute, local_now.minute, 60, minute_reader)
+            self._adjust(current_minute, target.minute, 60, minute_reader)
+            self._wait_for_commit(target)
             self._press(Keys.RIGHT, lambda line: self._page(line) != "clock", safe_clock=True)
             with self._lock:
                 completed = parse_utc(self._now())
@@ -354,13 +528,15 @@ class ClockSyncDriver:
                 self._last_sync_utc = completed
                 self._phase = "synced"
                 self._last_error = None
+                # The fit described the clock before it was set.
+                self._drift.reset()
                 self._save_locked()
+            lease.end_trip(self._return_default)
         except Exception as exc:
             with self._lock:
                 self._phase = "failed"
                 self._last_error = str(exc)
                 self._save_locked()
-        finally:
             try:
                 self._return_default()
             except Exception:
@@ -377,6 +553,8 @@ class ClockSyncDriver:
                 "last_check_utc": format_utc(self._last_check_utc) if self._last_check_utc else None,
                 "last_sync_utc": format_utc(self._last_sync_utc) if self._last_sync_utc else None,
                 "last_difference_minutes": self._last_difference_minutes,
+                "last_offset_sec": self._last_offset_seconds,
+                "drift": self._drift.as_dict(parse_utc(self._now())),
                 "last_error": self._last_error,
             }
         result["due"] = False if busy else self.due(self._now())
@@ -0,0 +1,161 @@
+"""Compact CBOR encoding of the combined state message.
+
+The JSON state topic carries ``"ON"``/``"OFF"`` strings and is re-encoded on
+every panel frame. Constrained consumers can subscribe to a parallel topic
+instead, whose payload is a CBOR (RFC 8949) map with the same short keys,
+booleans in place of ``"ON"``/``"OFF"`` and numbers left as numbers. Only the
+types the state dict uses are supported (maps, arrays, text, integers, floats,
+booleans and null), so no third-party CBOR library is needed; any CBOR decoder
+reads the result.
+
+``python -m aqualogic_mqtt.compact`` compares encode/decode cost and payload
+size against the JSON topic.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import timeit
+
+_ON_OFF = {"ON": True, "OFF": False}
+
+# Major types (RFC 8949 section 3.1).
+_UNSIGNED, _NEGATIVE, _TEXT, _ARRAY, _MAP = 0, 1, 3, 4, 5
+_FALSE, _TRUE, _NULL, _FLOAT64 = 0xF4, 0xF5, 0xF6, 0xFB
+
+
+def compact_state(state: dict) -> dict:
+    """Replace ``"ON"``/``"OFF"`` values with booleans."""
+    return {k: _ON_OFF.get(v, v) if isinstance(v, str) else v for k, v in state.items()}
+
+
+def _head(major: int, value: int) -> bytes:
+    if value < 24:
+        return bytes([major << 5 | value])
+    for info, fmt in ((24, ">B"), (25, ">H"), (26, ">I"), (27, ">Q")):
+        if value < 1 << (8 * struct.calcsize(fmt)):
+            return bytes([major << 5 | info]) + struct.pack(fmt, value)
+    raise ValueError(f"integer {value} is too large for CBOR")
+
+
+def _encode(value, out: bytearray) -> None:
+    if value is None:
+        out.append(_NULL)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out += _head(_UNSIGNED, value) if value >= 0 else _head(_NEGATIVE, -1 - value)
+    elif isinstance(value, float):
+        out.append(_FLOAT64)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += _head(_TEXT, len(data))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        out += _head(_ARRAY, len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out += _head(_MAP, len(value))
+        for key, item in value.items():
+            _encode(str(key), out)
+            _encode(item, out)
+    else:
+        raise TypeError(f"cannot CBOR-encode {type(value).__name__}")
+
+
+def encode(value) -> bytes:
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def _decode(data: bytes, pos: int):
+    initial = data[pos]
+    pos += 1
+    major, info = initial >> 5, initial & 0x1F
+    if major == 7:
+        if initial == _FALSE:
+            return False, pos
+        if initial == _TRUE:
+            return True, pos
+        if initial == _NULL:
+            return None, pos
+        if initial == _FLOAT64:
+            return struct.unpack_from(">d", data, pos)[0], pos + 8
+        raise ValueError(f"unsupported CBOR simple value 0x{initial:02x}")
+    if info < 24:
+        argument = info
+    elif info <= 27:
+        fmt = (">B", ">H", ">I", ">Q")[info - 24]
+        argument = struct.unpack_from(fmt, data, pos)[0]
+        pos += struct.calcsize(fmt)
+    else:
+        raise ValueError("indefinite-length CBOR items are not supported")
+    if major == _UNSIGNED:
+        return argument, pos
+    if major == _NEGATIVE:
+        return -1 - argument, pos
+    if major == _TEXT:
+        return data[pos:pos + argument].decode("utf-8"), pos + argument
+    if major == _ARRAY:
+        items = []
+        for _ in range(argument):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if major == _MAP:
+        result = {}
+        for _ in range(argument):
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos
+    raise ValueError(f"unsupported CBOR major type {major}")
+
+
+def decode(data: bytes):
+    value, pos = _decode(bytes(data), 0)
+    if pos != len(data):
+        raise ValueError("trailing bytes after CBOR item")
+    return value
+
+
+# A fully enabled panel in spa mode with a system message showing.
+SAMPLE_STATE = {
+    "cs": "ON", "sysm": "Check Chlorinator", "t_a": 71, "t_p": 82, "t_s": 101,
+    "cl_p": 50, "cl_s": 30, "salt": 3200, "s_p": 75, "p_p": 1150,
+    "l": "OFF", "f": "ON", "aux1": "OFF", "aux2": "OFF", "spill": "OFF",
+    "h1": "ON", "hauto": "ON", "sc": "OFF", "pool": "OFF", "spa": "ON",
+    "pending": [],
+}
+
+
+def benchmark(state: dict = SAMPLE_STATE, number: int = 20000) -> dict:
+    """Per-message encode/decode time (microseconds) and size (bytes)."""
+    json_payload = json.dumps(state)
+    cbor_payload = encode(compact_state(state))
+
+    def per_call(fn) -> float:
+        return round(timeit.timeit(fn, number=number) / number * 1e6, 2)
+
+    return {
+        "json": {
+            "bytes": len(json_payload.encode("utf-8")),
+            "encode_us": per_call(lambda: json.dumps(state)),
+            "decode_us": per_call(lambda: json.loads(json_payload)),
+        },
+        "cbor": {
+            "bytes": len(cbor_payload),
+            "encode_us": per_call(lambda: encode(compact_state(state))),
+            "decode_us": per_call(lambda: decode(cbor_payload)),
+        },
+    }
+
+
+if __name__ == "__main__":
+    for name, result in benchmark().items():
+        print(f"{name:5} {result['bytes']:4d} bytes  encode {result['encode_us']:6.2f} us  decode {result['decode_us']:6.2f} us")
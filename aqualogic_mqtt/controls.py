@@ -10,6 +10,12 @@ from .vsp import VspDriver
 from .equipment import EquipmentController
 from .automation import AutomationEngine
 from .heater_targets import HeaterTargetDriver
+from .clock_sync import ClockSyncDriver
+from .menu_graph import MenuGraph
+from .lcd_arbiter import LcdArbiter
+from .settings_harvest import SettingsHarvester
+from .key_timing import KeyTimingProfile
+from .spa_heating import SpaHeatingModel
 try:
     # Keys enum from swilson/aqualogic
     from aqualogic.keys import Keys
@@ -53,235 +59,51 @@ class DisplayState:
                 self.leds = dict(leds)
             self.updated_at = time.time()
 
-_state = DisplayState()
-_default_menu = DefaultMenuCache()
-_vsp_driver: Optional[VspDriver] = None
-_equipment: Optional[EquipmentController] = None
-_automation: Optional[AutomationEngine] = None
-_heater_targets: Optional[HeaterTargetDriver] = None
-
-def update_display(lines: Optional[List[str]], blink: Optional[List[Tuple[int, int]]], leds: Optional[dict]) -> None:
-    _state.update(lines, blink, leds)
-    if lines is not None or leds is not None:
-        current = _state.as_dict()
-        observed_lines = current.get("lines") if lines is not None else []
-        observed_leds = current.get("leds") if leds is not None or lines is not None else None
-        _default_menu.observe_display(observed_lines, observed_leds, current.get("updated_at"))
-        if _heater_targets is not None and observed_lines:
-            _heater_targets.observe_display(observed_lines)
-
-def get_display() -> dict:
-    return _state.as_dict()
-
-def get_default_menu() -> dict:
-    return _default_menu.as_dict()
-
-def set_vsp_driver(driver: VspDriver) -> None:
-    global _vsp_driver
-    _vsp_driver = driver
-
-def set_equipment_controller(controller: EquipmentController) -> None:
-    global _equipment
-    _equipment = controller
-
-def set_automation_engine(engine: AutomationEngine) -> None:
-    global _automation
-    _automation = engine
-
-def set_heater_target_driver(driver: HeaterTargetDriver) -> None:
-    global _heater_targets
-    _heater_targets = driver
-
-def get_heater_target_status() -> dict:
-    if _heater_targets is None:
-        return {"available": False, "busy": False, "last_error": "heater target driver is not registered"}
-    return _heater_targets.status()
-
-def refresh_heater_targets() -> dict:
-    if _heater_targets is None:
-        raise RuntimeError("heater target driver is not registered")
-    if _vsp_driver is not None and _vsp_driver.is_menu_busy():
-        raise RuntimeError("heater target read is blocked while a VSP menu operation is active")
-    if not _heater_targets.is_busy() and _automation is not None and _automation.hardware_busy():
-        raise RuntimeError("heater target read is blocked while another LCD menu operation is active")
-    return _heater_targets.request_refresh()
-
-def scan_heater_target(body: str) -> dict:
-    if _heater_targets is None:
-        raise RuntimeError("heater target driver is not registered")
-    if _vsp_driver is not None and _vsp_driver.is_menu_busy():
-        raise RuntimeError("heater target read is blocked while a VSP menu operation is active")
-    if not _heater_targets.is_busy() and _automation is not None and _automation.hardware_busy():
-        raise RuntimeError("heater target read is blocked while another LCD menu operation is active")
-    return _heater_targets.request_scan(body)
-
-def set_heater_target(body: str, target_f: int) -> dict:
-    if _heater_targets is None:
-        raise RuntimeError("heater target driver is not registered")
-    if _vsp_driver is not None and _vsp_driver.is_menu_busy():
-        raise RuntimeError("heater target write is blocked while a VSP menu operation is active")
-    if not _heater_targets.is_busy() and _automation is not None and _automation.hardware_busy():
-        raise RuntimeError("heater target write is blocked while another LCD menu operation is active")
-    return _heater_targets.request_set(body, target_f)
-
-def get_automation_status() -> dict:
-    if _automation is None:
-        return {"available": False, "enabled": False, "last_error": "automation engine is not registered"}
-    return _automation.status()
-
-def set_manual_override(values: dict) -> dict:
-    if _automation is None:
-        raise RuntimeError("automation engine is not registered")
-    return _automation.set_manual(**values)
-
-def set_pool_heat(enabled: bool) -> dict:
-    if _automation is None:
-        raise RuntimeError("automation engine is not registered")
-    return _automation.set_pool_heat(enabled)
-
-def clear_manual_override(field: Optional[str] = None) -> dict:
-    if _automation is None:
-        raise RuntimeError("automation engine is not registered")
-    return _automation.clear_manual(field)
-
-def activate_openclaw_spa(values: dict) -> dict:
-    if _automation is None:
-        raise RuntimeError("automation engine is not registered")
-    return _automation.activate_openclaw_spa(
-        session_id=values.get("session_id"),
-        phase=values.get("phase", "spa"),
-        prep_start_utc=values.get("prep_start_utc"),
-        preheat_start_utc=values.get("preheat_start_utc"),
-    )
-
-def stop_openclaw_spa(session_id: Optional[str] = None) -> dict:
-    if _automation is None:
-        raise RuntimeError("automation engine is not registered")
-    return _automation.stop_openclaw_spa(session_id)
-
-def _web_control_lock(equipment: dict, vsp: dict, automation: dict) -> tuple[bool, Optional[str]]:
-    """Lock globally only while automation owns the PL-PLUS LCD menu."""
-    clock_sync = automation.get("clock_sync") or {}
-    if clock_sync.get("busy"):
-        return True, "Synchronizing the PL-PLUS clock"
-
-    heater_targets = get_heater_target_status()
-    if heater_targets.get("busy"):
-        return True, "Reading or setting PL-PLUS heater targets"
-
-    vsp_phase = str(vsp.get("phase") or "")
-    if vsp.get("busy") and vsp_phase != "holding":
-        label = vsp_phase.replace("_", " ") or "pump speed control"
-        return True, f"Pump control in progress: {label}"
+# ---- Module-level helpers shared by every panel ----
+_KEY_MAP = {
+    "menu": Keys.MENU,
+    "left": Keys.LEFT,
+    "right": Keys.RIGHT,
+    "minus": Keys.MINUS,
+    "plus": Keys.PLUS,
+    "filter": Keys.FILTER,
+    "pool_spa": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),  # fallback to MENU if missing
+    # optional aliases:
+    "poolspa": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),
+    "pool_spa_toggle": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),
+}
 
-    return False, None
+# Hubitat/HA entity ids (minus the "<identifier>_" prefix) whose commands
+# automation captures as manual overrides.
+_AUTOMATION_MQTT_SWITCHES = {
+    "switch_filter": "filter",
+    "light_lights": "lights",
+    "switch_aux_1": "blower",
+    "switch_aux_2": "heater_relay",
+    "switch_heater_auto": "auto_heat",
+}
 
-def get_equipment_status() -> dict:
-    if _equipment is None:
-        return {"available": False, "last_error": "equipment controller is not registered"}
-    equipment = _equipment.status()
-    vsp = get_vsp_status()
-    automation = get_automation_status()
-    controls_locked, control_lock_reason = _web_control_lock(equipment, vsp, automation)
-    return {
-        "available": True,
-        **equipment,
-        "vsp": vsp,
-        "automation": automation,
-        "heater_targets": get_heater_target_status(),
-        "controls_locked": controls_locked,
-        "control_lock_reason": control_lock_reason,
-    }
-
-def set_equipment_switch(control: str, enabled: bool) -> dict:
-    if _equipment is None:
-        raise RuntimeError("equipment controller is not registered")
-    if _automation is not None and _automation.is_enabled():
-        if control == "auto_heat":
-            return _automation.set_pool_heat(enabled)
-        field = "filter_on" if control == "filter" else control
-        return _automation.set_manual(**{field: enabled})
-    if _heater_targets is not None and _heater_targets.is_busy():
-        raise RuntimeError("equipment control is blocked while a heater target menu operation is active")
-    if _vsp_driver is not None and _vsp_driver.is_busy():
-        raise RuntimeError("equipment control is blocked while a VSP menu operation is active")
-    return _equipment.set_switch(control, enabled)
-
-def request_equipment_mode(mode: str) -> dict:
-    if _equipment is None:
-        raise RuntimeError("equipment controller is not registered")
-    if _automation is not None and _automation.is_enabled():
-        return _automation.set_manual(mode=mode)
-    if _heater_targets is not None and _heater_targets.is_busy():
-        raise RuntimeError("mode control is blocked while a heater target menu operation is active")
-    if _vsp_driver is not None and _vsp_driver.is_busy():
-        raise RuntimeError("mode control is blocked while a VSP menu operation is active")
-    return _equipment.request_mode(mode)
-
-def get_vsp_status() -> dict:
-    if _vsp_driver is None:
-        return {"enabled": False, "available": False, "last_error": "VSP driver is not registered"}
-    return {"available": True, **_vsp_driver.status()}
-
-def request_vsp_preset(preset: str, lease_seconds: Optional[float] = None) -> dict:
-    if _vsp_driver is None:
-        raise RuntimeError("VSP driver is not registered")
-    if _automation is not None and _automation.is_enabled():
-        return _automation.set_manual(pump_preset=preset)
-    if _heater_targets is not None and _heater_targets.is_busy():
-        raise RuntimeError("pump speed control is blocked while a heater target menu operation is active")
-    return _vsp_driver.request_preset(preset, source="manual", lease_seconds=lease_seconds)
-
-def clear_vsp_target() -> dict:
-    if _vsp_driver is None:
-        raise RuntimeError("VSP driver is not registered")
-    if _automation is not None and _automation.is_enabled():
-        return _automation.clear_manual("pump_preset")
-    return _vsp_driver.clear_target()
-
-def mqtt_automation_command(topic: str, payload: str) -> Optional[tuple[str, object]]:
+def mqtt_automation_command(topic: str, payload: str, identifier: str = "aqualogic") -> Optional[tuple[str, object]]:
     value = str(payload or "").strip().upper()
     if value not in ("ON", "OFF"):
         return None
     enabled = value == "ON"
-    mappings = {
-        "aqualogic_switch_filter/set": ("switch", ("filter", enabled)),
-        "aqualogic_light_lights/set": ("switch", ("lights", enabled)),
-        "aqualogic_switch_aux_1/set": ("switch", ("blower", enabled)),
-        "aqualogic_switch_aux_2/set": ("switch", ("heater_relay", enabled)),
-        "aqualogic_switch_heater_auto/set": ("switch", ("auto_heat", enabled)),
-    }
-    for suffix, command in mappings.items():
-        if str(topic).endswith(suffix):
-            return command
-    if enabled and str(topic).endswith("aqualogic_switch_pool/set"):
+    parts = str(topic).rsplit("/", 2)
+    if len(parts) < 2 or parts[-1] != "set":
+        return None
+    prefix = f"{identifier}_"
+    if not parts[-2].startswith(prefix):
+        return None
+    entity = parts[-2][len(prefix):]
+    control = _AUTOMATION_MQTT_SWITCHES.get(entity)
+    if control is not None:
+        return ("switch", (control, enabled))
+    if enabled and entity == "switch_pool":
         return ("mode", "pool")
-    if str(topic).endswith("aqualogic_switch_spa/set"):
+    if entity == "switch_spa":
         return ("mode", "spa" if enabled else "pool")
     return None
 
-def handle_automation_mqtt(topic: str, payload: str) -> bool:
-    if _automation is None or not _automation.is_enabled():
-        return False
-    command = mqtt_automation_command(topic, payload)
-    if command is None:
-        return False
-    kind, value = command
-    if kind == "mode":
-        _automation.set_manual(mode=value)
-    else:
-        control, enabled = value
-        if control == "auto_heat":
-            _automation.set_pool_heat(enabled)
-            return True
-        field = "filter_on" if control == "filter" else control
-        _automation.set_manual(**{field: enabled})
-    return True
-
-# Convenience for when only text is known
-def ingest_display_lines(lines: List[str]) -> None:
-    update_display(lines, None, None)
-
 def _clean_lines(lines_like) -> List[str]:
     out: List[str] = []
     try:
@@ -293,111 +115,484 @@ def _clean_lines(lines_like) -> List[str]:
         out.append("")
     return out
 
-# ---- Key queue + sender plumbing ----
-_key_sender: Optional[Callable[[object], None]] = None
-_key_q = deque()
-_key_lock = Lock()
-
-_KEY_MAP = {
-    "menu": Keys.MENU,
-    "left": Keys.LEFT,
-    "right": Keys.RIGHT,
-    "minus": Keys.MINUS,
-    "plus": Keys.PLUS,
-    "filter": Keys.FILTER,
-    "pool_spa": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),  # fallback to MENU if missing
-    # optional aliases:
-    "poolspa": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),
-    "pool_spa_toggle": getattr(Keys, "POOL_SPA", getattr(Keys, "POOL_SPA_TOGGLE", Keys.MENU)),
+class StatusContext:
+    """Per-request memo: each subsystem's status() runs at most once.
+
+    Composed responses (equipment + VSP + automation + heater targets and
+    clock sync) and the web control-lock decision share one snapshot instead
+    of re-querying drivers that are already embedded elsewhere in the payload.
+    """
+
+    def __init__(self, panel: Optional["PanelControls"] = None):
+        self._panel = panel if panel is not None else _default
+        self._cache: dict = {}
+
+    def _memo(self, name: str, compute: Callable[[], dict]) -> dict:
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def equipment(self) -> dict:
+        return self._memo("equipment", lambda: self._panel._equipment.status())
+
+    def vsp(self) -> dict:
+        return self._memo("vsp", self._panel.get_vsp_status)
+
+    def heater_targets(self) -> dict:
+        return self._memo("heater_targets", self._panel.get_heater_target_status)
+
+    def clock_sync(self) -> dict:
+        return self._memo("clock_sync", lambda: self._panel._clock_sync.status())
+
+    def automation(self) -> dict:
+        def compute() -> dict:
+            automation = self._panel._automation
+            if automation is None:
+                return self._panel.get_automation_status()
+            heater_targets = self.heater_targets() if self._panel._heater_targets is not None else None
+            clock_sync = self.clock_sync() if self._panel._clock_sync is not None else None
+            return automation.status(clock_sync_status=clock_sync, heater_target_status=heater_targets)
+        return self._memo("automation", compute)
+
+_LCD_LOCK_REASONS = {
+    "vsp": "Pump control in progress",
+    "heater_targets": "Reading or setting PL-PLUS heater targets",
+    "clock_sync": "Synchronizing the PL-PLUS clock",
 }
 
-def set_key_sender(sender: Callable[[object], None]) -> None:
-    """Provide the low-level function that actually sends a key to the panel."""
-    global _key_sender
-    _key_sender = sender
-    logger.debug("controls: key sender registered")
-
-def enqueue_key(name: str) -> bool:
-    """Queue a keypress by name (menu/left/right/minus/plus/filter/pool_spa)."""
-    k = (name or "").strip().lower()
-    if _vsp_driver is not None and _vsp_driver.is_menu_busy():
-        logger.info("controls: key '%s' blocked while VSP menu operation is active", k)
-        return False
-    if _heater_targets is not None and _heater_targets.is_busy():
-        logger.info("controls: key '%s' blocked while a heater target menu operation is active", k)
-        return False
-    if _automation is not None and _automation.hardware_busy():
-        logger.info("controls: key '%s' blocked while clock synchronization is active", k)
-        return False
-    if k not in _KEY_MAP:
-        logger.debug(f"controls: unknown key '{name}'")
-        return False
-    with _key_lock:
-        _key_q.append(_KEY_MAP[k])
-    _default_menu.invalidate_for_key(k)
-    logger.info(f"controls: queued key {k}")
-    return True
-
-def drain_keypresses() -> None:
-    """Send all queued keypresses to the panel; call this right after a panel update or from API."""
-    global _key_sender
-    if _key_sender is None:
-        return
-    sent = 0
-    while True:
-        with _key_lock:
-            if not _key_q:
+def _web_control_lock(vsp: dict, lcd: dict) -> tuple[bool, Optional[str]]:
+    """Lock globally while a menu driver holds or is queued for the LCD menu.
+
+    The arbiter is the single record of menu ownership; direct relay keys
+    (owner ``equipment``) and a VSP lease that is only holding a speed do
+    not lock the page.
+    """
+    owners = [lcd.get("holder")] + [waiter.get("owner") for waiter in lcd.get("waiting") or []]
+    for owner in owners:
+        if owner in _LCD_LOCK_REASONS:
+            if owner == "vsp":
+                label = str(vsp.get("phase") or "").replace("_", " ") or "pump speed control"
+                return True, f"{_LCD_LOCK_REASONS[owner]}: {label}"
+            return True, _LCD_LOCK_REASONS[owner]
+    return False, None
+
+# ---- Per-panel controls ----
+class PanelControls:
+    """Display state, LCD menu drivers and key queue for one panel.
+
+    A bridge serving several controllers keeps one instance per panel; the
+    module-level functions below act on the default instance.
+    """
+
+    def __init__(self, panel_id: Optional[str] = None):
+        self.panel_id = panel_id
+        self._state = DisplayState()
+        self._default_menu = DefaultMenuCache()
+        self._menu_graph = MenuGraph()
+        self._lcd_arbiter = LcdArbiter(menu_graph=self._menu_graph)
+        self._settings_harvest = SettingsHarvester()
+        self._vsp_driver: Optional[VspDriver] = None
+        self._equipment: Optional[EquipmentController] = None
+        self._automation: Optional[AutomationEngine] = None
+        self._heater_targets: Optional[HeaterTargetDriver] = None
+        self._clock_sync: Optional[ClockSyncDriver] = None
+        self._key_timing: Optional[KeyTimingProfile] = None
+        self._spa_heating: Optional[SpaHeatingModel] = None
+        self._connection_status_reader: Optional[Callable[[], dict]] = None
+        self._key_sender: Optional[Callable[[object], None]] = None
+        self._key_q = deque()
+        self._key_lock = Lock()
+
+    def update_display(self, lines: Optional[List[str]], blink: Optional[List[Tuple[int, int]]], leds: Optional[dict]) -> None:
+        self._state.update(lines, blink, leds)
+        if lines is not None or leds is not None:
+            current = self._state.as_dict()
+            observed_lines = current.get("lines") if lines is not None else []
+            observed_leds = current.get("leds") if leds is not None or lines is not None else None
+            self._default_menu.observe_display(observed_lines, observed_leds, current.get("updated_at"))
+            if observed_lines:
+                self._menu_graph.observe_line(observed_lines[0])
+            if self._heater_targets is not None and observed_lines:
+                self._heater_targets.observe_display(observed_lines)
+            if self._clock_sync is not None and observed_lines:
+                self._clock_sync.observe_display(observed_lines)
+            if observed_lines:
+                self._settings_harvest.observe_display(observed_lines)
+            if self._spa_heating is not None:
+                self._spa_heating.observe(self._default_menu.as_dict)
+
+    def get_display(self) -> dict:
+        return self._state.as_dict()
+
+    def get_default_menu(self) -> dict:
+        return self._default_menu.as_dict()
+
+    def get_menu_graph(self) -> MenuGraph:
+        """The LCD menu model shared by this panel's menu drivers."""
+        return self._menu_graph
+
+    def get_menu_graph_status(self) -> dict:
+        return self._menu_graph.as_dict()
+
+    def get_settings_harvest(self) -> SettingsHarvester:
+        """Settings values seen on this panel's LCD, shared by its menu drivers."""
+        return self._settings_harvest
+
+    def get_settings_values(self) -> dict:
+        return self._settings_harvest.as_dict()
+
+    def get_lcd_arbiter(self) -> LcdArbiter:
+        """Ownership of this panel's LCD menu, shared by its menu drivers."""
+        return self._lcd_arbiter
+
+    def get_lcd_status(self) -> dict:
+        return self._lcd_arbiter.status()
+
+    def set_vsp_driver(self, driver: VspDriver) -> None:
+        self._vsp_driver = driver
+
+    def set_equipment_controller(self, controller: EquipmentController) -> None:
+        self._equipment = controller
+
+    def set_automation_engine(self, engine: AutomationEngine) -> None:
+        self._automation = engine
+
+    def set_heater_target_driver(self, driver: HeaterTargetDriver) -> None:
+        self._heater_targets = driver
+
+    def set_clock_sync_driver(self, driver: ClockSyncDriver) -> None:
+        self._clock_sync = driver
+
+    def set_key_timing(self, profile: KeyTimingProfile) -> None:
+        self._key_timing = profile
+
+    def set_spa_heating_model(self, model: SpaHeatingModel) -> None:
+        self._spa_heating = model
+
+    def estimate_spa_heating(self, values: dict) -> dict:
+        """Time to heat the Spa to ``target_f`` from the current (or given) conditions.
+
+        Temperatures not given come from the Default Menu and the target from
+        the last Spa Heater1 read; ``ready_utc`` adds the matching preheat start.
+        """
+        if self._spa_heating is None:
+            raise RuntimeError("spa heating model is not registered")
+        menu = self._default_menu.as_dict().get("values") or {}
+
+        def given_or_observed(name: str, key: str) -> Optional[float]:
+            value = values.get(name)
+            if value is None:
+                value = (menu.get(key) or {}).get("value")
+            return float(value) if value is not None else None
+
+        spa = given_or_observed("spa_temp_f", "spaTempF")
+        ambient = given_or_observed("ambient_f", "ambientF")
+        target = values.get("target_f")
+        if target is None and self._heater_targets is not None:
+            target = (self._heater_targets.status().get("targets") or {}).get("spa")
+        if target is None:
+            raise ValueError("target_f is required until the Spa heater target has been read")
+        if spa is None:
+            raise ValueError("spa_temp_f is required until the Spa temperature has been observed")
+        return self._spa_heating.estimate(spa, float(target), ambient, ready_utc=values.get("ready_utc"))
+
+    def get_key_timing_status(self) -> dict:
+        if self._key_timing is None:
+            return {"available": False, "last_error": "key timing profile is not registered"}
+        return {"available": True, **self._key_timing.as_dict()}
+
+    def set_connection_status_reader(self, reader: Callable[[], dict]) -> None:
+        self._connection_status_reader = reader
+
+    def get_connection_status(self) -> dict:
+        if self._connection_status_reader is None:
+            return {"available": False, "last_error": "connection supervisor is not registered"}
+        return {"available": True, **self._connection_status_reader()}
+
+    def get_heater_target_status(self) -> dict:
+        if self._heater_targets is None:
+            return {"available": False, "busy": False, "last_error": "heater target driver is not registered"}
+        return self._heater_targets.status()
+
+    def refresh_heater_targets(self) -> dict:
+        if self._heater_targets is None:
+            raise RuntimeError("heater target driver is not registered")
+        return self._heater_targets.request_refresh()
+
+    def scan_heater_target(self, body: str) -> dict:
+        if self._heater_targets is None:
+            raise RuntimeError("heater target driver is not registered")
+        return self._heater_targets.request_scan(body)
+
+    def set_heater_target(self, body: str, target_f: int) -> dict:
+        if self._heater_targets is None:
+            raise RuntimeError("heater target driver is not registered")
+        return self._heater_targets.request_set(body, target_f)
+
+    def get_automation_status(self) -> dict:
+        if self._automation is None:
+            return {"available": False, "enabled": False, "last_error": "automation engine is not registered"}
+        return self._automation.status()
+
+    def set_manual_override(self, values: dict) -> dict:
+        if self._automation is None:
+            raise RuntimeError("automation engine is not registered")
+        return self._automation.set_manual(**values)
+
+    def set_pool_heat(self, enabled: bool) -> dict:
+        if self._automation is None:
+            raise RuntimeError("automation engine is not registered")
+        return self._automation.set_pool_heat(enabled)
+
+    def clear_manual_override(self, field: Optional[str] = None) -> dict:
+        if self._automation is None:
+            raise RuntimeError("automation engine is not registered")
+        return self._automation.clear_manual(field)
+
+    def activate_openclaw_spa(self, values: dict) -> dict:
+        if self._automation is None:
+            raise RuntimeError("automation engine is not registered")
+        return self._automation.activate_openclaw_spa(
+            session_id=values.get("session_id"),
+            phase=values.get("phase", "spa"),
+            prep_start_utc=values.get("prep_start_utc"),
+            preheat_start_utc=values.get("preheat_start_utc"),
+        )
+
+    def stop_openclaw_spa(self, session_id: Optional[str] = None) -> dict:
+        if self._automation is None:
+            raise RuntimeError("automation engine is not registered")
+        return self._automation.stop_openclaw_spa(session_id)
+
+    def get_equipment_status(self) -> dict:
+        if self._equipment is None:
+            return {"available": False, "last_error": "equipment controller is not registered"}
+        context = StatusContext(self)
+        equipment = context.equipment()
+        vsp = context.vsp()
+        automation = context.automation()
+        heater_targets = context.heater_targets()
+        controls_locked, control_lock_reason = _web_control_lock(vsp, self._lcd_arbiter.status())
+        return {
+            "available": True,
+            **equipment,
+            "vsp": vsp,
+            "automation": automation,
+            "heater_targets": heater_targets,
+            "controls_locked": controls_locked,
+            "control_lock_reason": control_lock_reason,
+        }
+
+    def set_equipment_switch(self, control: str, enabled: bool) -> dict:
+        if self._equipment is None:
+            raise RuntimeError("equipment controller is not registered")
+        if self._automation is not None and self._automation.is_enabled():
+            if control == "auto_heat":
+                return self._automation.set_pool_heat(enabled)
+            field = "filter_on" if control == "filter" else control
+            return self._automation.set_manual(**{field: enabled})
+        return self._equipment.set_switch(control, enabled)
+
+    def request_equipment_mode(self, mode: str) -> dict:
+        if self._equipment is None:
+            raise RuntimeError("equipment controller is not registered")
+        if self._automation is not None and self._automation.is_enabled():
+            return self._automation.set_manual(mode=mode)
+        return self._equipment.request_mode(mode)
+
+    def get_vsp_status(self) -> dict:
+        if self._vsp_driver is None:
+            return {"enabled": False, "available": False, "last_error": "VSP driver is not registered"}
+        return {"available": True, **self._vsp_driver.status()}
+
+    def request_vsp_preset(self, preset: str, lease_seconds: Optional[float] = None) -> dict:
+        if self._vsp_driver is None:
+            raise RuntimeError("VSP driver is not registered")
+        if self._automation is not None and self._automation.is_enabled():
+            return self._automation.set_manual(pump_preset=preset)
+        return self._vsp_driver.request_preset(preset, source="manual", lease_seconds=lease_seconds)
+
+    def clear_vsp_target(self) -> dict:
+        if self._vsp_driver is None:
+            raise RuntimeError("VSP driver is not registered")
+        if self._automation is not None and self._automation.is_enabled():
+            return self._automation.clear_manual("pump_preset")
+        return self._vsp_driver.clear_target()
+
+    def handle_automation_mqtt(self, topic: str, payload: str, identifier: str = "aqualogic") -> bool:
+        if self._automation is None or not self._automation.is_enabled():
+            return False
+        command = mqtt_automation_command(topic, payload, identifier)
+        if command is None:
+            return False
+        kind, value = command
+        if kind == "mode":
+            self._automation.set_manual(mode=value)
+        else:
+            control, enabled = value
+            if control == "auto_heat":
+                self._automation.set_pool_heat(enabled)
+                return True
+            field = "filter_on" if control == "filter" else control
+            self._automation.set_manual(**{field: enabled})
+        return True
+
+    # Convenience for when only text is known
+    def ingest_display_lines(self, lines: List[str]) -> None:
+        self.update_display(lines, None, None)
+
+    def set_key_sender(self, sender: Callable[[object], None]) -> None:
+        """Provide the low-level function that actually sends a key to the panel."""
+        self._key_sender = sender
+        logger.debug("controls: key sender registered")
+
+    def enqueue_key(self, name: str) -> bool:
+        """Queue a keypress by name (menu/left/right/minus/plus/filter/pool_spa)."""
+        k = (name or "").strip().lower()
+        holder = self._lcd_arbiter.holder()
+        if holder is not None:
+            logger.info("controls: key '%s' blocked while %s owns the LCD menu", k, holder)
+            return False
+        if k not in _KEY_MAP:
+            logger.debug("controls: unknown key '%s'", name)
+            return False
+        with self._key_lock:
+            self._key_q.append(_KEY_MAP[k])
+        self._default_menu.invalidate_for_key(k)
+        logger.info("controls: queued key %s", k)
+        return True
+
+    def drain_keypresses(self) -> None:
+        """Send all queued keypresses to the panel; call this right after a panel update or from API."""
+        if self._key_sender is None:
+            return
+        sent = 0
+        while True:
+            with self._key_lock:
+                if not self._key_q:
+                    break
+                key = self._key_q.popleft()
+            try:
+                # Learn where manual navigation leads (e.g. LEFT shortcuts).
+                self._menu_graph.note_key(key, self._state.as_dict()["lines"][0])
+                self._key_sender(key)
+                sent += 1
+            except Exception as e:
+                logger.debug("controls: send key failed: %s", e)
                 break
-            key = _key_q.popleft()
+        if sent:
+            logger.debug("controls: sent %d key(s)", sent)
+
+    # ---- Optional: hook into panel display callbacks when available ----
+    def register_with_panel(self, panel: object) -> None:
+        """Attach to panel display updates in whatever form the lib exposes."""
+        def _push(lines):
+            try:
+                cleaned = _clean_lines(lines)
+                self.ingest_display_lines(cleaned)
+                logger.debug("controls: ingested display via callback: %r", cleaned)
+            except Exception as e:
+                logger.debug("controls: display callback failed: %s", e)
+
+        # Try method callback
         try:
-            _key_sender(key)
-            sent += 1
-        except Exception as e:
-            logger.debug(f"controls: send key failed: {e}")
-            break
-    if sent:
-        logger.debug(f"controls: sent {sent} key(s)")
-
-# ---- Optional: hook into panel display callbacks when available ----
-def register_with_panel(panel: object) -> None:
-    """Attach to panel display updates in whatever form the lib exposes."""
-    def _push(lines):
+            m = getattr(panel, "on_display_update", None)
+            if callable(m):
+                logger.debug("controls: using on_display_update(handler)")
+                m(_push)
+                return
+        except Exception:
+            pass
+
+        # Try attribute assignment
         try:
-            ingest_display_lines(_clean_lines(lines))
-            logger.debug(f"controls: ingested display via callback: {_clean_lines(lines)!r}")
-        except Exception as e:
-            logger.debug(f"controls: display callback failed: {e}")
-
-    # Try method callback
-    try:
-        m = getattr(panel, "on_display_update", None)
-        if callable(m):
-            logger.debug("controls: using on_display_update(handler)")
-            m(_push)
-            return
-    except Exception:
-        pass
-
-    # Try attribute assignment
-    try:
-        if hasattr(panel, "on_display_update") and not callable(getattr(panel, "on_display_update")):
-            logger.debug("controls: assigning on_display_update = handler")
-            setattr(panel, "on_display_update", _push)
-            return
-    except Exception:
-        pass
-
-    # Try generic event bus
-    try:
-        add_listener = getattr(panel, "add_listener", None)
-        if callable(add_listener):
-            logger.debug("controls: using add_listener('display', handler)")
-            def _listener(kind, payload):
-                if kind == "display":
-                    _push(payload)
-            add_listener(_listener)
-            return
-    except Exception:
-        pass
-
-    logger.debug("controls: no compatible display callback on panel; relying on PanelManager forwarding")
+            if hasattr(panel, "on_display_update") and not callable(getattr(panel, "on_display_update")):
+                logger.debug("controls: assigning on_display_update = handler")
+                setattr(panel, "on_display_update", _push)
+                return
+        except Exception:
+            pass
+
+        # Try generic event bus
+        try:
+            add_listener = getattr(panel, "add_listener", None)
+            if callable(add_listener):
+                logger.debug("controls: using add_listener('display', handler)")
+                def _listener(kind, payload):
+                    if kind == "display":
+                        _push(payload)
+                add_listener(_listener)
+                return
+        except Exception:
+            pass
+
+        logger.debug("controls: no compatible display callback on panel; relying on PanelManager forwarding")
+
+
+# ---- Default panel (module-level API) ----
+_default = PanelControls()
+
+update_display = _default.update_display
+get_display = _default.get_display
+get_default_menu = _default.get_default_menu
+get_menu_graph = _default.get_menu_graph
+get_menu_graph_status = _default.get_menu_graph_status
+get_lcd_arbiter = _default.get_lcd_arbiter
+get_settings_harvest = _default.get_settings_harvest
+get_settings_values = _default.get_settings_values
+get_lcd_status = _default.get_lcd_status
+set_vsp_driver = _default.set_vsp_driver
+set_equipment_controller = _default.set_equipment_controller
+set_automation_engine = _default.set_automation_engine
+set_heater_target_driver = _default.set_heater_target_driver
+set_clock_sync_driver = _default.set_clock_sync_driver
+set_key_timing = _default.set_key_timing
+get_key_timing_status = _default.get_key_timing_status
+set_spa_heating_model = _default.set_spa_heating_model
+estimate_spa_heating = _default.estimate_spa_heating
+set_connection_status_reader = _default.set_connection_status_reader
+get_connection_status = _default.get_connection_status
+get_heater_target_status = _default.get_heater_target_status
+refresh_heater_targets = _default.refresh_heater_targets
+scan_heater_target = _default.scan_heater_target
+set_heater_target = _default.set_heater_target
+get_automation_status = _default.get_automation_status
+set_manual_override = _default.set_manual_override
+set_pool_heat = _default.set_pool_heat
+clear_manual_override = _default.clear_manual_override
+activate_openclaw_spa = _default.activate_openclaw_spa
+stop_openclaw_spa = _default.stop_openclaw_spa
+get_equipment_status = _default.get_equipment_status
+set_equipment_switch = _default.set_equipment_switch
+request_equipment_mode = _default.request_equipment_mode
+get_vsp_status = _default.get_vsp_status
+request_vsp_preset = _default.request_vsp_preset
+clear_vsp_target = _default.clear_vsp_target
+handle_automation_mqtt = _default.handle_automation_mqtt
+ingest_display_lines = _default.ingest_display_lines
+set_key_sender = _default.set_key_sender
+enqueue_key = _default.enqueue_key
+drain_keypresses = _default.drain_keypresses
+register_with_panel = _default.register_with_panel
+
+# ---- Multi-panel registry ----
+_panels: dict[str, PanelControls] = {}
+
+def register_panel(panel_id: str) -> PanelControls:
+    """Create the controls for ``panel_id``.
+
+    The first panel registered is the module default, so the unprefixed
+    ``/api`` routes and existing callers keep addressing it.
+    """
+    if panel_id in _panels:
+        raise ValueError(f"panel {panel_id!r} is already registered")
+    panel = _default if not _panels else PanelControls()
+    panel.panel_id = panel_id
+    _panels[panel_id] = panel
+    return panel
+
+def get_panel(panel_id: str) -> Optional[PanelControls]:
+    return _panels.get(panel_id)
+
+def panel_ids() -> List[str]:
+    return list(_panels)
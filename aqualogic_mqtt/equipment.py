@@ -11,6 +11,7 @@ from typing import Callable, Optional
 from aqualogic.keys import Keys
 from aqualogic.states import States
 
+from .lcd_arbiter import USER, LcdArbiter
 
 logger = logging.getLogger("aqualogic_mqtt.equipment")
 
@@ -48,6 +49,8 @@ class EquipmentController:
         valve_settle_seconds: float = 35.0,
         switch_confirmation_seconds: float = 20.0,
         menu_cache_reader: Optional[Callable[[], dict]] = None,
+        arbiter: Optional[LcdArbiter] = None,
+        lcd_timeout_seconds: float = 30.0,
     ):
         self._panel = panel
         self._clock = clock
@@ -59,6 +62,8 @@ class EquipmentController:
         self._valve_settle_seconds = float(valve_settle_seconds)
         self._switch_confirmation_seconds = float(switch_confirmation_seconds)
         self._menu_cache_reader = menu_cache_reader or (lambda: {})
+        self._arbiter = arbiter
+        self._lcd_timeout_seconds = float(lcd_timeout_seconds)
         self._lock = Lock()
         self._worker: Optional[Thread] = None
         self._operation_id: Optional[str] = None
@@ -69,6 +74,15 @@ class EquipmentController:
         self._pending_switch: Optional[dict] = None
         self._switch_retry_block: Optional[dict] = None
 
+    @property
+    def switch_confirmation_seconds(self) -> float:
+        return self._switch_confirmation_seconds
+
+    @property
+    def mode_confirmation_seconds(self) -> float:
+        """Worst case for one mode step to be reported: selection plus valve settling."""
+        return self._mode_timeout_seconds + self._valve_settle_seconds
+
     def _read_state(self, state: States) -> tuple[bool, bool]:
         try:
             value = bool(self._panel.get_state(state))
@@ -81,6 +95,14 @@ class EquipmentController:
     def _state(self, state: States) -> bool:
         return self._read_state(state)[0]
 
+    def _press(self, action: Callable[[], object], timeout: Optional[float] = None) -> object:
+        """Send a relay key once no menu driver is between keypresses."""
+        if self._arbiter is None:
+            return action()
+        timeout = self._lcd_timeout_seconds if timeout is None else float(timeout)
+        with self._arbiter.acquire("equipment", USER, timeout=timeout):
+            return action()
+
     def _auto_heat_observation(self) -> tuple[bool, bool, Optional[float]]:
         """Return Auto Heat only when PL-PLUS has reported the Heater1 page.
 
@@ -195,7 +217,12 @@ class EquipmentController:
                 "last_error": self._last_error,
             }
 
-    def set_switch(self, control: str, enabled: bool) -> dict:
+    def set_switch(self, control: str, enabled: bool, *, lcd_timeout_seconds: Optional[float] = None) -> dict:
+        """Toggle ``control`` towards ``enabled`` and await its confirmation.
+
+        The keypress waits up to ``lcd_timeout_seconds`` (default: the
+        controller's) for menu work to finish; 0 fails at once.
+        """
         name = str(control or "").strip().lower()
         if name not in SWITCH_STATES:
             raise ValueError(f"unsupported equipment control: {control}")
@@ -225,10 +252,13 @@ class EquipmentController:
         auto_heat_observed_at = None
         if name == "auto_heat":
             _value, _confirmed, auto_heat_observed_at = self._auto_heat_observation()
-        try:
-            accepted = self._panel.set_state(SWITCH_STATES[name], enabled)
-        except Exception as exc:
-            raise EquipmentError(f"PL-PLUS failed to set {name}={enabled}: {exc}") from exc
+        def send() -> object:
+            try:
+                return self._panel.set_state(SWITCH_STATES[name], enabled)
+            except Exception as exc:
+                raise EquipmentError(f"PL-PLUS failed to set {name}={enabled}: {exc}") from exc
+
+        accepted = self._press(send, lcd_timeout_seconds)
         if accepted is False:
             raise EquipmentError(f"PL-PLUS rejected {name}={enabled}")
         with self._lock:
@@ -317,7 +347,7 @@ class EquipmentController:
             if target == "spillover" and current != target:
                 presses = 2 if current == "pool" else 1
                 for index in range(presses):
-                    self._panel.send_key(Keys.POOL_SPA)
+                    self._press(lambda: self._panel.send_key(Keys.POOL_SPA))
                     if index + 1 < presses:
                         self._sleep(self._mode_selection_interval_seconds)
                 self._wait_mode(
@@ -335,7 +365,7 @@ class EquipmentController:
             steps = (target_index - current_index) % len(MODE_ORDER)
             for offset in range(1, steps + 1):
                 expected = MODE_ORDER[(current_index + offset) % len(MODE_ORDER)]
-                self._panel.send_key(Keys.POOL_SPA)
+                self._press(lambda: self._panel.send_key(Keys.POOL_SPA))
                 self._wait_mode(expected)
                 self._settle_valves()
             with self._lock:
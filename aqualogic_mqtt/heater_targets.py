@@ -14,6 +14,12 @@ from typing import Callable, Optional
 from aqualogic.keys import Keys
 from aqualogic.states import States
 
+from .key_burst import DEFAULT_BURST_INTERVAL_SECONDS, send_burst, wait_settled
+from .key_timing import FixedKeyTiming, KeyTimingProfile
+from .lcd_arbiter import USER, LcdArbiter, LcdLease
+from .menu_graph import MenuGraph
+from .settings_harvest import SettingsHarvester
+
 
 MIN_TARGET_F = 65
 MAX_TARGET_F = 104
@@ -80,6 +86,13 @@ class HeaterTargetDriver:
         poll_interval_seconds: float = 0.1,
         key_timeout_seconds: float = 6.0,
         key_settle_seconds: float = 0.75,
+        menu_graph: Optional[MenuGraph] = None,
+        burst_keys: bool = True,
+        burst_interval_seconds: float = DEFAULT_BURST_INTERVAL_SECONDS,
+        arbiter: Optional[LcdArbiter] = None,
+        harvester: Optional[SettingsHarvester] = None,
+        harvest_max_age_seconds: float = 300.0,
+        key_timing: Optional[KeyTimingProfile] = None,
     ):
         self._panel = panel
         self._key_sender = key_sender or getattr(panel, "send_key")
@@ -91,10 +104,19 @@ class HeaterTargetDriver:
         self._poll_interval_seconds = float(poll_interval_seconds)
         self._key_timeout_seconds = float(key_timeout_seconds)
         self._key_settle_seconds = float(key_settle_seconds)
+        self._menu_graph = menu_graph or MenuGraph()
+        self._burst_keys = bool(burst_keys)
+        self._burst_interval_seconds = float(burst_interval_seconds)
+        self._arbiter = arbiter or LcdArbiter()
+        self._harvest = harvester or SettingsHarvester(clock=clock)
+        self._harvest.register(("spa_heater", "pool_heater"), lambda line: parse_heater_target(line)[1])
+        self._harvest_max_age_seconds = float(harvest_max_age_seconds)
+        self._key_timing = key_timing or FixedKeyTiming()
         self._lock = Lock()
         self._worker: Optional[Thread] = None
         self._operation_id: Optional[str] = None
         self._phase = "idle"
+        self._merged = False
         self._target_body: Optional[str] = None
         self._target_f: Optional[int] = None
         self._targets: dict[str, Optional[int]] = {"pool": None, "spa": None}
@@ -167,16 +189,16 @@ class HeaterTargetDriver:
         except Exception as exc:
             raise HeaterTargetError(f"could not confirm PL-PLUS Service mode: {exc}") from exc
 
-    def request_refresh(self) -> dict:
-        return self._start(None, None)
+    def request_refresh(self, *, priority: str = USER) -> dict:
+        return self._start(None, None, priority)
 
-    def request_scan(self, body: str) -> dict:
+    def request_scan(self, body: str, *, priority: str = USER) -> dict:
         name = str(body or "").strip().lower()
         if name not in ("pool", "spa"):
             raise ValueError("heater body must be pool or spa")
-        return self._start(name, None)
+        return self._start(name, None, priority)
 
-    def request_set(self, body: str, target_f: int) -> dict:
+    def request_set(self, body: str, target_f: int, *, priority: str = USER) -> dict:
         name = str(body or "").strip().lower()
         if name not in ("pool", "spa"):
             raise ValueError("heater body must be pool or spa")
@@ -184,21 +206,22 @@ class HeaterTargetDriver:
             raise ValueError("heater target must be an integer Fahrenheit value")
         if target_f < MIN_TARGET_F or target_f > MAX_TARGET_F:
             raise ValueError(f"heater target must be between {MIN_TARGET_F}F and {MAX_TARGET_F}F")
-        return self._start(name, target_f)
+        return self._start(name, target_f, priority)
 
-    def _start(self, body: Optional[str], target_f: Optional[int]) -> dict:
+    def _start(self, body: Optional[str], target_f: Optional[int], priority: str = USER) -> dict:
         self._assert_available()
         with self._lock:
             if self._worker is not None and self._worker.is_alive():
                 raise HeaterTargetBusyError("a heater target menu operation is already active")
             self._operation_id = uuid.uuid4().hex
             self._phase = "queued"
+            self._merged = False
             self._target_body = body
             self._target_f = target_f
             self._last_error = None
             worker = Thread(
                 target=self._run,
-                args=(body, target_f),
+                args=(body, target_f, priority),
                 daemon=True,
                 name=f"plplus-heater-target-{self._operation_id[:8]}",
             )
@@ -213,8 +236,8 @@ class HeaterTargetDriver:
             return str(lines[0]) if lines else ""
         return str(value or "")
 
-    def _wait_for(self, predicate: Callable[[str], bool]) -> str:
-        deadline = self._clock() + self._key_timeout_seconds
+    def _wait_for(self, predicate: Callable[[str], bool], timeout: Optional[float] = None) -> str:
+        deadline = self._clock() + (self._key_timeout_seconds if timeout is None else timeout)
         last = self._line()
         while self._clock() < deadline:
             self._assert_available()
@@ -224,7 +247,7 @@ class HeaterTargetDriver:
                     return last
             except (ValueError, IndexError):
                 pass
-            self._sleep(self._poll_interval_seconds)
+            self._sleep(self._key_timing.poll_seconds(self._poll_interval_seconds))
         raise HeaterTargetError(f"timed out waiting for PL-PLUS display (last={last!r})")
 
     def _press(
@@ -234,32 +257,32 @@ class HeaterTargetDriver:
         *,
         safe_page: Optional[str] = None,
     ) -> str:
-        if safe_page is not None and _page(self._line()) != safe_page:
+        page = _page(self._line())
+        if safe_page is not None and page != safe_page:
             raise HeaterTargetError(
                 f"refusing {getattr(key, 'name', key)} on unexpected page {self._line()!r}"
             )
+        timeout = self._key_timing.timeout_seconds(key, page, self._key_timeout_seconds)
+        started = self._clock()
         self._key_sender(key)
-        result = self._wait_for(predicate)
-        self._sleep(self._key_settle_seconds)
+        try:
+            result = self._wait_for(predicate, timeout)
+        except HeaterTargetError:
+            if self._clock() - started >= timeout:
+                self._key_timing.miss(key, page)
+            raise
+        self._key_timing.observe(key, page, self._clock() - started)
+        self._sleep(self._key_timing.settle_seconds(key, page, self._key_settle_seconds))
         return result
 
     def _navigate_spa(self) -> None:
-        for _ in range(7):
-            if _page(self._line()) == "settings":
-                break
-            previous = _normalize(self._line()).lower()
-            self._press(
-                Keys.MENU,
-                lambda line, old=previous: _normalize(line).lower() != old,
-            )
-        else:
-            raise HeaterTargetError("could not reach Settings Menu")
-        for _ in range(5):
-            if _page(self._line()) == "spa_heater":
-                return
-            previous = _page(self._line())
-            self._press(Keys.RIGHT, lambda line, old=previous: _page(line) != old)
-        raise HeaterTargetError("could not reach Spa Heater1 setting")
+        if not self._menu_graph.navigate(
+            "spa_heater",
+            self._line,
+            lambda key, predicate, _page: self._press(key, predicate),
+            on_page=self._arbiter.visit,
+        ):
+            raise HeaterTargetError("could not reach Spa Heater1 setting")
 
     def _read_target(self, body: str) -> Optional[int]:
         line = self._wait_for(lambda value: parse_heater_target(value)[0] == body)
@@ -309,6 +332,9 @@ class HeaterTargetDriver:
         if current is None:
             raise HeaterTargetError(f"could not move {body} heater target out of Off")
         key = Keys.PLUS if target > current else Keys.MINUS
+        if self._burst_keys and abs(target - current) > 1:
+            current = self._burst_target(body, key, abs(target - current))
+            key = Keys.PLUS if target > current else Keys.MINUS
         while current != target:
             expected = current + (1 if key == Keys.PLUS else -1)
             self._press(
@@ -319,19 +345,113 @@ class HeaterTargetDriver:
             current = expected
         return current
 
-    def _return_default(self) -> None:
-        for _ in range(8):
+    def _burst_target(self, body: str, key: object, count: int) -> int:
+        """Send ``count`` presses at once; return the target the page settles on."""
+        page = f"{body}_heater"
+
+        def guard() -> None:
             self._assert_available()
-            if _page(self._line()) == "default":
-                return
-            previous = _normalize(self._line()).lower()
-            self._key_sender(Keys.MENU)
+            if _page(self._line()) != page:
+                raise HeaterTargetError(f"refusing burst edit on unexpected page {self._line()!r}")
+
+        def read() -> Optional[int]:
+            guard()
             try:
-                self._wait_for(lambda line, old=previous: _normalize(line).lower() != old)
-            except HeaterTargetError:
-                pass
+                parsed_body, value = parse_heater_target(self._line())
+            except ValueError:
+                return None
+            return value if parsed_body == body else None
+
+        send_burst(
+            self._key_sender,
+            key,
+            count,
+            sleep=self._sleep,
+            interval_seconds=self._burst_interval_seconds,
+            before_press=guard,
+        )
+        value = wait_settled(
+            read,
+            clock=self._clock,
+            sleep=self._sleep,
+            poll_seconds=self._poll_interval_seconds,
+            settle_seconds=self._key_settle_seconds,
+            timeout_seconds=self._key_timeout_seconds,
+        )
+        if value is None:
+            raise HeaterTargetError(f"{body} heater target did not settle after burst entry")
+        self._sleep(self._key_settle_seconds)
+        return value
 
-    def _run(self, body: Optional[str], target_f: Optional[int]) -> None:
+    def _return_default(self) -> None:
+        self._assert_available()
+        self._menu_graph.navigate("default_menu", self._line, self._cleanup_press, on_page=self._arbiter.visit)
+
+    def _cleanup_press(self, key: object, predicate: Callable[[str], bool], _page: str) -> str:
+        self._assert_available()
+        self._key_sender(key)
+        try:
+            return self._wait_for(predicate)
+        except HeaterTargetError:
+            return self._line()
+
+    def _ride_along(self, body: str, read: set) -> Callable[[str], bool]:
+        def action(line: str) -> bool:
+            try:
+                parsed_body, target = parse_heater_target(line)
+            except ValueError:
+                return False
+            if parsed_body != body:
+                return False
+            self._record_target(body, target, force=True)
+            read.add(body)
+            return True
+
+        return action
+
+    def _run(self, body: Optional[str], target_f: Optional[int], priority: str = USER) -> None:
+        # Reads can be answered by another driver walking past the Heater1
+        # pages while this one waits for the menu; pool is reached via spa.
+        needed = {"spa"} if body == "spa" else {"spa", "pool"}
+        read: set = set()
+        if target_f is None:
+            for name in sorted(needed):
+                harvested = self._harvest.get(f"{name}_heater", self._harvest_max_age_seconds)
+                if harvested is not None:
+                    self._record_target(name, harvested["value"], force=True)
+                    read.add(name)
+            if needed <= read:
+                with self._lock:
+                    self._merged = True
+                    self._phase = "complete"
+                    self._last_error = None
+                    self._target_body = None
+                    self._target_f = None
+                return
+            for name in needed - read:
+                self._arbiter.add_rider("heater_targets", f"{name}_heater", self._ride_along(name, read))
+        try:
+            with self._arbiter.acquire("heater_targets", priority, page="spa_heater") as lease:
+                self._arbiter.cancel_riders("heater_targets")
+                if target_f is None and needed <= read:
+                    lease.end_trip(self._return_default)
+                    with self._lock:
+                        self._merged = True
+                        self._phase = "complete"
+                        self._last_error = None
+                    return
+                self._run_menu(body, target_f, lease)
+        except Exception as exc:
+            with self._lock:
+                self._phase = "failed"
+                self._last_error = str(exc)
+        finally:
+            self._arbiter.cancel_riders("heater_targets")
+            with self._lock:
+                self._target_body = None
+                self._target_f = None
+
+    def _run_menu(self, body: Optional[str], target_f: Optional[int], lease: LcdLease) -> None:
         try:
             with self._lock:
                 self._phase = "reading"
@@ -346,7 +466,7 @@ class HeaterTargetDriver:
             if body == "spa":
                 with self._lock:
                     self._phase = "returning_to_default"
-                self._return_default()
+                lease.end_trip(self._return_default)
                 with self._lock:
                     self._phase = "complete"
                     self._last_error = None
@@ -366,7 +486,7 @@ class HeaterTargetDriver:
 
             with self._lock:
                 self._phase = "returning_to_default"
-            self._return_default()
+            lease.end_trip(self._return_default)
             with self._lock:
                 self._phase = "complete"
                 self._last_error = None
@@ -374,14 +494,10 @@ class HeaterTargetDriver:
             with self._lock:
                 self._phase = "failed"
                 self._last_error = str(exc)
-        finally:
             try:
                 self._return_default()
             except Exception:
                 pass
-            with self._lock:
-                self._target_body = None
-                self._target_f = None
 
     def status(self) -> dict:
         with self._lock:
@@ -390,6 +506,7 @@ class HeaterTargetDriver:
                 "busy": self._worker is not None and self._worker.is_alive(),
                 "operation_id": self._operation_id,
                 "phase": self._phase,
+                "merged": self._merged,
                 "target_body": self._target_body,
                 "target_f": self._target_f,
                 "targets": dict(self._targets),
@@ -0,0 +1,151 @@
+"""In-memory views of the on-disk interlock and rollback files.
+
+The enable files and the VSP rollback journal stay the source of truth, so an
+operator can still ``touch``/``rm`` them or inspect the journal by hand. Status
+and interlock checks are made many times a second by the web UI and the
+reconcile loop, though, so they read a cached copy. The file is re-``stat``-ed
+at most once per ``ttl_seconds`` (or on ``refresh=True``), and the journal is
+parsed again only when its mtime, size or inode changes. Writes made through
+``RollbackJournal`` update the cache immediately.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from threading import Lock
+import time
+from typing import Callable, Optional
+
+
+DEFAULT_TTL_SECONDS = 1.0
+
+
+def _signature(path: str) -> Optional[tuple]:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+
+class InterlockFile:
+    """Cached presence of a local interlock file."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = str(path) if path else None
+        self._ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._present = False
+        self._checked_at: Optional[float] = None
+
+    def present(self, *, refresh: bool = False) -> bool:
+        if self.path is None:
+            return False
+        now = self._clock()
+        with self._lock:
+            if (
+                refresh
+                or self._checked_at is None
+                or now - self._checked_at >= self._ttl_seconds
+            ):
+                self._present = os.path.isfile(self.path)
+                self._checked_at = now
+            return self._present
+
+
+class RollbackJournal:
+    """Cached, write-through JSON journal file."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = str(path) if path else None
+        self._ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._signature: Optional[tuple] = None
+        self._payload: Optional[dict] = None
+        self._error: Optional[Exception] = None
+        self._checked_at: Optional[float] = None
+
+    def _refresh_locked(self, force: bool) -> None:
+        now = self._clock()
+        if not force and self._checked_at is not None and now - self._checked_at < self._ttl_seconds:
+            return
+        self._checked_at = now
+        signature = _signature(self.path)
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self._payload = None
+        self._error = None
+        if signature is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            if not isinstance(payload, dict):
+                raise ValueError("journal must contain a JSON object")
+            self._payload = payload
+        except (OSError, ValueError) as exc:
+            self._error = exc
+
+    def pending(self, *, refresh: bool = False) -> bool:
+        if self.path is None:
+            return False
+        with self._lock:
+            self._refresh_locked(refresh)
+            return self._signature is not None
+
+    def read(self) -> dict:
+        """Return the journal payload; raise if it is missing or unreadable."""
+        if self.path is None:
+            raise FileNotFoundError("journal is not configured")
+        with self._lock:
+            self._refresh_locked(False)
+            if self._signature is None:
+                raise FileNotFoundError(self.path)
+            if self._error is not None:
+                raise self._error
+            return dict(self._payload)
+
+    def write(self, payload: dict) -> None:
+        if self.path is None:
+            return
+        temp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, sort_keys=True)
+                handle.write("\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_path, self.path)
+            self._signature = _signature(self.path)
+            self._payload = dict(payload)
+            self._error = None
+            self._checked_at = self._clock()
+
+    def clear(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self._signature = None
+            self._payload = None
+            self._error = None
+            self._checked_at = self._clock()
@@ -0,0 +1,186 @@
+"""Burst entry of numeric PL-PLUS settings.
+
+Stepwise editing presses PLUS/MINUS once, waits for the LCD to show the next
+value and settles before the next press: a 29-minute clock correction takes
+over 20 seconds. A burst queues all N presses paced to the key bus and checks
+only the value the display settles on. If presses were dropped or repeated
+(undershoot or overshoot), the caller finishes stepwise from that value.
+
+``python -m aqualogic_mqtt.key_burst`` times both strategies for the clock
+driver against ``SimulatedPanel`` on a virtual clock.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+# One key frame goes out per keep-alive; leave the panel room to register it.
+DEFAULT_BURST_INTERVAL_SECONDS = 0.25
+
+
+def send_burst(
+    send_key: Callable[[object], None],
+    key: object,
+    count: int,
+    *,
+    sleep: Callable[[float], None],
+    interval_seconds: float = DEFAULT_BURST_INTERVAL_SECONDS,
+    before_press: Optional[Callable[[], None]] = None,
+) -> None:
+    """Send ``key`` ``count`` times, ``interval_seconds`` apart."""
+    for index in range(count):
+        if before_press is not None:
+            before_press()
+        send_key(key)
+        if index + 1 < count:
+            sleep(interval_seconds)
+
+
+def wait_settled(
+    read_value: Callable[[], Optional[int]],
+    *,
+    clock: Callable[[], float],
+    sleep: Callable[[float], None],
+    poll_seconds: float,
+    settle_seconds: float,
+    timeout_seconds: float,
+) -> Optional[int]:
+    """Return the value once it has stopped changing for ``settle_seconds``.
+
+    Seeing ``target`` is not enough: a doubled press can pass through it with
+    presses still queued on the bus. ``read_value`` returns None while the
+    field is blinked off. Returns the last value read (possibly None) when
+    nothing settles before the timeout.
+    """
+    deadline = clock() + timeout_seconds
+    last: Optional[int] = None
+    since = clock()
+    while True:
+        value = read_value()
+        now = clock()
+        if value is not None:
+            if value != last:
+                last, since = value, now
+            elif now - since >= settle_seconds:
+                return value
+        if now >= deadline:
+            return last
+        sleep(poll_seconds)
+
+
+class SimulatedPanel:
+    """One numeric PL-PLUS setting behind the key bus, on a virtual clock.
+
+    Queued keys are applied one per ``frame_seconds`` (the keep-alive that
+    lets a key frame out) and reach the LCD ``display_latency_seconds`` later.
+    ``repeat_every`` makes every Nth press register twice, to model overshoot.
+    """
+
+    def __init__(
+        self,
+        value: int,
+        render: Callable[[int], str],
+        *,
+        step: int = 1,
+        modulus: Optional[int] = None,
+        frame_seconds: float = 0.1,
+        display_latency_seconds: float = 0.2,
+        repeat_every: int = 0,
+    ):
+        self.now = 0.0
+        self.presses = 0
+        self._render = render
+        self._step = step
+        self._modulus = modulus
+        self._frame_seconds = frame_seconds
+        self._latency = display_latency_seconds
+        self._repeat_every = repeat_every
+        self._value = value
+        self._shown = [(0.0, value)]
+        self._queue: deque = deque()
+        self._next_frame = frame_seconds
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        end = self.now + max(0.0, seconds)
+        while self._next_frame <= end:
+            self.now = self._next_frame
+            self._next_frame += self._frame_seconds
+            if self._queue:
+                self._apply(self._queue.popleft())
+        self.now = end
+
+    def send_key(self, key: object) -> None:
+        self._queue.append(key)
+
+    def _apply(self, key: object) -> None:
+        self.presses += 1
+        times = 2 if self._repeat_every and self.presses % self._repeat_every == 0 else 1
+        delta = self._step * times * (1 if getattr(key, "name", key) == "PLUS" else -1)
+        self._value += delta
+        if self._modulus:
+            self._value %= self._modulus
+        self._shown.append((self.now + self._latency, self._value))
+
+    def value(self) -> int:
+        return self._value
+
+    def display(self) -> dict:
+        shown = [value for at, value in self._shown if at <= self.now][-1]
+        return {"lines": [self._render(shown), "", "", ""]}
+
+
+def _clock_line(minute: int) -> str:
+    return f"Set Day and Time Saturday 10:{minute:02d}A"
+
+
+def benchmark(
+    start: int = 14,
+    target: int = 43,
+    repeat_every: int = 0,
+    modes: tuple = ("stepwise", "burst"),
+) -> dict:
+    """Virtual seconds and key presses to move the clock's minute field."""
+    from .clock_sync import ClockSyncDriver, display_hour_minute
+
+    def minute(line: str) -> int:
+        return display_hour_minute(line)[1]
+
+    results = {}
+    for name in modes:
+        panel = SimulatedPanel(start, _clock_line, modulus=60, repeat_every=repeat_every)
+        driver = ClockSyncDriver(
+            key_sender=panel.send_key,
+            display_reader=panel.display,
+            menu_cache_reader=lambda: {},
+            state_file=None,
+            now=lambda: datetime(2026, 6, 27, 14, 43, tzinfo=timezone.utc),
+            monotonic=panel.clock,
+            sleep=panel.sleep,
+            burst_keys=name == "burst",
+        )
+        driver._adjust(start, target, 60, minute)
+        results[name] = {
+            "seconds": round(panel.now, 2),
+            "presses": panel.presses,
+            "final": panel.value(),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # Stepwise entry waits for every intermediate value, so it cannot
+    # absorb a doubled press; only the burst is timed for overshoot.
+    for label, repeat, modes in (
+        ("exact", 0, ("stepwise", "burst")),
+        ("every 13th press doubled", 13, ("burst",)),
+    ):
+        for name, result in benchmark(repeat_every=repeat, modes=modes).items():
+            print(
+                f"{label:25} {name:8} {result['seconds']:6.2f} s  "
+                f"{result['presses']:3d} presses  final {result['final']}"
+            )
@@ -0,0 +1,204 @@
+"""Key timing learned from how fast this PL-PLUS panel answers keypresses.
+
+The menu drivers wait a fixed ``key_settle_seconds`` (0.75 s) after every
+press and give up after ``key_timeout_seconds`` (6 s), polling the display
+every 0.1 s. Those are guesses that suit a slow panel. A ``KeyTimingProfile``
+records the measured key->display-change latency for each key on each page
+and derives the waits from its percentiles:
+
+- settle: the 90th percentile latency, at least ``settle_floor_seconds``;
+- timeout: four times the 99th percentile, at least ``timeout_floor_seconds``;
+- poll: a quarter of the 10th percentile, at least ``poll_floor_seconds``.
+
+Learned values only ever shorten the configured ones, and a key/page falls
+back to its page-independent samples, then to the configured values, until
+``min_samples`` presses have been measured. A press that times out puts its
+key/page back on the configured timeout. The profile is saved to
+``state_file`` so a restart does not relearn it.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import json
+import logging
+import os
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+logger = logging.getLogger("aqualogic_mqtt.key_timing")
+
+
+def _key_name(key: object) -> str:
+    return str(getattr(key, "name", key))
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class KeyTimingProfile:
+    """Per key and page latency samples for one panel."""
+
+    def __init__(
+        self,
+        *,
+        state_file: Optional[str] = ".key-timing.json",
+        min_samples: int = 20,
+        window: int = 200,
+        settle_floor_seconds: float = 0.3,
+        timeout_floor_seconds: float = 2.0,
+        poll_floor_seconds: float = 0.02,
+        save_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._state_file = str(state_file) if state_file else None
+        self._min_samples = int(min_samples)
+        self._window = int(window)
+        self._settle_floor = float(settle_floor_seconds)
+        self._timeout_floor = float(timeout_floor_seconds)
+        self._poll_floor = float(poll_floor_seconds)
+        self._save_interval = float(save_interval_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._samples: dict[str, deque] = {}
+        self._misses: dict[str, int] = {}
+        self._dirty = False
+        self._poll_cache: Optional[float] = None
+        self._saved_at = clock()
+        self._last_error: Optional[str] = None
+        self._load()
+
+    @staticmethod
+    def _bucket(key: object, page: str) -> str:
+        return f"{_key_name(key)}@{page}"
+
+    def _load(self) -> None:
+        if not self._state_file or not os.path.isfile(self._state_file):
+            return
+        try:
+            with open(self._state_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            for bucket, values in (payload.get("samples") or {}).items():
+                self._samples[bucket] = deque((float(v) for v in values), maxlen=self._window)
+            self._misses = {bucket: int(count) for bucket, count in (payload.get("misses") or {}).items()}
+        except Exception as exc:
+            self._last_error = f"key timing profile load failed: {exc}"
+
+    def _save_locked(self) -> None:
+        self._dirty = False
+        self._saved_at = self._clock()
+        if not self._state_file:
+            return
+        payload = {
+            "version": 1,
+            "samples": {bucket: [round(v, 4) for v in values] for bucket, values in sorted(self._samples.items())},
+            "misses": dict(sorted(self._misses.items())),
+        }
+        try:
+            parent = os.path.dirname(os.path.abspath(self._state_file))
+            os.makedirs(parent, exist_ok=True)
+            temp_path = f"{self._state_file}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2, sort_keys=True)
+                handle.write("\n")
+            os.replace(temp_path, self._state_file)
+        except Exception as exc:
+            self._last_error = f"key timing profile save failed: {exc}"
+            logger.warning("%s", self._last_error)
+
+    def observe(self, key: object, page: str, latency_seconds: float) -> None:
+        """Record how long ``key`` pressed on ``page`` took to change the display."""
+        bucket = self._bucket(key, page)
+        with self._lock:
+            self._samples.setdefault(bucket, deque(maxlen=self._window)).append(max(0.0, float(latency_seconds)))
+            self._dirty = True
+            self._poll_cache = None
+            if self._clock() - self._saved_at >= self._save_interval:
+                self._save_locked()
+
+    def miss(self, key: object, page: str) -> None:
+        """Record a press on ``page`` that did not change the display in time."""
+        bucket = self._bucket(key, page)
+        with self._lock:
+            self._misses[bucket] = self._misses.get(bucket, 0) + 1
+            self._save_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+    def _samples_for_locked(self, key: object, page: str) -> list:
+        samples = list(self._samples.get(self._bucket(key, page), ()))
+        if len(samples) >= self._min_samples:
+            return samples
+        prefix = f"{_key_name(key)}@"
+        pooled = [v for bucket, values in self._samples.items() if bucket.startswith(prefix) for v in values]
+        return pooled if len(pooled) >= self._min_samples else []
+
+    def settle_seconds(self, key: object, page: str, default: float) -> float:
+        with self._lock:
+            samples = self._samples_for_locked(key, page)
+        if not samples:
+            return default
+        return min(default, max(self._settle_floor, _percentile(samples, 0.9)))
+
+    def timeout_seconds(self, key: object, page: str, default: float) -> float:
+        with self._lock:
+            if self._misses.get(self._bucket(key, page)):
+                return default
+            samples = self._samples_for_locked(key, page)
+        if not samples:
+            return default
+        return min(default, max(self._timeout_floor, 4 * _percentile(samples, 0.99)))
+
+    def poll_seconds(self, default: float) -> float:
+        with self._lock:
+            if self._poll_cache is None:
+                # Polled in tight loops; recomputed only after new samples.
+                samples = [v for values in self._samples.values() for v in values]
+                learned = _percentile(samples, 0.1) / 4 if len(samples) >= self._min_samples else float("inf")
+                self._poll_cache = max(self._poll_floor, learned)
+            return min(default, self._poll_cache)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            buckets = {}
+            for bucket, values in sorted(self._samples.items()):
+                samples = list(values)
+                buckets[bucket] = {
+                    "samples": len(samples),
+                    "p50_sec": round(_percentile(samples, 0.5), 3),
+                    "p90_sec": round(_percentile(samples, 0.9), 3),
+                    "p99_sec": round(_percentile(samples, 0.99), 3),
+                    "misses": self._misses.get(bucket, 0),
+                }
+            return {
+                "state_file": self._state_file,
+                "min_samples": self._min_samples,
+                "buckets": buckets,
+                "last_error": self._last_error,
+            }
+
+
+class FixedKeyTiming:
+    """The configured waits, unchanged; what drivers use without a profile."""
+
+    def observe(self, key: object, page: str, latency_seconds: float) -> None:
+        pass
+
+    def miss(self, key: object, page: str) -> None:
+        pass
+
+    def settle_seconds(self, key: object, page: str, default: float) -> float:
+        return default
+
+    def timeout_seconds(self, key: object, page: str, default: float) -> float:
+        return default
+
+    def poll_seconds(self, default: float) -> float:
+        return default
@@ -0,0 +1,303 @@
+"""Ownership of the PL-PLUS LCD menu across the drivers that navigate it.
+
+Only one operation can drive the menu at a time. The VSP, heater-target and
+clock drivers take a lease from the panel's ``LcdArbiter`` for the span in
+which they press keys, and block until it is granted instead of refusing the
+request. Waiters are served by priority (safety rollback, then automation,
+user and maintenance) and first-come first-served within a priority. When a
+higher-priority request starts waiting, the holder's lease is marked for
+preemption. Only the maintenance clock sync checks it, before it starts
+editing; VSP and heater-target edits are short and always run to the end.
+
+Read-only work can ride along on another driver's trip: a rider names the page
+it needs and an action that reads it. Holders report every page they pass
+through ``visit``, so a heater-target scan queued behind a VSP edit is
+satisfied by the VSP driver walking past the heater pages, and the scan's
+own trip is skipped.
+
+Settings operations that are pending together share one trip. A waiter names
+the page its work starts on, and when the holder finishes while such a waiter
+is queued it hands the lease over from where it stands instead of returning
+to the Default Menu (``LcdLease.end_trip``). Waiters of equal priority are
+then served nearest page first along the shared ``MenuGraph``, which from the
+Default Menu is Settings-menu order: heater targets, VSP presets, clock. Only
+the last operation of the trip walks back to the Default Menu.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from threading import Condition, Event
+import time
+from typing import Callable, Optional
+
+from .menu_graph import MenuGraph
+
+logger = logging.getLogger("aqualogic_mqtt.lcd_arbiter")
+
+SAFETY = "safety"
+AUTOMATION = "automation"
+USER = "user"
+MAINTENANCE = "maintenance"
+PRIORITY_RANK = {SAFETY: 0, AUTOMATION: 1, USER: 2, MAINTENANCE: 3}
+
+
+class LcdBusyError(RuntimeError):
+    """Raised when the LCD menu was not granted in time (or the wait was cancelled)."""
+
+
+class LcdLease:
+    def __init__(self, arbiter: "LcdArbiter", owner: str, priority: str, acquired_at: float, expires_at: float):
+        self._arbiter = arbiter
+        self.owner = owner
+        self.priority = priority
+        self.acquired_at = acquired_at
+        self.expires_at = expires_at
+        self._preempt = Event()
+        self._released = False
+
+    def preempt_requested(self) -> bool:
+        """True once a higher-priority operation is waiting for the menu."""
+        return self._preempt.is_set()
+
+    def release(self) -> None:
+        self._arbiter.release(self)
+
+    def handoff_ready(self) -> bool:
+        """True when another operation is queued to continue this menu trip."""
+        return self._arbiter._handoff_ready(self)
+
+    def end_trip(self, return_to_default: Callable[[], object]) -> bool:
+        """Finish this operation's menu work.
+
+        Hands the menu to a queued operation where it stands, or calls
+        ``return_to_default`` when nobody is waiting. ``return_to_default``
+        is kept to run later if the successor stops waiting. Returns True
+        when the lease was handed over.
+        """
+        if self.handoff_ready():
+            self._arbiter.release(self, restore=return_to_default)
+            return True
+        return_to_default()
+        return False
+
+    def __enter__(self) -> "LcdLease":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.release()
+
+
+class _Rider:
+    def __init__(self, owner: str, page: str, action: Callable[[str], bool]):
+        self.owner = owner
+        self.page = page
+        self.action = action
+
+
+class _Waiter:
+    def __init__(self, rank: int, seq: int, owner: str, priority: str, page: Optional[str]):
+        self.rank = rank
+        self.seq = seq
+        self.owner = owner
+        self.priority = priority
+        self.page = page
+
+
+class LcdArbiter:
+    def __init__(
+        self,
+        *,
+        default_lease_seconds: float = 600.0,
+        menu_graph: Optional[MenuGraph] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._default_lease_seconds = float(default_lease_seconds)
+        self._menu_graph = menu_graph
+        self._clock = clock
+        self._cond = Condition()
+        self._holder: Optional[LcdLease] = None
+        self._waiting: list[_Waiter] = []
+        self._page: Optional[str] = None
+        self._restore: Optional[Callable[[], object]] = None
+        self._trip_operations = 0
+        self._handoffs = 0
+        self._restores = 0
+        self._seq = itertools.count()
+        self._riders: list[_Rider] = []
+        self._grants = 0
+        self._expired = 0
+        self._rides = 0
+
+    def _holder_live_locked(self) -> bool:
+        if self._holder is None:
+            return False
+        if self._clock() >= self._holder.expires_at:
+            # A holder that never released (a crashed worker) must not wedge the menu.
+            logger.warning("LCD lease held by %s expired; reclaiming", self._holder.owner)
+            self._holder._released = True
+            self._holder = None
+            self._expired += 1
+            return False
+        return True
+
+    def _distance_locked(self, waiter: _Waiter) -> int:
+        if self._menu_graph is None or self._page is None or waiter.page is None:
+            return 0
+        steps = self._menu_graph.path(self._page, waiter.page)
+        return len(steps) if steps is not None else len(self._menu_graph.pages())
+
+    def _next_locked(self) -> Optional[_Waiter]:
+        if not self._waiting:
+            return None
+        return min(self._waiting, key=lambda w: (w.rank, self._distance_locked(w), w.seq))
+
+    def _grant_locked(self, owner: str, priority: str, lease_seconds: Optional[float]) -> LcdLease:
+        now = self._clock()
+        # The new holder continues (or starts) the trip and returns from it.
+        self._trip_operations = self._trip_operations + 1 if self._restore is not None else 1
+        self._restore = None
+        seconds = self._default_lease_seconds if lease_seconds is None else float(lease_seconds)
+        self._holder = LcdLease(self, owner, priority, now, now + seconds)
+        self._grants += 1
+        return self._holder
+
+    def acquire(
+        self,
+        owner: str,
+        priority: str = USER,
+        *,
+        timeout: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        cancel: Optional[Event] = None,
+        page: Optional[str] = None,
+    ) -> LcdLease:
+        """Block until the menu is granted to ``owner``; returns the lease.
+
+        ``page`` is where the operation's menu work starts; it lets the
+        operation continue another's trip and orders it by menu position.
+        """
+        if priority not in PRIORITY_RANK:
+            raise ValueError(f"unknown LCD priority {priority!r}")
+        entry = _Waiter(PRIORITY_RANK[priority], next(self._seq), owner, priority, page)
+        deadline = None if timeout is None else self._clock() + float(timeout)
+        try:
+            with self._cond:
+                self._waiting.append(entry)
+                try:
+                    while True:
+                        if cancel is not None and cancel.is_set():
+                            raise LcdBusyError(f"{owner} stopped waiting for the LCD menu")
+                        if not self._holder_live_locked() and self._next_locked() is entry:
+                            return self._grant_locked(owner, priority, lease_seconds)
+                        if self._holder is not None and PRIORITY_RANK[self._holder.priority] > entry.rank:
+                            self._holder._preempt.set()
+                        wait = 0.25
+                        if deadline is not None:
+                            remaining = deadline - self._clock()
+                            if remaining <= 0:
+                                holder = self._holder.owner if self._holder is not None else "a queued operation"
+                                raise LcdBusyError(f"LCD menu is in use by {holder}")
+                            wait = min(wait, remaining)
+                        self._cond.wait(wait)
+                finally:
+                    self._waiting.remove(entry)
+                    self._cond.notify_all()
+        except LcdBusyError:
+            self._restore_abandoned_trip(owner)
+            raise
+
+    def _restore_abandoned_trip(self, owner: str) -> None:
+        """Return the menu to default when the operation it was handed to left."""
+        with self._cond:
+            if self._restore is None or self._waiting or self._holder_live_locked():
+                return
+            restore, self._restore = self._restore, None
+            lease = self._grant_locked(owner, SAFETY, None)
+            self._restores += 1
+        try:
+            restore()
+        except Exception:
+            logger.exception("Failed to return the LCD menu to default for an abandoned trip")
+        finally:
+            self.release(lease)
+
+    def release(self, lease: LcdLease, *, restore: Optional[Callable[[], object]] = None) -> None:
+        with self._cond:
+            if lease._released:
+                return
+            lease._released = True
+            if self._holder is lease:
+                self._holder = None
+                if restore is not None:
+                    self._restore = restore
+                    self._handoffs += 1
+            self._cond.notify_all()
+
+    def _handoff_ready(self, lease: LcdLease) -> bool:
+        with self._cond:
+            return self._holder is lease and any(w.page is not None for w in self._waiting)
+
+    def busy(self) -> bool:
+        with self._cond:
+            return self._holder_live_locked()
+
+    def holder(self) -> Optional[str]:
+        with self._cond:
+            return self._holder.owner if self._holder_live_locked() else None
+
+    def add_rider(self, owner: str, page: str, action: Callable[[str], bool]) -> None:
+        """Ask whoever passes ``page`` to run ``action(line)``; True means done."""
+        with self._cond:
+            self._riders.append(_Rider(owner, page, action))
+
+    def cancel_riders(self, owner: str) -> int:
+        """Withdraw ``owner``'s riders; returns how many were still pending."""
+        with self._cond:
+            pending = [rider for rider in self._riders if rider.owner == owner]
+            self._riders = [rider for rider in self._riders if rider.owner != owner]
+            return len(pending)
+
+    def visit(self, page: str, line: str) -> int:
+        """Run the riders waiting for ``page``; the holder calls this as it navigates."""
+        with self._cond:
+            self._page = page
+            holder = self._holder.owner if self._holder is not None else None
+            riders = [r for r in self._riders if r.page == page and r.owner != holder]
+        done = []
+        for rider in riders:
+            try:
+                if rider.action(line):
+                    done.append(rider)
+            except Exception:
+                logger.exception("LCD ride-along for %s failed", rider.owner)
+        if done:
+            with self._cond:
+                self._riders = [r for r in self._riders if r not in done]
+                self._rides += len(done)
+        return len(done)
+
+    def status(self) -> dict:
+        with self._cond:
+            live = self._holder_live_locked()
+            now = self._clock()
+            return {
+                "busy": live,
+                "holder": self._holder.owner if live else None,
+                "holder_priority": self._holder.priority if live else None,
+                "held_for_sec": round(now - self._holder.acquired_at, 1) if live else None,
+                "preempt_requested": self._holder.preempt_requested() if live else False,
+                "page": self._page,
+                "waiting": [
+                    {"owner": w.owner, "priority": w.priority, "page": w.page}
+                    for w in sorted(self._waiting, key=lambda w: (w.rank, self._distance_locked(w), w.seq))
+                ],
+                "trip_operations": self._trip_operations,
+                "handoffs": self._handoffs,
+                "abandoned_trip_restores": self._restores,
+                "riders": [{"owner": r.owner, "page": r.page} for r in self._riders],
+                "grants": self._grants,
+                "expired_leases": self._expired,
+                "rides": self._rides,
+            }
@@ -0,0 +1,111 @@
+"""Process logging setup: plain or structured JSON output with per-subsystem levels.
+
+Panel frames arrive many times per second, so hot paths log lazily with
+``%``-style arguments. Subsystem overrides such as
+``aqualogic_mqtt.vsp=DEBUG`` raise one driver's verbosity without also
+raising the frame-rate ``aqualogic_mqtt.client`` debug output.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import json
+import logging
+from typing import Iterable, Mapping, Optional, TextIO
+
+
+# Attributes present on every LogRecord. Anything else was supplied through
+# ``extra=`` and is emitted as a structured field.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+PLAIN_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Render each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith("_"):
+                payload[name] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, sort_keys=True)
+
+
+def level_for_verbosity(verbose: int) -> int:
+    if verbose >= 3:
+        return logging.DEBUG
+    if verbose == 2:
+        return logging.INFO
+    if verbose == 1:
+        return logging.WARNING
+    return logging.ERROR
+
+
+def _parse_level(value: object) -> int:
+    text = str(value or "").strip().upper()
+    if text.isdigit():
+        return int(text)
+    level = logging.getLevelName(text)
+    if not isinstance(level, int):
+        raise ValueError(f"unknown log level: {value!r}")
+    return level
+
+
+def parse_level_overrides(values: Optional[Iterable[str]]) -> dict[str, int]:
+    """Parse ``logger=LEVEL`` items; commas may join several in one item.
+
+    A bare subsystem name such as ``vsp`` is taken relative to the
+    ``aqualogic_mqtt`` package, unless it already names a top-level logger
+    of another library (``paho``, ``aqualogic``) and no subsystem has it.
+    """
+    overrides: dict[str, int] = {}
+    for item in values or ():
+        for part in str(item or "").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            name, sep, level = part.partition("=")
+            if not sep or not name.strip():
+                raise ValueError(f"log level override must be LOGGER=LEVEL: {part!r}")
+            name = name.strip()
+            if "." not in name and name != "aqualogic_mqtt":
+                known = logging.root.manager.loggerDict
+                if f"aqualogic_mqtt.{name}" in known or name not in known:
+                    name = f"aqualogic_mqtt.{name}"
+            overrides[name] = _parse_level(level)
+    return overrides
+
+
+def configure_logging(
+    level: int = logging.ERROR,
+    *,
+    json_format: bool = False,
+    subsystem_levels: Optional[Mapping[str, int]] = None,
+    stream: Optional[TextIO] = None,
+) -> logging.Handler:
+    """Install a single root handler and apply per-logger level overrides.
+
+    The handler itself is left at NOTSET so that a subsystem raised above the
+    root level still reaches the output.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter(PLAIN_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name, subsystem_level in (subsystem_levels or {}).items():
+        logging.getLogger(name).setLevel(subsystem_level)
+    return handler
@@ -0,0 +1,252 @@
+"""Shared model of the PL-PLUS LCD menu for the drivers that navigate it.
+
+The VSP, heater-target and clock drivers used to walk the menu blindly:
+press MENU until Settings shows up, then RIGHT until the wanted setting does.
+A ``MenuGraph`` instead holds the known pages and the key that moves between
+them, so a driver can classify the page it is on, compute the shortest key
+sequence to its target and press only those keys, checking after each press
+that the display actually moved.
+
+Edges start from the declared PL-PLUS layout and are corrected by what the
+panel does: every verified transition (a driver's or a user's keypress from
+the web UI) is recorded, replacing a declared edge it contradicts and adding
+shortcuts such as LEFT that are not declared. Pages the model does not know
+(unlisted settings, default-menu rows) are left by continuing to scroll with
+RIGHT when that is how they were reached, or with MENU otherwise, which is
+what the blind walks did.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import re
+import time
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from aqualogic.keys import Keys
+
+from .default_menu import normalize_line
+
+TOP_LEVEL = ("settings_menu", "timers_menu", "diagnostic_menu", "configuration_menu", "default_menu")
+# Settings Menu items in RIGHT order.
+SETTINGS_ITEMS = (
+    "spa_heater",
+    "pool_heater",
+    "vsp_settings",
+    "super_chlorinate",
+    "spa_chlorinator",
+    "pool_chlorinator",
+    "clock",
+)
+FILTER_SPEEDS = tuple(f"filter_speed{n}" for n in range(1, 5))
+
+_EXACT_PAGES = {
+    "settings menu": "settings_menu",
+    "timers menu": "timers_menu",
+    "diagnostic menu": "diagnostic_menu",
+    "configuration menu-locked": "configuration_menu",
+    "default menu": "default_menu",
+}
+# "Filter Speed 70% Speed1" is a default-menu row, not a preset page.
+_FILTER_SPEED_PAGE_RE = re.compile(r"^filter\s+speed\s*([1-4])(?:\s|$)")
+# Pages whose value (blinking while selected) follows the label.
+_PREFIX_PAGES = (
+    ("spa heater1", "spa_heater"),
+    ("pool heater1", "pool_heater"),
+    ("vsp speed settings", "vsp_settings"),
+    ("super chlorinate", "super_chlorinate"),
+    ("spa chlorinator", "spa_chlorinator"),
+    ("pool chlorinator", "pool_chlorinator"),
+    ("set day and time", "clock"),
+)
+
+
+def classify_page(line: object) -> str:
+    """Return the page name for an LCD top line, or its normalized text."""
+    text = normalize_line(line).lower()
+    match = _FILTER_SPEED_PAGE_RE.match(text)
+    if match:
+        return f"filter_speed{match.group(1)}"
+    if text in _EXACT_PAGES:
+        return _EXACT_PAGES[text]
+    for prefix, page in _PREFIX_PAGES:
+        if text.startswith(prefix):
+            return page
+    return text
+
+
+def _declared_edges() -> list:
+    edges = []
+    for index, page in enumerate(TOP_LEVEL):
+        edges.append((page, Keys.MENU, TOP_LEVEL[(index + 1) % len(TOP_LEVEL)]))
+    edges.append(("settings_menu", Keys.RIGHT, SETTINGS_ITEMS[0]))
+    for page, following in zip(SETTINGS_ITEMS, SETTINGS_ITEMS[1:]):
+        edges.append((page, Keys.RIGHT, following))
+    edges.append(("vsp_settings", Keys.PLUS, FILTER_SPEEDS[0]))
+    for page, following in zip(FILTER_SPEEDS, FILTER_SPEEDS[1:]):
+        edges.append((page, Keys.RIGHT, following))
+    # MENU leaves any setting for the menu after Settings.
+    for page in SETTINGS_ITEMS + FILTER_SPEEDS:
+        edges.append((page, Keys.MENU, "timers_menu"))
+    return edges
+
+
+DECLARED_EDGES = tuple(_declared_edges())
+
+
+def _key_name(key: object) -> str:
+    return str(getattr(key, "name", key))
+
+
+class MenuGraph:
+    """Known PL-PLUS pages and the keys that move between them."""
+
+    def __init__(
+        self,
+        edges: Iterable[tuple] = DECLARED_EDGES,
+        *,
+        learn_window_seconds: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = Lock()
+        self._edges: dict[str, dict[object, str]] = {}
+        self._learned: set[tuple[str, object]] = set()
+        for source, key, target in edges:
+            self._edges.setdefault(source, {})[key] = target
+            self._edges.setdefault(target, {})
+        self._learn_window_seconds = float(learn_window_seconds)
+        self._clock = clock
+        self._pending: Optional[tuple[str, object, float]] = None
+        self._pending_ambiguous = False
+        self._navigations = 0
+        self._presses = 0
+
+    def pages(self) -> list:
+        with self._lock:
+            return sorted(self._edges)
+
+    def knows(self, page: str) -> bool:
+        with self._lock:
+            return page in self._edges
+
+    def observe(self, source: str, key: object, target: str) -> bool:
+        """Record that ``key`` moved the display from ``source`` to ``target``."""
+        with self._lock:
+            if source == target or source not in self._edges or target not in self._edges:
+                return False
+            if self._edges[source].get(key) == target:
+                return False
+            self._edges[source][key] = target
+            self._learned.add((source, key))
+            return True
+
+    def path(self, source: str, target: str) -> Optional[list]:
+        """Shortest ``[(key, page), ...]`` from ``source`` to ``target``."""
+        with self._lock:
+            if source == target:
+                return []
+            if source not in self._edges:
+                return None
+            previous: dict[str, tuple[str, object]] = {}
+            queue = deque([source])
+            while queue:
+                page = queue.popleft()
+                for key, following in self._edges[page].items():
+                    if following == source or following in previous:
+                        continue
+                    previous[following] = (page, key)
+                    if following == target:
+                        steps = []
+                        while following != source:
+                            page, key = previous[following]
+                            steps.append((key, following))
+                            following = page
+                        return steps[::-1]
+                    queue.append(following)
+            return None
+
+    def navigate(
+        self,
+        target: str,
+        read_line: Callable[[], str],
+        press: Callable[[object, Callable[[str], bool], str], str],
+        *,
+        max_steps: int = 16,
+        on_page: Optional[Callable[[str, str], object]] = None,
+    ) -> bool:
+        """Drive the panel to ``target`` along the shortest known path.
+
+        ``press(key, predicate, page)`` sends ``key`` while the display shows
+        ``page`` and returns the first line satisfying ``predicate`` (the page
+        changed); it raises, or returns the unchanged line, when it does not.
+        The path is re-planned from the observed page after every press.
+        Returns False when ``target`` was not reached within ``max_steps``.
+        ``on_page(page, line)`` is called for every page passed on the way.
+        """
+        with self._lock:
+            self._navigations += 1
+        scroll_key = Keys.MENU
+        for _ in range(max_steps):
+            line = read_line()
+            page = classify_page(line)
+            if on_page is not None:
+                on_page(page, line)
+            if page == target:
+                return True
+            if self.knows(page):
+                steps = self.path(page, target)
+                if not steps:
+                    return False
+                key = steps[0][0]
+            else:
+                key = scroll_key
+            line = press(key, lambda value, old=page: classify_page(value) not in (old, ""), page)
+            with self._lock:
+                self._presses += 1
+            reached = classify_page(line)
+            self.observe(page, key, reached)
+            if not self.knows(reached):
+                scroll_key = Keys.RIGHT if key == Keys.RIGHT else Keys.MENU
+        return classify_page(read_line()) == target
+
+    def note_key(self, key: object, line: object) -> None:
+        """Remember a key sent outside ``navigate`` to learn where it leads."""
+        with self._lock:
+            if self._pending is not None:
+                # Several keys before the display moved: can't attribute it.
+                self._pending_ambiguous = True
+                return
+            self._pending = (classify_page(line), key, self._clock())
+            self._pending_ambiguous = False
+
+    def observe_line(self, line: object) -> None:
+        with self._lock:
+            pending, ambiguous = self._pending, self._pending_ambiguous
+        if pending is None:
+            return
+        source, key, sent_at = pending
+        page = classify_page(line)
+        if page in (source, ""):
+            if self._clock() - sent_at > self._learn_window_seconds:
+                with self._lock:
+                    self._pending = None
+            return
+        with self._lock:
+            self._pending = None
+        if not ambiguous and self._clock() - sent_at <= self._learn_window_seconds:
+            self.observe(source, key, page)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "pages": len(self._edges),
+                "edges": {
+                    source: {_key_name(key): target for key, target in keys.items()}
+                    for source, keys in sorted(self._edges.items())
+                    if keys
+                },
+                "learned": sorted(f"{source} {_key_name(key)}" for source, key in self._learned),
+                "navigations": self._navigations,
+                "presses": self._presses,
+            }
@@ -4,6 +4,7 @@ from aqualogic.core import AquaLogic
 from aqualogic.states import States
 
 from .panelmanager import PanelManager
+from . import compact
 
 #ALW
 from aqualogic.keys import Keys  # Needed to send the key later
@@ -21,8 +22,10 @@ class Messages:
     _system_message_sensor_dict = None
     _ha_status_path = None
     _onoff = {False: "OFF", True: "ON"}
+    STATE_TOPIC_MODES = ("combined", "entity")
     
-    def __init__(self, identifier, discover_prefix, enable, system_message_sensors):
+    def __init__(self, identifier, discover_prefix, enable, system_message_sensors,
+                 state_topics="combined", telemetry_qos=0, control_qos=1, compact_state=False):
         self._identifier = identifier #TODO: Sanitize?
         self._discover_prefix = discover_prefix #TODO: Sanitize?
         self._root = f"{self._discover_prefix}/device/{self._identifier}"
@@ -32,6 +35,20 @@ class Messages:
         self._sensor_dict = { k:v for k,v in Messages.get_sensor_dict(self._identifier).items() if k in enable }
         self._button_dict = self.get_button_dict()  
         self._system_message_sensor_dict = Messages.get_system_message_sensor_dict(self._identifier, system_message_sensors)
+        self._control_command_topics = { f"{self._root}/{v['id']}/set": k for k, v in self._control_dict.items() }
+        if state_topics not in Messages.STATE_TOPIC_MODES:
+            raise ValueError(f"state_topics must be one of {', '.join(Messages.STATE_TOPIC_MODES)}")
+        self._state_topics = state_topics
+        self._telemetry_qos = int(telemetry_qos)
+        self._control_qos = int(control_qos)
+        self._compact_state = bool(compact_state)
+        # State key -> component id, for per-entity state topics.
+        self._entity_ids = {
+            "cs": f"{ self._identifier }_binary_sensor_check_system",
+            "sysm": f"{ self._identifier }_sensor_system_messages",
+        }
+        for d in (self._sensor_dict, self._control_dict, self._system_message_sensor_dict):
+            self._entity_ids.update({ k: v['id'] for k, v in d.items() })
  
     
     def get_id_for_string(input:(str)):
@@ -199,6 +216,57 @@ class Messages:
     def get_valid_entity_meta():
         return { k: v['name'] for k, v in (Messages.get_sensor_dict() | Messages.get_control_dict()).items() }
 
+    def get_control_command_topics(self):
+        """Map each enabled control's exact command topic to its panel state."""
+        return { t: self._control_dict[k]['state'] for t, k in self._control_command_topics.items() }
+
+    def get_control_key_for_topic(self, topic):
+        return self._control_command_topics.get(topic)
+
+    def get_ack_topic(self, key):
+        return f"{self._root}/{self._control_dict[key]['id']}/ack"
+
+    def get_button_command_topics(self):
+        """Map each button's exact command topic to the key it presses."""
+        return { v['command_topic']: v['key_code'] for v in self._button_dict.values() }
+
+    def is_entity_state_mode(self):
+        return self._state_topics == "entity"
+
+    def get_entity_state_topic(self, key):
+        return f"{self._root}/{self._entity_ids[key]}/state"
+
+    def get_state_publications(self, state):
+        """Return (topic, payload, qos, retain) tuples for a state dict.
+
+        Combined mode is the original single JSON topic. Entity mode gives each
+        entity its own retained topic; control state uses the control QoS and
+        everything else (sensors, system messages) the telemetry QoS. ``None``
+        sensor readings are not published until the panel reports a value.
+        With ``compact_state`` the whole state is also published, retained, as
+        CBOR on the compact state topic.
+        """
+        if self._state_topics == "combined":
+            result = [(self.get_state_topic(), json.dumps(state), self._control_qos, False)]
+        else:
+            result = []
+            for k, v in state.items():
+                if k not in self._entity_ids or v is None:
+                    continue
+                qos = self._control_qos if k in self._control_dict else self._telemetry_qos
+                result.append((self.get_entity_state_topic(k), str(v), qos, True))
+        if self._compact_state:
+            result.append((
+                self.get_compact_state_topic(), compact.encode(compact.compact_state(state)), self._control_qos, True,
+            ))
+        return result
+
+    def get_ha_status_topic(self):
+        return self._ha_status_path
+
+    def get_identifier(self):
+        return self._identifier
+
     def get_subscription_topics(self):
         return [f"{self._discover_prefix}/device/{self._identifier}/+/set"]
     
@@ -208,7 +276,13 @@ class Messages:
     def get_state_topic(self):
         return f"{self._root}/state"
     
+    def get_compact_state_topic(self):
+        return f"{self._root}/state/cbor"
+
     def get_state_message(self, panel, panel_manager:(PanelManager)):
+        return json.dumps(self.get_state_dict(panel, panel_manager))
+
+    def get_state_dict(self, panel, panel_manager:(PanelManager)):
         sysm = panel_manager.get_system_messages()
 
         state = {
@@ -224,7 +298,7 @@ class Messages:
         for k, v in self._system_message_sensor_dict.items():
             state[k] = self._onoff[v["name"] in sysm]
 
-        return json.dumps(state)
+        return state
     
     #TODO: ^ and v move out of this class, to divorce it from Aqualogic panel?
 
@@ -232,10 +306,9 @@ class Messages:
         if topic == self._ha_status_path and msg == "online": #TODO: Make configurable?
             return [(self.get_discovery_topic(), self.get_discovery_message())] 
         
-        state_dict_filtered = { k:v for (k,v) in self._control_dict.items() if f"{self._root}/{v['id']}/set" == topic }
-        logger.debug(f"{state_dict_filtered=}")
-        for k,v in state_dict_filtered.items(): # Really there will be only one...
-            panel.set_state(v['state'], True if msg == "ON" else False)
+        key = self._control_command_topics.get(topic)
+        if key is not None:
+            panel.set_state(self._control_dict[key]['state'], True if msg == "ON" else False)
             return []
 
    
@@ -273,7 +346,7 @@ class Messages:
                 }
             },
             "stat_t": self.get_state_topic(),
-            "qos": 2
+            "qos": self._control_qos
         }
         for k,v in self._sensor_dict.items():
             cmp = {
@@ -295,7 +368,11 @@ class Messages:
                 "uniq_id": v["id"],
                 "obj_id": v["id"],
                 "name": v["name"],
-                "cmd_t": f"{self._root}/{v['id']}/set"
+                "cmd_t": f"{self._root}/{v['id']}/set",
+                # Commands are echoed optimistically; expose whether this
+                # control is still awaiting panel confirmation.
+                "json_attr_t": self.get_state_topic(),
+                "json_attr_tpl": "{{ {'pending': '" + k + "' in (value_json.pending or [])} | tojson }}"
             }
             if k == "l":
                 cmp['p'] = "light"
@@ -326,5 +403,17 @@ class Messages:
             }
             p['cmps'][v["id"]] = cmp
         #
+
+        if self._state_topics == "entity":
+            for k, entity_id in self._entity_ids.items():
+                cmp = p['cmps'][entity_id]
+                cmp['stat_t'] = self.get_entity_state_topic(k)
+                cmp['qos'] = self._control_qos if k in self._control_dict else self._telemetry_qos
+                cmp.pop('val_tpl', None)
+                cmp.pop('stat_val_tpl', None)
+                if k in self._control_dict:
+                    cmp['json_attr_t'] = self.get_ack_topic(k)
+                    cmp['json_attr_tpl'] = "{{ {'pending': value_json.result == 'pending'} | tojson }}"
+            del p['stat_t']
         
         return json.dumps(p)
@@ -0,0 +1,242 @@
+"""One MQTT broker session shared by every panel the bridge serves.
+
+The connection owns the ``paho`` client, the inbound command router, the
+outbound buffer and the MQTT link supervisor. Each panel's ``Client`` attaches
+to it; on every (re)connect the router is rebuilt and each attached client
+subscribes and publishes its own discovery, so panels differ only by their
+``Messages`` identifier. Broker-wide events (disconnects, held commands,
+buffered publishes) wake every attached client's reconcile loop.
+
+Bridges built independently in one process share connections through a
+``ConnectionPool``: ``acquire`` returns the existing connection for the same
+broker settings and counts its users, and the last ``release`` disconnects it.
+TLS handshakes, keepalive traffic and broker connection counts then scale with
+hosts rather than panels. Inbound topics carry the panel identifier, so the
+router's exact-topic table demultiplexes them with no extra lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import ssl
+from threading import Lock
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.reasoncodes import ReasonCode
+
+from .outbound import OutboundBuffer
+from .router import CommandRouter
+from .supervisor import LinkSupervisor
+
+logger = logging.getLogger("aqualogic_mqtt.mqtt_connection")
+
+
+def split_host_port(dest, port=1883):
+    if dest is not None and ':' in dest:
+        host, port = dest.split(':')
+        return host, int(port)
+    return dest, port
+
+
+class MqttConnection:
+    def __init__(self, client_id=None, transport='tcp', protocol_num=5):
+        protocol = mqtt.MQTTv311 if protocol_num == 3 else mqtt.MQTTv5
+        # Reconnects are paced by service_tick (threaded runtime) or the
+        # asyncio runtime, not by paho's network thread.
+        self.paho = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2,
+                                client_id=client_id, transport=transport,
+                                protocol=protocol, reconnect_on_failure=False)
+        self.router = CommandRouter(on_pending=lambda: self.notify("mqtt_command"))
+        self.outbound = OutboundBuffer(
+            self._publish_now,
+            on_pending=lambda: self.notify("mqtt_outbound"),
+        )
+        self.link = LinkSupervisor("MQTT", self._reconnect)
+        self._clients = []
+        self._connected = False
+        self._connect_requested = False
+        self._tls_configured = False
+        self.paho.on_message = self._on_message
+        self.paho.on_connect = self._on_connect
+        self.paho.on_disconnect = self._on_disconnect
+        self.paho.on_connect_fail = self._on_connect_fail
+
+    def attach(self, client) -> None:
+        """Serve ``client`` (one panel) over this connection."""
+        identifier = client._formatter.get_identifier()
+        if identifier in self.identifiers():
+            raise ValueError(f"identifier {identifier!r} is already served by this MQTT connection")
+        self._clients.append(client)
+        if self._connected:
+            # Joining a live session: set up just this panel.
+            self._set_up(client)
+
+    def detach(self, client) -> None:
+        if client not in self._clients:
+            return
+        self._clients.remove(client)
+        formatter = client._formatter
+        self.router.remove_routes(
+            list(formatter.get_control_command_topics()) + list(formatter.get_button_command_topics())
+        )
+        if self._connected:
+            for topic in formatter.get_subscription_topics():
+                self.paho.unsubscribe(topic)
+
+    def identifiers(self) -> list:
+        return [client._formatter.get_identifier() for client in self._clients]
+
+    def _set_up(self, client) -> None:
+        client.on_mqtt_connected()
+        topic = client._formatter.get_ha_status_topic()
+        if topic not in self.router.topics():
+            # Discovery replies are not key-bus traffic; never hold them back.
+            self.router.add_route(topic, self._ha_status_handler(topic), min_interval_seconds=0)
+
+    def notify(self, reason: str) -> None:
+        for client in list(self._clients):
+            client._scheduler.notify(reason)
+
+    def _publish_now(self, topic, payload, qos, retain):
+        self.paho.publish(topic, payload, qos=qos, retain=retain)
+
+    def _on_message(self, client, userdata, msg):
+        logger.debug("_on_message called for topic %s with payload %r", msg.topic, msg.payload)
+        if not self.router.dispatch(msg.topic, msg.payload.decode().strip()):
+            logger.debug("No command route for topic %s", msg.topic)
+
+    def _ha_status_handler(self, topic):
+        def handle(payload):
+            if payload != "online":
+                return
+            for attached in list(self._clients):
+                if attached._formatter.get_ha_status_topic() == topic:
+                    attached.publish_discovery()
+        return handle
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        logger.debug("_on_connect called")
+        if isinstance(reason_code, ReasonCode):
+            if reason_code.is_failure:
+                logger.error("Got failure when connecting MQTT: %s!", reason_code.getName())
+                self.link.mark_down(f"connect refused: {reason_code.getName()}")
+                self.notify("mqtt_disconnect")
+                return
+        self.link.mark_up()
+        self._connected = True
+
+        self.router.clear()
+        for attached in list(self._clients):
+            self._set_up(attached)
+        # Anything buffered while disconnected goes out after discovery, one
+        # (latest) message per topic.
+        self.outbound.set_connected(True)
+
+    def _on_connect_fail(self, userdata, reason_code):
+        #TODO: Have not been able to reach here, needs testing!
+        logger.debug("_on_connect_fail called")
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
+        self._connected = False
+        self.outbound.set_connected(False)
+        if isinstance(reason_code, ReasonCode):
+            failed = reason_code.is_failure
+            name = reason_code.getName()
+        else:
+            failed = isinstance(reason_code, int) and reason_code > 0
+            name = reason_code
+        if not failed:
+            logger.debug("MQTT Disconnected: %s", name)
+            return
+        # Runs on paho's network thread: never sleep or reconnect here.
+        logger.error("MQTT Disconnected: %s!", name)
+        self.link.mark_down(f"disconnected: {name}")
+        self.notify("mqtt_disconnect")
+
+    def _reconnect(self):
+        self.paho.reconnect()
+        # paho's network thread exits with the failed connection.
+        self.paho.loop_start()
+
+    def username_pw_set(self, username:(str), password:(str)):
+        return self.paho.username_pw_set(username=username, password=password)
+
+    def tls_set(self, certfile=None, keyfile=None, cert_reqs=ssl.CERT_REQUIRED):
+        # Every bridge sharing the connection asks; paho only allows it once.
+        if self._tls_configured:
+            return None
+        self._tls_configured = True
+        return self.paho.tls_set(certfile=certfile, keyfile=keyfile, cert_reqs=cert_reqs)
+
+    def connect(self, dest:(str), port:(int)=1883, keepalive=60):
+        if self._connect_requested:
+            logger.debug("MQTT connection already requested; sharing it")
+            return None
+        host, port = split_host_port(dest, port)
+        r = self.paho.connect(host, port, keepalive)
+        self._connect_requested = True
+        logger.debug("Connected to %s:%s with result %s", host, port, r)
+
+    def close(self):
+        self._connected = False
+        self._connect_requested = False
+        self.outbound.set_connected(False)
+        self.paho.disconnect()
+        self.paho.loop_stop()
+
+    def service_tick(self):
+        """Retry the link, drain buffers; return delays until work is next due."""
+        self.link.tick()
+        self.outbound.drain()
+        self.router.flush()
+        return (self.router.next_due(), self.outbound.next_due(), self.link.next_due())
+
+    def status(self):
+        return {**self.link.status(), "outbound": self.outbound.status(), "panels": self.identifiers()}
+
+
+class ConnectionPool:
+    """Reference-counted ``MqttConnection``s keyed by broker settings."""
+
+    def __init__(self, factory=MqttConnection):
+        self._factory = factory
+        self._lock = Lock()
+        self._entries = {}
+
+    def acquire(self, client_id=None, transport='tcp', protocol_num=5) -> MqttConnection:
+        key = (client_id, transport, protocol_num)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [self._factory(client_id=client_id, transport=transport, protocol_num=protocol_num), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, connection: MqttConnection) -> None:
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[0] is connection:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del self._entries[key]
+                    break
+            else:
+                return
+        connection.close()
+
+    def users(self, connection: MqttConnection) -> int:
+        with self._lock:
+            for entry in self._entries.values():
+                if entry[0] is connection:
+                    return entry[1]
+        return 0
+
+
+_pool = ConnectionPool()
+
+def acquire_connection(client_id=None, transport='tcp', protocol_num=5) -> MqttConnection:
+    return _pool.acquire(client_id=client_id, transport=transport, protocol_num=protocol_num)
+
+def release_connection(connection: MqttConnection) -> None:
+    _pool.release(connection)
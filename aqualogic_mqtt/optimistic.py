@@ -0,0 +1,100 @@
+"""Optimistic state echo and acknowledgements for MQTT switch commands.
+
+A command published by Home Assistant or Hubitat is echoed on the state topic
+straight away with the commanded value and the control listed under
+``pending``. Every later state publish keeps the commanded value until the
+panel reports it (``confirmed``) or the confirmation window passes
+(``timed_out``), mirroring ``EquipmentController``'s pending-switch check. A
+newer command for the same control ends the older one as ``superseded``.
+Each outcome is reported once on the control's acknowledgement topic.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+import time
+import uuid
+from typing import Callable, Optional
+
+
+DEFAULT_CONFIRMATION_SECONDS = 20.0
+
+
+class OptimisticStates:
+    def __init__(
+        self,
+        *,
+        confirmation_seconds: float = DEFAULT_CONFIRMATION_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._confirmation_seconds = float(confirmation_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._pending: dict[str, dict] = {}
+
+    def _ack(self, key: str, pending: dict, result: str, now: float) -> tuple[str, dict]:
+        return key, {
+            "command_id": pending["command_id"],
+            "target": pending["target"],
+            "result": result,
+            "elapsed_ms": int(round((now - pending["issued_at"]) * 1000)),
+        }
+
+    def command(
+        self,
+        key: str,
+        target: str,
+        *,
+        confirmation_seconds: Optional[float] = None,
+    ) -> list[tuple[str, dict]]:
+        """Record a commanded value; return the acknowledgements to publish."""
+        now = self._clock()
+        timeout = self._confirmation_seconds if confirmation_seconds is None else float(confirmation_seconds)
+        pending = {
+            "command_id": uuid.uuid4().hex[:12],
+            "target": target,
+            "issued_at": now,
+            "expires_at": now + timeout,
+        }
+        acks = []
+        with self._lock:
+            previous = self._pending.get(key)
+            if previous is not None:
+                acks.append(self._ack(key, previous, "superseded", now))
+            self._pending[key] = pending
+        acks.append(self._ack(key, pending, "pending", now))
+        return acks
+
+    def fail(self, key: str) -> list[tuple[str, dict]]:
+        """End a pending command whose handler raised before reaching the panel."""
+        now = self._clock()
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        return [self._ack(key, pending, "failed", now)] if pending is not None else []
+
+    def apply(self, observed: dict) -> tuple[dict, list[tuple[str, dict]]]:
+        """Resolve pending commands against ``observed`` panel state.
+
+        Returns the state to publish (unresolved targets overlaid and a
+        ``pending`` list added) and the acknowledgements for commands that
+        resolved.
+        """
+        now = self._clock()
+        state = dict(observed)
+        acks = []
+        with self._lock:
+            for key, pending in list(self._pending.items()):
+                if observed.get(key) == pending["target"]:
+                    acks.append(self._ack(key, pending, "confirmed", now))
+                    del self._pending[key]
+                elif now >= pending["expires_at"]:
+                    acks.append(self._ack(key, pending, "timed_out", now))
+                    del self._pending[key]
+                else:
+                    state[key] = pending["target"]
+            state["pending"] = sorted(self._pending)
+        return state, acks
+
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pending
@@ -0,0 +1,168 @@
+"""Outbound MQTT buffering and reconnect pacing.
+
+``OutboundBuffer`` sits between the bridge and ``paho``. Publishes are keyed by
+topic and only the newest payload per topic is kept, so while the broker is
+unreachable the buffer holds one message per topic instead of every panel
+frame; when it is full the least recently updated topic is dropped. A token
+bucket caps the publish rate, so a reconnect flush (or a flapping entity)
+cannot flood the broker. With a connection and tokens available a publish goes
+straight out; otherwise ``drain`` releases what is buffered as tokens refill.
+
+``ReconnectBackoff`` yields exponentially growing, jittered reconnect delays so
+a fleet of bridges does not reconnect to a restarted broker in lockstep.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import logging
+import random
+from threading import Lock
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger("aqualogic_mqtt.outbound")
+
+DEFAULT_MAX_TOPICS = 256
+DEFAULT_RATE_PER_SECOND = 20.0
+DEFAULT_BURST = 50
+
+
+class OutboundBuffer:
+    def __init__(
+        self,
+        publish: Callable[[str, str, int, bool], None],
+        *,
+        max_topics: int = DEFAULT_MAX_TOPICS,
+        rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        on_pending: Optional[Callable[[], None]] = None,
+    ):
+        self._publish = publish
+        self._max_topics = int(max_topics)
+        self._rate = float(rate_per_second)
+        self._burst = float(burst)
+        self._clock = clock
+        self._on_pending = on_pending
+        self._lock = Lock()
+        self._drain_lock = Lock()
+        self._queue: OrderedDict[str, tuple[str, int, bool]] = OrderedDict()
+        self._tokens = self._burst
+        self._refilled_at = clock()
+        self._connected = False
+        self._counts = {"published": 0, "coalesced": 0, "dropped": 0, "errors": 0}
+
+    def _refill_locked(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def set_connected(self, connected: bool) -> None:
+        with self._lock:
+            self._connected = bool(connected)
+        if connected:
+            self.drain()
+
+    def submit(self, topic: str, payload: str, qos: int = 0, retain: bool = False) -> None:
+        with self._lock:
+            if topic in self._queue:
+                self._counts["coalesced"] += 1
+                self._queue.move_to_end(topic)
+            elif len(self._queue) >= self._max_topics:
+                dropped, _message = self._queue.popitem(last=False)
+                self._counts["dropped"] += 1
+                logger.debug("Outbound buffer full; dropped %s", dropped)
+            self._queue[topic] = (payload, qos, retain)
+        if self.drain() == 0 and self._on_pending is not None and self.pending():
+            self._on_pending()
+
+    def _pop_ready(self) -> Optional[tuple[str, str, int, bool]]:
+        with self._lock:
+            if not self._connected or not self._queue:
+                return None
+            self._refill_locked(self._clock())
+            if self._tokens < 1.0:
+                return None
+            self._tokens -= 1.0
+            topic, (payload, qos, retain) = self._queue.popitem(last=False)
+            return topic, payload, qos, retain
+
+    def drain(self) -> int:
+        """Publish buffered messages while connected and within the rate cap."""
+        sent = 0
+        while True:
+            # One drainer at a time keeps per-topic publish order intact; a
+            # concurrent submit leaves its message for the active drainer.
+            if not self._drain_lock.acquire(blocking=False):
+                return sent
+            try:
+                while True:
+                    item = self._pop_ready()
+                    if item is None:
+                        break
+                    try:
+                        self._publish(*item)
+                        with self._lock:
+                            self._counts["published"] += 1
+                        sent += 1
+                    except Exception as exc:
+                        with self._lock:
+                            self._counts["errors"] += 1
+                        logger.warning("MQTT publish to %s failed: %s", item[0], exc)
+            finally:
+                self._drain_lock.release()
+            if not self._pop_would_succeed():
+                return sent
+
+    def _pop_would_succeed(self) -> bool:
+        with self._lock:
+            if not self._connected or not self._queue:
+                return False
+            self._refill_locked(self._clock())
+            return self._tokens >= 1.0
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def next_due(self) -> Optional[float]:
+        """Seconds until buffered messages can be published, if any are waiting."""
+        with self._lock:
+            if not self._connected or not self._queue:
+                return None
+            self._refill_locked(self._clock())
+            return max(0.0, (1.0 - self._tokens) / self._rate)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "connected": self._connected,
+                "buffered": len(self._queue),
+                "max_topics": self._max_topics,
+                "rate_per_second": self._rate,
+                **self._counts,
+            }
+
+
+class ReconnectBackoff:
+    """Exponential backoff with "equal jitter": each delay is in [d/2, d]."""
+
+    def __init__(
+        self,
+        *,
+        min_seconds: float = 1.0,
+        max_seconds: float = 30.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self._min_seconds = float(min_seconds)
+        self._max_seconds = float(max_seconds)
+        self._rng = rng
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        ceiling = min(self._max_seconds, self._min_seconds * (2 ** self.attempts))
+        self.attempts += 1
+        return ceiling / 2 + self._rng() * ceiling / 2
+
+    def reset(self) -> None:
+        self.attempts = 0
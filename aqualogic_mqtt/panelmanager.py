@@ -11,8 +11,10 @@ class PanelManager:
     _exp_s = None
     _last_text_update = None
 
-    def __init__(self, connect_timeout:(int), message_exp_seconds:(int)):
+    def __init__(self, connect_timeout:(int), message_exp_seconds:(int), panel_controls=None):
         self._last_text_update = time.time()
+        # Controls of the panel this manager watches (module default if omitted)
+        self._controls = panel_controls if panel_controls is not None else controls
         self._timeout = connect_timeout
         self._exp_s = message_exp_seconds
         self._registry = {}
@@ -35,6 +37,9 @@ class PanelManager:
     def get_last_update_age(self):
         return time.time() - self._last_text_update
     
+    def get_timeout_remaining(self):
+        return self._timeout - self.get_last_update_age()
+
     def is_updating(self):
         return (time.time() - self._last_text_update) < self._timeout
 
@@ -44,7 +49,7 @@ class PanelManager:
     # updates from the panel (e.g. to determine if the connection is lost).
     def text_updated(self, str):
         self._last_text_update = time.time()
-        logger.debug(f"text_updated: {str}")
+        logger.debug("text_updated: %s", str)
         try:
             # Collapse raw text into a single line, strip NULs and padding
             s = (str or "").replace("\x00", "").strip()
@@ -53,7 +58,7 @@ class PanelManager:
             self._lcd_line0 = s
 
             # Forward to the web UI as a single line, leave others blank
-            controls.update_display([self._lcd_line0, "", "", ""], blink=None, leds=None)
+            self._controls.update_display([self._lcd_line0, "", "", ""], blink=None, leds=None)
         except Exception as e:
-            logger.debug(f"text_updated forward failed: {e}")
+            logger.debug("text_updated forward failed: %s", e)
         return
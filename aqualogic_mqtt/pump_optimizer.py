@@ -0,0 +1,299 @@
+"""Lowest-cost daily pump schedule for a turnover target.
+
+The pump runs all day; the schedule only picks the preset for each slot of
+the local day. Given the power each preset draws (``pump_power`` log, or
+``power_w`` in the config), the flow it moves and a time-of-use tariff, the
+optimizer starts every slot on the cheapest-running preset. It then buys
+the remaining volume where a gallon costs least: every step to a faster
+preset in a slot costs ``price * extra watts / extra flow``. Presets off the
+lower convex hull of (flow, power) are never worth running and are skipped,
+so the cheapest steps can be taken in order, and the last step is the only
+place the result can overshoot the target. The config file looks like::
+
+    {
+      "pool_gallons": 18000,
+      "turnovers": 1.0,
+      "flow_gpm": {"speed1": 58, "speed2": 78, "speed3": 46, "speed4": 33},
+      "slot_minutes": 30,
+      "tariff": {
+        "default_price": 0.14,
+        "periods": [{"start": "16:00", "end": "21:00", "price": 0.31}]
+      },
+      "power_w": {"speed2": 1650}
+    }
+
+``flow_gpm_at_100`` may replace ``flow_gpm``; flow then scales with the
+preset's speed percentage. ``power_w`` entries override logged means.
+
+The result is a schedule file (``schedule_config``) with ``fallback_preset``
+set to the base preset and one ``pump_schedule`` window per faster stretch.
+The cleanout windows of every layer (top level, weekdays, seasons) are
+carried over from the current schedule. ``--write`` refuses a current schedule
+whose weekday or season layers change pump windows or the fallback preset,
+since one daily plan cannot keep them. Run
+``python -m aqualogic_mqtt.pump_optimizer --config optimizer.json`` for a
+dry-run report of projected kWh, cost and turnovers against the current
+schedule. Add ``--write schedule.json`` to install it; the schedule watcher
+picks up the new file.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, time
+import heapq
+import json
+import os
+from typing import Mapping, Optional, Sequence
+
+from .automation import LOCAL_TIMEZONE, DailyTimeline
+from .pump_power import load_pump_power
+from .schedule_config import ScheduleConfig, ScheduleConfigError, load_schedule_file
+from .vsp import PRESET_SPEEDS
+
+_DAY_SECONDS = 86400
+
+
+def _number(value: object, where: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ScheduleConfigError(f"{where}: expected a number, got {value!r}") from None
+
+
+def _second(value: object, where: str) -> int:
+    try:
+        parsed = time.fromisoformat(str(value))
+    except ValueError:
+        raise ScheduleConfigError(f"{where}: expected HH:MM, got {value!r}") from None
+    return parsed.hour * 3600 + parsed.minute * 60 + parsed.second
+
+
+def _preset(value: object, where: str) -> str:
+    text = str(value or "").strip().lower().replace(" ", "")
+    if text not in PRESET_SPEEDS:
+        raise ScheduleConfigError(f"{where}: preset must be one of {', '.join(PRESET_SPEEDS)}")
+    return text
+
+
+class Tariff:
+    """Energy price per kWh by local time of day."""
+
+    def __init__(self, raw: Mapping[str, object]):
+        if not isinstance(raw, Mapping) or "default_price" not in raw:
+            raise ScheduleConfigError("tariff: expected an object with default_price")
+        self.default_price = _number(raw["default_price"], "tariff.default_price")
+        self.periods: list[tuple[int, int, float]] = []
+        for index, period in enumerate(raw.get("periods") or []):
+            where = f"tariff.periods[{index}]"
+            if not isinstance(period, Mapping) or set(period) != {"start", "end", "price"}:
+                raise ScheduleConfigError(f"{where}: expected start, end and price")
+            start = _second(period["start"], f"{where}.start")
+            end = _second(period["end"], f"{where}.end")
+            if start == end:
+                raise ScheduleConfigError(f"{where}: start and end must differ")
+            self.periods.append((start, end, _number(period["price"], f"{where}.price")))
+
+    def price_at(self, second: int) -> float:
+        for start, end, price in self.periods:
+            if (start <= second < end) if start < end else (second >= start or second < end):
+                return price
+        return self.default_price
+
+
+def _positive(config: Mapping[str, object], key: str, default: Optional[float] = None) -> float:
+    raw = config.get(key, default)
+    value = _number(raw, f"optimizer: {key}") if raw is not None else 0.0
+    if not value > 0:
+        raise ScheduleConfigError(f"optimizer: {key} must be a positive number, got {raw!r}")
+    return value
+
+
+def _preset_flows(config: Mapping[str, object]) -> dict[str, float]:
+    if "flow_gpm" in config:
+        raw = config["flow_gpm"]
+        if not isinstance(raw, Mapping):
+            raise ScheduleConfigError("flow_gpm: expected an object keyed by preset")
+        return {_preset(preset, "flow_gpm"): _number(gpm, f"flow_gpm.{preset}") for preset, gpm in raw.items()}
+    if "flow_gpm_at_100" in config:
+        full = _number(config["flow_gpm_at_100"], "flow_gpm_at_100")
+        return {preset: full * pct / 100 for preset, pct in PRESET_SPEEDS.items()}
+    raise ScheduleConfigError("optimizer: flow_gpm or flow_gpm_at_100 is required")
+
+
+def _hull(presets: Sequence[tuple[str, float, float]]) -> list[tuple[str, float, float]]:
+    """Presets on the lower convex hull of (flow, watts), slowest first."""
+    hull: list[tuple[str, float, float]] = []
+    for preset in sorted(presets, key=lambda item: (item[1], item[2])):
+        if hull and preset[2] <= hull[-1][2]:
+            # As much flow for less power: the slower preset is never worth it.
+            while hull and preset[2] <= hull[-1][2]:
+                hull.pop()
+        while len(hull) >= 2:
+            (_, f1, w1), (_, f2, w2) = hull[-2], hull[-1]
+            if (w2 - w1) * (preset[1] - f1) >= (preset[2] - w1) * (f2 - f1):
+                hull.pop()
+            else:
+                break
+        if hull and preset[1] == hull[-1][1]:
+            continue
+        hull.append(preset)
+    return hull
+
+
+def _windows(slots: Sequence[str], slot_seconds: int, base: str) -> list[dict]:
+    def clock(second: int) -> str:
+        second %= _DAY_SECONDS
+        return f"{second // 3600:02d}:{second % 3600 // 60:02d}"
+
+    runs: list[list] = []
+    for index, preset in enumerate(slots):
+        if runs and runs[-1][0] == preset:
+            runs[-1][2] = index + 1
+        else:
+            runs.append([preset, index, index + 1])
+    if len(runs) > 1 and runs[0][0] == runs[-1][0]:
+        # Join a stretch running through midnight into one wrapping window.
+        runs[0][1] = runs[-1][1] - len(slots)
+        runs.pop()
+    return [
+        {"start": clock(start * slot_seconds), "end": clock(end * slot_seconds), "preset": preset}
+        for preset, start, end in runs
+        if preset != base
+    ]
+
+
+def evaluate(
+    timeline: DailyTimeline,
+    watts: Mapping[str, float],
+    flows: Mapping[str, float],
+    tariff: Tariff,
+) -> Optional[dict]:
+    """Projected kWh, cost and gallons for one day of ``timeline``; None if a preset has no power."""
+    kwh = cost = gallons = 0.0
+    for minute in range(0, _DAY_SECONDS, 60):
+        preset, _cleanout = timeline.slot_at(minute)
+        if preset not in watts or preset not in flows:
+            return None
+        energy = watts[preset] / 1000 / 60
+        kwh += energy
+        cost += energy * tariff.price_at(minute)
+        gallons += flows[preset]
+    return {"kwh": round(kwh, 2), "cost": round(cost, 2), "gallons": round(gallons)}
+
+
+def optimize(
+    config: Mapping[str, object],
+    logged_watts: Mapping[str, float],
+    current: Optional[ScheduleConfig] = None,
+    day: Optional[date] = None,
+) -> dict:
+    """Build the cheapest schedule for ``config`` and a report comparing it to ``current``."""
+    if not isinstance(config, Mapping):
+        raise ScheduleConfigError("optimizer: expected an object")
+    day = day or datetime.now(LOCAL_TIMEZONE).date()
+    current = current or ScheduleConfig({})
+    tariff = Tariff(config.get("tariff") or {})
+    flows = _preset_flows(config)
+    watts = dict(logged_watts)
+    for preset, value in (config.get("power_w") or {}).items():
+        watts[_preset(preset, "power_w")] = _number(value, f"power_w.{preset}")
+    slot_minutes = _number(config.get("slot_minutes", 30), "optimizer: slot_minutes")
+    if slot_minutes != int(slot_minutes):
+        raise ScheduleConfigError("optimizer: slot_minutes must be a whole number")
+    slot_minutes = int(slot_minutes)
+    if slot_minutes <= 0 or 1440 % slot_minutes:
+        raise ScheduleConfigError("optimizer: slot_minutes must divide the day")
+    pool_gallons = _positive(config, "pool_gallons")
+    target = pool_gallons * _positive(config, "turnovers", 1.0)
+
+    usable = [(preset, flows[preset], watts[preset]) for preset in PRESET_SPEEDS if preset in flows and preset in watts]
+    hull = _hull(usable)
+    if not hull:
+        raise ScheduleConfigError("optimizer: no preset has both a flow and a logged or configured power")
+    slot_seconds = slot_minutes * 60
+    slot_count = _DAY_SECONDS // slot_seconds
+    prices = [tariff.price_at(index * slot_seconds + slot_seconds // 2) for index in range(slot_count)]
+    levels = [0] * slot_count
+    gallons = hull[0][1] * slot_minutes * slot_count
+
+    steps = []
+    for index, price in enumerate(prices):
+        for level in range(1, len(hull)):
+            extra_flow = hull[level][1] - hull[level - 1][1]
+            extra_kwh = (hull[level][2] - hull[level - 1][2]) / 1000 * slot_minutes / 60
+            steps.append((price * extra_kwh / (extra_flow * slot_minutes), level, index))
+    heapq.heapify(steps)
+    while gallons < target and steps:
+        _cost, level, index = heapq.heappop(steps)
+        if levels[index] != level - 1:
+            continue
+        levels[index] = level
+        gallons += (hull[level][1] - hull[level - 1][1]) * slot_minutes
+
+    # Normally the slowest preset; every slot may have been stepped up.
+    base = hull[min(levels)][0]
+    schedule: dict = {
+        "version": 1,
+        "fallback_preset": base,
+        "pump_schedule": _windows([hull[level][0] for level in levels], slot_seconds, base),
+        **current.cleanout_layers(),
+    }
+    optimized = ScheduleConfig(schedule)
+    projected = evaluate(optimized.timeline_for(day), watts, flows, tariff)
+    baseline = evaluate(current.timeline_for(day), watts, flows, tariff)
+    for result in (projected, baseline):
+        if result is not None:
+            result["turnovers"] = round(result["gallons"] / pool_gallons, 2)
+    used = {preset for preset, _flow, _watts in hull}
+    return {
+        "day": day.isoformat(),
+        "target_gallons": round(target),
+        "target_met": projected["gallons"] >= target,
+        "presets": {
+            preset: {"flow_gpm": flows[preset], "watts": round(watts[preset], 1), "on_hull": preset in used}
+            for preset, _flow, _watts in usable
+        },
+        "projected": projected,
+        "current": baseline,
+        "savings": round(baseline["cost"] - projected["cost"], 2) if baseline else None,
+        "replaced_layers": current.pump_layers(),
+        "schedule": schedule,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", required=True, help="optimizer config JSON (volume, flows, tariff)")
+    parser.add_argument("--power-log", default=os.getenv("AQUALOGIC_PUMP_POWER_FILE", ".pump-power.json"),
+                        help="logged watts per preset (default: .pump-power.json)")
+    parser.add_argument("--schedule", help="current schedule file to compare against and take cleanout from")
+    parser.add_argument("--day", type=date.fromisoformat, help="local date to plan (default: today)")
+    parser.add_argument("--write", metavar="PATH", help="write the optimized schedule here instead of only reporting")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as handle:
+            config = json.load(handle)
+        current = load_schedule_file(args.schedule) if args.schedule else None
+        report = optimize(config, load_pump_power(args.power_log), current, args.day)
+    except (OSError, json.JSONDecodeError, ScheduleConfigError) as exc:
+        parser.error(str(exc))
+    if args.write and report["replaced_layers"]:
+        parser.error(
+            "--write would drop the current schedule's pump layers "
+            f"({', '.join(report['replaced_layers'])}); remove them or review the dry run"
+        )
+    if args.write:
+        temp_path = f"{args.write}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(report["schedule"], handle, indent=2)
+            handle.write("\n")
+        os.replace(temp_path, args.write)
+        report["written"] = args.write
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
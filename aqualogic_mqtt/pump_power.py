@@ -0,0 +1,139 @@
+"""Pump power drawn at each VSP preset, logged from panel observations.
+
+The panel reports the pump's requested speed and its power draw with every
+frame. ``PumpPowerLog`` maps the speed to its preset (``PRESET_SPEEDS``)
+and keeps a running mean of the power for each preset, skipping the first
+``settle_seconds`` after a speed change while the motor ramps. The means are
+saved to ``state_file`` for the schedule optimizer (``pump_optimizer``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+from .vsp import PRESET_SPEEDS
+
+logger = logging.getLogger("aqualogic_mqtt.pump_power")
+
+_PRESET_FOR_PCT = {pct: preset for preset, pct in PRESET_SPEEDS.items()}
+
+
+def load_pump_power(path: str) -> dict[str, float]:
+    """Mean watts per preset from a saved log; empty if there is none yet."""
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    return {
+        preset: float(entry["mean_w"])
+        for preset, entry in (payload.get("presets") or {}).items()
+        if preset in PRESET_SPEEDS
+    }
+
+
+class PumpPowerLog:
+    """Running mean of observed pump power per preset."""
+
+    def __init__(
+        self,
+        *,
+        state_file: Optional[str] = ".pump-power.json",
+        settle_seconds: float = 30.0,
+        max_weight: int = 10000,
+        save_interval_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._state_file = str(state_file) if state_file else None
+        self._settle_seconds = float(settle_seconds)
+        self._max_weight = int(max_weight)
+        self._save_interval = float(save_interval_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        # preset -> [samples, mean watts]; the sample count saturates at
+        # max_weight so the mean keeps following a slowly changing pump.
+        self._presets: dict[str, list] = {}
+        self._current: Optional[str] = None
+        self._since = 0.0
+        self._dirty = False
+        self._saved_at = clock()
+        self._last_error: Optional[str] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self._state_file or not os.path.isfile(self._state_file):
+            return
+        try:
+            with open(self._state_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            for preset, entry in (payload.get("presets") or {}).items():
+                if preset in PRESET_SPEEDS:
+                    self._presets[preset] = [int(entry["samples"]), float(entry["mean_w"])]
+        except Exception as exc:
+            self._last_error = f"pump power log load failed: {exc}"
+
+    def _save_locked(self) -> None:
+        self._dirty = False
+        self._saved_at = self._clock()
+        if not self._state_file:
+            return
+        payload = {
+            "version": 1,
+            "presets": {
+                preset: {"samples": samples, "mean_w": round(mean, 1)}
+                for preset, (samples, mean) in sorted(self._presets.items())
+            },
+        }
+        try:
+            parent = os.path.dirname(os.path.abspath(self._state_file))
+            os.makedirs(parent, exist_ok=True)
+            temp_path = f"{self._state_file}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2, sort_keys=True)
+                handle.write("\n")
+            os.replace(temp_path, self._state_file)
+        except Exception as exc:
+            self._last_error = f"pump power log save failed: {exc}"
+            logger.warning("%s", self._last_error)
+
+    def observe(self, speed_pct: Optional[int], power_w: Optional[float], filter_on: bool = True) -> None:
+        """Record one frame's speed and power draw."""
+        now = self._clock()
+        preset = _PRESET_FOR_PCT.get(speed_pct) if filter_on else None
+        with self._lock:
+            if preset != self._current:
+                self._current = preset
+                self._since = now
+                return
+            if preset is None or power_w is None or now - self._since < self._settle_seconds:
+                return
+            entry = self._presets.setdefault(preset, [0, 0.0])
+            entry[0] = min(entry[0] + 1, self._max_weight)
+            entry[1] += (float(power_w) - entry[1]) / entry[0]
+            self._dirty = True
+            if now - self._saved_at >= self._save_interval:
+                self._save_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+    def watts(self) -> dict[str, float]:
+        with self._lock:
+            return {preset: mean for preset, (_samples, mean) in self._presets.items()}
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "state_file": self._state_file,
+                "presets": {
+                    preset: {"samples": samples, "mean_w": round(mean, 1)}
+                    for preset, (samples, mean) in sorted(self._presets.items())
+                },
+                "last_error": self._last_error,
+            }
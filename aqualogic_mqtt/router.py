@@ -0,0 +1,153 @@
+"""Exact-topic dispatch for inbound MQTT commands.
+
+Routes are registered once per (re)subscription, so an incoming message is a
+single dict lookup rather than a scan over every control. Each topic is also
+rate limited: a command arriving within ``min_interval_seconds`` of the last
+one dispatched on that topic is held, and any later command on the same topic
+replaces it (the latest ON/OFF wins). Held commands are released by
+``flush`` once their interval has passed; a held command that would merely
+repeat the last dispatched payload is dropped, so a burst of ON/OFF/ON ends
+up as one key sequence instead of three.
+
+That only makes sense for ON/OFF control topics. Momentary button topics are
+registered with ``min_interval_seconds=0``: every PRESS is dispatched, since
+three presses of a menu key are three key events, not one state.
+"""
+
+from __future__ import annotations
+
+import logging
+from threading import Lock
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger("aqualogic_mqtt.router")
+
+DEFAULT_MIN_INTERVAL_SECONDS = 1.0
+
+CommandHandler = Callable[[str], None]
+
+
+class _Route:
+    __slots__ = ("handler", "min_interval", "last_sent_at", "last_payload", "pending")
+
+    def __init__(self, handler: CommandHandler, min_interval: float):
+        self.handler = handler
+        self.min_interval = min_interval
+        self.last_sent_at: Optional[float] = None
+        self.last_payload: Optional[str] = None
+        self.pending: Optional[str] = None
+
+
+class CommandRouter:
+    def __init__(
+        self,
+        *,
+        min_interval_seconds: float = DEFAULT_MIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        on_pending: Optional[Callable[[], None]] = None,
+    ):
+        self._min_interval_seconds = float(min_interval_seconds)
+        self._clock = clock
+        self._on_pending = on_pending
+        self._lock = Lock()
+        self._routes: dict[str, _Route] = {}
+        self._counts = {"dispatched": 0, "coalesced": 0, "dropped": 0, "unrouted": 0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def add_route(
+        self,
+        topic: str,
+        handler: CommandHandler,
+        *,
+        min_interval_seconds: Optional[float] = None,
+    ) -> None:
+        interval = self._min_interval_seconds if min_interval_seconds is None else float(min_interval_seconds)
+        with self._lock:
+            self._routes[str(topic)] = _Route(handler, interval)
+
+    def remove_routes(self, topics) -> None:
+        with self._lock:
+            for topic in topics:
+                self._routes.pop(str(topic), None)
+
+    def topics(self) -> list[str]:
+        with self._lock:
+            return sorted(self._routes)
+
+    def dispatch(self, topic: str, payload: str) -> bool:
+        """Route one message; return False if no handler owns ``topic``."""
+        now = self._clock()
+        with self._lock:
+            route = self._routes.get(topic)
+            if route is None:
+                self._counts["unrouted"] += 1
+                return False
+            if route.pending is None and (
+                route.last_sent_at is None or now - route.last_sent_at >= route.min_interval
+            ):
+                route.last_sent_at = now
+                route.last_payload = payload
+                self._counts["dispatched"] += 1
+                handler = route.handler
+            else:
+                if route.pending is not None:
+                    self._counts["coalesced"] += 1
+                route.pending = payload
+                handler = None
+        if handler is None:
+            logger.debug("Holding MQTT command on %s: %r", topic, payload)
+            if self._on_pending is not None:
+                self._on_pending()
+            return True
+        self._run(topic, handler, payload)
+        return True
+
+    def flush(self) -> int:
+        """Dispatch held commands whose interval has passed; return how many ran."""
+        now = self._clock()
+        ready = []
+        with self._lock:
+            for topic, route in self._routes.items():
+                if route.pending is None or now - route.last_sent_at < route.min_interval:
+                    continue
+                payload, route.pending = route.pending, None
+                if payload == route.last_payload:
+                    self._counts["dropped"] += 1
+                    continue
+                route.last_sent_at = now
+                route.last_payload = payload
+                self._counts["dispatched"] += 1
+                ready.append((topic, route.handler, payload))
+        for topic, handler, payload in ready:
+            self._run(topic, handler, payload)
+        return len(ready)
+
+    def next_due(self) -> Optional[float]:
+        """Seconds until the earliest held command may be released."""
+        now = self._clock()
+        with self._lock:
+            delays = [
+                route.last_sent_at + route.min_interval - now
+                for route in self._routes.values()
+                if route.pending is not None
+            ]
+        return max(0.0, min(delays)) if delays else None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "routes": len(self._routes),
+                "pending": sorted(topic for topic, route in self._routes.items() if route.pending is not None),
+                **self._counts,
+            }
+
+    @staticmethod
+    def _run(topic: str, handler: CommandHandler, payload: str) -> None:
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("MQTT command handler for %s failed", topic)
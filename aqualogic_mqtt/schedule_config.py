@@ -0,0 +1,370 @@
+"""Pump schedule definitions loaded from a JSON (or YAML) file.
+
+A schedule file replaces the built-in ``DEFAULT_PUMP_SCHEDULE``, cleanout
+window and fallback preset. Every layer may set ``pump_schedule``,
+``cleanout`` (``null`` disables it) and ``fallback_preset``; later layers
+replace earlier ones for a given local date::
+
+    {
+      "version": 1,
+      "fallback_preset": "speed4",
+      "cleanout": {"start": "09:00", "end": "10:30"},
+      "pump_schedule": [
+        {"start": "00:00", "end": "08:00", "preset": "speed4"},
+        {"start": "08:00", "end": "00:00", "preset": "speed3"}
+      ],
+      "weekdays": {"sat": {"cleanout": null}},
+      "seasons": [
+        {"name": "winter", "from": "11-01", "to": "03-31",
+         "pump_schedule": [{"start": "10:00", "end": "16:00", "preset": "speed3"}],
+         "weekdays": {"sun": {"fallback_preset": "speed4"}}}
+      ]
+    }
+
+Layer order is: top level, top-level weekday, the first matching season,
+then that season's weekday entry. Season ranges are inclusive and may wrap
+the new year. Files ending in ``.yaml``/``.yml`` need PyYAML installed;
+unquoted times such as ``10:30`` are read as text there, not as YAML 1.1
+base-60 integers.
+
+``ScheduleFileWatcher`` re-reads the file when its mtime or size changes,
+checking at most every ``check_interval_seconds``. An invalid edit is
+reported and the last good schedule stays in effect.
+"""
+
+from __future__ import annotations
+
+from datetime import date, time
+import json
+import logging
+import os
+import re
+import time as _time
+from threading import Lock
+from typing import Callable, Mapping, Optional
+
+from .automation import (
+    DEFAULT_PUMP_SCHEDULE,
+    DailyTimeline,
+    PumpWindow,
+    ScheduleResolver,
+    format_utc,
+    utc_now,
+)
+from .vsp import PRESET_SPEEDS
+
+logger = logging.getLogger("aqualogic_mqtt.schedule_config")
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_CLOCK_TEXT_RE = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?$")
+_LAYER_KEYS = {"pump_schedule", "cleanout", "fallback_preset"}
+
+
+class ScheduleConfigError(ValueError):
+    pass
+
+
+def _parse_time(value: object, where: str) -> time:
+    if isinstance(value, int) and not isinstance(value, bool):
+        raise ScheduleConfigError(f"{where}: expected HH:MM or HH:MM:SS text, got the number {value!r}")
+    try:
+        parts = [int(part) for part in str(value).split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError
+        return time(*parts)
+    except (TypeError, ValueError):
+        raise ScheduleConfigError(f"{where}: expected HH:MM or HH:MM:SS, got {value!r}") from None
+
+
+def _parse_month_day(value: object, where: str) -> tuple[int, int]:
+    try:
+        month, day = (int(part) for part in str(value).split("-"))
+        date(2024, month, day)  # leap year so 02-29 validates
+    except (TypeError, ValueError):
+        raise ScheduleConfigError(f"{where}: expected MM-DD, got {value!r}") from None
+    return month, day
+
+
+def _parse_preset(value: object, where: str) -> str:
+    text = str(value or "").strip().lower().replace(" ", "")
+    if text not in PRESET_SPEEDS:
+        raise ScheduleConfigError(f"{where}: preset must be one of {', '.join(PRESET_SPEEDS)}")
+    return text
+
+
+def _parse_layer(raw: object, where: str, extra_keys: set[str] = frozenset()) -> dict:
+    if not isinstance(raw, Mapping):
+        raise ScheduleConfigError(f"{where}: expected an object")
+    unknown = set(raw) - _LAYER_KEYS - extra_keys
+    if unknown:
+        raise ScheduleConfigError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+    layer: dict = {}
+    if "pump_schedule" in raw:
+        windows = raw["pump_schedule"]
+        if not isinstance(windows, list):
+            raise ScheduleConfigError(f"{where}.pump_schedule: expected a list")
+        parsed = []
+        for index, window in enumerate(windows):
+            item = f"{where}.pump_schedule[{index}]"
+            if not isinstance(window, Mapping) or set(window) != {"start", "end", "preset"}:
+                raise ScheduleConfigError(f"{item}: expected start, end and preset")
+            start = _parse_time(window["start"], f"{item}.start")
+            end = _parse_time(window["end"], f"{item}.end")
+            if start == end:
+                raise ScheduleConfigError(f"{item}: start and end must differ")
+            parsed.append(PumpWindow(start, end, _parse_preset(window["preset"], f"{item}.preset")))
+        layer["pump_schedule"] = tuple(parsed)
+    if "cleanout" in raw:
+        cleanout = raw["cleanout"]
+        if cleanout is None:
+            layer["cleanout"] = None
+        elif isinstance(cleanout, Mapping) and set(cleanout) == {"start", "end"}:
+            start = _parse_time(cleanout["start"], f"{where}.cleanout.start")
+            end = _parse_time(cleanout["end"], f"{where}.cleanout.end")
+            if start >= end:
+                raise ScheduleConfigError(f"{where}.cleanout: start must precede end on the same day")
+            layer["cleanout"] = (start, end)
+        else:
+            raise ScheduleConfigError(f"{where}.cleanout: expected null or start and end")
+    if "fallback_preset" in raw:
+        layer["fallback_preset"] = _parse_preset(raw["fallback_preset"], f"{where}.fallback_preset")
+    return layer
+
+
+def _format_cleanout(cleanout: Optional[tuple[time, time]]) -> Optional[dict]:
+    if cleanout is None:
+        return None
+    start, end = (value.isoformat("seconds" if value.second else "minutes") for value in cleanout)
+    return {"start": start, "end": end}
+
+
+def _parse_weekdays(raw: object, where: str) -> dict[int, dict]:
+    if raw is None:
+        return {}
+    if not isinstance(raw, Mapping):
+        raise ScheduleConfigError(f"{where}: expected an object keyed by weekday")
+    result = {}
+    for name, layer in raw.items():
+        key = str(name).strip().lower()[:3]
+        if key not in WEEKDAYS:
+            raise ScheduleConfigError(f"{where}: unknown weekday {name!r}")
+        result[WEEKDAYS.index(key)] = _parse_layer(layer, f"{where}.{name}")
+    return result
+
+
+class ScheduleConfig:
+    """Validated schedule definition with timelines cached per distinct day."""
+
+    def __init__(self, raw: Mapping[str, object]):
+        if not isinstance(raw, Mapping):
+            raise ScheduleConfigError("schedule: expected an object")
+        version = raw.get("version", 1)
+        if version != 1:
+            raise ScheduleConfigError(f"schedule: unsupported version {version!r}")
+        self._base = {
+            "pump_schedule": DEFAULT_PUMP_SCHEDULE,
+            "cleanout": (time(9, 0), time(10, 30)),
+            "fallback_preset": "speed4",
+        }
+        self._base.update(_parse_layer(raw, "schedule", {"version", "weekdays", "seasons"}))
+        self._weekdays = _parse_weekdays(raw.get("weekdays"), "schedule.weekdays")
+        self._seasons = []
+        seasons = raw.get("seasons") or []
+        if not isinstance(seasons, list):
+            raise ScheduleConfigError("schedule.seasons: expected a list")
+        for index, season in enumerate(seasons):
+            where = f"schedule.seasons[{index}]"
+            layer = _parse_layer(season, where, {"name", "from", "to", "weekdays"})
+            if "from" not in season or "to" not in season:
+                raise ScheduleConfigError(f"{where}: from and to are required")
+            self._seasons.append((
+                _parse_month_day(season["from"], f"{where}.from"),
+                _parse_month_day(season["to"], f"{where}.to"),
+                str(season.get("name") or f"season{index}"),
+                layer,
+                _parse_weekdays(season.get("weekdays"), f"{where}.weekdays"),
+            ))
+        self._timelines: dict[tuple, DailyTimeline] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _in_season(day: date, start: tuple[int, int], end: tuple[int, int]) -> bool:
+        current = (day.month, day.day)
+        if start <= end:
+            return start <= current <= end
+        return current >= start or current <= end
+
+    def season_for(self, day: date) -> Optional[str]:
+        for start, end, name, _layer, _weekdays in self._seasons:
+            if self._in_season(day, start, end):
+                return name
+        return None
+
+    def day_spec(self, day: date) -> tuple:
+        spec = dict(self._base)
+        spec.update(self._weekdays.get(day.weekday(), {}))
+        for start, end, _name, layer, weekdays in self._seasons:
+            if self._in_season(day, start, end):
+                spec.update(layer)
+                spec.update(weekdays.get(day.weekday(), {}))
+                break
+        return spec["pump_schedule"], spec["cleanout"], spec["fallback_preset"]
+
+    def cleanout_layers(self) -> dict:
+        """Every layer's cleanout setting, in schedule-file form.
+
+        Seasons are all kept, in order, since the first matching one wins.
+        """
+        def weekdays(table: dict[int, dict]) -> dict:
+            return {
+                WEEKDAYS[index]: {"cleanout": _format_cleanout(layer["cleanout"])}
+                for index, layer in sorted(table.items())
+                if "cleanout" in layer
+            }
+
+        result: dict = {"cleanout": _format_cleanout(self._base["cleanout"])}
+        if weekdays(self._weekdays):
+            result["weekdays"] = weekdays(self._weekdays)
+        seasons = []
+        for start, end, name, layer, season_weekdays in self._seasons:
+            entry: dict = {"name": name, "from": "%02d-%02d" % start, "to": "%02d-%02d" % end}
+            if "cleanout" in layer:
+                entry["cleanout"] = _format_cleanout(layer["cleanout"])
+            if weekdays(season_weekdays):
+                entry["weekdays"] = weekdays(season_weekdays)
+            seasons.append(entry)
+        if seasons:
+            result["seasons"] = seasons
+        return result
+
+    def pump_layers(self) -> list[str]:
+        """Weekday and season layers that change the pump schedule or fallback preset."""
+        pump_keys = {"pump_schedule", "fallback_preset"}
+        found = [f"weekdays.{WEEKDAYS[index]}" for index, layer in sorted(self._weekdays.items()) if pump_keys & set(layer)]
+        for start, end, name, layer, season_weekdays in self._seasons:
+            if pump_keys & set(layer):
+                found.append(f"seasons.{name}")
+            found.extend(
+                f"seasons.{name}.weekdays.{WEEKDAYS[index]}"
+                for index, day_layer in sorted(season_weekdays.items())
+                if pump_keys & set(day_layer)
+            )
+        return found
+
+    def timeline_for(self, day: date) -> DailyTimeline:
+        key = self.day_spec(day)
+        with self._lock:
+            timeline = self._timelines.get(key)
+            if timeline is None:
+                windows, cleanout, fallback = key
+                start, end = cleanout if cleanout is not None else (time(0), time(0))
+                timeline = DailyTimeline(windows, start, end, fallback)
+                self._timelines[key] = timeline
+            return timeline
+
+
+def _yaml_loader(yaml) -> type:
+    """``SafeLoader`` that keeps ``HH:MM[:SS]`` scalars as text."""
+
+    class ScheduleLoader(yaml.SafeLoader):
+        pass
+
+    resolvers = {key: list(value) for key, value in yaml.SafeLoader.yaml_implicit_resolvers.items()}
+    for digit in "0123456789":
+        # Checked before YAML 1.1's sexagesimal int, which reads 10:30 as 630.
+        resolvers[digit] = [("tag:yaml.org,2002:str", _CLOCK_TEXT_RE)] + resolvers.get(digit, [])
+    ScheduleLoader.yaml_implicit_resolvers = resolvers
+    return ScheduleLoader
+
+
+def load_schedule_file(path: str) -> ScheduleConfig:
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ScheduleConfigError("YAML schedule files require PyYAML; use JSON instead") from None
+        try:
+            raw = yaml.load(text, Loader=_yaml_loader(yaml))
+        except yaml.YAMLError as exc:
+            raise ScheduleConfigError(f"{path}: {exc}") from None
+    else:
+        try:
+            raw = json.loads(text)
+        except ValueError as exc:
+            raise ScheduleConfigError(f"{path}: {exc}") from None
+    return ScheduleConfig(raw)
+
+
+class ScheduleFileWatcher:
+    """Hold the last good ``ScheduleConfig`` for a file and reload on change."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        check_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = _time.monotonic,
+    ):
+        self._path = str(path)
+        self._check_interval_seconds = float(check_interval_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._signature: Optional[tuple] = None
+        self._next_check = 0.0
+        self._loaded_at_utc = None
+        self._last_error: Optional[str] = None
+        # Fail fast at startup; only later edits fall back to the last good file.
+        self._config = load_schedule_file(self._path)
+        self._signature = self._stat()
+        self._loaded_at_utc = utc_now()
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            info = os.stat(self._path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def current(self) -> ScheduleConfig:
+        now = self._clock()
+        with self._lock:
+            if now < self._next_check:
+                return self._config
+            self._next_check = now + self._check_interval_seconds
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return self._config
+            self._signature = signature
+            try:
+                self._config = load_schedule_file(self._path)
+                self._loaded_at_utc = utc_now()
+                self._last_error = None
+                logger.info("Reloaded pump schedule from %s", self._path)
+            except (OSError, ScheduleConfigError) as exc:
+                self._last_error = str(exc)
+                logger.error("Keeping previous pump schedule; %s is invalid: %s", self._path, exc)
+            return self._config
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "source": self._path,
+                "loaded_at_utc": format_utc(self._loaded_at_utc) if self._loaded_at_utc else None,
+                "last_error": self._last_error,
+            }
+
+
+class FileScheduleResolver(ScheduleResolver):
+    """``ScheduleResolver`` whose daily timelines come from a watched file."""
+
+    def __init__(self, watcher: ScheduleFileWatcher, **kwargs):
+        super().__init__(**kwargs)
+        self._watcher = watcher
+
+    def timeline_for(self, local_date: date) -> DailyTimeline:
+        return self._watcher.current().timeline_for(local_date)
+
+    def describe(self) -> dict:
+        return {**self._watcher.status(), "timezone": str(self.timezone)}
@@ -0,0 +1,107 @@
+"""Wake-up scheduling for the reconciliation loop.
+
+Reconciliation used to run on a fixed 1 Hz sleep. ``ReconcileScheduler``
+instead sleeps until the earliest computed deadline (schedule boundary, lease
+renewal, daily checkpoint, clock-sync due time, panel watchdog) or until an
+input changes and someone calls ``notify``. A short poll interval is still used
+while a menu driver is working, and ``max_sleep_seconds`` bounds every sleep
+so inputs without a change event (interlock files) are picked up eventually.
+The asyncio runtime waits with ``wait_async``, which notifications from other
+threads wake through the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from threading import Event, Lock
+from typing import Iterable, Optional
+
+
+class ReconcileScheduler:
+    def __init__(
+        self,
+        *,
+        busy_poll_seconds: float = 1.0,
+        max_sleep_seconds: float = 15.0,
+        min_sleep_seconds: float = 0.05,
+    ):
+        self._busy_poll_seconds = float(busy_poll_seconds)
+        self._max_sleep_seconds = float(max_sleep_seconds)
+        self._min_sleep_seconds = float(min_sleep_seconds)
+        self._event = Event()
+        self._lock = Lock()
+        self._reasons: set[str] = set()
+        self._wakeups: dict[str, int] = {}
+        self._last_delay: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_event: Optional[asyncio.Event] = None
+
+    def notify(self, reason: str = "event") -> None:
+        """Request a reconciliation pass as soon as possible (thread-safe)."""
+        with self._lock:
+            self._reasons.add(str(reason))
+            loop, async_event = self._loop, self._async_event
+        self._event.set()
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(async_event.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def next_delay(self, delays: Iterable[Optional[float]], *, busy: bool = False) -> float:
+        """Return seconds until the earliest of ``delays`` within the poll bounds.
+
+        ``None`` entries mean "no deadline"; past deadlines clamp to the minimum
+        sleep so a persistently overdue input cannot spin the loop.
+        """
+        delay = self._max_sleep_seconds
+        if busy:
+            delay = min(delay, self._busy_poll_seconds)
+        for candidate in delays:
+            if candidate is not None:
+                delay = min(delay, float(candidate))
+        return max(self._min_sleep_seconds, delay)
+
+    def wait(self, delay: float) -> frozenset[str]:
+        """Sleep up to ``delay`` seconds or until notified; return why we woke."""
+        with self._lock:
+            self._last_delay = float(delay)
+        self._event.wait(max(0.0, float(delay)))
+        self._event.clear()
+        return self._take_reasons()
+
+    async def wait_async(self, delay: float) -> frozenset[str]:
+        """``wait`` for the event loop: sleeps without tying up a thread."""
+        with self._lock:
+            self._last_delay = float(delay)
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                self._async_event = asyncio.Event()
+            async_event = self._async_event
+            if self._reasons:
+                async_event.set()
+        try:
+            await asyncio.wait_for(async_event.wait(), max(0.0, float(delay)))
+        except asyncio.TimeoutError:
+            pass
+        async_event.clear()
+        self._event.clear()
+        return self._take_reasons()
+
+    def _take_reasons(self) -> frozenset[str]:
+        with self._lock:
+            reasons = frozenset(self._reasons) or frozenset({"timer"})
+            self._reasons.clear()
+            for reason in reasons:
+                self._wakeups[reason] = self._wakeups.get(reason, 0) + 1
+        return reasons
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "busy_poll_seconds": self._busy_poll_seconds,
+                "max_sleep_seconds": self._max_sleep_seconds,
+                "last_delay_sec": self._last_delay,
+                "pending": sorted(self._reasons),
+                "wakeups": dict(self._wakeups),
+            }
@@ -0,0 +1,113 @@
+"""Passive capture of PL-PLUS Settings values from the display stream.
+
+Every LCD frame passes through the panel controls, whoever is driving the
+menu: a VSP edit walking past the heater pages, a user scrolling Settings from
+the web UI or at the panel itself. The harvester classifies each frame with the
+shared menu model and keeps the latest value seen on each Settings page (heater
+targets, Filter Speed percentages, the clock, chlorinator outputs), with when it
+was seen. Drivers consult it before navigating, so a read whose answer is
+already known and fresh does not enter the menu at all.
+
+Drivers register a parser for the pages they own. A parser raises ValueError
+for a frame it cannot read (the edited field blinks off while selected), and
+that frame is ignored rather than overwriting a good value. Pages without a
+registered parser keep a percentage, On/Off or trailing number.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from .default_menu import normalize_line
+from .menu_graph import FILTER_SPEEDS, SETTINGS_ITEMS, classify_page
+
+HARVESTED_PAGES = SETTINGS_ITEMS + FILTER_SPEEDS
+
+_PERCENT_RE = re.compile(r"(\d+)\s*%\s*$")
+_ON_OFF_RE = re.compile(r"\b(on|off)\s*$", re.I)
+_NUMBER_RE = re.compile(r"\s(\d+)\s*[a-z°]*\s*$", re.I)
+
+
+def generic_value(line: object) -> object:
+    """Value shown at the end of a Settings line: percent, On/Off or number."""
+    text = normalize_line(line)
+    if match := _PERCENT_RE.search(text):
+        return int(match.group(1))
+    if match := _ON_OFF_RE.search(text):
+        return match.group(1).lower() == "on"
+    if match := _NUMBER_RE.search(text):
+        return int(match.group(1))
+    raise ValueError(f"no value on Settings line {line!r}")
+
+
+class SettingsHarvester:
+    """Latest value observed on each PL-PLUS Settings page."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = Lock()
+        self._parsers: dict[str, Callable[[str], object]] = {}
+        self._values: dict[str, dict] = {}
+        self._updates = 0
+
+    def register(self, pages: Iterable[str], parser: Callable[[str], object]) -> None:
+        """Read ``pages`` with ``parser`` instead of the generic value."""
+        with self._lock:
+            for page in pages:
+                self._parsers[page] = parser
+
+    def observe_display(self, lines: object) -> int:
+        """Record every readable Settings line; returns how many were recorded."""
+        values = lines if isinstance(lines, (list, tuple)) else [lines]
+        recorded = 0
+        for line in values:
+            page = classify_page(line)
+            if page not in HARVESTED_PAGES:
+                continue
+            with self._lock:
+                parser = self._parsers.get(page, generic_value)
+            try:
+                value = parser(str(line))
+            except (ValueError, IndexError):
+                continue
+            self.record(page, value, line)
+            recorded += 1
+        return recorded
+
+    def record(self, page: str, value: object, line: object = "") -> None:
+        """Store a value a driver read (or wrote and verified) on ``page``."""
+        with self._lock:
+            self._values[page] = {
+                "value": value,
+                "line": normalize_line(line),
+                "observed_at": self._clock(),
+            }
+            self._updates += 1
+
+    def get(self, page: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """The entry for ``page`` if seen within ``max_age`` seconds, else None."""
+        with self._lock:
+            entry = self._values.get(page)
+            if entry is None:
+                return None
+            if max_age is not None and self._clock() - entry["observed_at"] > max_age:
+                return None
+            return dict(entry)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            return {
+                "values": {
+                    page: {
+                        "value": entry["value"],
+                        "line": entry["line"],
+                        "age_sec": round(now - entry["observed_at"], 1),
+                    }
+                    for page, entry in sorted(self._values.items())
+                },
+                "updates": self._updates,
+            }
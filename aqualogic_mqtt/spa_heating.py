@@ -0,0 +1,225 @@
+"""Spa heating rate learned from logged heating sessions.
+
+While the panel is in Spa mode with the heater running, the Default Menu
+shows the Spa and air temperatures. Every ``sample_interval_seconds`` the
+model logs them. Each ``segment_seconds`` stretch of a session becomes one
+observation: the heating rate (degrees F per hour) and the water-air
+difference over that stretch. A straight line through the observations
+separates the heater's gain from the losses, which grow with the
+difference::
+
+    rate = gain - loss * (spa - air)
+
+That makes the time to reach a target a closed form (Newton heating):
+``ln((T_ss - T) / (T_ss - target)) / loss`` hours, where ``T_ss = air +
+gain / loss`` is where heating levels off. With too little spread in the
+observed differences, ``loss`` is taken as 0 and the mean rate is used.
+Segments are kept in ``state_file``, so the model improves across restarts.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import json
+import logging
+import math
+import os
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+from .automation import format_utc, parse_utc, utc_now
+
+logger = logging.getLogger("aqualogic_mqtt.spa_heating")
+
+
+class SpaHeatingModel:
+    """Gain/loss fit over logged Spa heating sessions."""
+
+    def __init__(
+        self,
+        *,
+        state_file: Optional[str] = ".spa-heating.json",
+        sample_interval_seconds: float = 60.0,
+        segment_seconds: float = 900.0,
+        max_gap_seconds: float = 300.0,
+        min_segments: int = 3,
+        min_delta_spread_f: float = 5.0,
+        max_segments: int = 400,
+        clock: Callable[[], float] = time.time,
+        now: Callable[[], datetime] = utc_now,
+    ):
+        self._state_file = str(state_file) if state_file else None
+        self._sample_interval = float(sample_interval_seconds)
+        self._segment_seconds = float(segment_seconds)
+        self._max_gap = float(max_gap_seconds)
+        self._min_segments = int(min_segments)
+        self._min_delta_spread = float(min_delta_spread_f)
+        self._max_segments = int(max_segments)
+        self._clock = clock
+        self._now = now
+        self._lock = Lock()
+        # [rate F/h, spa-air F, duration s, ended epoch s]
+        self._segments: list[list[float]] = []
+        self._segment_start: Optional[tuple[float, float, float]] = None
+        self._last_sample_at: Optional[float] = None
+        self._last_heating_at: Optional[float] = None
+        self._fit: Optional[tuple[float, float]] = None
+        self._last_error: Optional[str] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self._state_file or not os.path.isfile(self._state_file):
+            return
+        try:
+            with open(self._state_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            self._segments = [[float(v) for v in segment][:4] for segment in payload.get("segments") or []]
+            self._refit_locked()
+        except Exception as exc:
+            self._last_error = f"spa heating model load failed: {exc}"
+
+    def _save_locked(self) -> None:
+        if not self._state_file:
+            return
+        payload = {"version": 1, "segments": [[round(v, 3) for v in segment] for segment in self._segments]}
+        try:
+            parent = os.path.dirname(os.path.abspath(self._state_file))
+            os.makedirs(parent, exist_ok=True)
+            temp_path = f"{self._state_file}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2, sort_keys=True)
+                handle.write("\n")
+            os.replace(temp_path, self._state_file)
+        except Exception as exc:
+            self._last_error = f"spa heating model save failed: {exc}"
+            logger.warning("%s", self._last_error)
+
+    def observe(self, menu_reader: Callable[[], dict]) -> None:
+        """Log the Default Menu values at most once per sample interval."""
+        at = self._clock()
+        if self._last_sample_at is not None and at - self._last_sample_at < self._sample_interval:
+            return
+        self._last_sample_at = at
+        values = (menu_reader() or {}).get("values") or {}
+
+        def fresh(key: str) -> object:
+            entry = values.get(key) or {}
+            return entry.get("value") if entry.get("fresh") else None
+
+        heating = fresh("poolSpaMode") == "spa" and fresh("heaterRun") is True
+        spa = fresh("spaTempF")
+        ambient = fresh("ambientF")
+        self.record(
+            float(spa) if isinstance(spa, (int, float)) else None,
+            float(ambient) if isinstance(ambient, (int, float)) else None,
+            heating,
+            at,
+        )
+
+    def record(self, spa_temp_f: Optional[float], ambient_f: Optional[float], heating: bool, at: float) -> None:
+        """Log one sample; a heating stretch of ``segment_seconds`` becomes a segment."""
+        with self._lock:
+            if not heating or spa_temp_f is None or ambient_f is None:
+                self._segment_start = None
+                return
+            start = self._segment_start
+            if start is None or at - self._last_heating_at > self._max_gap:
+                self._segment_start = (at, spa_temp_f, ambient_f)
+                self._last_heating_at = at
+                return
+            self._last_heating_at = at
+            started_at, start_spa, start_ambient = start
+            duration = at - started_at
+            if duration < self._segment_seconds:
+                return
+            rate = (spa_temp_f - start_spa) * 3600 / duration
+            delta = (spa_temp_f + start_spa) / 2 - (ambient_f + start_ambient) / 2
+            self._segments.append([rate, delta, duration, at])
+            del self._segments[: -self._max_segments]
+            self._segment_start = (at, spa_temp_f, ambient_f)
+            self._refit_locked()
+            self._save_locked()
+
+    def _refit_locked(self) -> None:
+        if len(self._segments) < self._min_segments:
+            self._fit = None
+            return
+        rates = [segment[0] for segment in self._segments]
+        deltas = [segment[1] for segment in self._segments]
+        rate_mean = sum(rates) / len(rates)
+        delta_mean = sum(deltas) / len(deltas)
+        spread = sum((d - delta_mean) ** 2 for d in deltas)
+        loss = 0.0
+        if max(deltas) - min(deltas) >= self._min_delta_spread and spread > 0:
+            slope = sum((d - delta_mean) * (r - rate_mean) for d, r in zip(deltas, rates)) / spread
+            loss = max(0.0, -slope)
+        gain = rate_mean + loss * delta_mean
+        self._fit = (gain, loss) if gain > 0 else None
+
+    def estimate(
+        self,
+        spa_temp_f: float,
+        target_f: float,
+        ambient_f: Optional[float] = None,
+        *,
+        ready_utc: Optional[object] = None,
+    ) -> dict:
+        """Minutes of heating from ``spa_temp_f`` to ``target_f`` at ``ambient_f``.
+
+        With ``ready_utc`` the answer also carries the latest preheat start
+        that reaches the target by then.
+        """
+        with self._lock:
+            fit = self._fit
+            segments = len(self._segments)
+        if fit is None:
+            raise RuntimeError(
+                f"not enough logged Spa heating to estimate ({segments} of {self._min_segments} segments)"
+            )
+        gain, loss = fit
+        spa_temp_f = float(spa_temp_f)
+        target_f = float(target_f)
+        if loss > 0 and ambient_f is None:
+            raise ValueError("ambient_f is required until the air temperature has been observed")
+        result = {
+            "ok": True,
+            "spa_temp_f": spa_temp_f,
+            "target_f": target_f,
+            "ambient_f": float(ambient_f) if ambient_f is not None else None,
+            "reachable": True,
+            "minutes": 0.0,
+            "model": self.as_dict(),
+        }
+        if spa_temp_f < target_f:
+            if loss > 0:
+                ceiling = float(ambient_f) + gain / loss
+                result["ceiling_f"] = round(ceiling, 1)
+                if target_f >= ceiling:
+                    result["reachable"] = False
+                    result["minutes"] = None
+                    return result
+                hours = math.log((ceiling - spa_temp_f) / (ceiling - target_f)) / loss
+            else:
+                hours = (target_f - spa_temp_f) / gain
+            result["minutes"] = round(hours * 60, 1)
+        now = parse_utc(self._now())
+        result["ready_at_utc"] = format_utc(now + timedelta(minutes=result["minutes"]))
+        if ready_utc is not None:
+            ready = parse_utc(ready_utc)
+            result["ready_utc"] = format_utc(ready)
+            result["preheat_start_utc"] = format_utc(ready - timedelta(minutes=result["minutes"]))
+        return result
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            fit = self._fit
+            return {
+                "state_file": self._state_file,
+                "segments": len(self._segments),
+                "min_segments": self._min_segments,
+                "gain_f_per_hour": round(fit[0], 2) if fit else None,
+                "loss_per_hour": round(fit[1], 4) if fit else None,
+                "heating": self._segment_start is not None,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,148 @@
+"""In-process reconnection for the bridge's two links: MQTT and the panel.
+
+The bridge used to exit when either link failed and rely on the container
+restart, which re-ran discovery and threw away the LCD menu cache, heater
+targets and automation state. A ``LinkSupervisor`` instead tracks one link,
+retries it forever with jittered exponential backoff, and keeps outage and
+recovery-time metrics. The links are supervised independently, so a broker
+restart does not touch the RS-485 connection and vice versa. The first
+connection goes through ``start``: if the broker or panel is not reachable at
+startup, the link begins down and is retried like any later outage.
+
+A reconnect attempt only establishes the transport; the link counts as up
+when the caller sees evidence of it (a CONNACK, fresh panel frames) and calls
+``mark_up``. Until then another attempt is made no sooner than
+``confirm_seconds`` later, so a slow-to-talk link is not torn down repeatedly.
+"""
+
+from __future__ import annotations
+
+import logging
+from threading import Lock
+import time
+from typing import Callable, Optional
+
+from .outbound import ReconnectBackoff
+
+logger = logging.getLogger("aqualogic_mqtt.supervisor")
+
+
+class LinkSupervisor:
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], None],
+        *,
+        backoff: Optional[ReconnectBackoff] = None,
+        confirm_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._connect = connect
+        self._backoff = backoff or ReconnectBackoff(min_seconds=1.0, max_seconds=30.0)
+        self._confirm_seconds = float(confirm_seconds)
+        self._clock = clock
+        self._lock = Lock()
+        self._up = True
+        self._down_since: Optional[float] = None
+        self._retry_at: Optional[float] = None
+        self._attempts = 0
+        self._outage_attempts = 0
+        self._outages = 0
+        self._last_reason: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._last_recovery: Optional[float] = None
+        self._max_recovery: Optional[float] = None
+        self._total_downtime = 0.0
+
+    def set_connect(self, connect: Callable[[], None]) -> None:
+        """Replace how the link is re-established (e.g. by another runtime)."""
+        self._connect = connect
+
+    def start(self, connect: Callable[[], None]) -> bool:
+        """Make the first connection with ``connect``; False if it failed and will be retried."""
+        try:
+            connect()
+        except Exception as exc:
+            self.start_failed(exc)
+            return False
+        return True
+
+    def start_failed(self, exc: BaseException) -> None:
+        """Record a failed first connection; ``tick`` takes over from here."""
+        self.mark_down(f"initial connect failed: {exc}")
+        with self._lock:
+            self._last_error = str(exc)
+
+    def is_up(self) -> bool:
+        with self._lock:
+            return self._up
+
+    def mark_down(self, reason: str) -> None:
+        with self._lock:
+            if not self._up:
+                return
+            now = self._clock()
+            self._up = False
+            self._down_since = now
+            self._outages += 1
+            self._outage_attempts = 0
+            self._last_reason = str(reason)
+            self._backoff.reset()
+            self._retry_at = now + self._backoff.next_delay()
+            delay = self._retry_at - now
+        logger.error("%s link down (%s); reconnecting in %.1fs", self.name, reason, delay)
+
+    def mark_up(self) -> None:
+        with self._lock:
+            if self._up:
+                return
+            recovery = self._clock() - self._down_since
+            self._up = True
+            self._down_since = None
+            self._retry_at = None
+            self._last_error = None
+            self._last_recovery = recovery
+            self._max_recovery = recovery if self._max_recovery is None else max(self._max_recovery, recovery)
+            self._total_downtime += recovery
+            attempts = self._outage_attempts
+        logger.warning("%s link recovered after %.1fs (%d attempts)", self.name, recovery, attempts)
+
+    def tick(self) -> None:
+        """Make a reconnect attempt if the link is down and one is due."""
+        with self._lock:
+            if self._up or self._retry_at is None or self._clock() < self._retry_at:
+                return
+            self._attempts += 1
+            self._outage_attempts += 1
+            # Next attempt if this one fails or never shows signs of life.
+            self._retry_at = self._clock() + self._confirm_seconds
+        try:
+            self._connect()
+        except Exception as exc:
+            with self._lock:
+                self._last_error = str(exc)
+                self._retry_at = self._clock() + self._backoff.next_delay()
+                delay = self._retry_at - self._clock()
+            logger.warning("%s reconnect failed: %s; retrying in %.1fs", self.name, exc, delay)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            if self._up or self._retry_at is None:
+                return None
+            return max(0.0, self._retry_at - self._clock())
+
+    def status(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            return {
+                "state": "up" if self._up else "down",
+                "down_for_sec": None if self._down_since is None else round(now - self._down_since, 1),
+                "outages": self._outages,
+                "reconnect_attempts": self._attempts,
+                "last_reason": self._last_reason,
+                "last_error": self._last_error,
+                "last_recovery_sec": None if self._last_recovery is None else round(self._last_recovery, 1),
+                "max_recovery_sec": None if self._max_recovery is None else round(self._max_recovery, 1),
+                "total_downtime_sec": round(self._total_downtime, 1),
+            }
@@ -10,8 +10,6 @@ broadcasts the resulting speed without turning Filter off.
 from __future__ import annotations
 
 import logging
-import json
-import os
 import re
 import time
 import uuid
@@ -22,6 +20,13 @@ from typing import Callable, Optional
 
 from aqualogic.keys import Keys
 
+from .interlocks import InterlockFile, RollbackJournal
+from .key_burst import DEFAULT_BURST_INTERVAL_SECONDS, send_burst, wait_settled
+from .key_timing import FixedKeyTiming, KeyTimingProfile
+from .lcd_arbiter import AUTOMATION, SAFETY, USER, LcdArbiter
+from .menu_graph import FILTER_SPEEDS, MenuGraph, classify_page as _page_key
+from .settings_harvest import SettingsHarvester
+
 logger = logging.getLogger("aqualogic_mqtt.vsp")
 
 PRESET_SPEEDS = {
@@ -64,37 +69,18 @@ def _normalize(value: object) -> str:
     return " ".join(str(value or "").replace("\x00", " ").lower().split())
 
 
+def _preset_percent(line: str) -> int:
+    match = _FILTER_SPEED_RE.match(_normalize(line))
+    if match is None or match.group(2) is None:
+        raise ValueError(f"no percent on Filter Speed line {line!r}")
+    return int(match.group(2))
+
+
 def _canonical_preset(value: object) -> Optional[str]:
     match = re.search(r"(?:speed|spd)\s*([1-4])", str(value or ""), re.I)
     return f"speed{match.group(1)}" if match else None
 
 
-def _page_key(value: object) -> str:
-    text = _normalize(value)
-    match = _FILTER_SPEED_RE.match(text)
-    if match:
-        return f"filter_speed{match.group(1)}"
-    if text == "settings menu":
-        return "settings_menu"
-    if text == "timers menu":
-        return "timers_menu"
-    if text == "diagnostic menu":
-        return "diagnostic_menu"
-    if text == "configuration menu-locked":
-        return "configuration_menu"
-    if text == "default menu":
-        return "default_menu"
-    if text.startswith("spa heater1"):
-        return "spa_heater"
-    if text.startswith("pool heater1"):
-        return "pool_heater"
-    if text.startswith("vsp speed settings"):
-        return "vsp_settings"
-    if text.startswith("super chlorinate"):
-        return "super_chlorinate"
-    return text
-
-
 class VspDriver:
     """Edits the active PL-PLUS VSP preset for a short, reversible lease."""
 
@@ -116,11 +102,22 @@ class VspDriver:
         key_sender: Optional[Callable[[object], None]] = None,
         display_reader: Optional[Callable[[], object]] = None,
         menu_cache_reader: Optional[Callable[[], dict]] = None,
+        on_phase_change: Optional[Callable[[str], None]] = None,
+        menu_graph: Optional[MenuGraph] = None,
+        burst_keys: bool = True,
+        burst_interval_seconds: float = DEFAULT_BURST_INTERVAL_SECONDS,
+        arbiter: Optional[LcdArbiter] = None,
+        preset_cache_seconds: float = 600.0,
+        observed_state_max_age_seconds: float = 5.0,
+        harvester: Optional[SettingsHarvester] = None,
+        key_timing: Optional[KeyTimingProfile] = None,
     ):
         self._panel = panel
         self._enabled = bool(enabled)
         self._enable_file = str(enable_file) if enable_file else None
         self._rollback_file = str(rollback_file) if rollback_file else None
+        self._enable_flag = InterlockFile(self._enable_file, clock=clock)
+        self._journal = RollbackJournal(self._rollback_file, clock=clock)
         self._clock = clock
         self._sleep = sleep
         self._default_lease_seconds = float(default_lease_seconds)
@@ -132,6 +129,16 @@ class VspDriver:
         self._key_sender = key_sender or getattr(panel, "send_key")
         self._display_reader = display_reader or (lambda: {"lines": [""]})
         self._menu_cache_reader = menu_cache_reader or (lambda: {})
+        self._on_phase_change = on_phase_change
+        self._menu_graph = menu_graph or MenuGraph()
+        self._burst_keys = bool(burst_keys)
+        self._burst_interval_seconds = float(burst_interval_seconds)
+        self._arbiter = arbiter or LcdArbiter()
+        self._preset_cache_seconds = float(preset_cache_seconds)
+        self._observed_state_max_age_seconds = float(observed_state_max_age_seconds)
+        self._harvest = harvester or SettingsHarvester(clock=clock)
+        self._harvest.register(FILTER_SPEEDS, _preset_percent)
+        self._key_timing = key_timing or FixedKeyTiming()
 
         self._lock = Lock()
         self._operation_lock = Lock()
@@ -146,9 +153,17 @@ class VspDriver:
         self._lease_expires_at: Optional[float] = None
         self._last_error: Optional[str] = None
         self._worker: Optional[Thread] = None
+        self._menu_edits_skipped = 0
+
+    def _set_phase_locked(self, phase: str) -> None:
+        changed = phase != self._phase
+        self._phase = phase
+        if changed and self._on_phase_change is not None:
+            # Listeners must not block: this runs under the driver lock.
+            self._on_phase_change(phase)
 
     def _is_enabled_locked(self) -> bool:
-        return self._enabled or bool(self._enable_file and os.path.isfile(self._enable_file))
+        return self._enabled or self._enable_flag.present()
 
     def observe(self, state: PanelPumpState) -> None:
         now = self._clock() if state.observed_at is None else float(state.observed_at)
@@ -161,6 +176,36 @@ class VspDriver:
                 observed_at=now,
             )
 
+    def _remember_preset(self, preset: str, percent: int) -> None:
+        self._harvest.record(f"filter_speed{int(preset[-1])}", percent, self._line())
+
+    def _unchanged_preset(self, target_pct: int) -> Optional[tuple[Optional[str], str]]:
+        """Return ``(active preset, reason)`` when no menu edit is needed.
+
+        The edit is redundant when the pump reported ``target_pct`` within
+        ``observed_state_max_age_seconds`` (live state goes stale in seconds)
+        or the active preset's page was last seen holding it within
+        ``preset_cache_seconds``.
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._state
+        try:
+            preset: Optional[str] = self._active_preset()
+        except VspError:
+            preset = None
+        fresh_state = (
+            state.observed_at is not None and now - state.observed_at <= self._observed_state_max_age_seconds
+        )
+        if fresh_state and state.requested_speed_pct == target_pct:
+            return preset, "observed"
+        if preset is None:
+            return None
+        cached = self._harvest.get(f"filter_speed{int(preset[-1])}", self._preset_cache_seconds)
+        if cached is not None and cached["value"] == target_pct:
+            return preset, "cached"
+        return None
+
     def _hardware_prime_active(self) -> bool:
         texts = []
         try:
@@ -236,7 +281,7 @@ class VspDriver:
                     raise VspBusyError("a persisted VSP rollback must complete before a new request")
             if not renew_existing:
                 self._operation_id = operation_id
-                self._phase = "queued"
+                self._set_phase_locked("queued")
                 self._target_name = name
                 self._target_pct = PRESET_SPEEDS[name]
                 self._edited_preset = None
@@ -276,7 +321,7 @@ class VspDriver:
                     "persisted VSP rollback target does not match the observed desired speed"
                 )
             self._operation_id = None
-            self._phase = "observed"
+            self._set_phase_locked("observed")
             self._target_name = name
             self._target_pct = target_pct
             self._edited_preset = rollback.get("preset") if rollback is not None else None
@@ -290,7 +335,7 @@ class VspDriver:
         with self._lock:
             active = self._worker is not None and self._worker.is_alive()
             if not active and self._phase == "observed":
-                self._phase = "idle"
+                self._set_phase_locked("idle")
                 self._target_pct = None
                 self._target_name = None
                 self._edited_preset = None
@@ -304,7 +349,7 @@ class VspDriver:
 
     def tick(self) -> bool:
         with self._lock:
-            enabled = self._is_enabled_locked()
+            enabled = self._enabled or self._enable_flag.present(refresh=True)
             active = self._worker is not None and self._worker.is_alive()
         if active and not enabled:
             self._cancel.set()
@@ -326,7 +371,7 @@ class VspDriver:
                 self._assert_hardware_interlocks_locked(self._clock())
                 operation_id = uuid.uuid4().hex
                 self._operation_id = operation_id
-                self._phase = "recovery_queued"
+                self._set_phase_locked("recovery_queued")
                 self._last_error = None
                 worker = Thread(
                     target=self._run_recovery,
@@ -368,7 +413,7 @@ class VspDriver:
             last = self._line()
             if predicate(last):
                 return last
-            self._sleep(self._poll_interval_seconds)
+            self._sleep(self._key_timing.poll_seconds(self._poll_interval_seconds))
         raise VspError(f"timed out waiting for PL-PLUS display (last={last!r})")
 
     def _press_until(
@@ -382,21 +427,28 @@ class VspDriver:
         last_error: Optional[Exception] = None
         for _attempt in range(self._key_retries):
             self._check_runtime_interlocks()
-            if safe_page is not None and _page_key(self._line()) != safe_page:
+            page = _page_key(self._line())
+            if safe_page is not None and page != safe_page:
                 raise VspError(
                     f"refusing {getattr(key, 'name', key)} on unexpected page "
                     f"{self._line()!r}; expected {safe_page}"
                 )
+            timeout = self._key_timing.timeout_seconds(key, page, self._key_timeout_seconds)
+            settle = self._key_timing.settle_seconds(key, page, self._key_settle_seconds)
+            started = self._clock()
             self._key_sender(key)
             try:
-                result = self._wait_for(predicate)
-                self._sleep(self._key_settle_seconds)
+                result = self._wait_for(predicate, timeout)
+                self._key_timing.observe(key, page, self._clock() - started)
+                self._sleep(settle)
                 return result
             except VspError as exc:
                 last_error = exc
+                if self._clock() - started >= timeout:
+                    self._key_timing.miss(key, page)
                 if predicate(self._line()):
                     result = self._line()
-                    self._sleep(self._key_settle_seconds)
+                    self._sleep(settle)
                     return result
                 if safe_page is not None and _page_key(self._line()) != safe_page:
                     raise VspError(
@@ -430,55 +482,16 @@ class VspDriver:
             raise VspError("current PL-PLUS pump preset is unknown")
         return preset
 
-    def _navigate_to_settings(self) -> None:
-        top_level = {
-            "settings_menu",
-            "timers_menu",
-            "diagnostic_menu",
-            "configuration_menu",
-            "default_menu",
-        }
-        for _ in range(6):
-            if _page_key(self._line()) == "settings_menu":
-                return
-            previous = _page_key(self._line())
-            self._press_until(
-                Keys.MENU,
-                lambda line, old=previous: _page_key(line) in top_level and _page_key(line) != old,
-                "a top-level menu page",
-            )
-        raise VspError("could not reach Settings Menu")
+    def _menu_press(self, key: object, predicate: Callable[[str], bool], page: str) -> str:
+        safe_page = page if self._menu_graph.knows(page) else None
+        return self._press_until(key, predicate, "the next menu page", safe_page=safe_page)
 
     def _navigate_to_preset(self, preset: str) -> int:
-        self._navigate_to_settings()
-        for source, target in (
-            ("settings_menu", "spa_heater"),
-            ("spa_heater", "pool_heater"),
-            ("pool_heater", "vsp_settings"),
-        ):
-            self._press_until(
-                Keys.RIGHT,
-                lambda line, expected=target: _page_key(line) == expected,
-                target,
-                safe_page=source,
-            )
-
-        self._press_until(
-            Keys.PLUS,
-            lambda line: _page_key(line) == "filter_speed1",
-            "Filter Speed1",
-            safe_page="vsp_settings",
-        )
         target_number = int(preset[-1])
-        for expected_number in range(2, target_number + 1):
-            self._press_until(
-                Keys.RIGHT,
-                lambda line, n=expected_number: bool(
-                    (match := _FILTER_SPEED_RE.match(_normalize(line))) and int(match.group(1)) == n
-                ),
-                f"Filter Speed{expected_number}",
-                safe_page=f"filter_speed{expected_number - 1}",
-            )
+        if not self._menu_graph.navigate(
+            f"filter_speed{target_number}", self._line, self._menu_press, on_page=self._arbiter.visit
+        ):
+            raise VspError(f"could not reach Filter Speed{target_number}")
         line = self._wait_for(
             lambda value: bool(
                 (match := _FILTER_SPEED_RE.match(_normalize(value)))
@@ -489,6 +502,7 @@ class VspDriver:
         )
         match = _FILTER_SPEED_RE.match(_normalize(line))
         assert match is not None and match.group(2) is not None
+        self._remember_preset(f"speed{target_number}", int(match.group(2)))
         return int(match.group(2))
 
     def _adjust_current_preset(
@@ -502,6 +516,10 @@ class VspDriver:
         if (target_pct - current_pct) % 5 != 0:
             raise VspError(f"target {target_pct}% is not reachable from {current_pct}% in 5% steps")
         key = Keys.PLUS if target_pct > current_pct else Keys.MINUS
+        count = abs(target_pct - current_pct) // 5
+        if self._burst_keys and count > 1:
+            current_pct = self._burst_preset(preset, key, count, target_pct)
+            key = Keys.PLUS if target_pct > current_pct else Keys.MINUS
         value = current_pct
         while value != target_pct:
             value += 5 if key == Keys.PLUS else -5
@@ -517,9 +535,47 @@ class VspDriver:
                 f"{preset} at {expected}%",
                 safe_page=f"filter_speed{int(preset[-1])}",
             )
+        self._remember_preset(preset, target_pct)
         if verify_request:
             self._wait_for(lambda _line: self._state.requested_speed_pct == target_pct, timeout=10.0)
 
+    def _burst_preset(self, preset: str, key: object, count: int, target_pct: int) -> int:
+        """Send ``count`` presses at once; return the percent the preset settles on."""
+        number = int(preset[-1])
+
+        def guard() -> None:
+            self._check_runtime_interlocks()
+            if _page_key(self._line()) != f"filter_speed{number}":
+                raise VspError(f"refusing burst edit on unexpected page {self._line()!r}")
+
+        def read() -> Optional[int]:
+            guard()
+            match = _FILTER_SPEED_RE.match(_normalize(self._line()))
+            if match is None or match.group(2) is None:
+                return None
+            return int(match.group(2))
+
+        send_burst(
+            self._key_sender,
+            key,
+            count,
+            sleep=self._sleep,
+            interval_seconds=self._burst_interval_seconds,
+            before_press=guard,
+        )
+        value = wait_settled(
+            read,
+            clock=self._clock,
+            sleep=self._sleep,
+            poll_seconds=self._poll_interval_seconds,
+            settle_seconds=self._key_settle_seconds,
+            timeout_seconds=self._key_timeout_seconds,
+        )
+        if value is None or (target_pct - value) % 5 != 0:
+            raise VspError(f"{preset} did not settle on a usable value after burst entry ({value!r})")
+        self._sleep(self._key_settle_seconds)
+        return value
+
     def _set_preset_percent(self, preset: str, target_pct: int, *, verify_request: bool) -> int:
         current_pct = self._navigate_to_preset(preset)
         self._adjust_current_preset(
@@ -531,30 +587,22 @@ class VspDriver:
         return current_pct
 
     def _rollback_pending(self) -> bool:
-        return bool(self._rollback_file and os.path.isfile(self._rollback_file))
+        return self._journal.pending()
 
     def _write_rollback(self, preset: str, original_pct: int, target_pct: int) -> None:
         if not self._rollback_file:
             return
-        payload = {
+        self._journal.write({
             "preset": preset,
             "original_pct": original_pct,
             "target_pct": target_pct,
             "created_at_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-        }
-        temp_path = f"{self._rollback_file}.tmp"
-        with open(temp_path, "w", encoding="utf-8") as handle:
-            json.dump(payload, handle, sort_keys=True)
-            handle.write("\n")
-            handle.flush()
-            os.fsync(handle.fileno())
-        os.replace(temp_path, self._rollback_file)
+        })
 
     def _read_rollback(self) -> dict:
         if not self._rollback_file:
             raise VspError("rollback journal is not configured")
-        with open(self._rollback_file, "r", encoding="utf-8") as handle:
-            payload = json.load(handle)
+        payload = self._journal.read()
         preset = _canonical_preset(payload.get("preset"))
         original_pct = payload.get("original_pct")
         if preset is None or not isinstance(original_pct, int):
@@ -562,105 +610,136 @@ class VspDriver:
         return {**payload, "preset": preset, "original_pct": original_pct}
 
     def _clear_rollback(self) -> None:
-        if not self._rollback_file:
-            return
-        try:
-            os.unlink(self._rollback_file)
-        except FileNotFoundError:
-            pass
+        self._journal.clear()
 
     def _return_to_default(self) -> None:
         # Navigation-only cleanup is safe even after a control interlock trips.
-        top_level = {
-            "settings_menu",
-            "timers_menu",
-            "diagnostic_menu",
-            "configuration_menu",
-            "default_menu",
-        }
-        for _ in range(7):
-            previous = _page_key(self._line())
-            if previous == "default_menu":
-                return
-            self._key_sender(Keys.MENU)
-            deadline = self._clock() + self._key_timeout_seconds
-            while self._clock() < deadline:
-                current = _page_key(self._line())
-                if current in top_level and current != previous:
-                    break
-                self._sleep(self._poll_interval_seconds)
+        self._menu_graph.navigate("default_menu", self._line, self._cleanup_press, on_page=self._arbiter.visit)
+
+    def _cleanup_press(self, key: object, predicate: Callable[[str], bool], _page: str) -> str:
+        self._key_sender(key)
+        deadline = self._clock() + self._key_timeout_seconds
+        while self._clock() < deadline:
+            line = self._line()
+            if predicate(line):
+                return line
+            self._sleep(self._poll_interval_seconds)
+        return self._line()
 
     def _run_lease(self, target_pct: int, duration: float, source: str) -> None:
-        del source  # retained in the API contract for later priority integration
+        priority = USER if source == "manual" else AUTOMATION
         active_preset: Optional[str] = None
         original_pct: Optional[int] = None
         target_applied = False
+        in_menu = False
         with self._operation_lock:
             try:
+                unchanged = self._unchanged_preset(target_pct)
+                if unchanged is not None:
+                    # Already in effect: hold the lease without opening the menu.
+                    active_preset, reason = unchanged
+                    original_pct = target_pct
+                    logger.info("VSP target %s%% already in effect (%s); skipping menu edit", target_pct, reason)
+                    with self._lock:
+                        self._menu_edits_skipped += 1
+                        self._edited_preset = active_preset
+                        self._original_pct = original_pct
+                        self._lease_expires_at = self._clock() + duration
+                else:
+                    with self._arbiter.acquire("vsp", priority, cancel=self._cancel, page="vsp_settings") as lease:
+                        in_menu = True
+                        try:
+                            with self._lock:
+                                self._set_phase_locked("applying")
+                            active_preset = self._active_preset()
+                            original_pct = self._navigate_to_preset(active_preset)
+                            if original_pct != target_pct:
+                                self._write_rollback(active_preset, original_pct, target_pct)
+                                target_applied = True
+                            self._adjust_current_preset(
+                                active_preset,
+                                original_pct,
+                                target_pct,
+                                verify_request=True,
+                            )
+                        except Exception:
+                            # Clean up before the lease is released so no
+                            # waiter is handed a half-edited Settings page.
+                            self._recover_in_menu(active_preset, original_pct, target_applied)
+                            target_applied = in_menu = False
+                            raise
+                        with self._lock:
+                            self._edited_preset = active_preset
+                            self._original_pct = original_pct
+                            self._set_phase_locked("returning_to_default")
+                            self._lease_expires_at = self._clock() + duration
+                        lease.end_trip(self._return_to_default)
+                        in_menu = False
+                # The speed lease is held from the Default Menu; the LCD is free.
                 with self._lock:
-                    self._phase = "applying"
-                active_preset = self._active_preset()
-                original_pct = self._navigate_to_preset(active_preset)
-                if original_pct != target_pct:
-                    self._write_rollback(active_preset, original_pct, target_pct)
-                    target_applied = True
-                self._adjust_current_preset(
-                    active_preset,
-                    original_pct,
-                    target_pct,
-                    verify_request=True,
-                )
-                with self._lock:
-                    self._edited_preset = active_preset
-                    self._original_pct = original_pct
-                    self._phase = "returning_to_default"
-                    self._lease_expires_at = self._clock() + duration
-                self._return_to_default()
-                with self._lock:
-                    self._phase = "holding"
+                    self._set_phase_locked("holding")
 
                 while not self._cancel.wait(min(0.25, duration)):
                     with self._lock:
                         expires = self._lease_expires_at
-                    if expires is None or self._clock() >= expires:
+                        enabled = self._is_enabled_locked()
+                    if expires is None or self._clock() >= expires or not enabled:
                         break
                     self._check_runtime_interlocks()
 
                 if original_pct != target_pct:
-                    with self._lock:
-                        self._phase = "restoring"
-                    self._set_preset_percent(active_preset, original_pct, verify_request=True)
-                    self._clear_rollback()
+                    with self._arbiter.acquire("vsp", SAFETY, page="vsp_settings") as lease:
+                        in_menu = True
+                        with self._lock:
+                            self._set_phase_locked("restoring")
+                        try:
+                            self._set_preset_percent(active_preset, original_pct, verify_request=True)
+                            self._clear_rollback()
+                        except Exception:
+                            self._recover_in_menu(active_preset, original_pct, True)
+                            target_applied = in_menu = False
+                            raise
+                        lease.end_trip(self._return_to_default)
+                        in_menu = False
                 with self._lock:
-                    self._phase = "complete"
+                    self._set_phase_locked("complete")
                     self._last_error = None
             except Exception as exc:
                 logger.exception("VSP menu operation failed")
                 with self._lock:
-                    self._phase = "failed"
+                    self._set_phase_locked("failed")
                     self._last_error = str(exc)
-                if target_applied and active_preset and original_pct is not None and original_pct != target_pct:
-                    try:
-                        self._set_preset_percent(active_preset, original_pct, verify_request=True)
-                        self._clear_rollback()
-                    except Exception:
-                        logger.exception("VSP rollback failed")
+                # Failures inside the menu were cleaned up under their lease;
+                # this covers a failure while holding from the Default Menu.
+                rollback = target_applied and original_pct != target_pct
+                if rollback or in_menu:
+                    with self._arbiter.acquire("vsp", SAFETY):
+                        self._recover_in_menu(active_preset, original_pct, rollback)
             finally:
-                try:
-                    self._return_to_default()
-                except Exception:
-                    logger.exception("Failed to return PL-PLUS to Default Menu")
                 with self._lock:
                     self._target_pct = None
                     self._target_name = None
                     self._lease_expires_at = None
                     self._cancel.clear()
 
+    def _recover_in_menu(self, preset: Optional[str], original_pct: Optional[int], rollback: bool) -> None:
+        """Undo a partial edit and leave the menu; the caller holds the LCD lease."""
+        if rollback and preset and original_pct is not None:
+            try:
+                self._set_preset_percent(preset, original_pct, verify_request=True)
+                self._clear_rollback()
+            except Exception:
+                logger.exception("VSP rollback failed")
+        try:
+            self._return_to_default()
+        except Exception:
+            logger.exception("Failed to return PL-PLUS to Default Menu")
+
     def _run_recovery(self) -> None:
-        with self._operation_lock:
+        with self._operation_lock, self._arbiter.acquire("vsp", SAFETY):
             try:
                 with self._lock:
-                    self._phase = "recovering"
+                    self._set_phase_locked("recovering")
                 rollback = self._read_rollback()
                 active = self._active_preset()
                 self._set_preset_percent(
@@ -670,12 +749,12 @@ class VspDriver:
                 )
                 self._clear_rollback()
                 with self._lock:
-                    self._phase = "recovered"
+                    self._set_phase_locked("recovered")
                     self._last_error = None
             except Exception as exc:
                 logger.exception("Persisted VSP rollback recovery failed")
                 with self._lock:
-                    self._phase = "recovery_failed"
+                    self._set_phase_locked("recovery_failed")
                     self._last_error = str(exc)
             finally:
                 try:
@@ -693,6 +772,12 @@ class VspDriver:
                 rollback_target_pct = self._read_rollback().get("target_pct")
             except Exception:
                 pass
+        harvested = self._harvest.as_dict()["values"]
+        preset_cache = {
+            f"speed{page[-1]}": {"pct": entry["value"], "age_sec": entry["age_sec"]}
+            for page, entry in harvested.items()
+            if page in FILTER_SPEEDS
+        }
         with self._lock:
             lease_remaining = None
             if self._lease_expires_at is not None:
@@ -717,5 +802,7 @@ class VspDriver:
                 "service_mode": self._state.service_mode,
                 "hardware_priming": hardware_priming,
                 "verified": self._phase in ("holding", "observed") and self._state.requested_speed_pct == self._target_pct,
+                "preset_cache": preset_cache,
+                "menu_edits_skipped": self._menu_edits_skipped,
                 "last_error": self._last_error,
             }
@@ -4,16 +4,30 @@ import os
 import base64
 import logging
 from functools import wraps
+from typing import Callable, List, Tuple
 from flask import Flask, jsonify, request, send_from_directory
 from . import controls
 from .vsp import VspBusyError, VspDisabledError, VspInterlockError
 from .equipment import EquipmentBusyError, EquipmentError
 from .heater_targets import HeaterTargetBusyError, HeaterTargetError
 
-def _basic_auth(user: str | None, pw: str | None):
+logger = logging.getLogger("aqualogic_mqtt.webapp")
+
+# An API handler receives the decoded JSON body (empty for GET/no body) plus
+# any path parameters and returns (payload, HTTP status). Keeping handlers
+# free of framework objects lets the Flask app and the asyncio runtime serve
+# the same routes.
+ApiHandler = Callable[..., Tuple[object, int]]
+
+def basic_auth_token(user: str | None, pw: str | None) -> str | None:
     if not user or not pw:
+        return None
+    return "Basic " + base64.b64encode(f"{user}:{pw}".encode()).decode()
+
+def _basic_auth(user: str | None, pw: str | None):
+    token = basic_auth_token(user, pw)
+    if token is None:
         return lambda f: f  # no-op
-    token = "Basic " + base64.b64encode(f"{user}:{pw}".encode()).decode()
     def decorator(f):
         @wraps(f)
         def inner(*args, **kwargs):
@@ -32,252 +46,302 @@ def _enable_flask_logging(app: Flask):
         h.setLevel(logging.INFO)
         app.logger.addHandler(h)
 
-def create_app(static_dir: str | None = None, basic_user: str | None = None, basic_pass: str | None = None) -> Flask:
-    app = Flask(__name__, static_folder=None)
-    _enable_flask_logging(app)
-    require_auth = _basic_auth(basic_user, basic_pass)
+def _error(exc: Exception, status: int) -> Tuple[dict, int]:
+    return {"ok": False, "error": str(exc)}, status
 
-    # ---- API ----
-    @app.get("/api/display")
-    @require_auth
-    def api_display():
-        return jsonify(controls.get_display())
+# ---- API handlers ----
+def api_display(body: dict, panel=controls):
+    return panel.get_display(), 200
 
-    @app.get("/api/default-menu")
-    @require_auth
-    def api_default_menu():
-        return jsonify(controls.get_default_menu())
+def api_default_menu(body: dict, panel=controls):
+    return panel.get_default_menu(), 200
 
-    @app.get("/api/vsp")
-    @require_auth
-    def api_vsp_status():
-        return jsonify(controls.get_vsp_status())
+def api_menu_graph(body: dict, panel=controls):
+    return panel.get_menu_graph_status(), 200
 
-    @app.post("/api/vsp/speed")
-    @require_auth
-    def api_vsp_speed():
-        body = request.get_json(silent=True) or {}
-        preset = body.get("preset")
-        if not preset:
-            return jsonify({"ok": False, "error": "JSON field 'preset' is required"}), 400
-        try:
-            status = controls.request_vsp_preset(preset, body.get("lease_seconds"))
-        except ValueError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except VspDisabledError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        except VspInterlockError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        except VspBusyError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.delete("/api/vsp/speed")
-    @require_auth
-    def api_vsp_clear():
-        try:
-            status = controls.clear_vsp_target()
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status})
-
-    @app.get("/api/equipment")
-    @require_auth
-    def api_equipment_status():
-        return jsonify(controls.get_equipment_status())
+def api_settings_values(body: dict, panel=controls):
+    return panel.get_settings_values(), 200
 
-    @app.get("/api/heater-targets")
-    @require_auth
-    def api_heater_targets():
-        return jsonify(controls.get_heater_target_status())
+def api_key_timing(body: dict, panel=controls):
+    return panel.get_key_timing_status(), 200
 
-    @app.post("/api/heater-targets/refresh")
-    @require_auth
-    def api_heater_targets_refresh():
-        try:
-            status = controls.refresh_heater_targets()
-        except HeaterTargetBusyError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        except (HeaterTargetError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.post("/api/heater-targets/scan")
-    @require_auth
-    def api_heater_target_scan():
-        body = request.get_json(silent=True) or {}
-        if "body" not in body:
-            return jsonify({"ok": False, "error": "JSON field 'body' is required"}), 400
-        try:
-            status = controls.scan_heater_target(body.get("body"))
-        except (ValueError, TypeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except HeaterTargetBusyError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        except (HeaterTargetError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.get("/api/automation")
-    @require_auth
-    def api_automation_status():
-        return jsonify(controls.get_automation_status())
+def api_lcd(body: dict, panel=controls):
+    return panel.get_lcd_status(), 200
 
-    @app.post("/api/automation/manual")
-    @require_auth
-    def api_automation_manual():
-        body = request.get_json(silent=True) or {}
-        try:
-            status = controls.set_manual_override(body)
-        except (ValueError, TypeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.delete("/api/automation/manual")
-    @require_auth
-    def api_automation_manual_clear():
-        body = request.get_json(silent=True) or {}
-        try:
-            status = controls.clear_manual_override(body.get("field"))
-        except ValueError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status})
-
-    @app.get("/api/openclaw/spa")
-    @require_auth
-    def api_openclaw_spa_status():
-        status = controls.get_automation_status()
-        session = status.get("openclaw_spa_session")
-        desired = status.get("desired") or {}
-        return jsonify({
-            "ok": True,
-            "armed": session is not None,
-            "active": bool(status.get("enabled")) and desired.get("source") == "calendar" and session is not None,
-            "phase": session.get("phase") if session else None,
-            "session": session,
-            "desired": desired,
-            "automation_enabled": status.get("enabled"),
+def api_vsp_status(body: dict, panel=controls):
+    return panel.get_vsp_status(), 200
+
+def api_vsp_speed(body: dict, panel=controls):
+    preset = body.get("preset")
+    if not preset:
+        return {"ok": False, "error": "JSON field 'preset' is required"}, 400
+    try:
+        status = panel.request_vsp_preset(preset, body.get("lease_seconds"))
+    except ValueError as exc:
+        return _error(exc, 400)
+    except VspDisabledError as exc:
+        return _error(exc, 503)
+    except VspInterlockError as exc:
+        return _error(exc, 409)
+    except VspBusyError as exc:
+        return _error(exc, 409)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_vsp_clear(body: dict, panel=controls):
+    try:
+        status = panel.clear_vsp_target()
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 200
+
+def api_connections(body: dict, panel=controls):
+    return panel.get_connection_status(), 200
+
+def api_equipment_status(body: dict, panel=controls):
+    return panel.get_equipment_status(), 200
+
+def api_heater_targets(body: dict, panel=controls):
+    return panel.get_heater_target_status(), 200
+
+def api_heater_targets_refresh(body: dict, panel=controls):
+    try:
+        status = panel.refresh_heater_targets()
+    except HeaterTargetBusyError as exc:
+        return _error(exc, 409)
+    except (HeaterTargetError, RuntimeError) as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_heater_target_scan(body: dict, panel=controls):
+    if "body" not in body:
+        return {"ok": False, "error": "JSON field 'body' is required"}, 400
+    try:
+        status = panel.scan_heater_target(body.get("body"))
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except HeaterTargetBusyError as exc:
+        return _error(exc, 409)
+    except (HeaterTargetError, RuntimeError) as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_automation_status(body: dict, panel=controls):
+    return panel.get_automation_status(), 200
+
+def api_automation_manual(body: dict, panel=controls):
+    try:
+        status = panel.set_manual_override(body)
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_automation_manual_clear(body: dict, panel=controls):
+    try:
+        status = panel.clear_manual_override(body.get("field"))
+    except ValueError as exc:
+        return _error(exc, 400)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 200
+
+def api_openclaw_spa_status(body: dict, panel=controls):
+    status = panel.get_automation_status()
+    session = status.get("openclaw_spa_session")
+    desired = status.get("desired") or {}
+    return {
+        "ok": True,
+        "armed": session is not None,
+        "active": bool(status.get("enabled")) and desired.get("source") == "calendar" and session is not None,
+        "phase": session.get("phase") if session else None,
+        "session": session,
+        "desired": desired,
+        "automation_enabled": status.get("enabled"),
+    }, 200
+
+def api_openclaw_spa_estimate(body: dict, panel=controls):
+    try:
+        estimate = panel.estimate_spa_heating(body)
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return estimate, 200
+
+def api_openclaw_spa_start(body: dict, panel=controls):
+    try:
+        status = panel.activate_openclaw_spa({
+            "session_id": body.get("session_id"),
+            "phase": "spa",
         })
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
 
-    @app.post("/api/openclaw/spa")
-    @require_auth
-    def api_openclaw_spa_start():
-        body = request.get_json(silent=True) or {}
-        try:
-            status = controls.activate_openclaw_spa({
-                "session_id": body.get("session_id"),
-                "phase": "spa",
-            })
-        except (ValueError, TypeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.post("/api/openclaw/spa/prepare")
-    @require_auth
-    def api_openclaw_spa_prepare():
-        body = request.get_json(silent=True) or {}
-        try:
-            status = controls.activate_openclaw_spa({
-                "session_id": body.get("session_id"),
-                "phase": "scheduled",
-                "prep_start_utc": body.get("prep_start_utc"),
-                "preheat_start_utc": body.get("preheat_start_utc"),
-            })
-        except (ValueError, TypeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.delete("/api/openclaw/spa")
-    @require_auth
-    def api_openclaw_spa_stop():
-        body = request.get_json(silent=True) or {}
-        try:
-            status = controls.stop_openclaw_spa(body.get("session_id"))
-        except RuntimeError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
+def api_openclaw_spa_prepare(body: dict, panel=controls):
+    try:
+        status = panel.activate_openclaw_spa({
+            "session_id": body.get("session_id"),
+            "phase": "scheduled",
+            "prep_start_utc": body.get("prep_start_utc"),
+            "preheat_start_utc": body.get("preheat_start_utc"),
+        })
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
 
-    @app.post("/api/control/switch")
-    @require_auth
-    def api_control_switch():
-        body = request.get_json(silent=True) or {}
-        try:
-            result = controls.set_equipment_switch(body.get("control"), body.get("target"))
-        except ValueError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except (EquipmentError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        return jsonify(result), 202
-
-    @app.post("/api/control/mode")
-    @require_auth
-    def api_control_mode():
-        body = request.get_json(silent=True) or {}
-        if "target" not in body:
-            return jsonify({"ok": False, "error": "JSON field 'target' is required"}), 400
-        try:
-            status = controls.request_equipment_mode(body.get("target"))
-        except ValueError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except (EquipmentBusyError, EquipmentError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.post("/api/control/pump-speed")
-    @require_auth
-    def api_control_pump_speed():
-        body = request.get_json(silent=True) or {}
-        if "target" not in body:
-            return jsonify({"ok": False, "error": "JSON field 'target' is required"}), 400
-        try:
-            status = controls.request_vsp_preset(body.get("target"), body.get("lease_seconds"))
-        except ValueError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except (VspBusyError, VspDisabledError, VspInterlockError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.post("/api/control/temperature")
-    @require_auth
-    def api_control_temperature():
+def api_openclaw_spa_stop(body: dict, panel=controls):
+    try:
+        status = panel.stop_openclaw_spa(body.get("session_id"))
+    except RuntimeError as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_control_switch(body: dict, panel=controls):
+    try:
+        result = panel.set_equipment_switch(body.get("control"), body.get("target"))
+    except ValueError as exc:
+        return _error(exc, 400)
+    except (EquipmentError, RuntimeError) as exc:
+        return _error(exc, 409)
+    return result, 202
+
+def api_control_mode(body: dict, panel=controls):
+    if "target" not in body:
+        return {"ok": False, "error": "JSON field 'target' is required"}, 400
+    try:
+        status = panel.request_equipment_mode(body.get("target"))
+    except ValueError as exc:
+        return _error(exc, 400)
+    except (EquipmentBusyError, EquipmentError, RuntimeError) as exc:
+        return _error(exc, 409)
+    return {"ok": True, "status": status}, 202
+
+def api_control_pump_speed(body: dict, panel=controls):
+    if "target" not in body:
+        return {"ok": False, "error": "JSON field 'target' is required"}, 400
+    try:
+        status = panel.request_vsp_preset(body.get("target"), body.get("lease_seconds"))
+    except ValueError as exc:
+        return _error(exc, 400)
+    except (VspBusyError, VspDisabledError, VspInterlockError, RuntimeError) as exc:
+        return _error(exc, 409)
+    return {"ok": True, "status": status}, 202
+
+def api_control_temperature(body: dict, panel=controls):
+    if "body" not in body or "target_f" not in body:
+        return {"ok": False, "error": "JSON fields 'body' and 'target_f' are required"}, 400
+    try:
+        status = panel.set_heater_target(body.get("body"), body.get("target_f"))
+    except (ValueError, TypeError) as exc:
+        return _error(exc, 400)
+    except HeaterTargetBusyError as exc:
+        return _error(exc, 409)
+    except (HeaterTargetError, RuntimeError) as exc:
+        return _error(exc, 503)
+    return {"ok": True, "status": status}, 202
+
+def api_keypress(body: dict, keyname: str, panel=controls):
+    ok = panel.enqueue_key(keyname)
+    logger.info("POST /api/key/%s -> queued=%s", keyname, ok)
+    # Send immediately (don’t wait for next panel update)
+    try:
+        panel.drain_keypresses()
+        logger.info("controls.drain_keypresses() invoked")
+    except Exception as e:
+        logger.info("controls.drain_keypresses() error: %s", e)
+    return {"ok": bool(ok), "key": keyname}, 200
+
+def api_panels(body: dict):
+    return {"panels": controls.panel_ids()}, 200
+
+def _panel_scoped(handler: ApiHandler) -> ApiHandler:
+    """Serve ``handler`` for the panel named by the ``panel_id`` path parameter."""
+    def scoped(body: dict, panel_id: str, **params):
+        panel = controls.get_panel(panel_id)
+        if panel is None:
+            return {"ok": False, "error": f"unknown panel '{panel_id}'"}, 404
+        return handler(body, panel=panel, **params)
+    scoped.__name__ = f"{handler.__name__}_panel"
+    return scoped
+
+# Routes for the default panel.
+_PANEL_ROUTES: List[Tuple[str, str, ApiHandler]] = [
+    ("GET", "/api/display", api_display),
+    ("GET", "/api/default-menu", api_default_menu),
+    ("GET", "/api/menu-graph", api_menu_graph),
+    ("GET", "/api/lcd", api_lcd),
+    ("GET", "/api/key-timing", api_key_timing),
+    ("GET", "/api/settings-values", api_settings_values),
+    ("GET", "/api/vsp", api_vsp_status),
+    ("POST", "/api/vsp/speed", api_vsp_speed),
+    ("DELETE", "/api/vsp/speed", api_vsp_clear),
+    ("GET", "/api/equipment", api_equipment_status),
+    ("GET", "/api/connections", api_connections),
+    ("GET", "/api/heater-targets", api_heater_targets),
+    ("POST", "/api/heater-targets/refresh", api_heater_targets_refresh),
+    ("POST", "/api/heater-targets/scan", api_heater_target_scan),
+    ("GET", "/api/automation", api_automation_status),
+    ("POST", "/api/automation/manual", api_automation_manual),
+    ("DELETE", "/api/automation/manual", api_automation_manual_clear),
+    ("GET", "/api/openclaw/spa", api_openclaw_spa_status),
+    ("GET", "/api/openclaw/spa/estimate", api_openclaw_spa_estimate),
+    ("POST", "/api/openclaw/spa", api_openclaw_spa_start),
+    ("POST", "/api/openclaw/spa/prepare", api_openclaw_spa_prepare),
+    ("DELETE", "/api/openclaw/spa", api_openclaw_spa_stop),
+    ("POST", "/api/control/switch", api_control_switch),
+    ("POST", "/api/control/mode", api_control_mode),
+    ("POST", "/api/control/pump-speed", api_control_pump_speed),
+    ("POST", "/api/control/temperature", api_control_temperature),
+    ("POST", "/api/key/<keyname>", api_keypress),
+]
+
+# (method, Flask-style rule, handler). Rules use <name> path parameters. With
+# several panels, /api/panels/<panel_id>/... addresses each one and the
+# unprefixed routes keep addressing the first.
+API_ROUTES: List[Tuple[str, str, ApiHandler]] = _PANEL_ROUTES + [
+    ("GET", "/api/panels", api_panels),
+] + [
+    (method, "/api/panels/<panel_id>" + rule[len("/api"):], _panel_scoped(handler))
+    for method, rule, handler in _PANEL_ROUTES
+]
+
+def default_static_dir() -> str:
+    return os.path.join(os.path.dirname(__file__), "static")
+
+def _flask_view(handler: ApiHandler):
+    def view(**params):
         body = request.get_json(silent=True) or {}
-        if "body" not in body or "target_f" not in body:
-            return jsonify({"ok": False, "error": "JSON fields 'body' and 'target_f' are required"}), 400
-        try:
-            status = controls.set_heater_target(body.get("body"), body.get("target_f"))
-        except (ValueError, TypeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        except HeaterTargetBusyError as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 409
-        except (HeaterTargetError, RuntimeError) as exc:
-            return jsonify({"ok": False, "error": str(exc)}), 503
-        return jsonify({"ok": True, "status": status}), 202
-
-    @app.post("/api/key/<keyname>")
-    @require_auth
-    def api_keypress(keyname):
-        ok = controls.enqueue_key(keyname)
-        app.logger.info(f"POST /api/key/{keyname} -> queued={ok}")
-        # Send immediately (don’t wait for next panel update)
-        try:
-            controls.drain_keypresses()
-            app.logger.info("controls.drain_keypresses() invoked")
-        except Exception as e:
-            app.logger.info(f"controls.drain_keypresses() error: {e}")
-        return jsonify({"ok": bool(ok), "key": keyname})
+        if request.method == "GET":
+            # GET parameters arrive in the query string.
+            body = {**request.args.to_dict(), **body}
+        payload, status = handler(body, **params)
+        return jsonify(payload), status
+    return view
+
+def create_app(static_dir: str | None = None, basic_user: str | None = None, basic_pass: str | None = None) -> Flask:
+    app = Flask(__name__, static_folder=None)
+    _enable_flask_logging(app)
+    require_auth = _basic_auth(basic_user, basic_pass)
+
+    # ---- API ----
+    for method, rule, handler in API_ROUTES:
+        app.add_url_rule(
+            rule,
+            endpoint=f"{handler.__name__}_{method.lower()}",
+            view_func=require_auth(_flask_view(handler)),
+            methods=[method],
+        )
 
     # ---- Static UI ----
-    _static_dir = (static_dir or os.path.join(os.path.dirname(__file__), "static"))
+    _static_dir = (static_dir or default_static_dir())
 
     @app.get("/")
     @require_auth
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from aqualogic_mqtt.aio_runtime import AsyncRuntime, PanelByteFeed, create_aiohttp_app
+from aqualogic_mqtt.webapp import API_ROUTES, basic_auth_token, create_app
+
+
+class AiohttpApiTest(unittest.IsolatedAsyncioTestCase):
+    async def _client(self, **kwargs):
+        client = TestClient(TestServer(create_aiohttp_app(**kwargs)))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        return client
+
+    def test_route_table_matches_flask_app(self):
+        flask_rules = {
+            (rule.rule, method)
+            for rule in create_app().url_map.iter_rules()
+            for method in rule.methods
+            if rule.rule.startswith("/api/") and method in {"GET", "POST", "DELETE"}
+        }
+        self.assertEqual(flask_rules, {(rule, method) for method, rule, _ in API_ROUTES})
+
+    @patch("aqualogic_mqtt.webapp.controls.request_vsp_preset")
+    async def test_same_handlers_serve_aiohttp_requests(self, request_preset):
+        request_preset.return_value = {"phase": "queued", "target_preset": "speed2"}
+        client = await self._client()
+        response = await client.post("/api/vsp/speed", json={"preset": "speed2"})
+        self.assertEqual(response.status, 202)
+        self.assertEqual((await response.json())["status"]["target_preset"], "speed2")
+        request_preset.assert_called_once_with("speed2", None)
+
+        response = await client.post("/api/vsp/speed", json={})
+        self.assertEqual(response.status, 400)
+
+    @patch("aqualogic_mqtt.webapp.controls.drain_keypresses")
+    @patch("aqualogic_mqtt.webapp.controls.enqueue_key")
+    async def test_path_parameters_are_passed_through(self, enqueue, drain):
+        enqueue.return_value = True
+        client = await self._client()
+        response = await client.post("/api/key/menu")
+        self.assertEqual(await response.json(), {"ok": True, "key": "menu"})
+        enqueue.assert_called_once_with("menu")
+
+    async def test_basic_auth_and_static_index(self):
+        client = await self._client(basic_user="pool", basic_pass="secret")
+        auth = {"Authorization": basic_auth_token("pool", "secret")}
+        response = await client.get("/")
+        self.assertEqual(response.status, 401)
+        response = await client.get("/", headers=auth)
+        self.assertEqual(response.status, 200)
+        self.assertIn("<html", (await response.text()).lower())
+        response = await client.get("/../webapp.py", headers=auth)
+        self.assertEqual(response.status, 404)
+
+
+class PanelByteFeedTest(unittest.TestCase):
+    def test_reader_blocks_until_fed_and_sees_eof_on_close(self):
+        written = []
+        feed = PanelByteFeed(written.append)
+        received = []
+
+        def reader():
+            while True:
+                data = feed.read(1)
+                if not data:
+                    break
+                received.append(data)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        feed.feed(b"\x10\x02")
+        feed.close()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(b"".join(received), b"\x10\x02")
+
+        feed.write(bytearray(b"\x10\x03"))
+        self.assertEqual(written, [b"\x10\x03"])
+
+
+class PanelCallbackCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_of_reader_callbacks_dispatches_once(self):
+        client = MagicMock()
+        runtime = AsyncRuntime(client)
+        runtime._loop = asyncio.get_running_loop()
+
+        def burst():
+            for _ in range(50):
+                runtime._panel_changed_from_reader(client._panel)
+
+        await asyncio.get_running_loop().run_in_executor(None, burst)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        client._panel_changed.assert_called_once_with(client._panel)
+
+
+if __name__ == "__main__":
+    unittest.main()
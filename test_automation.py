@@ -2,9 +2,10 @@ import json
 import os
 import tempfile
 import unittest
-from datetime import datetime, time, timezone
+from datetime import date, datetime, time, timezone
 
 from aqualogic_mqtt.automation import (
+    DEFAULT_PUMP_SCHEDULE,
     AutomationEngine,
     ManualOverride,
     PumpWindow,
@@ -12,6 +13,7 @@ from aqualogic_mqtt.automation import (
     format_utc,
     parse_utc,
 )
+from aqualogic_mqtt.lcd_arbiter import LcdArbiter
 
 
 UTC = timezone.utc
@@ -90,6 +92,66 @@ class ScheduleResolverTest(unittest.TestCase):
         self.assertEqual(first.pump_preset, "speed4")
         self.assertEqual(second.pump_preset, "speed4")
 
+    def test_next_change_covers_schedule_and_cleanout_edges(self):
+        # 08:30 EDT -> cleanout starts at 09:00 EDT.
+        self.assertEqual(
+            format_utc(self.resolver.next_change(parse_utc("2026-06-27T12:30:00Z"))),
+            "2026-06-27T13:00:00Z",
+        )
+        # Exactly on a boundary moves to the following one (10:00 EDT).
+        self.assertEqual(
+            format_utc(self.resolver.next_change(parse_utc("2026-06-27T13:00:00Z"))),
+            "2026-06-27T14:00:00Z",
+        )
+        # 11:30 EDT -> next local midnight.
+        self.assertEqual(
+            format_utc(self.resolver.next_change(parse_utc("2026-06-27T15:30:00Z"))),
+            "2026-06-28T04:00:00Z",
+        )
+        # Across the spring jump the 08:00 boundary is already EDT.
+        self.assertEqual(
+            format_utc(self.resolver.next_change(parse_utc("2026-03-08T06:30:00Z"))),
+            "2026-03-08T12:00:00Z",
+        )
+
+    def test_compiled_timeline_matches_window_scan(self):
+        schedule = DEFAULT_PUMP_SCHEDULE + (PumpWindow(time(22), time(2), "speed2"),)
+        resolver = ScheduleResolver(pump_schedule=schedule)
+        timeline = resolver.timeline_for(date(2026, 6, 27))
+        for minute in range(0, 24 * 60, 7):
+            local_time = time(minute // 60, minute % 60)
+            expected = next(
+                (window.preset for window in schedule if window.contains(local_time)), "speed4"
+            )
+            second = minute * 60
+            self.assertEqual(timeline.slot_at(second), (expected, 9 * 60 <= minute < 10 * 60 + 30))
+
+    def test_next_change_across_spring_gap_is_the_jump(self):
+        resolver = ScheduleResolver(
+            pump_schedule=(
+                PumpWindow(time(0), time(2, 30), "speed4"),
+                PumpWindow(time(2, 30), time(0), "speed3"),
+            ),
+        )
+        # 01:00 EST; local 02:30 never exists, so the change is at 03:00 EDT.
+        self.assertEqual(
+            format_utc(resolver.next_change(parse_utc("2026-03-08T06:00:00Z"))),
+            "2026-03-08T07:00:00Z",
+        )
+
+    def test_next_change_follows_repeated_fall_hour(self):
+        resolver = ScheduleResolver(
+            pump_schedule=(
+                PumpWindow(time(0), time(1, 30), "speed4"),
+                PumpWindow(time(1, 30), time(0), "speed3"),
+            ),
+        )
+        first = resolver.next_change(parse_utc("2026-11-01T05:00:00Z"))
+        self.assertEqual(format_utc(first), "2026-11-01T05:30:00Z")  # 01:30 EDT
+        back = resolver.next_change(first)
+        self.assertEqual(format_utc(back), "2026-11-01T06:00:00Z")  # wall clock returns to 01:00 EST
+        self.assertEqual(format_utc(resolver.next_change(back)), "2026-11-01T06:30:00Z")
+
     def test_utc_round_trip_and_naive_rejection(self):
         self.assertEqual(format_utc(parse_utc("2026-06-27T09:00:00-04:00")), "2026-06-27T13:00:00Z")
         with self.assertRaisesRegex(ValueError, "UTC offset"):
@@ -118,7 +180,7 @@ class FakeEquipment:
         self.calls.append(("mode", mode))
         self.state["mode"] = mode
 
-    def set_switch(self, name, target):
+    def set_switch(self, name, target, lcd_timeout_seconds=None):
         self.calls.append((name, target))
         self.state[name] = target
 
@@ -225,6 +287,47 @@ class AutomationEngineTest(unittest.TestCase):
         )
         return engine, equipment, vsp
 
+    def test_next_deadline_is_lease_renewal_or_schedule_boundary(self):
+        now = ["2026-06-27T12:30:00Z"]
+        engine, _equipment, vsp = self.make_engine(now, speed_lease_seconds=90)
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-27T13:00:00Z")
+
+        self.assertTrue(engine.tick())
+        self.assertEqual(vsp.state["phase"], "holding")
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-27T12:30:45Z")
+
+        vsp.state["lease_remaining_sec"] = 30
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-27T12:30:30Z")
+
+    def test_next_deadline_includes_calendar_prep_and_daily_release(self):
+        now = ["2026-06-27T15:30:00Z"]
+        engine, _equipment, _vsp = self.make_engine(now)
+        # 11:30 EDT: the schedule boundary is local midnight, before 03:00.
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-28T04:00:00Z")
+        engine.activate_openclaw_spa(
+            session_id="spa-1",
+            phase="scheduled",
+            prep_start_utc="2026-06-27T19:55:00Z",
+            preheat_start_utc="2026-06-27T20:00:00Z",
+        )
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-27T19:55:00Z")
+        now[0] = "2026-06-27T19:56:00Z"
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-27T20:00:00Z")
+
+        now[0] = "2026-06-28T06:30:00Z"  # 02:30 EDT
+        engine.stop_openclaw_spa()
+        self.assertEqual(format_utc(engine.next_deadline()), "2026-06-28T07:00:00Z")
+
+    def test_input_changes_notify_the_scheduler(self):
+        changes = []
+        engine, _equipment, _vsp = self.make_engine(
+            ["2026-06-27T12:30:00Z"], on_change=lambda: changes.append(True)
+        )
+        engine.set_manual(mode="spa")
+        engine.clear_manual()
+        engine.activate_openclaw_spa(session_id="spa-1")
+        self.assertEqual(len(changes), 3)
+
     def test_disabled_engine_never_writes_hardware(self):
         engine, equipment, vsp = self.make_engine(["2026-06-27T12:00:00Z"], enabled=False)
         self.assertFalse(engine.tick())
@@ -239,15 +342,28 @@ class AutomationEngineTest(unittest.TestCase):
 
     def test_heater_target_menu_work_pauses_automation(self):
         targets = FakeHeaterTargets(busy=True)
+        arbiter = LcdArbiter()
         engine, equipment, vsp = self.make_engine(
-            ["2026-06-27T12:00:00Z"], heater_targets=targets
+            ["2026-06-27T12:00:00Z"], heater_targets=targets, arbiter=arbiter
         )
         self.assertTrue(engine.hardware_busy())
-        self.assertFalse(engine.tick())
+        with arbiter.acquire("heater_targets", "user"):
+            self.assertFalse(engine.tick())
         self.assertEqual(engine.status()["phase"], "heater_target")
         self.assertEqual(equipment.calls, [])
         self.assertEqual(vsp.calls, [])
 
+    def test_relay_keys_wait_for_lcd_without_blocking_tick(self):
+        arbiter = LcdArbiter()
+        engine, equipment, _vsp = self.make_engine(["2026-06-27T12:00:00Z"], arbiter=arbiter)
+        engine.set_manual(lights=True)
+        with arbiter.acquire("vsp", "automation"):
+            self.assertFalse(engine.tick())
+            self.assertEqual(engine.status()["phase"], "waiting_for_lcd")
+        self.assertEqual(equipment.calls, [])
+        self.assertTrue(engine.tick())
+        self.assertEqual(equipment.calls, [("lights", True)])
+
     def test_service_mode_is_global_inhibit(self):
         engine, equipment, vsp = self.make_engine(["2026-06-27T12:00:00Z"])
         equipment.state["service_mode"] = True
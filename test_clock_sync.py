@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 
 from aqualogic.keys import Keys
 
+from aqualogic_mqtt.clock_drift import ClockDriftEstimator
 from aqualogic_mqtt.clock_sync import (
     ClockSyncDriver,
     clock_difference_minutes,
@@ -113,8 +114,36 @@ class ClockParsingTest(unittest.TestCase):
         self.assertEqual(display_weekday("Set Day and Time Saturday      :56A"), 5)
 
 
+class ClockDriftEstimatorTest(unittest.TestCase):
+    def test_rollovers_fit_offset_and_skew(self):
+        start = datetime(2026, 6, 27, 12, 0, 7, tzinfo=UTC)
+        estimator = ClockDriftEstimator()
+        # Controller starts 10 s fast and gains 2 s a day; frames every 7 s.
+        for step in range(0, 2 * 86400, 7):
+            host = start + timedelta(seconds=step)
+            controller = host + timedelta(seconds=10 + 2 * step / 86400)
+            estimator.observe(controller.replace(second=0, microsecond=0), host)
+        now = start + timedelta(days=2)
+        self.assertAlmostEqual(estimator.skew_seconds_per_day(), 2.0, delta=0.3)
+        self.assertAlmostEqual(estimator.offset_seconds(now), 14.0, delta=1.5)
+        crossing = estimator.crossing(45.0, now)
+        self.assertAlmostEqual((crossing - now).total_seconds() / 86400, 15.5, delta=2.5)
+        self.assertLessEqual(estimator.as_dict(now)["samples"], 2 * 144)
+
+    def test_clock_set_at_the_panel_starts_a_new_fit(self):
+        start = datetime(2026, 6, 27, 12, 0, tzinfo=UTC)
+        estimator = ClockDriftEstimator(min_fit_span_seconds=0)
+        for minute in range(0, 60, 10):
+            estimator.add_sample(start.timestamp() + minute * 60, 20.0, 1.0)
+        self.assertAlmostEqual(estimator.offset_seconds(start + timedelta(hours=1)), 20.0)
+        estimator.add_sample(start.timestamp() + 3600, -15.0, 1.0)
+        self.assertEqual(estimator.as_dict(start)["resets"], 1)
+        self.assertIsNone(estimator.skew_seconds_per_day())
+        self.assertAlmostEqual(estimator.offset_seconds(start + timedelta(hours=1)), -15.0)
+
+
 class ClockSyncDriverTest(unittest.TestCase):
-    def make_driver(self, panel, now):
+    def make_driver(self, panel, now, **kwargs):
         return ClockSyncDriver(
             key_sender=panel.send_key,
             display_reader=panel.display,
@@ -123,8 +152,10 @@ class ClockSyncDriverTest(unittest.TestCase):
             now=lambda: now[0],
             poll_interval_seconds=0.001,
             key_settle_seconds=0,
+            burst_interval_seconds=0,
             field_settle_seconds=0.001,
             key_timeout_seconds=0.1,
+            **kwargs,
         )
 
     def test_weekly_check_does_not_touch_menu_when_clock_matches(self):
@@ -149,6 +180,53 @@ class ClockSyncDriverTest(unittest.TestCase):
         self.assertEqual(panel.keys.count(Keys.PLUS), 3)
         self.assertEqual(driver.status()["phase"], "synced")
 
+    def test_sync_commits_just_after_the_next_rollover(self):
+        now = [datetime(2026, 6, 27, 14, 50, 30, tzinfo=UTC)]
+        panel = FakeClockPanel(datetime(2026, 6, 27, 10, 47))
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += timedelta(seconds=seconds)
+
+        driver = self.make_driver(panel, now, sleep=sleep)
+        self.assertTrue(driver.check_or_start())
+        self.assertTrue(wait_until(lambda: not driver.is_busy()))
+        self.assertEqual(driver.status()["phase"], "synced")
+        # The next minute is entered ahead of time and committed as it begins.
+        self.assertEqual(panel.value, datetime(2026, 6, 27, 10, 51))
+        self.assertTrue(any(29 < seconds < 31 for seconds in sleeps))
+        self.assertEqual(now[0].replace(microsecond=0), datetime(2026, 6, 27, 14, 51, tzinfo=UTC))
+
+    def test_fitted_drift_schedules_a_sync_before_the_threshold(self):
+        now = [datetime(2026, 6, 27, 14, 44, tzinfo=UTC)]
+        panel = FakeClockPanel(datetime(2026, 6, 27, 10, 44))
+        drift = ClockDriftEstimator()
+        base = now[0].timestamp()
+        # 30 s fast and gaining 3 s a day over the last two days.
+        drift.load([[base - day * 86400, 30.0 - 3 * day, 1.0] for day in (2.0, 1.5, 1.0, 0.5, 0.0)])
+        driver = self.make_driver(panel, now, drift=drift)
+
+        self.assertFalse(driver.check_or_start())
+        self.assertEqual(driver.status()["last_offset_sec"], 30.0)
+        next_due = driver.next_due(now[0])
+        self.assertLess(next_due, now[0] + timedelta(days=7))
+        self.assertAlmostEqual((next_due - now[0]).total_seconds() / 86400, 5.0, delta=0.01)
+        self.assertFalse(driver.due(now[0] + timedelta(days=4)))
+        self.assertTrue(driver.due(next_due))
+
+    def test_default_menu_rollovers_feed_the_estimator(self):
+        now = [datetime(2026, 6, 27, 14, 43, 58, tzinfo=UTC)]
+        panel = FakeClockPanel(datetime(2026, 6, 27, 10, 43))
+        driver = self.make_driver(panel, now)
+        driver.observe_display(["Saturday 10:43A", "", "", ""])
+        now[0] += timedelta(seconds=4)
+        driver.observe_display(["Set Day and Time Saturday 10:44A"])
+        driver.observe_display(["Saturday 10:44A"])
+        drift = driver.status()["drift"]
+        self.assertEqual(drift["samples"], 1)
+        self.assertEqual(drift["offset_sec"], 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from aqualogic_mqtt import compact
+from aqualogic_mqtt.messages import Messages
+
+
+class CborEncodingTest(unittest.TestCase):
+    def test_matches_rfc_8949_examples(self):
+        # Appendix A of RFC 8949.
+        examples = [
+            (0, "00"), (23, "17"), (24, "1818"), (1000, "1903e8"), (1000000, "1a000f4240"),
+            (-1, "20"), (-1000, "3903e7"), (1.1, "fb3ff199999999999a"),
+            (False, "f4"), (True, "f5"), (None, "f6"), ("a", "6161"), ("ü", "62c3bc"),
+            ([1, [2, 3]], "8201820203"), ({"a": 1, "b": [2, 3]}, "a26161016162820203"),
+        ]
+        for value, expected in examples:
+            with self.subTest(value=value):
+                self.assertEqual(compact.encode(value).hex(), expected)
+                self.assertEqual(compact.decode(bytes.fromhex(expected)), value)
+
+    def test_state_round_trip_uses_booleans_and_is_smaller_than_json(self):
+        state = dict(compact.SAMPLE_STATE, t_s=None)
+        decoded = compact.decode(compact.encode(compact.compact_state(state)))
+        self.assertIs(decoded["f"], True)
+        self.assertIs(decoded["l"], False)
+        self.assertEqual((decoded["t_p"], decoded["t_s"], decoded["sysm"]), (82, None, "Check Chlorinator"))
+        result = compact.benchmark(number=10)
+        self.assertLess(result["cbor"]["bytes"], result["json"]["bytes"])
+
+    def test_compact_topic_is_published_alongside_json(self):
+        messages = Messages(
+            identifier="aqualogic",
+            discover_prefix="homeassistant",
+            enable=["f"],
+            system_message_sensors=[],
+            compact_state=True,
+        )
+        publications = messages.get_state_publications({"cs": "OFF", "sysm": "", "f": "ON"})
+        self.assertEqual([p[0] for p in publications], [
+            "homeassistant/device/aqualogic/state",
+            "homeassistant/device/aqualogic/state/cbor",
+        ])
+        topic, payload, qos, retain = publications[1]
+        self.assertEqual(compact.decode(payload), {"cs": False, "sysm": "", "f": True})
+        self.assertEqual((qos, retain), (1, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
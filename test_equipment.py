@@ -5,6 +5,7 @@ from aqualogic.keys import Keys
 from aqualogic.states import States
 
 from aqualogic_mqtt.equipment import EquipmentController, EquipmentError
+from aqualogic_mqtt.lcd_arbiter import LcdArbiter, LcdBusyError
 
 
 class FakePanel:
@@ -211,6 +212,18 @@ class EquipmentControllerTest(unittest.TestCase):
         with self.assertRaisesRegex(EquipmentError, "Service mode"):
             EquipmentController(panel, valve_settle_seconds=0).set_switch("lights", True)
 
+    def test_switch_waits_for_menu_driver_to_release_lcd(self):
+        panel = FakePanel()
+        arbiter = LcdArbiter()
+        controller = EquipmentController(panel, valve_settle_seconds=0, arbiter=arbiter, lcd_timeout_seconds=0.05)
+        with arbiter.acquire("vsp", "automation"):
+            with self.assertRaises(LcdBusyError):
+                controller.set_switch("lights", True)
+        self.assertEqual(panel.set_calls, [])
+        controller.set_switch("lights", True)
+        self.assertEqual(panel.set_calls, [(States.LIGHTS, True)])
+        self.assertIsNone(arbiter.holder())
+
     def test_mode_reaches_explicit_spillover(self):
         panel = RejectIntermediateSpaObservationPanel()
         controller = EquipmentController(panel, poll_interval_seconds=0.001, valve_settle_seconds=0)
@@ -77,6 +77,7 @@ class HeaterTargetDriverTest(unittest.TestCase):
             poll_interval_seconds=0.001,
             key_timeout_seconds=0.2,
             key_settle_seconds=0,
+            burst_interval_seconds=0,
         )
 
     def test_uses_injected_normalized_service_mode_reader(self):
@@ -91,6 +92,7 @@ class HeaterTargetDriverTest(unittest.TestCase):
             poll_interval_seconds=0.001,
             key_timeout_seconds=0.2,
             key_settle_seconds=0,
+            burst_interval_seconds=0,
         )
         driver.request_refresh()
         self.assertEqual(wait_complete(driver)["phase"], "complete")
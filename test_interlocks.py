@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from aqualogic_mqtt import interlocks
+from aqualogic_mqtt.interlocks import InterlockFile, RollbackJournal
+
+
+class InterlockFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "enabled")
+        self.clock = [0.0]
+
+    def test_presence_is_cached_until_ttl_or_refresh(self):
+        open(self.path, "w").close()
+        flag = InterlockFile(self.path, ttl_seconds=1.0, clock=lambda: self.clock[0])
+        self.assertTrue(flag.present())
+        os.unlink(self.path)
+        with patch.object(interlocks.os.path, "isfile", wraps=os.path.isfile) as isfile:
+            self.assertTrue(flag.present())
+            isfile.assert_not_called()
+            self.assertFalse(flag.present(refresh=True))
+            open(self.path, "w").close()
+            self.clock[0] = 1.0
+            self.assertTrue(flag.present())
+            self.assertEqual(isfile.call_count, 2)
+
+    def test_unconfigured_flag_is_absent(self):
+        self.assertFalse(InterlockFile(None).present())
+
+
+class RollbackJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "rollback.json")
+        self.clock = [0.0]
+        self.journal = RollbackJournal(self.path, ttl_seconds=1.0, clock=lambda: self.clock[0])
+
+    def test_own_writes_are_served_from_memory(self):
+        self.assertFalse(self.journal.pending())
+        self.journal.write({"preset": "speed1", "original_pct": 70, "target_pct": 55})
+        with open(self.path, encoding="utf-8") as handle:
+            self.assertEqual(json.load(handle)["target_pct"], 55)
+        with patch.object(interlocks.os, "stat", wraps=os.stat) as stat:
+            for _ in range(5):
+                self.assertTrue(self.journal.pending())
+                self.assertEqual(self.journal.read()["original_pct"], 70)
+            stat.assert_not_called()
+        self.journal.clear()
+        self.assertFalse(self.journal.pending())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_external_edits_and_removal_are_seen_after_ttl(self):
+        self.journal.write({"preset": "speed1", "original_pct": 70, "target_pct": 55})
+        with open(self.path, "w", encoding="utf-8") as handle:
+            json.dump({"preset": "speed2", "original_pct": 95, "target_pct": 40, "note": "edited"}, handle)
+        self.assertEqual(self.journal.read()["preset"], "speed1")
+        self.clock[0] = 1.0
+        self.assertEqual(self.journal.read()["preset"], "speed2")
+
+        os.unlink(self.path)
+        self.assertTrue(self.journal.pending())
+        self.assertFalse(self.journal.pending(refresh=True))
+        with self.assertRaises(FileNotFoundError):
+            self.journal.read()
+
+    def test_unreadable_journal_is_pending_but_raises_on_read(self):
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write("{truncated")
+        self.assertTrue(self.journal.pending())
+        with self.assertRaises(ValueError):
+            self.journal.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from aqualogic_mqtt import key_burst
+from aqualogic_mqtt.heater_targets import HeaterTargetDriver
+from aqualogic_mqtt.key_burst import SimulatedPanel, wait_settled
+
+
+class WaitSettledTest(unittest.TestCase):
+    def test_waits_for_the_value_to_stop_changing(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        # Passing through the target (43) with presses still queued is not settled.
+        readings = iter([None, 41, 43, None, 44, 44, 44, 44])
+        settled = wait_settled(
+            lambda: next(readings), clock=lambda: now[0], sleep=sleep,
+            poll_seconds=0.1, settle_seconds=0.2, timeout_seconds=5,
+        )
+        self.assertEqual(settled, 44)
+        self.assertIsNone(
+            wait_settled(lambda: None, clock=lambda: now[0], sleep=sleep,
+                         poll_seconds=0.1, settle_seconds=0.2, timeout_seconds=1)
+        )
+
+
+class BurstBenchmarkTest(unittest.TestCase):
+    def test_burst_is_faster_with_the_same_presses(self):
+        result = key_burst.benchmark(start=14, target=43)
+        self.assertEqual(result["stepwise"]["final"], 43)
+        self.assertEqual(result["burst"]["final"], 43)
+        self.assertEqual(result["burst"]["presses"], result["stepwise"]["presses"])
+        self.assertLess(result["burst"]["seconds"], result["stepwise"]["seconds"] / 2)
+
+    def test_overshoot_is_corrected_stepwise(self):
+        result = key_burst.benchmark(start=14, target=43, repeat_every=13, modes=("burst",))
+        self.assertEqual(result["burst"]["final"], 43)
+        self.assertEqual(result["burst"]["presses"], 31)
+
+    def test_heater_target_burst_over_simulated_bus(self):
+        panel = SimulatedPanel(85, lambda value: f"Pool Heater1 {value}°F", repeat_every=5)
+        driver = HeaterTargetDriver(
+            panel,
+            key_sender=panel.send_key,
+            display_reader=panel.display,
+            service_mode_reader=lambda: False,
+            state_file=None,
+            clock=panel.clock,
+            sleep=panel.sleep,
+        )
+        self.assertEqual(driver._adjust_target("pool", 85, 78), 78)
+        self.assertEqual(panel.value(), 78)
+        self.assertEqual(panel.presses, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from aqualogic_mqtt.heater_targets import HeaterTargetDriver
+from aqualogic_mqtt.key_timing import KeyTimingProfile
+
+
+class KeyTimingProfileTest(unittest.TestCase):
+    def test_configured_waits_until_enough_samples(self):
+        profile = KeyTimingProfile(state_file=None, min_samples=5)
+        for _ in range(4):
+            profile.observe("RIGHT", "spa_heater", 0.2)
+        self.assertEqual(profile.settle_seconds("RIGHT", "spa_heater", 0.75), 0.75)
+        self.assertEqual(profile.timeout_seconds("RIGHT", "spa_heater", 6.0), 6.0)
+        self.assertEqual(profile.poll_seconds(0.1), 0.1)
+
+        # A fifth sample on another page is pooled for the same key.
+        profile.observe("RIGHT", "pool_heater", 0.2)
+        self.assertEqual(profile.settle_seconds("RIGHT", "spa_heater", 0.75), 0.3)
+        self.assertEqual(profile.timeout_seconds("RIGHT", "spa_heater", 6.0), 2.0)
+        self.assertEqual(profile.settle_seconds("PLUS", "spa_heater", 0.75), 0.75)
+        self.assertEqual(profile.poll_seconds(0.1), 0.05)
+
+    def test_slow_panel_is_capped_and_misses_restore_timeout(self):
+        profile = KeyTimingProfile(state_file=None, min_samples=3)
+        for latency in (0.5, 0.6, 1.9):
+            profile.observe("MENU", "settings", latency)
+        self.assertEqual(profile.settle_seconds("MENU", "settings", 0.75), 0.75)
+        self.assertAlmostEqual(profile.timeout_seconds("MENU", "settings", 6.0), 6.0)
+        for latency in (0.4, 0.4, 0.5):
+            profile.observe("LEFT", "settings", latency)
+        self.assertAlmostEqual(profile.settle_seconds("LEFT", "settings", 0.75), 0.5)
+        self.assertEqual(profile.timeout_seconds("LEFT", "settings", 6.0), 2.0)
+        profile.miss("LEFT", "settings")
+        self.assertEqual(profile.timeout_seconds("LEFT", "settings", 6.0), 6.0)
+        self.assertEqual(profile.as_dict()["buckets"]["LEFT@settings"]["misses"], 1)
+
+    def test_profile_persists_across_restarts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "timing.json")
+            profile = KeyTimingProfile(state_file=path, min_samples=2)
+            profile.observe("RIGHT", "clock", 0.35)
+            profile.observe("RIGHT", "clock", 0.45)
+            profile.flush()
+
+            reloaded = KeyTimingProfile(state_file=path, min_samples=2)
+            self.assertAlmostEqual(reloaded.settle_seconds("RIGHT", "clock", 0.75), 0.45)
+            self.assertEqual(reloaded.as_dict()["buckets"]["RIGHT@clock"]["samples"], 2)
+
+    def test_driver_presses_feed_the_profile(self):
+        profile = KeyTimingProfile(state_file=None)
+        lines = ["Default Menu"]
+        driver = HeaterTargetDriver(
+            None,
+            key_sender=lambda _key: lines.__setitem__(0, "Spa Heater1 101°F"),
+            display_reader=lambda: {"lines": list(lines)},
+            service_mode_reader=lambda: False,
+            state_file=None,
+            sleep=lambda _seconds: None,
+            key_timing=profile,
+        )
+        driver._press("RIGHT", lambda line: line.startswith("Spa Heater1"))
+        buckets = profile.as_dict()["buckets"]
+        self.assertEqual(list(buckets), ["RIGHT@default"])
+        self.assertEqual(buckets["RIGHT@default"]["samples"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import threading
+import time
+import unittest
+
+from aqualogic_mqtt.heater_targets import HeaterTargetDriver
+from aqualogic_mqtt.lcd_arbiter import AUTOMATION, MAINTENANCE, SAFETY, USER, LcdArbiter, LcdBusyError
+from aqualogic_mqtt.menu_graph import MenuGraph
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+class LcdArbiterTest(unittest.TestCase):
+    def test_waiters_are_served_by_priority_then_arrival(self):
+        arbiter = LcdArbiter()
+        holder = arbiter.acquire("clock_sync", MAINTENANCE)
+        granted = []
+
+        def wait(owner, priority):
+            with arbiter.acquire(owner, priority):
+                granted.append(owner)
+
+        threads = []
+        for owner, priority in (("maintenance", MAINTENANCE), ("user1", USER), ("auto", AUTOMATION), ("user2", USER)):
+            thread = threading.Thread(target=wait, args=(owner, priority))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda count=len(threads): len(arbiter.status()["waiting"]) == count)
+        self.assertTrue(holder.preempt_requested())
+        holder.release()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(granted, ["auto", "user1", "user2", "maintenance"])
+        self.assertFalse(arbiter.busy())
+
+    def test_lower_priority_waiter_does_not_preempt(self):
+        arbiter = LcdArbiter()
+        with arbiter.acquire("vsp", SAFETY) as lease:
+            with self.assertRaises(LcdBusyError):
+                arbiter.acquire("heater_targets", USER, timeout=0.05)
+            self.assertFalse(lease.preempt_requested())
+            cancel = threading.Event()
+            cancel.set()
+            with self.assertRaises(LcdBusyError):
+                arbiter.acquire("heater_targets", USER, cancel=cancel)
+            self.assertEqual(arbiter.status()["waiting"], [])
+
+    def test_abandoned_lease_expires(self):
+        now = [0.0]
+        arbiter = LcdArbiter(clock=lambda: now[0])
+        arbiter.acquire("vsp", AUTOMATION, lease_seconds=5)
+        with self.assertRaises(LcdBusyError):
+            arbiter.acquire("heater_targets", timeout=0)
+        now[0] = 6.0
+        arbiter.acquire("heater_targets", timeout=0)
+        self.assertEqual(arbiter.status()["expired_leases"], 1)
+        self.assertEqual(arbiter.holder(), "heater_targets")
+
+    def test_queued_settings_operations_share_one_trip_in_menu_order(self):
+        arbiter = LcdArbiter(menu_graph=MenuGraph())
+        holder = arbiter.acquire("heater_targets", USER, page="spa_heater")
+        arbiter.visit("pool_heater", "Pool Heater1 85°F")
+        served = []
+        returned = []
+
+        def operation(owner, page):
+            with arbiter.acquire(owner, USER, page=page) as lease:
+                served.append(owner)
+                arbiter.visit(page, "")
+                lease.end_trip(lambda: returned.append(owner))
+
+        threads = []
+        for owner, page in (("clock_sync", "clock"), ("spa", "spa_heater"), ("vsp", "vsp_settings")):
+            thread = threading.Thread(target=operation, args=(owner, page))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda count=len(threads): len(arbiter.status()["waiting"]) == count)
+
+        self.assertTrue(holder.end_trip(lambda: returned.append("heater_targets")))
+        for thread in threads:
+            thread.join(2)
+        # Nearest page first from Pool Heater1; only the last one walks home.
+        self.assertEqual(served, ["vsp", "clock_sync", "spa"])
+        self.assertEqual(returned, ["spa"])
+        status = arbiter.status()
+        self.assertEqual(status["trip_operations"], 4)
+        self.assertEqual(status["handoffs"], 3)
+
+    def test_abandoned_handoff_returns_the_menu_to_default(self):
+        arbiter = LcdArbiter(menu_graph=MenuGraph())
+        holder = arbiter.acquire("heater_targets", USER, page="spa_heater")
+        cancel = threading.Event()
+        errors = []
+
+        def wait():
+            try:
+                arbiter.acquire("vsp", AUTOMATION, page="vsp_settings", cancel=cancel)
+            except LcdBusyError as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        wait_until(lambda: arbiter.status()["waiting"])
+        returned = []
+        # Hold the arbiter's lock so the waiter sees the cancel only after the handoff.
+        with arbiter._cond:
+            cancel.set()
+            self.assertTrue(holder.end_trip(lambda: returned.append(True)))
+        thread.join(2)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(returned, [True])
+        self.assertEqual(arbiter.status()["abandoned_trip_restores"], 1)
+        self.assertFalse(arbiter.busy())
+
+    def test_heater_scan_rides_along_on_another_drivers_trip(self):
+        arbiter = LcdArbiter()
+        keys = []
+        driver = HeaterTargetDriver(
+            None,
+            key_sender=keys.append,
+            display_reader=lambda: {"lines": ["Default Menu"]},
+            service_mode_reader=lambda: False,
+            state_file=None,
+            arbiter=arbiter,
+        )
+        lease = arbiter.acquire("vsp", AUTOMATION)
+        driver.request_scan("spa")
+        wait_until(lambda: arbiter.status()["riders"])
+        # The VSP driver walks past Spa Heater1 on its way to the speed presets.
+        self.assertEqual(arbiter.visit("spa_heater", "Spa Heater1 101°F"), 1)
+        lease.release()
+        wait_until(lambda: not driver.is_busy())
+
+        status = driver.status()
+        self.assertEqual(status["phase"], "complete")
+        self.assertTrue(status["merged"])
+        self.assertEqual(status["targets"]["spa"], 101)
+        self.assertEqual(keys, [])
+        self.assertEqual(arbiter.status()["rides"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
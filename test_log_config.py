@@ -0,0 +1,86 @@
+import io
+import json
+import logging
+import unittest
+
+from aqualogic_mqtt.log_config import (
+    JsonLogFormatter,
+    configure_logging,
+    level_for_verbosity,
+    parse_level_overrides,
+)
+
+
+class LogConfigTest(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self._saved_handlers = list(root.handlers)
+        self._saved_level = root.level
+        self._touched = ["aqualogic_mqtt.vsp", "aqualogic_mqtt.client"]
+        self._saved_levels = {name: logging.getLogger(name).level for name in self._touched}
+
+    def tearDown(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self._saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self._saved_level)
+        for name, level in self._saved_levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def test_parse_overrides_accepts_short_names_and_comma_lists(self):
+        logging.getLogger("paho.mqtt.client")
+        overrides = parse_level_overrides(["vsp=DEBUG,aqualogic_mqtt.equipment=info", "paho=20", "frames=5"])
+        self.assertEqual(overrides, {
+            "aqualogic_mqtt.vsp": logging.DEBUG,
+            "aqualogic_mqtt.equipment": logging.INFO,
+            # Other libraries' top-level loggers keep their own name.
+            "paho": 20,
+            "aqualogic_mqtt.frames": 5,
+        })
+        with self.assertRaisesRegex(ValueError, "LOGGER=LEVEL"):
+            parse_level_overrides(["vsp"])
+        with self.assertRaisesRegex(ValueError, "unknown log level"):
+            parse_level_overrides(["vsp=LOUD"])
+
+    def test_subsystem_override_does_not_raise_frame_logging(self):
+        stream = io.StringIO()
+        configure_logging(
+            level_for_verbosity(0),
+            subsystem_levels={"aqualogic_mqtt.vsp": logging.DEBUG},
+            stream=stream,
+        )
+        logging.getLogger("aqualogic_mqtt.vsp").debug("vsp detail")
+        logging.getLogger("aqualogic_mqtt.client").debug("frame detail")
+        output = stream.getvalue()
+        self.assertIn("vsp detail", output)
+        self.assertNotIn("frame detail", output)
+
+    def test_json_mode_emits_structured_fields(self):
+        stream = io.StringIO()
+        configure_logging(logging.INFO, json_format=True, stream=stream)
+        logging.getLogger("aqualogic_mqtt.equipment").info(
+            "switch %s", "filter", extra={"control": "filter", "target": True}
+        )
+        payload = json.loads(stream.getvalue().strip())
+        self.assertEqual(payload["msg"], "switch filter")
+        self.assertEqual(payload["logger"], "aqualogic_mqtt.equipment")
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual(payload["control"], "filter")
+        self.assertIs(payload["target"], True)
+        self.assertTrue(payload["ts"].endswith("Z"))
+
+    def test_json_formatter_includes_exception_text(self):
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.getLogger("x").makeRecord(
+                "x", logging.ERROR, __file__, 1, "failed", (), __import__("sys").exc_info()
+            )
+        payload = json.loads(JsonLogFormatter().format(record))
+        self.assertIn("RuntimeError: boom", payload["exc"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+
+from aqualogic.keys import Keys
+
+from aqualogic_mqtt.menu_graph import MenuGraph, classify_page
+
+
+class FakeMenu:
+    TOP = ["Settings Menu", "Timers Menu", "Diagnostic Menu", "Configuration Menu-Locked", "Default Menu"]
+    SETTINGS = [
+        "Spa Heater1 102°F",
+        "Pool Heater1 Off",
+        "VSP Speed Settings + to enter",
+        "Super Chlorinate Off",
+        "Spa Chlorinator 10%",
+        "Pool Chlorinator 30%",
+        "Set Day and Time Saturday 10:43A",
+    ]
+
+    def __init__(self, screen="Default Menu", settings=None):
+        self.screen = screen
+        self.settings = list(settings or self.SETTINGS)
+        self.keys = []
+
+    def line(self):
+        return self.screen
+
+    def press(self, key, predicate, _page):
+        self.keys.append(key)
+        if key == Keys.MENU:
+            if self.screen in self.TOP:
+                self.screen = self.TOP[(self.TOP.index(self.screen) + 1) % len(self.TOP)]
+            else:
+                self.screen = "Timers Menu"
+        elif key == Keys.RIGHT:
+            if self.screen == "Settings Menu":
+                self.screen = self.settings[0]
+            elif self.screen in self.settings[:-1]:
+                self.screen = self.settings[self.settings.index(self.screen) + 1]
+        elif key == Keys.LEFT and self.screen in self.settings[1:]:
+            self.screen = self.settings[self.settings.index(self.screen) - 1]
+        assert predicate(self.screen), self.screen
+        return self.screen
+
+
+class ClassifyPageTest(unittest.TestCase):
+    def test_pages_ignore_blinking_values_and_default_rows(self):
+        self.assertEqual(classify_page("Spa Heater1"), classify_page("Spa Heater1 Manual 102°F"))
+        self.assertEqual(classify_page("Set Day and Time Saturday 10:  A"), "clock")
+        self.assertEqual(classify_page("Filter Speed2 95%"), "filter_speed2")
+        self.assertEqual(classify_page("Filter Speed 70% Speed1"), "filter speed 70% speed1")
+        self.assertEqual(classify_page("Configuration  Menu-Locked"), "configuration_menu")
+
+
+class MenuGraphTest(unittest.TestCase):
+    def test_shortest_path_follows_declared_layout(self):
+        graph = MenuGraph()
+        self.assertEqual(
+            [key for key, _page in graph.path("default_menu", "filter_speed2")],
+            [Keys.MENU, Keys.RIGHT, Keys.RIGHT, Keys.RIGHT, Keys.PLUS, Keys.RIGHT],
+        )
+        self.assertEqual(
+            graph.path("pool_heater", "default_menu"),
+            [(Keys.MENU, "timers_menu"), (Keys.MENU, "diagnostic_menu"),
+             (Keys.MENU, "configuration_menu"), (Keys.MENU, "default_menu")],
+        )
+        self.assertIsNone(graph.path("default_menu", "not a page"))
+
+    def test_navigate_presses_only_the_planned_keys(self):
+        panel = FakeMenu("Diagnostic Menu")
+        self.assertTrue(MenuGraph().navigate("pool_heater", panel.line, panel.press))
+        self.assertEqual(panel.keys, [Keys.MENU, Keys.MENU, Keys.MENU, Keys.RIGHT, Keys.RIGHT])
+
+    def test_manual_left_press_is_learned_as_a_shortcut(self):
+        graph = MenuGraph(clock=lambda: 0.0)
+        graph.note_key(Keys.LEFT, "Pool Heater1 Off")
+        graph.observe_line("Spa Heater1 102°F")
+        self.assertIn("pool_heater LEFT", graph.as_dict()["learned"])
+
+        panel = FakeMenu("Pool Heater1 Off")
+        self.assertTrue(graph.navigate("spa_heater", panel.line, panel.press))
+        self.assertEqual(panel.keys, [Keys.LEFT])
+
+    def test_ambiguous_or_late_keypresses_are_not_learned(self):
+        now = [0.0]
+        graph = MenuGraph(clock=lambda: now[0], learn_window_seconds=3.0)
+        graph.note_key(Keys.LEFT, "Pool Heater1 Off")
+        graph.note_key(Keys.LEFT, "Pool Heater1 Off")
+        graph.observe_line("Settings Menu")
+        graph.note_key(Keys.LEFT, "Pool Heater1 Off")
+        now[0] = 5.0
+        graph.observe_line("Spa Heater1 102°F")
+        self.assertEqual(graph.as_dict()["learned"], [])
+
+    def test_observed_transition_replaces_contradicting_declared_edge(self):
+        graph = MenuGraph()
+        panel = FakeMenu("Spa Heater1 102°F")
+        panel.press = lambda key, predicate, page: self._menu_to_settings(panel, key)
+        self.assertTrue(graph.navigate("settings_menu", panel.line, panel.press))
+        self.assertEqual(graph.path("spa_heater", "settings_menu"), [(Keys.MENU, "settings_menu")])
+
+    @staticmethod
+    def _menu_to_settings(panel, key):
+        panel.keys.append(key)
+        panel.screen = "Settings Menu"
+        return panel.screen
+
+    def test_unlisted_settings_are_scrolled_past(self):
+        settings = FakeMenu.SETTINGS[:-1] + ["Display Light On", FakeMenu.SETTINGS[-1]]
+        panel = FakeMenu("Default Menu", settings=settings)
+        self.assertTrue(MenuGraph().navigate("clock", panel.line, panel.press))
+        self.assertEqual(panel.keys, [Keys.MENU] + [Keys.RIGHT] * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
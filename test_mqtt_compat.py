@@ -41,6 +41,16 @@ class MqttCompatibilityTest(unittest.TestCase):
         for component_id, topic in expected.items():
             self.assertEqual(discovery["cmps"][component_id]["cmd_t"], topic)
 
+    def test_controls_expose_pending_attribute_and_ack_topic(self):
+        discovery = json.loads(self.messages.get_discovery_message())
+        component = discovery["cmps"]["aqualogic_switch_filter"]
+        self.assertEqual(component["json_attr_t"], "homeassistant/device/aqualogic/state")
+        self.assertIn("'f' in", component["json_attr_tpl"])
+        self.assertEqual(
+            self.messages.get_ack_topic("f"),
+            "homeassistant/device/aqualogic/aqualogic_switch_filter/ack",
+        )
+
     def test_existing_heater_auto_command_still_uses_set_state(self):
         panel = FakePanel()
         topic = "homeassistant/device/aqualogic/aqualogic_switch_heater_auto/set"
@@ -53,6 +63,54 @@ class MqttCompatibilityTest(unittest.TestCase):
         self.messages.handle_message_on_topic(topic, "OFF", panel)
         self.assertEqual(panel.calls, [(States.FILTER, False)])
 
+    def test_command_topics_are_exact_topic_maps(self):
+        controls_by_topic = self.messages.get_control_command_topics()
+        self.assertEqual(
+            controls_by_topic["homeassistant/device/aqualogic/aqualogic_switch_filter/set"], States.FILTER
+        )
+        self.assertEqual(len(controls_by_topic), 7)
+        buttons = self.messages.get_button_command_topics()
+        self.assertIn("homeassistant/device/aqualogic/aqualogic_button_pool_spa_toggle/set", buttons)
+        panel = FakePanel()
+        self.messages.handle_message_on_topic("other/aqualogic_switch_filter/set", "ON", panel)
+        self.assertEqual(panel.calls, [])
+
+    def test_combined_state_uses_control_qos_declared_in_discovery(self):
+        discovery = json.loads(self.messages.get_discovery_message())
+        publications = self.messages.get_state_publications({"f": "ON", "t_a": 71})
+        self.assertEqual(publications, [(
+            "homeassistant/device/aqualogic/state", json.dumps({"f": "ON", "t_a": 71}), discovery["qos"], False,
+        )])
+
+    def test_entity_state_topics_are_retained_with_per_class_qos(self):
+        messages = Messages(
+            identifier="aqualogic",
+            discover_prefix="homeassistant",
+            enable=["f", "l", "t_p"],
+            system_message_sensors=[],
+            state_topics="entity",
+        )
+        publications = messages.get_state_publications(
+            {"cs": "OFF", "sysm": "", "f": "ON", "l": "OFF", "t_p": None, "pending": []}
+        )
+        root = "homeassistant/device/aqualogic"
+        self.assertEqual(publications, [
+            (f"{root}/aqualogic_binary_sensor_check_system/state", "OFF", 0, True),
+            (f"{root}/aqualogic_sensor_system_messages/state", "", 0, True),
+            (f"{root}/aqualogic_switch_filter/state", "ON", 1, True),
+            (f"{root}/aqualogic_light_lights/state", "OFF", 1, True),
+        ])
+        discovery = json.loads(messages.get_discovery_message())
+        self.assertNotIn("stat_t", discovery)
+        lights = discovery["cmps"]["aqualogic_light_lights"]
+        self.assertEqual(lights["stat_t"], f"{root}/aqualogic_light_lights/state")
+        self.assertNotIn("stat_val_tpl", lights)
+        self.assertEqual(lights["qos"], 1)
+        self.assertEqual(lights["json_attr_t"], f"{root}/aqualogic_light_lights/ack")
+        pool_temp = discovery["cmps"]["aqualogic_sensor_pool_temperature"]
+        self.assertEqual((pool_temp["stat_t"], pool_temp["qos"]), (f"{root}/aqualogic_sensor_pool_temperature/state", 0))
+        self.assertNotIn("val_tpl", pool_temp)
+
     def test_automation_maps_existing_hubitat_topics_without_renaming(self):
         topic = "homeassistant/device/aqualogic/aqualogic_switch_filter/set"
         self.assertEqual(mqtt_automation_command(topic, "OFF"), ("switch", ("filter", False)))
@@ -64,7 +122,7 @@ class MqttCompatibilityTest(unittest.TestCase):
         automation = MagicMock()
         automation.is_enabled.return_value = True
         topic = "homeassistant/device/aqualogic/aqualogic_switch_heater_auto/set"
-        with patch.object(controls, "_automation", automation):
+        with patch.object(controls._default, "_automation", automation):
             self.assertTrue(handle_automation_mqtt(topic, "ON"))
         automation.set_pool_heat.assert_called_once_with(True)
         automation.set_manual.assert_not_called()
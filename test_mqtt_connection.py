@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+
+from paho.mqtt.reasoncodes import ReasonCode
+from paho.mqtt.packettypes import PacketTypes
+
+from aqualogic_mqtt.messages import Messages
+from aqualogic_mqtt.mqtt_connection import ConnectionPool, MqttConnection
+
+
+def panel_client(identifier):
+    client = MagicMock()
+    client._formatter = Messages(
+        identifier=identifier,
+        discover_prefix="homeassistant",
+        enable=["f"],
+        system_message_sensors=[],
+    )
+    return client
+
+
+class SharedConnectionTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = MqttConnection()
+        self.connection.paho = MagicMock()
+        self.pool = panel_client("pool")
+        self.lap = panel_client("lap")
+        self.connection.attach(self.pool)
+        self.connection.attach(self.lap)
+
+    def test_connect_sets_up_every_panel_and_one_status_route(self):
+        routes = []
+        self.pool.on_mqtt_connected.side_effect = lambda: routes.append("pool")
+        self.lap.on_mqtt_connected.side_effect = lambda: routes.append("lap")
+        self.connection._on_connect(None, None, None, ReasonCode(PacketTypes.CONNACK, "Success"), None)
+        self.assertEqual(routes, ["pool", "lap"])
+        self.assertEqual(self.connection.router.topics(), ["homeassistant/status"])
+
+        self.connection.router.dispatch("homeassistant/status", "online")
+        self.pool.publish_discovery.assert_called_once_with()
+        self.lap.publish_discovery.assert_called_once_with()
+
+    def test_broker_events_wake_every_panel(self):
+        with self.assertLogs("aqualogic_mqtt.supervisor"):
+            self.connection._on_disconnect(None, None, None, ReasonCode(PacketTypes.DISCONNECT, "Unspecified error"), None)
+        self.assertEqual(self.connection.status()["state"], "down")
+        self.pool._scheduler.notify.assert_called_with("mqtt_disconnect")
+        self.lap._scheduler.notify.assert_called_with("mqtt_disconnect")
+
+    def test_panels_joining_a_live_session_are_multiplexed_by_identifier(self):
+        self.connection._on_connect(None, None, None, ReasonCode(PacketTypes.CONNACK, "Success"), None)
+        late = panel_client("spa")
+        late.on_mqtt_connected.side_effect = lambda: self.connection.router.add_route(
+            "homeassistant/device/spa/spa_switch_filter/set", late.handle
+        )
+        self.connection.attach(late)
+        late.on_mqtt_connected.assert_called_once_with()
+        self.connection.router.dispatch("homeassistant/device/spa/spa_switch_filter/set", "ON")
+        late.handle.assert_called_once_with("ON")
+        self.assertEqual(self.connection.status()["panels"], ["pool", "lap", "spa"])
+
+        with self.assertRaises(ValueError):
+            self.connection.attach(panel_client("lap"))
+
+        self.connection.detach(late)
+        self.assertFalse(self.connection.router.dispatch("homeassistant/device/spa/spa_switch_filter/set", "OFF"))
+        self.connection.paho.unsubscribe.assert_called_once_with("homeassistant/device/spa/+/set")
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def test_same_broker_settings_share_one_connection_until_last_release(self):
+        pool = ConnectionPool(factory=lambda **settings: MagicMock(settings=settings))
+        first = pool.acquire(client_id="bridge")
+        second = pool.acquire(client_id="bridge")
+        other = pool.acquire(client_id="other")
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(pool.users(first), 2)
+
+        pool.release(first)
+        first.close.assert_not_called()
+        pool.release(second)
+        first.close.assert_called_once_with()
+        self.assertEqual(pool.users(first), 0)
+        self.assertIsNot(pool.acquire(client_id="bridge"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
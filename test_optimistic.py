@@ -0,0 +1,63 @@
+import unittest
+
+from aqualogic_mqtt.optimistic import OptimisticStates
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 50.0
+
+    def __call__(self):
+        return self.now
+
+
+class OptimisticStatesTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.states = OptimisticStates(confirmation_seconds=20.0, clock=self.clock)
+
+    def test_command_is_echoed_until_panel_confirms(self):
+        acks = self.states.command("f", "ON")
+        self.assertEqual([(key, ack["result"]) for key, ack in acks], [("f", "pending")])
+        command_id = acks[0][1]["command_id"]
+
+        state, acks = self.states.apply({"f": "OFF", "l": "OFF"})
+        self.assertEqual(state, {"f": "ON", "l": "OFF", "pending": ["f"]})
+        self.assertEqual(acks, [])
+
+        self.clock.now += 0.4
+        state, acks = self.states.apply({"f": "ON", "l": "OFF"})
+        self.assertEqual(state["pending"], [])
+        self.assertEqual(acks, [("f", {
+            "command_id": command_id,
+            "target": "ON",
+            "result": "confirmed",
+            "elapsed_ms": 400,
+        })])
+        self.assertFalse(self.states.is_pending("f"))
+
+    def test_unconfirmed_command_times_out_and_reverts(self):
+        self.states.command("l", "ON", confirmation_seconds=5.0)
+        self.clock.now += 5.0
+        state, acks = self.states.apply({"l": "OFF"})
+        self.assertEqual(state, {"l": "OFF", "pending": []})
+        self.assertEqual(acks[0][1]["result"], "timed_out")
+
+    def test_newer_command_supersedes_pending_one(self):
+        first = self.states.command("f", "ON")[0][1]["command_id"]
+        acks = self.states.command("f", "OFF")
+        self.assertEqual(
+            [(ack["command_id"] == first, ack["result"]) for _key, ack in acks],
+            [(True, "superseded"), (False, "pending")],
+        )
+        state, _acks = self.states.apply({"f": "ON"})
+        self.assertEqual(state["f"], "OFF")
+
+    def test_failed_handler_reports_failure(self):
+        self.states.command("f", "ON")
+        self.assertEqual(self.states.fail("f")[0][1]["result"], "failed")
+        self.assertEqual(self.states.fail("f"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from aqualogic_mqtt.outbound import OutboundBuffer, ReconnectBackoff
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class OutboundBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sent = []
+        self.wakeups = []
+        self.buffer = OutboundBuffer(
+            lambda *message: self.sent.append(message),
+            max_topics=3,
+            rate_per_second=2.0,
+            burst=2,
+            clock=self.clock,
+            on_pending=lambda: self.wakeups.append(True),
+        )
+
+    def test_outage_keeps_latest_payload_per_topic(self):
+        for frame in range(1000):
+            self.buffer.submit("pool/state", f"frame {frame}", 1, False)
+        self.buffer.submit("pool/filter/ack", "done")
+        self.assertEqual(self.sent, [])
+        self.assertEqual(self.buffer.pending(), 2)
+        self.assertEqual(self.buffer.status()["coalesced"], 999)
+
+        self.buffer.set_connected(True)
+        self.assertEqual(self.sent, [
+            ("pool/state", "frame 999", 1, False),
+            ("pool/filter/ack", "done", 0, False),
+        ])
+
+    def test_full_buffer_drops_least_recently_updated_topic(self):
+        for topic in ("a", "b", "c"):
+            self.buffer.submit(topic, "1")
+        self.buffer.submit("a", "2")
+        self.buffer.submit("d", "1")
+        self.assertEqual(self.buffer.status()["dropped"], 1)
+        self.buffer.set_connected(True)
+        self.clock.now += 5
+        self.buffer.drain()
+        self.assertEqual([topic for topic, *_ in self.sent], ["c", "a", "d"])
+
+    def test_token_bucket_caps_publish_rate(self):
+        self.buffer.set_connected(True)
+        for topic in ("a", "b", "c", "d"):
+            self.buffer.submit(topic, "x")
+        self.assertEqual(len(self.sent), 2)
+        self.assertTrue(self.wakeups)
+        self.assertAlmostEqual(self.buffer.next_due(), 0.5)
+
+        self.clock.now += 0.5
+        self.assertEqual(self.buffer.drain(), 1)
+        self.clock.now += 0.5
+        self.assertEqual(self.buffer.drain(), 1)
+        self.assertEqual([topic for topic, *_ in self.sent], ["a", "b", "c", "d"])
+        self.assertIsNone(self.buffer.next_due())
+
+    def test_publish_errors_are_counted_not_raised(self):
+        def fail(*message):
+            raise OSError("socket closed")
+        buffer = OutboundBuffer(fail, clock=self.clock)
+        buffer.set_connected(True)
+        with self.assertLogs("aqualogic_mqtt.outbound", level="WARNING"):
+            buffer.submit("a", "x")
+        self.assertEqual(buffer.status()["errors"], 1)
+
+
+class ReconnectBackoffTest(unittest.TestCase):
+    def test_delays_double_with_jitter_and_cap(self):
+        low = ReconnectBackoff(min_seconds=1, max_seconds=8, rng=lambda: 0.0)
+        high = ReconnectBackoff(min_seconds=1, max_seconds=8, rng=lambda: 1.0)
+        self.assertEqual([low.next_delay() for _ in range(5)], [0.5, 1.0, 2.0, 4.0, 4.0])
+        self.assertEqual([high.next_delay() for _ in range(5)], [1.0, 2.0, 4.0, 8.0, 8.0])
+        low.reset()
+        self.assertEqual((low.attempts, low.next_delay()), (0, 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+from contextlib import redirect_stderr
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from aqualogic_mqtt.pump_optimizer import main, optimize
+from aqualogic_mqtt.pump_power import PumpPowerLog, load_pump_power
+from aqualogic_mqtt.schedule_config import ScheduleConfig, ScheduleConfigError
+
+
+DAY = date(2026, 6, 27)
+CONFIG = {
+    "pool_gallons": 18000,
+    "turnovers": 3.0,
+    "flow_gpm": {"speed1": 58, "speed2": 78, "speed3": 46, "speed4": 33},
+    "tariff": {
+        "default_price": 0.14,
+        "periods": [
+            {"start": "16:00", "end": "21:00", "price": 0.31},
+            {"start": "23:00", "end": "06:00", "price": 0.08},
+        ],
+    },
+}
+WATTS = {"speed1": 1100.0, "speed2": 2400.0, "speed3": 520.0, "speed4": 230.0}
+
+
+class PumpOptimizerTest(unittest.TestCase):
+    def test_extra_volume_is_bought_in_the_cheapest_hours(self):
+        report = optimize(CONFIG, WATTS, day=DAY)
+        schedule = report["schedule"]
+        self.assertTrue(report["target_met"])
+        self.assertGreaterEqual(report["projected"]["gallons"], 54000)
+        self.assertLess(report["projected"]["gallons"], 54000 + 30 * 33)
+        self.assertEqual(schedule["fallback_preset"], "speed4")
+        # One window through the off-peak night, wrapping midnight.
+        self.assertEqual(schedule["pump_schedule"][0]["start"], "23:00")
+        self.assertEqual(schedule["pump_schedule"][0]["preset"], "speed3")
+        self.assertEqual(len(schedule["pump_schedule"]), 1)
+        self.assertLess(report["projected"]["cost"], report["current"]["cost"])
+        self.assertAlmostEqual(report["savings"], report["current"]["cost"] - report["projected"]["cost"], places=2)
+
+        timeline = ScheduleConfig(schedule).timeline_for(DAY)
+        self.assertEqual(timeline.slot_at(2 * 3600), ("speed3", False))
+        self.assertEqual(timeline.slot_at(9 * 3600 + 1800), ("speed4", True))
+        self.assertEqual(timeline.slot_at(18 * 3600), ("speed4", False))
+
+    def test_presets_off_the_flow_power_hull_are_never_scheduled(self):
+        config = dict(CONFIG, turnovers=4.0, power_w={"speed3": 900})
+        report = optimize(config, WATTS, day=DAY)
+        self.assertFalse(report["presets"]["speed3"]["on_hull"])
+        used = {window["preset"] for window in report["schedule"]["pump_schedule"]}
+        self.assertNotIn("speed3", used)
+        self.assertTrue(report["target_met"])
+
+    def test_unreachable_target_and_missing_power_are_reported(self):
+        report = optimize(dict(CONFIG, turnovers=10.0), WATTS, day=DAY)
+        self.assertFalse(report["target_met"])
+        self.assertEqual(report["schedule"]["fallback_preset"], "speed2")
+        self.assertEqual(report["schedule"]["pump_schedule"], [])
+
+        partial = optimize(CONFIG, {"speed4": 230.0, "speed3": 520.0}, day=DAY)
+        self.assertIsNone(partial["current"])
+        self.assertIsNone(partial["savings"])
+        with self.assertRaises(ScheduleConfigError):
+            optimize(CONFIG, {}, day=DAY)
+
+    def test_pool_volume_must_be_positive(self):
+        missing = {key: value for key, value in CONFIG.items() if key != "pool_gallons"}
+        for config in (missing, dict(CONFIG, pool_gallons=0), dict(CONFIG, pool_gallons="lots")):
+            with self.assertRaisesRegex(ScheduleConfigError, "pool_gallons"):
+                optimize(config, WATTS, day=DAY)
+        with self.assertRaisesRegex(ScheduleConfigError, "turnovers"):
+            optimize(dict(CONFIG, turnovers=-1), WATTS, day=DAY)
+
+    def test_every_cleanout_layer_is_carried_over(self):
+        current = ScheduleConfig({
+            "weekdays": {"sat": {"cleanout": None}},
+            "seasons": [{"name": "winter", "from": "11-01", "to": "03-31",
+                         "cleanout": {"start": "11:00", "end": "11:30"}}],
+        })
+        saturday = date(2026, 10, 24)
+        report = optimize(CONFIG, WATTS, current, day=saturday)
+        written = ScheduleConfig(report["schedule"])
+        self.assertEqual(report["replaced_layers"], [])
+        self.assertIsNone(written.day_spec(saturday)[1])
+        self.assertEqual(written.day_spec(date(2026, 10, 23))[1], current.day_spec(date(2026, 10, 23))[1])
+        self.assertEqual(written.day_spec(date(2026, 12, 2))[1], current.day_spec(date(2026, 12, 2))[1])
+
+    def test_non_numeric_values_are_config_errors(self):
+        for config in (
+            dict(CONFIG, flow_gpm={"speed1": "fast"}),
+            dict(CONFIG, power_w={"speed2": "n/a"}),
+            dict(CONFIG, tariff={"default_price": 0.14, "periods": [{"start": "16:00", "end": "21:00", "price": "peak"}]}),
+        ):
+            with self.assertRaisesRegex(ScheduleConfigError, "expected a number"):
+                optimize(config, WATTS, day=DAY)
+
+    def test_cli_refuses_to_write_over_pump_layers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, "optimizer.json")
+            schedule_path = os.path.join(tmp, "schedule.json")
+            with open(config_path, "w", encoding="utf-8") as handle:
+                json.dump(dict(CONFIG, power_w=WATTS), handle)
+            with open(schedule_path, "w", encoding="utf-8") as handle:
+                json.dump({"weekdays": {"sun": {"fallback_preset": "speed3"}}}, handle)
+            with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+                main(["--config", config_path, "--schedule", schedule_path, "--write", schedule_path,
+                      "--power-log", os.path.join(tmp, "none.json")])
+            self.assertIn("weekdays.sun", stderr.getvalue())
+            with open(schedule_path, "r", encoding="utf-8") as handle:
+                self.assertEqual(json.load(handle), {"weekdays": {"sun": {"fallback_preset": "speed3"}}})
+
+    def test_cli_reports_bad_config_as_usage_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "optimizer.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("{not json")
+            with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit) as raised:
+                main(["--config", path])
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("Expecting property name", stderr.getvalue())
+
+
+class PumpPowerLogTest(unittest.TestCase):
+    def test_ramping_is_skipped_and_means_persist(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "power.json")
+            now = [0.0]
+            log = PumpPowerLog(state_file=path, clock=lambda: now[0])
+            log.observe(55, 900)
+            for second, watts in ((10, 800), (40, 500), (50, 540), (60, 520)):
+                now[0] = float(second)
+                log.observe(55, watts)
+            # An unknown speed or a stopped filter is not a preset reading.
+            log.observe(63, 1000)
+            log.observe(55, 2000, filter_on=False)
+            log.flush()
+            self.assertEqual(log.watts(), {"speed3": 520.0})
+            self.assertEqual(load_pump_power(path), {"speed3": 520.0})
+            self.assertEqual(PumpPowerLog(state_file=path).as_dict()["presets"]["speed3"]["samples"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
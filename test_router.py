@@ -0,0 +1,89 @@
+import unittest
+
+from aqualogic_mqtt.router import CommandRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class CommandRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pending = []
+        self.router = CommandRouter(
+            min_interval_seconds=1.0,
+            clock=self.clock,
+            on_pending=lambda: self.pending.append(True),
+        )
+        self.calls = []
+        self.router.add_route("pool/filter/set", lambda payload: self.calls.append(("filter", payload)))
+        self.router.add_route("pool/lights/set", lambda payload: self.calls.append(("lights", payload)))
+
+    def test_exact_topic_dispatch_and_unrouted_topics(self):
+        self.assertTrue(self.router.dispatch("pool/filter/set", "ON"))
+        self.assertFalse(self.router.dispatch("xpool/filter/set", "ON"))
+        self.assertEqual(self.calls, [("filter", "ON")])
+        self.assertEqual(self.router.status()["unrouted"], 1)
+
+    def test_commands_within_interval_coalesce_to_latest(self):
+        self.router.dispatch("pool/filter/set", "ON")
+        self.clock.now += 0.2
+        self.router.dispatch("pool/filter/set", "OFF")
+        self.router.dispatch("pool/filter/set", "ON")
+        self.router.dispatch("pool/filter/set", "OFF")
+        self.assertEqual(self.calls, [("filter", "ON")])
+        self.assertAlmostEqual(self.router.next_due(), 0.8)
+        self.assertTrue(self.pending)
+
+        self.assertEqual(self.router.flush(), 0)
+        self.clock.now += 0.8
+        self.assertEqual(self.router.flush(), 1)
+        self.assertEqual(self.calls, [("filter", "ON"), ("filter", "OFF")])
+        self.assertIsNone(self.router.next_due())
+        self.assertEqual(self.router.status()["coalesced"], 2)
+
+    def test_held_command_matching_last_dispatch_is_dropped(self):
+        self.router.dispatch("pool/filter/set", "ON")
+        self.router.dispatch("pool/filter/set", "OFF")
+        self.router.dispatch("pool/filter/set", "ON")
+        self.clock.now += 1.0
+        self.assertEqual(self.router.flush(), 0)
+        self.assertEqual(self.calls, [("filter", "ON")])
+        self.assertEqual(self.router.status()["dropped"], 1)
+
+    def test_topics_are_limited_independently(self):
+        self.router.dispatch("pool/filter/set", "ON")
+        self.router.dispatch("pool/lights/set", "ON")
+        self.assertEqual(self.calls, [("filter", "ON"), ("lights", "ON")])
+
+    def test_zero_interval_route_is_never_held(self):
+        seen = []
+        self.router.add_route("ha/status", seen.append, min_interval_seconds=0)
+        self.router.dispatch("ha/status", "online")
+        self.router.dispatch("ha/status", "online")
+        self.assertEqual(seen, ["online", "online"])
+
+    def test_button_presses_are_never_coalesced(self):
+        presses = []
+        self.router.add_route("pool/buttons/menu/set", presses.append, min_interval_seconds=0)
+        for _ in range(3):
+            self.router.dispatch("pool/buttons/menu/set", "PRESS")
+        self.assertEqual(presses, ["PRESS", "PRESS", "PRESS"])
+        self.assertIsNone(self.router.next_due())
+        self.assertEqual(self.router.status()["dropped"], 0)
+
+    def test_handler_errors_do_not_escape(self):
+        def boom(payload):
+            raise RuntimeError("bus error")
+        self.router.add_route("pool/aux/set", boom)
+        with self.assertLogs("aqualogic_mqtt.router", level="ERROR"):
+            self.assertTrue(self.router.dispatch("pool/aux/set", "ON"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, time
+
+from aqualogic_mqtt.automation import AutomationEngine, parse_utc
+from aqualogic_mqtt.schedule_config import (
+    FileScheduleResolver,
+    ScheduleConfig,
+    ScheduleConfigError,
+    ScheduleFileWatcher,
+    load_schedule_file,
+)
+
+
+SCHEDULE = {
+    "version": 1,
+    "fallback_preset": "speed4",
+    "cleanout": {"start": "09:00", "end": "10:30"},
+    "pump_schedule": [
+        {"start": "00:00", "end": "08:00", "preset": "speed4"},
+        {"start": "08:00", "end": "00:00", "preset": "speed3"},
+    ],
+    "weekdays": {"sat": {"cleanout": None}},
+    "seasons": [
+        {
+            "name": "winter",
+            "from": "11-01",
+            "to": "03-31",
+            "pump_schedule": [{"start": "10:00", "end": "16:00", "preset": "speed2"}],
+            "weekdays": {"sunday": {"fallback_preset": "speed1"}},
+        }
+    ],
+}
+
+
+class ScheduleConfigTest(unittest.TestCase):
+    def test_weekday_and_wrapping_season_layers(self):
+        config = ScheduleConfig(SCHEDULE)
+        friday = config.timeline_for(date(2026, 6, 26))
+        saturday = config.timeline_for(date(2026, 6, 27))
+        self.assertEqual(friday.slot_at(9 * 3600 + 30 * 60), ("speed3", True))
+        self.assertEqual(saturday.slot_at(9 * 3600 + 30 * 60), ("speed3", False))
+
+        self.assertEqual(config.season_for(date(2027, 1, 15)), "winter")
+        self.assertIsNone(config.season_for(date(2026, 6, 26)))
+        winter_friday = config.timeline_for(date(2027, 1, 15))
+        self.assertEqual(winter_friday.slot_at(7 * 3600), ("speed4", False))
+        self.assertEqual(winter_friday.slot_at(12 * 3600), ("speed2", False))
+        winter_sunday = config.timeline_for(date(2027, 1, 17))
+        self.assertEqual(winter_sunday.slot_at(20 * 3600), ("speed1", False))
+
+    def test_identical_days_share_one_compiled_timeline(self):
+        config = ScheduleConfig(SCHEDULE)
+        monday = config.timeline_for(date(2026, 6, 22))
+        self.assertIs(config.timeline_for(date(2026, 6, 23)), monday)
+        self.assertIsNot(config.timeline_for(date(2026, 6, 27)), monday)
+
+    def test_validation_reports_the_offending_field(self):
+        cases = [
+            ({"pump_schedule": [{"start": "8:00", "end": "8:00", "preset": "speed1"}]}, "must differ"),
+            ({"pump_schedule": [{"start": "25:00", "end": "8:00", "preset": "speed1"}]}, r"pump_schedule\[0\]\.start"),
+            ({"fallback_preset": "turbo"}, "fallback_preset"),
+            ({"cleanout": {"start": "10:30", "end": "09:00"}}, "cleanout"),
+            ({"weekdays": {"funday": {}}}, "unknown weekday"),
+            ({"seasons": [{"from": "13-01", "to": "02-01"}]}, r"seasons\[0\]\.from"),
+            ({"pumps": []}, "unknown keys pumps"),
+            ({"version": 2}, "unsupported version"),
+        ]
+        for raw, message in cases:
+            with self.subTest(raw=raw):
+                with self.assertRaisesRegex(ScheduleConfigError, message):
+                    ScheduleConfig(raw)
+
+
+class ScheduleFileWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "schedule.json")
+        self.write(SCHEDULE)
+        self.clock = [0.0]
+
+    def write(self, payload):
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write(payload if isinstance(payload, str) else json.dumps(payload))
+
+    def touch_forward(self):
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_hot_reload_keeps_last_good_schedule(self):
+        watcher = ScheduleFileWatcher(self.path, check_interval_seconds=5, clock=lambda: self.clock[0])
+        resolver = FileScheduleResolver(watcher)
+        noon = parse_utc("2026-06-26T16:00:00Z")
+        self.assertEqual(resolver.slot(noon), ("speed3", False))
+
+        self.write(dict(SCHEDULE, pump_schedule=[{"start": "00:00", "end": "00:01", "preset": "speed1"}]))
+        self.touch_forward()
+        self.assertEqual(resolver.slot(noon), ("speed3", False))  # not checked yet
+        self.clock[0] = 6
+        self.assertEqual(resolver.slot(noon), ("speed4", False))
+
+        self.write("{not json")
+        self.touch_forward()
+        self.clock[0] = 12
+        self.assertEqual(resolver.slot(noon), ("speed4", False))
+        self.assertIn("schedule.json", watcher.status()["last_error"])
+
+    def test_engine_status_reports_schedule_source(self):
+        resolver = FileScheduleResolver(ScheduleFileWatcher(self.path))
+        engine = AutomationEngine(
+            object(), object(), state_file=None, resolver=resolver,
+            now=lambda: parse_utc("2026-06-26T16:00:00Z"),
+        )
+        status = engine.status()
+        self.assertEqual(status["schedule"]["source"], self.path)
+        self.assertEqual(status["desired"]["pump_preset"], "speed3")
+
+    @unittest.skipUnless(importlib.util.find_spec("yaml"), "PyYAML is not installed")
+    def test_yaml_file_with_unquoted_times(self):
+        path = os.path.join(self.tmp.name, "schedule.yaml")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(
+                "version: 1\n"
+                "cleanout: {start: 9:00, end: 10:30}\n"
+                "pump_schedule:\n"
+                "  - {start: 00:00, end: 08:00:30, preset: speed4}\n"
+                "  - {start: 08:00:30, end: 00:00, preset: speed3}\n"
+                "weekdays: {sat: {cleanout: null}}\n"
+                "seasons:\n"
+                "  - {name: winter, from: 11-01, to: 03-31, fallback_preset: speed2}\n"
+            )
+        config = load_schedule_file(path)
+        windows, cleanout, fallback = config.day_spec(date(2026, 6, 26))
+        self.assertEqual(cleanout, (time(9, 0), time(10, 30)))
+        self.assertEqual(windows[0].end, time(8, 0, 30))
+        self.assertEqual(fallback, "speed4")
+        self.assertIsNone(config.day_spec(date(2026, 6, 27))[1])
+        self.assertEqual(config.day_spec(date(2026, 12, 1))[2], "speed2")
+
+    def test_numeric_time_is_rejected_with_a_hint(self):
+        with self.assertRaisesRegex(ScheduleConfigError, "cleanout.end: expected HH:MM or HH:MM:SS text"):
+            ScheduleConfig({"cleanout": {"start": "09:00", "end": 630}})
+
+    def test_invalid_file_fails_at_startup(self):
+        self.write({"fallback_preset": "turbo"})
+        with self.assertRaises(ScheduleConfigError):
+            ScheduleFileWatcher(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from aqualogic_mqtt.scheduler import ReconcileScheduler
+
+
+class ReconcileSchedulerTest(unittest.TestCase):
+    def test_delay_is_earliest_deadline_within_poll_bounds(self):
+        scheduler = ReconcileScheduler(busy_poll_seconds=1.0, max_sleep_seconds=15.0)
+        self.assertEqual(scheduler.next_delay([None, None]), 15.0)
+        self.assertEqual(scheduler.next_delay([120.0, 7.5, None]), 7.5)
+        self.assertEqual(scheduler.next_delay([7.5], busy=True), 1.0)
+        # Overdue deadlines clamp to the minimum sleep instead of spinning.
+        self.assertEqual(scheduler.next_delay([-3.0]), 0.05)
+
+    def test_notify_wakes_waiter_with_reasons(self):
+        scheduler = ReconcileScheduler()
+        timer = threading.Timer(0.05, scheduler.notify, args=("panel",))
+        timer.start()
+        self.assertEqual(scheduler.wait(5.0), frozenset({"panel"}))
+        timer.join()
+
+        scheduler.notify("vsp_phase")
+        scheduler.notify("automation_inputs")
+        self.assertEqual(scheduler.wait(5.0), frozenset({"vsp_phase", "automation_inputs"}))
+        self.assertEqual(scheduler.wait(0.01), frozenset({"timer"}))
+        self.assertEqual(
+            scheduler.status()["wakeups"],
+            {"panel": 1, "vsp_phase": 1, "automation_inputs": 1, "timer": 1},
+        )
+
+    def test_async_wait_is_woken_from_another_thread(self):
+        scheduler = ReconcileScheduler()
+
+        async def scenario():
+            timer = threading.Timer(0.05, scheduler.notify, args=("panel",))
+            timer.start()
+            started = time.monotonic()
+            reasons = await scheduler.wait_async(5.0)
+            timer.join()
+            self.assertLess(time.monotonic() - started, 1.0)
+            self.assertEqual(reasons, frozenset({"panel"}))
+            scheduler.notify("mqtt_command")
+            self.assertEqual(await scheduler.wait_async(5.0), frozenset({"mqtt_command"}))
+            self.assertEqual(await scheduler.wait_async(0.01), frozenset({"timer"}))
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
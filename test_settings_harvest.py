@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+import unittest
+
+from aqualogic_mqtt.clock_sync import ClockSyncDriver
+from aqualogic_mqtt.heater_targets import HeaterTargetDriver
+from aqualogic_mqtt.settings_harvest import SettingsHarvester, generic_value
+
+
+class SettingsHarvesterTest(unittest.TestCase):
+    def test_generic_values_and_blinking_fields(self):
+        self.assertEqual(generic_value("Spa Chlorinator 10%"), 10)
+        self.assertIs(generic_value("Super Chlorinate Off"), False)
+        with self.assertRaises(ValueError):
+            generic_value("Spa Chlorinator")
+
+        now = [0.0]
+        harvest = SettingsHarvester(clock=lambda: now[0])
+        self.assertEqual(harvest.observe_display(["Pool Chlorinator 30%", "", "", ""]), 1)
+        # The field blinks off while selected; keep the last readable value.
+        self.assertEqual(harvest.observe_display(["Pool Chlorinator"]), 0)
+        # Default Menu rows are not Settings pages.
+        self.assertEqual(harvest.observe_display(["Filter Speed 70% Speed1", "Pool Chlorinator 30%  "]), 1)
+        self.assertEqual(harvest.get("pool_chlorinator")["value"], 30)
+        now[0] = 100.0
+        self.assertIsNone(harvest.get("pool_chlorinator", max_age=60))
+        self.assertEqual(harvest.as_dict()["values"]["pool_chlorinator"]["age_sec"], 100.0)
+
+    def test_heater_scan_is_answered_from_harvested_pages(self):
+        harvest = SettingsHarvester()
+        keys = []
+        driver = HeaterTargetDriver(
+            None,
+            key_sender=keys.append,
+            display_reader=lambda: {"lines": ["Default Menu"]},
+            service_mode_reader=lambda: False,
+            state_file=None,
+            harvester=harvest,
+        )
+        harvest.observe_display(["Spa Heater1 Manual 101°F"])
+        harvest.observe_display(["Pool Heater1 Off"])
+        driver.request_refresh()
+        driver._worker.join(2)
+
+        status = driver.status()
+        self.assertEqual(status["phase"], "complete")
+        self.assertTrue(status["merged"])
+        self.assertEqual(status["targets"], {"pool": None, "spa": 101})
+        self.assertEqual(keys, [])
+
+    def test_clock_check_falls_back_to_a_recent_clock_page(self):
+        harvest = SettingsHarvester()
+        driver = ClockSyncDriver(
+            key_sender=lambda _key: None,
+            display_reader=lambda: {"lines": [""]},
+            menu_cache_reader=lambda: {"values": {"controllerClock": {"fresh": False, "value": "Monday 1:00A"}}},
+            state_file=None,
+            now=lambda: datetime(2026, 6, 27, 14, 43, tzinfo=timezone.utc),
+            harvester=harvest,
+        )
+        harvest.observe_display(["Set Day and Time Saturday 10:  A"])
+        self.assertIsNone(harvest.get("clock"))
+        harvest.observe_display(["Set Day and Time Saturday 10:43A"])
+        self.assertEqual(driver._cached_line(), "Saturday 10:43A")
+
+
+if __name__ == "__main__":
+    unittest.main()
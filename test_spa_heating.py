@@ -0,0 +1,77 @@
+import math
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from aqualogic_mqtt.spa_heating import SpaHeatingModel
+
+
+NOW = datetime(2026, 6, 27, 18, 0, tzinfo=timezone.utc)
+
+
+def heat_session(model, start, spa, ambient, hours, gain=20.0, loss=0.1):
+    """Feed one simulated session; returns its final temperature and time."""
+    at = start
+    for _ in range(int(hours * 60)):
+        # The panel shows whole degrees.
+        model.record(float(round(spa)), ambient, True, at)
+        spa += (gain - loss * (spa - ambient)) / 60
+        at += 60
+    model.record(None, None, False, at)
+    return spa, at
+
+
+class SpaHeatingModelTest(unittest.TestCase):
+    def test_sessions_at_different_air_temperatures_separate_gain_and_loss(self):
+        model = SpaHeatingModel(state_file=None, now=lambda: NOW)
+        with self.assertRaises(RuntimeError):
+            model.estimate(80, 102, 60)
+        _, at = heat_session(model, 0.0, 60.0, 45.0, 3)
+        heat_session(model, at + 86400, 85.0, 85.0, 3)
+
+        status = model.as_dict()
+        self.assertAlmostEqual(status["gain_f_per_hour"], 20.0, delta=1.5)
+        self.assertAlmostEqual(status["loss_per_hour"], 0.1, delta=0.03)
+
+        estimate = model.estimate(80, 102, 60, ready_utc="2026-06-27T23:00:00Z")
+        expected = math.log((260 - 80) / (260 - 102)) / 0.1 * 60
+        self.assertAlmostEqual(estimate["minutes"], expected, delta=10)
+        self.assertTrue(estimate["reachable"])
+        self.assertLess(estimate["preheat_start_utc"], "2026-06-27T23:00:00Z")
+        self.assertEqual(model.estimate(103, 102, 60)["minutes"], 0.0)
+        self.assertFalse(model.estimate(80, 300, 60)["reachable"])
+
+    def test_only_spa_heating_is_logged_and_segments_persist(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "heating.json")
+            now = [0.0]
+            model = SpaHeatingModel(state_file=path, clock=lambda: now[0], now=lambda: NOW)
+            values = {
+                "poolSpaMode": {"value": "pool", "fresh": True},
+                "heaterRun": {"value": True, "fresh": True},
+                "spaTempF": {"value": 90, "fresh": True},
+                "ambientF": {"value": 70, "fresh": True},
+            }
+            for minute in range(40):
+                now[0] = minute * 60.0
+                values["spaTempF"]["value"] = 90 + minute // 3
+                model.observe(lambda: {"values": values})
+            self.assertEqual(model.as_dict()["segments"], 0)
+
+            values["poolSpaMode"]["value"] = "spa"
+            for minute in range(40, 80):
+                now[0] = minute * 60.0
+                values["spaTempF"]["value"] = 90 + minute // 3
+                model.observe(lambda: {"values": values})
+                model.observe(lambda: {"values": values})
+            self.assertEqual(model.as_dict()["segments"], 2)
+
+            reloaded = SpaHeatingModel(state_file=path, min_segments=2, now=lambda: NOW)
+            # Constant air temperature: the loss cannot be separated, mean rate only.
+            self.assertEqual(reloaded.as_dict()["loss_per_hour"], 0.0)
+            self.assertAlmostEqual(reloaded.as_dict()["gain_f_per_hour"], 20.0, delta=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
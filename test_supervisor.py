@@ -0,0 +1,100 @@
+import unittest
+
+from aqualogic_mqtt import controls
+from aqualogic_mqtt.outbound import ReconnectBackoff
+from aqualogic_mqtt.supervisor import LinkSupervisor
+from aqualogic_mqtt.webapp import create_app
+from unittest.mock import patch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class LinkSupervisorTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.attempts = []
+        self.fail_with = None
+        self.link = LinkSupervisor(
+            "Panel",
+            self._connect,
+            backoff=ReconnectBackoff(min_seconds=1, max_seconds=8, rng=lambda: 1.0),
+            confirm_seconds=5,
+            clock=self.clock,
+        )
+
+    def _connect(self):
+        self.attempts.append(self.clock.now)
+        if self.fail_with is not None:
+            raise self.fail_with
+
+    def test_retries_forever_with_capped_backoff(self):
+        self.fail_with = OSError("connection refused")
+        with self.assertLogs("aqualogic_mqtt.supervisor"):
+            self.link.mark_down("reader stopped")
+            for _ in range(20):
+                self.clock.now += self.link.next_due()
+                self.link.tick()
+        self.assertEqual(len(self.attempts), 20)
+        gaps = [b - a for a, b in zip(self.attempts, self.attempts[1:])]
+        self.assertEqual(gaps[:4], [2.0, 4.0, 8.0, 8.0])
+        self.assertEqual(max(gaps), 8.0)
+        self.assertEqual(self.link.status()["last_error"], "connection refused")
+
+    def test_successful_attempt_waits_for_confirmation_before_retrying(self):
+        with self.assertLogs("aqualogic_mqtt.supervisor"):
+            self.link.mark_down("no updates for 30s")
+        self.clock.now += 1.0
+        self.link.tick()
+        self.assertEqual(len(self.attempts), 1)
+        self.assertEqual(self.link.next_due(), 5.0)
+        self.clock.now += 4.0
+        self.link.tick()
+        self.assertEqual(len(self.attempts), 1)
+
+    def test_failed_first_connection_is_retried_with_backoff(self):
+        self.fail_with = OSError("connection refused")
+        with self.assertLogs("aqualogic_mqtt.supervisor"):
+            self.assertFalse(self.link.start(self._connect))
+        status = self.link.status()
+        self.assertEqual(status["state"], "down")
+        self.assertEqual(status["last_error"], "connection refused")
+        self.assertEqual(self.link.next_due(), 1.0)
+        self.fail_with = None
+        self.clock.now += 1.0
+        self.link.tick()
+        self.assertEqual(len(self.attempts), 2)
+
+    def test_recovery_metrics(self):
+        with self.assertLogs("aqualogic_mqtt.supervisor"):
+            self.link.mark_down("disconnected")
+            self.link.mark_down("disconnected again")
+            self.clock.now += 12.5
+            self.link.mark_up()
+            self.link.mark_down("disconnected")
+            self.clock.now += 3.0
+            self.link.mark_up()
+        status = self.link.status()
+        self.assertEqual(status["state"], "up")
+        self.assertEqual(status["outages"], 2)
+        self.assertEqual(status["last_recovery_sec"], 3.0)
+        self.assertEqual(status["max_recovery_sec"], 12.5)
+        self.assertEqual(status["total_downtime_sec"], 15.5)
+        self.assertIsNone(self.link.next_due())
+
+    def test_connections_endpoint(self):
+        reader = lambda: {"mqtt": {"state": "up"}, "panel": {"state": "down"}}
+        with patch.object(controls._default, "_connection_status_reader", reader):
+            response = create_app().test_client().get("/api/connections")
+        self.assertEqual(response.get_json(), {
+            "available": True, "mqtt": {"state": "up"}, "panel": {"state": "down"},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
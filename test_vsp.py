@@ -7,6 +7,7 @@ import unittest
 from aqualogic.keys import Keys
 
 from aqualogic_mqtt import controls
+from aqualogic_mqtt.settings_harvest import SettingsHarvester
 from aqualogic_mqtt.vsp import PanelPumpState, VspDriver, VspInterlockError, _page_key
 from aqualogic_mqtt.webapp import create_app
 
@@ -98,6 +99,7 @@ class VspDriverTest(unittest.TestCase):
             poll_interval_seconds=0.001,
             key_timeout_seconds=0.1,
             key_settle_seconds=0,
+            burst_interval_seconds=0,
             key_sender=controller.send_key,
             display_reader=controller.display,
             menu_cache_reader=controller.cache,
@@ -151,6 +153,58 @@ class VspDriverTest(unittest.TestCase):
         self.assertIsNone(status["target_name"])
         self.assertEqual(controller.keys, [])
 
+    def test_target_already_in_effect_is_held_without_key_presses(self):
+        controller = FakeController(active_preset=1)
+        driver = self.make_driver(controller)
+
+        driver.request_preset("speed1")
+        self.assertTrue(wait_until(lambda: not driver.is_busy()))
+
+        status = driver.status()
+        self.assertEqual(status["phase"], "complete")
+        self.assertEqual(status["menu_edits_skipped"], 1)
+        self.assertEqual(controller.keys, [])
+
+    def test_observed_pump_speed_only_skips_menu_edit_while_live(self):
+        now = [100.0]
+        controller = FakeController(active_preset=2)
+        driver = self.make_driver(controller, clock=lambda: now[0], preset_cache_seconds=600)
+        driver.observe(PanelPumpState(requested_speed_pct=95, pump_power_w=400, filter_on=True, service_mode=False))
+        self.assertEqual(driver._unchanged_preset(95), ("speed2", "observed"))
+        # Minutes-old pump state is not evidence of the current speed, even
+        # though harvested preset pages stay usable that long.
+        now[0] += 6
+        self.assertIsNone(driver._unchanged_preset(95))
+
+    def test_fresh_cached_preset_percent_skips_menu_edit(self):
+        now = [100.0]
+        controller = FakeController(active_preset=2)
+        harvest = SettingsHarvester(clock=lambda: now[0])
+        driver = self.make_driver(controller, clock=lambda: now[0], preset_cache_seconds=60, harvester=harvest)
+        # The pump reports a different speed (e.g. still ramping), but the
+        # Filter Speed2 page was just seen holding 95%.
+        driver.observe(PanelPumpState(requested_speed_pct=90, pump_power_w=400, filter_on=True, service_mode=False))
+        harvest.observe_display(["Filter Speed2 95%", "", "", ""])
+        self.assertEqual(driver._unchanged_preset(95), ("speed2", "cached"))
+        self.assertEqual(driver.status()["preset_cache"]["speed2"]["pct"], 95)
+
+        now[0] += 61
+        self.assertIsNone(driver._unchanged_preset(95))
+        # The Default Menu's "Filter Speed 95% Speed2" row is not a preset page.
+        harvest.observe_display(["Filter Speed 95% Speed2"])
+        self.assertIsNone(driver._unchanged_preset(95))
+
+    def test_phase_changes_are_reported_to_listener(self):
+        controller = FakeController(active_preset=1)
+        phases = []
+        driver = self.make_driver(controller, on_phase_change=phases.append)
+        driver.request_preset("speed3")
+        self.assertTrue(wait_until(lambda: not driver.is_busy()))
+        self.assertEqual(phases[0], "queued")
+        self.assertIn("holding", phases)
+        self.assertEqual(phases[-1], "complete")
+        self.assertEqual(len(phases), len(set(phases)))
+
     def test_lcd_detail_refresh_does_not_look_like_page_navigation(self):
         self.assertEqual(_page_key("Spa Heater1"), _page_key("Spa Heater1 Manual Off"))
         self.assertEqual(_page_key("VSP Speed Settings"), _page_key("VSP Speed Settings + to enter"))
@@ -323,6 +377,7 @@ class VspApiTest(unittest.TestCase):
             poll_interval_seconds=0.001,
             key_timeout_seconds=0.1,
             key_settle_seconds=0,
+            burst_interval_seconds=0,
             key_sender=controller.send_key,
             display_reader=controller.display,
             menu_cache_reader=controller.cache,
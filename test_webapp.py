@@ -110,9 +110,9 @@ class WebApiContractTest(unittest.TestCase):
         automation.hardware_busy.return_value = False
         sender = MagicMock()
         with (
-            patch.object(controls, "_vsp_driver", vsp),
-            patch.object(controls, "_automation", automation),
-            patch.object(controls, "_key_sender", sender),
+            patch.object(controls._default, "_vsp_driver", vsp),
+            patch.object(controls._default, "_automation", automation),
+            patch.object(controls._default, "_key_sender", sender),
         ):
             client = create_app().test_client()
             for key in ("menu", "plus", "minus", "left", "right", "filter", "pool_spa"):
@@ -122,12 +122,10 @@ class WebApiContractTest(unittest.TestCase):
         self.assertEqual(sender.call_count, 7)
 
     def test_navigation_keys_remain_blocked_during_vsp_menu_write(self):
-        vsp = MagicMock()
-        vsp.is_menu_busy.return_value = True
         sender = MagicMock()
         with (
-            patch.object(controls, "_vsp_driver", vsp),
-            patch.object(controls, "_key_sender", sender),
+            controls.get_lcd_arbiter().acquire("vsp", "automation"),
+            patch.object(controls._default, "_key_sender", sender),
         ):
             response = create_app().test_client().post("/api/key/menu")
         self.assertFalse(response.get_json()["ok"])
@@ -196,13 +194,14 @@ class WebApiContractTest(unittest.TestCase):
         automation.status.return_value = {"enabled": True, "phase": "setting_speed"}
 
         with (
-            patch.object(controls, "_equipment", equipment),
-            patch.object(controls, "_vsp_driver", vsp),
-            patch.object(controls, "_automation", automation),
+            patch.object(controls._default, "_equipment", equipment),
+            patch.object(controls._default, "_vsp_driver", vsp),
+            patch.object(controls._default, "_automation", automation),
         ):
-            active = controls.get_equipment_status()
+            with controls.get_lcd_arbiter().acquire("vsp", "automation"):
+                active = controls.get_equipment_status()
             self.assertTrue(active["controls_locked"])
-            self.assertIn("Pump control in progress", active["control_lock_reason"])
+            self.assertIn("Pump control in progress: applying", active["control_lock_reason"])
 
             vsp.status.return_value["phase"] = "holding"
             automation.status.return_value["phase"] = "holding_speed"
@@ -223,9 +222,10 @@ class WebApiContractTest(unittest.TestCase):
         automation.status.return_value = {"enabled": True, "phase": "setting_lights"}
 
         with (
-            patch.object(controls, "_equipment", equipment),
-            patch.object(controls, "_vsp_driver", vsp),
-            patch.object(controls, "_automation", automation),
+            patch.object(controls._default, "_equipment", equipment),
+            patch.object(controls._default, "_vsp_driver", vsp),
+            patch.object(controls._default, "_automation", automation),
+            controls.get_lcd_arbiter().acquire("equipment", "user"),
         ):
             status = controls.get_equipment_status()
 
@@ -245,15 +245,48 @@ class WebApiContractTest(unittest.TestCase):
         }
 
         with (
-            patch.object(controls, "_equipment", equipment),
-            patch.object(controls, "_vsp_driver", vsp),
-            patch.object(controls, "_automation", automation),
+            patch.object(controls._default, "_equipment", equipment),
+            patch.object(controls._default, "_vsp_driver", vsp),
+            patch.object(controls._default, "_automation", automation),
+            controls.get_lcd_arbiter().acquire("clock_sync", "maintenance"),
         ):
             status = controls.get_equipment_status()
 
         self.assertTrue(status["controls_locked"])
         self.assertIn("Synchronizing", status["control_lock_reason"])
 
+    def test_equipment_status_queries_each_subsystem_once(self):
+        equipment = MagicMock()
+        equipment.status.return_value = {"busy": False, "phase": "idle"}
+        vsp = MagicMock()
+        vsp.status.return_value = {"busy": False, "phase": "idle"}
+        heater_targets = MagicMock()
+        heater_targets.status.return_value = {"busy": False, "pool": None, "spa": None}
+        clock_sync = MagicMock()
+        clock_sync.status.return_value = {"busy": False, "phase": "idle"}
+        automation = MagicMock()
+        automation.status.return_value = {"enabled": True, "phase": "idle"}
+
+        with (
+            patch.object(controls._default, "_equipment", equipment),
+            patch.object(controls._default, "_vsp_driver", vsp),
+            patch.object(controls._default, "_heater_targets", heater_targets),
+            patch.object(controls._default, "_clock_sync", clock_sync),
+            patch.object(controls._default, "_automation", automation),
+        ):
+            status = controls.get_equipment_status()
+
+        self.assertFalse(status["controls_locked"])
+        equipment.status.assert_called_once()
+        vsp.status.assert_called_once()
+        heater_targets.status.assert_called_once()
+        clock_sync.status.assert_called_once()
+        automation.status.assert_called_once_with(
+            clock_sync_status=clock_sync.status.return_value,
+            heater_target_status=heater_targets.status.return_value,
+        )
+        self.assertIs(status["heater_targets"], heater_targets.status.return_value)
+
     @patch("aqualogic_mqtt.webapp.controls.activate_openclaw_spa")
     def test_openclaw_spa_start_endpoint(self, activate):
         activate.return_value = {"desired": {"source": "calendar", "mode": "spa"}}
@@ -285,6 +318,16 @@ class WebApiContractTest(unittest.TestCase):
             "preheat_start_utc": "2026-06-27T16:00:00Z",
         })
 
+    @patch("aqualogic_mqtt.webapp.controls.estimate_spa_heating")
+    def test_openclaw_spa_estimate_takes_query_parameters(self, estimate):
+        estimate.return_value = {"ok": True, "minutes": 42.0, "reachable": True}
+        response = self.client.get("/api/openclaw/spa/estimate?target_f=102&ready_utc=2026-06-27T23:00:00Z")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["minutes"], 42.0)
+        estimate.assert_called_once_with({"target_f": "102", "ready_utc": "2026-06-27T23:00:00Z"})
+        estimate.side_effect = RuntimeError("not enough logged Spa heating")
+        self.assertEqual(self.client.get("/api/openclaw/spa/estimate").status_code, 503)
+
     @patch("aqualogic_mqtt.webapp.controls.get_automation_status")
     def test_openclaw_status_distinguishes_armed_plan(self, status):
         status.return_value = {
@@ -299,5 +342,38 @@ class WebApiContractTest(unittest.TestCase):
         self.assertEqual(body["phase"], "scheduled")
 
 
+
+class MultiPanelApiTest(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(controls._panels, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_panel_routes_address_each_panel_and_reject_unknown_ids(self):
+        first = controls.register_panel("pool")
+        second = controls.register_panel("lap")
+        self.assertIs(first, controls._default)
+        sender = MagicMock()
+        second.set_key_sender(sender)
+        second.update_display(["LAP POOL", "", "", ""], None, None)
+        client = create_app().test_client()
+
+        self.assertEqual(client.get("/api/panels").get_json(), {"panels": ["pool", "lap"]})
+        response = client.get("/api/panels/lap/display")
+        self.assertEqual(response.get_json()["lines"][0], "LAP POOL")
+        self.assertNotEqual(client.get("/api/display").get_json()["lines"][0], "LAP POOL")
+        response = client.post("/api/panels/lap/key/menu")
+        self.assertEqual(response.get_json(), {"ok": True, "key": "menu"})
+        sender.assert_called_once()
+
+        response = client.get("/api/panels/spa/equipment")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.get_json()["ok"])
+
+    def test_automation_commands_match_the_panel_identifier(self):
+        topic = "homeassistant/device/lap/lap_switch_filter/set"
+        self.assertEqual(controls.mqtt_automation_command(topic, "ON", "lap"), ("switch", ("filter", True)))
+        self.assertIsNone(controls.mqtt_automation_command(topic, "ON"))
+
 if __name__ == "__main__":
     unittest.main()